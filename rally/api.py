@@ -14,18 +14,15 @@
 #    under the License.
 
 import collections
+import datetime as dt
 import json
 import os
 import re
 import sys
 import time
 
-import jinja2
-import jinja2.meta
-import requests
-from requests.packages import urllib3
-
 from rally.common import cfg
+from rally.common import db
 from rally.common import logging
 from rally.common import objects
 from rally.common import opts
@@ -36,7 +33,9 @@ from rally import consts
 from rally import exceptions
 from rally.task import engine
 from rally.task import exporter as texporter
+from rally.task.processing import plot
 from rally.task import task_cfg
+from rally.task import template
 from rally.verification import context as vcontext
 from rally.verification import manager as vmanager
 from rally.verification import reporter as vreporter
@@ -50,6 +49,19 @@ API_REQUEST_PREFIX = "/api"
 opts.register()
 
 
+def check_task_result(result):
+    """Check the format of a raw result of an iteration of a workload.
+
+    The check does not touch the database, so it can be done anywhere
+    before results are imported.
+
+    :param result: a raw result of an iteration
+    :returns: a message which describes a problem or None if the result
+        is valid
+    """
+    return objects.task.check_result(result)
+
+
 class APIGroup(object):
     def __init__(self, api):
         """Initialize API group.
@@ -214,16 +226,28 @@ class _Task(APIGroup):
     TASK_SCHEMA = objects.task.TASK_SCHEMA
 
     def list(self, **filters):
+        """List tasks.
+
+        :param filters: filters to apply (status, deployment, tags), and
+            optional pagination, ordering and projection arguments:
+            created_after, created_before, sort_desc, marker (the uuid of
+            the last task of the previous page), limit, offset, fields
+            and uuids_only.
+        """
         return [task.to_dict() for task in objects.Task.list(**filters)]
 
-    def get(self, task_id, detailed=False):
+    def get(self, task_id, detailed=False, lazy_data=False):
         """Get task data
 
         :param task_id: Task UUID
         :param detailed: whether return detailed information(including
             subtasks and workloads) or not.
+        :param lazy_data: whether return raw iterations of workloads as
+            iterables which load them from the database chunk by chunk
+            instead of lists.
         """
-        return objects.Task.get(task_id, detailed=detailed).to_dict()
+        return objects.Task.get(task_id, detailed=detailed,
+                                lazy_data=lazy_data).to_dict()
 
     # TODO(andreykurilin): move it to some kind of utils
     def render_template(self, task_template, template_dir="./", **kwargs):
@@ -254,10 +278,9 @@ class _Task(APIGroup):
         #                 main module)
         import builtins
 
-        env = jinja2.Environment(
-            loader=jinja2.FileSystemLoader(template_dir, encoding="utf8"))
-        env.globals.update(self.create_template_functions())
-        ast = env.parse(task_template)
+        compiled = template.get(task_template, template_dir,
+                                self.create_template_functions())
+        env = compiled.environment
         # NOTE(Julia Varigina):
         # Bug in jinja2.meta.find_undeclared_variables
         #
@@ -274,7 +297,7 @@ class _Task(APIGroup):
         # Despite this bug, jinja resolves values
         # declared in jinja2.Environment.globals for both types of undeclared
         # variables and successfully renders templates in both cases.
-        required_kwargs = jinja2.meta.find_undeclared_variables(ast)
+        required_kwargs = compiled.undeclared
         missing = (set(required_kwargs) - set(kwargs) - set(dir(builtins))
                    - set(env.globals))
         real_missing = [mis for mis in missing
@@ -286,8 +309,7 @@ class _Task(APIGroup):
             raise TypeError((len(real_missing) > 1 and multi_msg or single_msg)
                             % ", ".join(real_missing))
 
-        render_template = env.from_string(task_template).render(**kwargs)
-        return render_template
+        return compiled.render(**kwargs)
 
     def create_template_functions(self):
 
@@ -427,6 +449,13 @@ class _Task(APIGroup):
 
         task_engine.run()
 
+        try:
+            self._index_trends(task["uuid"])
+        except Exception as e:
+            # trends of the task will be indexed while building them
+            LOG.warning("Failed to index trends of the task %s: %s"
+                        % (task["uuid"], e))
+
         return task["uuid"], task.get_status(task["uuid"])
 
     def abort(self, task_uuid, soft=False, wait=False, **kwargs):
@@ -496,8 +525,18 @@ class _Task(APIGroup):
             objects.Task.delete_by_uuid(
                 task_uuid, status=consts.TaskStatus.FINISHED)
 
-    def import_results(self, deployment, task_results, tags=None):
-        """Import json results of a task into rally database"""
+    def import_results(self, deployment, task_results, tags=None,
+                       validate=True):
+        """Import json results of a task into rally database
+
+        :param deployment: UUID or name of the deployment
+        :param task_results: results of the task
+        :param tags: tags to mark the task with
+        :param validate: whether to check the format of each iteration. It
+            can be turned off if iterations have been validated already
+        :raises RallyException: if results are in wrong format. The task is
+            not stored in this case
+        """
         deployment = objects.Deployment.get(deployment)
         if deployment["status"] != consts.DeployStatus.DEPLOY_FINISHED:
             raise exceptions.DeploymentNotFinishedStatus(
@@ -508,34 +547,63 @@ class _Task(APIGroup):
         task_inst = objects.Task(env_uuid=deployment["uuid"],
                                  tags=tags)
         task_inst.update_status(consts.TaskStatus.RUNNING)
-        for subtask in task_results["subtasks"]:
+        try:
+            self._import_subtasks(task_inst, task_results["subtasks"],
+                                  validate=validate)
+        except Exception:
+            # iterations are validated while they are stored, so the task
+            #   is deleted to not leave it half-imported
+            task_inst.delete()
+            raise
+        task_inst.update_status(consts.SubtaskStatus.FINISHED)
+        try:
+            self._index_trends(task_inst["uuid"])
+        except Exception as e:
+            # trends of the task will be indexed while building them
+            LOG.warning("Failed to index trends of the task %s: %s"
+                        % (task_inst["uuid"], e))
+
+        LOG.info("Task results have been successfully imported.")
+
+        return task_inst.to_dict()
+
+    @staticmethod
+    def _import_subtasks(task_inst, subtasks, validate=True):
+        for subtask in subtasks:
             subtask_obj = task_inst.add_subtask(title=subtask.get("title"))
             for workload in subtask["workloads"]:
-                for data in workload["data"]:
-                    if not task_inst.result_has_valid_schema(data):
-                        raise exceptions.RallyException(
-                            "Task %s is trying to import "
-                            "results in wrong format" % task_inst["uuid"])
-
                 workload_obj = subtask_obj.add_workload(
                     name=workload["name"], description=workload["description"],
                     position=workload["position"], runner=workload["runner"],
                     runner_type=workload["runner_type"],
                     contexts=workload["contexts"], hooks=workload["hooks"],
-                    sla=workload["sla"], args=workload["args"])
+                    sla=workload["sla"], args=workload["args"],
+                    parameters=workload.get("parameters"))
 
+                # NOTE: `workload["data"]` can be an iterator which reads
+                #   iterations from a file, so it is consumed only once and
+                #   stored by chunks as it goes.
                 chunk_size = CONF.raw_result_chunk_size
                 workload_data_count = 0
-                while len(workload["data"]) > chunk_size:
-                    results_chunk = workload["data"][:chunk_size]
-                    workload["data"] = workload["data"][chunk_size:]
-                    results_chunk.sort(key=lambda x: x["timestamp"])
-                    workload_obj.add_workload_data(workload_data_count,
-                                                   {"raw": results_chunk})
-                    workload_data_count += 1
-
-                workload_obj.add_workload_data(workload_data_count,
-                                               {"raw": workload["data"]})
+                results_chunk = []
+                for data in workload["data"]:
+                    if validate and not task_inst.result_has_valid_schema(
+                            data):
+                        raise exceptions.RallyException(
+                            "Task %s is trying to import "
+                            "results in wrong format" % task_inst["uuid"])
+                    if len(results_chunk) == chunk_size:
+                        results_chunk.sort(key=lambda x: x["timestamp"])
+                        workload_obj.add_workload_data(
+                            workload_data_count, {"raw": results_chunk},
+                            chunk_format=CONF.raw_result_chunk_format)
+                        workload_data_count += 1
+                        results_chunk = []
+                    results_chunk.append(data)
+
+                workload_obj.add_workload_data(
+                    workload_data_count, {"raw": results_chunk},
+                    chunk_format=CONF.raw_result_chunk_format)
                 workload_obj.set_results(
                     sla_results=workload["sla_results"].get("sla"),
                     hooks_results=workload["hooks"],
@@ -544,28 +612,102 @@ class _Task(APIGroup):
                     load_duration=workload["load_duration"],
                     contexts_results=workload["contexts_results"])
             subtask_obj.update_status(consts.SubtaskStatus.FINISHED)
-        task_inst.update_status(consts.SubtaskStatus.FINISHED)
 
-        LOG.info("Task results have been successfully imported.")
+    def _index_trends(self, task_uuid):
+        """Make summaries of workloads of the task for trends.
 
-        return task_inst.to_dict()
+        Summaries are stored only if the task is in a final status, since
+        results of running tasks can change.
 
-    def export(self, tasks, output_type, output_dest=None):
+        :returns: a list of summaries (points of trends)
+        """
+        task = self.get(task_uuid, detailed=True, lazy_data=True)
+        trends = plot.Trends()
+        points = [{"workload_uuid": workload["uuid"],
+                   "point": trends.make_point(workload)}
+                  for subtask in task["subtasks"]
+                  for workload in subtask["workloads"]]
+        if task["status"] in (consts.TaskStatus.FINISHED,
+                              consts.TaskStatus.ABORTED,
+                              consts.TaskStatus.CRASHED):
+            objects.Task.set_trend_points(task_uuid, points)
+        return [p["point"] for p in points]
+
+    def get_trend_points(self, task_uuids):
+        """Get summaries of workloads of tasks to build trends.
+
+        Summaries are taken from the trends index, so neither workloads
+        nor their raw iterations are loaded. Tasks which are missed in the
+        index (i.e. they were run by older versions of Rally) are indexed
+        on the fly.
+
+        :param task_uuids: a list of UUIDs of tasks
+        :returns: a dict where keys are UUIDs of tasks and values are lists
+            of summaries of their workloads
+        """
+        points = objects.Task.get_trend_points(task_uuids)
+        result = collections.OrderedDict()
+        for task_uuid in task_uuids:
+            if task_uuid not in points:
+                points[task_uuid] = self._index_trends(task_uuid)
+            result[task_uuid] = points[task_uuid]
+        return result
+
+    def compact(self, older_than=None, tags=None, iterations_limit=1000,
+                batch_size=100):
+        """Replace raw iterations of finished workloads by compact data.
+
+        Workloads are processed in batches and each workload is compacted in
+        a separate transaction, so it is safe to run it against the database
+        that is used by running tasks. Already compacted workloads are
+        skipped, so the process can be interrupted and restarted at any time.
+
+        :param older_than: compact only workloads created more than the
+            specified number of days ago
+        :param tags: compact only workloads of tasks with any of these tags
+        :param iterations_limit: maximum number of iterations to keep for
+            each workload
+        :param batch_size: number of workloads to process at once
+        :returns: number of compacted workloads
+        """
+        created_before = None
+        if older_than is not None:
+            created_before = (dt.datetime.utcnow()
+                              - dt.timedelta(days=older_than))
+
+        compacted = 0
+        marker = None
+        while True:
+            workloads = objects.Workload.list_for_compaction(
+                created_before=created_before, tags=tags, marker=marker,
+                limit=batch_size)
+            if not workloads:
+                break
+            for workload in workloads:
+                if objects.Workload.compact(
+                        workload["uuid"], iterations_limit=iterations_limit,
+                        chunk_format=CONF.raw_result_chunk_format):
+                    compacted += 1
+            marker = workloads[-1]["id"]
+            LOG.info("%s workload(s) have been compacted so far."
+                     % compacted)
+
+        return compacted
+
+    def export(self, tasks, output_type, output_dest=None, use_cache=True):
         """Generate a report for a task or a few tasks.
 
         :param tasks: List of tasks UUIDs or tasks results
         :param output_type: Plugin name of task exporter
         :param output_dest: Destination for task report
+        :param use_cache: Whether to use the cache of processed data of
+            workloads (if the exporter supports it)
+        :returns: a dict with "files", "open" and "print" optional keys. If
+            the report is saved to the destination by the exporter itself
+            (i.e. JSON, JUnit-XML and ElasticSearch exporters), there is no
+            "files" key.
         """
 
-        tasks_results = []
-        tasks = tasks or []
-        for task in tasks:
-            if isinstance(task, dict):
-                tasks_results.append(task)
-            else:
-                tasks_results.append(self.get(task_id=task, detailed=True))
-
         errors = texporter.TaskExporter.validate(
             output_type, context={}, config={},
             # wrap destination to a dict to allow extending options in future
@@ -577,13 +719,24 @@ class _Task(APIGroup):
 
         reporter_cls = texporter.TaskExporter.get(output_type)
 
+        tasks_results = []
+        tasks = tasks or []
+        for task in tasks:
+            if isinstance(task, dict):
+                tasks_results.append(task)
+            else:
+                tasks_results.append(
+                    self.get(task_id=task, detailed=reporter_cls.DETAILED,
+                             lazy_data=reporter_cls.STREAMING))
+
         LOG.info("Building '%s' report for the following task(s): '%s'."
                  % (output_type,
                     "', '".join([task["uuid"] for task in tasks_results])))
         result = texporter.TaskExporter.make(reporter_cls,
                                              tasks_results,
                                              output_dest,
-                                             api=self.api)
+                                             api=self.api,
+                                             use_cache=use_cache)
         LOG.info("The report has been successfully built.")
         return result
 
@@ -1072,17 +1225,16 @@ class _Verification(APIGroup):
             run_args["concurrency"] = concurrency
 
         verification = self._get(verification_uuid)
-        tests = verification.tests
 
         if failed:
-            tests = [t for t, r in tests.items() if r["status"] == "fail"]
+            tests = list(verification.get_tests(status="fail",
+                                                detailed=False))
             if not tests:
                 raise exceptions.RallyException(
                     "There are no failed tests from verification (UUID=%s)."
                     % verification_uuid)
         else:
-            # py2 and py3
-            tests = list(tests.keys())
+            tests = list(verification.get_tests(detailed=False))
 
         deployment = (deployment_id if deployment_id
                       else verification.deployment_uuid)
@@ -1103,21 +1255,59 @@ class _Verification(APIGroup):
         """
         return objects.Verification.get(verification_uuid)
 
-    def get(self, verification_uuid):
-        return self._get(verification_uuid).to_dict()
+    def get(self, verification_uuid, load_tests=True):
+        """Get a verification.
+
+        :param verification_uuid: Verification UUID
+        :param load_tests: Whether to load results of all tests. Use
+            `get_tests` method to load only the required ones
+        """
+        verification = self._get(verification_uuid)
+        data = verification.to_dict()
+        if load_tests:
+            data["tests"] = verification.tests
+        return data
+
+    def get_tests(self, verification_uuid, status=None, detailed=True):
+        """Get results of tests of a verification.
+
+        :param verification_uuid: Verification UUID
+        :param status: Status (or list of statuses) of tests to filter by
+        :param detailed: Whether to load the whole results (tracebacks,
+            tags, etc) or only names, statuses and durations of tests
+        :returns: dict where keys are names of tests
+        """
+        return self._get(verification_uuid).get_tests(status=status,
+                                                      detailed=detailed)
+
+    def get_test_results(self, test_names, verification_uuids=None):
+        """Get results of tests across many verifications.
+
+        :param test_names: Names of tests
+        :param verification_uuids: UUIDs of verifications to look in (all
+            verifications by default)
+        :returns: dict where keys are UUIDs of verifications and values are
+            dicts with results of tests
+        """
+        return objects.Verification.get_test_results(
+            test_names, verification_uuids=verification_uuids)
 
     def list(self, verifier_id=None, deployment_id=None,
-             tags=None, status=None):
+             tags=None, status=None, **kwargs):
         """List all verifications.
 
         :param verifier_id: Verifier name or UUID
         :param deployment_id: Deployment name or UUID
         :param tags: Tags to filter verifications by
         :param status: Status to filter verifications by
+        :param kwargs: optional pagination, ordering and projection
+            arguments: created_after, created_before, sort_desc, marker (the
+            uuid of the last verification of the previous page), limit,
+            offset and fields
         """
         return [item.to_dict() for item in objects.Verification.list(
             verifier_id, deployment_id=deployment_id,
-            tags=tags, status=status)]
+            tags=tags, status=status, **kwargs)]
 
     def delete(self, verification_uuid):
         """Delete a verification.
@@ -1135,6 +1325,9 @@ class _Verification(APIGroup):
         :param uuids: List of verifications UUIDs
         :param output_type: Plugin name of verification reporter
         :param output_dest: Destination for verification report
+        :returns: a dict with "files", "open" and "print" optional keys. If
+            the report is saved to the destination by the reporter itself
+            (i.e. JUnit-XML reporter), there is no "files" key.
         """
         verifications = [self._get(uuid) for uuid in uuids]
 
@@ -1236,6 +1429,8 @@ class API(object):
                 urllib3_log.setLevel(logging.WARNING)
 
                 LOG.debug("urllib3 insecure warnings are hidden.")
+                import urllib3
+
                 for warning in ("InsecurePlatformWarning",
                                 "SNIMissingWarning",
                                 "InsecureRequestWarning"):
@@ -1282,7 +1477,25 @@ class API(object):
             if os.path.isfile(fpath):
                 return [fpath]
 
+    @classmethod
+    def read_only(cls, config_file=None, config_args=None, plugin_paths=None):
+        """Initialize Rally API instance for tools which only read data.
+
+        The revision of the database is not checked at all, so the
+        initialization does not touch the database. An outdated schema
+        results in errors of DB queries instead.
+
+        See API.__init__ for the description of parameters.
+        """
+        return cls(config_file=config_file, config_args=config_args,
+                   plugin_paths=plugin_paths, skip_db_check=True)
+
     def check_db_revision(self):
+        # NOTE: it is done by each command of CLI, so the result of the
+        #   check is recorded and reused until the database or Rally changes
+        if db.schema.is_revision_verified():
+            return
+
         rev = rally_version.database_revision()
 
         # Check that db exists
@@ -1298,7 +1511,11 @@ class API(object):
                 "revision %(revision)s to %(current_head)s by command "
                 "`rally db upgrade'") % rev)
 
+        db.schema.set_revision_verified()
+
     def _request(self, path, method, **kwargs):
+        import requests
+
         headers = {
             "RALLY-CLIENT-VERSION": rally_version.version_string(),
             "RALLY-API": "1.0"
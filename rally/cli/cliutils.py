@@ -14,6 +14,9 @@
 #    under the License.
 
 import argparse
+import collections.abc
+import datetime as dt
+import importlib
 import inspect
 import json
 import os
@@ -21,11 +24,8 @@ import sys
 import textwrap
 import warnings
 
-import jsonschema
 import prettytable
-import sqlalchemy.exc
 
-from rally import api
 from rally.common import cfg
 from rally.common import logging
 from rally.common.plugin import info
@@ -41,6 +41,34 @@ LOG = logging.getLogger(__name__)
 MARGIN = 3
 
 
+class LazyCategories(collections.abc.Mapping):
+    """Categories of CLI commands which are imported on first access.
+
+    Modules of commands import the whole stack of Rally (DB, task engine,
+    verification framework, etc), so only categories which are actually
+    dispatched should be imported.
+
+    :param categories: a dict with names of categories as keys and full
+        names of classes of commands (i.e. "module.Class") as values
+    """
+
+    def __init__(self, categories):
+        self._categories = categories
+        self._loaded = {}
+
+    def __getitem__(self, name):
+        if name not in self._loaded:
+            module, cls = self._categories[name].rsplit(".", 1)
+            self._loaded[name] = getattr(importlib.import_module(module), cls)
+        return self._loaded[name]
+
+    def __iter__(self):
+        return iter(self._categories)
+
+    def __len__(self):
+        return len(self._categories)
+
+
 class MissingArgs(Exception):
     """Supplied arguments are not sufficient for calling a function."""
     def __init__(self, missing):
@@ -361,6 +389,20 @@ def pretty_float_formatter(field, ndigits=None):
     return _formatter
 
 
+def datetime_type(value):
+    """Convert a date (and optionally time) in ISO 8601 format to datetime.
+
+    It is designed to be used as a `type` of command line arguments.
+    """
+    for fmt in ("%Y-%m-%d", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S"):
+        try:
+            return dt.datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError(
+        "'%s' is not a date in 'YYYY-MM-DD[THH:MM:SS]' format." % value)
+
+
 def args(*args, **kwargs):
     def _decorator(func):
         func.__dict__.setdefault("args", []).insert(0, (args, kwargs))
@@ -501,7 +543,7 @@ def _print_version():
         print("\n".join("\t%s: %s" % p for p in sorted(packages.items())))
 
 
-def _add_command_parsers(categories, subparsers):
+def _add_command_parsers(categories, subparsers, requested=None):
 
     # INFO(oanufriev) This monkey patching makes our custom parser class to be
     # used instead of native.  This affects all subparsers down from
@@ -512,6 +554,11 @@ def _add_command_parsers(categories, subparsers):
     parser.add_argument("query_category", nargs="?")
 
     for category in categories:
+        if requested is not None and category not in requested:
+            # NOTE: the category can't be dispatched, so there is no need to
+            #   import its commands. The name is enough for the help message.
+            subparsers.add_parser(category)
+            continue
         command_object = categories[category]()
         descr = _compose_category_description(categories[category])
         parser = subparsers.add_parser(
@@ -563,7 +610,13 @@ def run(argv, categories):
         _print_version()
         return 0
 
-    parser = lambda subparsers: _add_command_parsers(categories, subparsers)
+    # a category is one of the positional arguments, so only categories which
+    #   are mentioned in arguments can be dispatched
+    requested = set(argv[1:])
+    if "bash-completion" in requested:
+        requested = None
+    parser = lambda subparsers: _add_command_parsers(categories, subparsers,
+                                                     requested)
     category_opt = cfg.SubCommandOpt("category",
                                      title="Command categories",
                                      help="Available categories",
@@ -600,6 +653,13 @@ def run(argv, categories):
     except ImportError:
         pass
 
+    # NOTE: these modules are heavy, so they are not imported by `rally
+    #   --version` and by modules of commands while they are not dispatched.
+    import jsonschema
+    import sqlalchemy.exc
+
+    from rally import api
+
     try:
         rapi = api.API(config_args=argv[1:], skip_db_check=True)
     except exceptions.RallyException as e:
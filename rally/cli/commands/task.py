@@ -15,6 +15,9 @@
 
 """Rally command: task"""
 
+import collections
+from concurrent import futures
+import hashlib
 import itertools
 import json
 import os
@@ -39,6 +42,17 @@ from rally.utils import strutils
 LOG = logging.getLogger(__name__)
 
 
+def _bounded_map(executor, func, items, limit):
+    """Like executor.map, but keeps at most `limit` results in memory."""
+    pending = collections.deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= limit:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
 class FailedToLoadTask(exceptions.RallyException):
     error_code = 117
     msg_fmt = "Invalid %(source)s passed:\n\n\t %(msg)s"
@@ -49,6 +63,13 @@ class TaskCommands(object):
 
     """
 
+    # columns of tasks which are displayed by `rally task list`
+    LIST_FIELDS = ["uuid", "env_uuid", "created_at", "updated_at",
+                   "task_duration", "status"]
+
+    # number of tasks to fetch and print at once while streaming them
+    LIST_BATCH_SIZE = 1000
+
     def _load_and_validate_task(self, api, task_file, args_file=None,
                                 raw_args=None):
         """Load, render and validate tasks template from file with passed args.
@@ -482,9 +503,30 @@ class TaskCommands(object):
                    help="Tags to filter tasks by.")
     @cliutils.args("--uuids-only", action="store_true",
                    dest="uuids_only", help="List task UUIDs only.")
+    @cliutils.args("--created-after", dest="created_after",
+                   type=cliutils.datetime_type, metavar="<date>",
+                   required=False,
+                   help="List tasks created after the date "
+                        "(YYYY-MM-DD[THH:MM:SS]).")
+    @cliutils.args("--created-before", dest="created_before",
+                   type=cliutils.datetime_type, metavar="<date>",
+                   required=False,
+                   help="List tasks created before the date "
+                        "(YYYY-MM-DD[THH:MM:SS]).")
+    @cliutils.args("--newest-first", action="store_true",
+                   dest="newest_first",
+                   help="Order tasks from the newest to the oldest.")
+    @cliutils.args("--limit", dest="limit", type=int, metavar="<n>",
+                   required=False, help="Maximum number of tasks to list.")
+    @cliutils.args("--marker", dest="marker", type=str, metavar="<uuid>",
+                   required=False,
+                   help="List tasks after the task with the UUID (the last "
+                        "task of the previous page).")
     @envutils.with_default_deployment(cli_arg_name="deployment")
     def list(self, api, deployment=None, all_deployments=False, status=None,
-             tags=None, uuids_only=False):
+             tags=None, uuids_only=False, created_after=None,
+             created_before=None, newest_first=False, limit=None,
+             marker=None):
         """List tasks, started and finished.
 
         Displayed tasks can be filtered by status or deployment.  By
@@ -509,13 +551,41 @@ class TaskCommands(object):
 
         if tags:
             filters["tags"] = tags
+        if created_after:
+            filters["created_after"] = created_after
+        if created_before:
+            filters["created_before"] = created_before
+        if newest_first:
+            filters["sort_desc"] = True
+        if marker:
+            filters["marker"] = marker
+
+        if uuids_only:
+            filters["uuids_only"] = True
+        else:
+            filters["fields"] = self.LIST_FIELDS
 
-        task_list = api.task.list(**filters)
+        if limit is not None:
+            task_list = iter(api.task.list(limit=limit, **filters))
+        else:
+            task_list = self._iter_tasks(api, **filters)
+
+        first_task = next(task_list, None)
+        if first_task is None:
+            if status:
+                print("There are no tasks in '%s' status. "
+                      "To run a new task, use:\n\trally task start"
+                      % status)
+            else:
+                print("There are no tasks. To run a new task, use:\n"
+                      "\trally task start")
+            return
+        task_list = itertools.chain([first_task], task_list)
 
         if uuids_only:
-            if task_list:
-                print("\n".join([t["uuid"] for t in task_list]))
-        elif task_list:
+            for task in task_list:
+                print(task["uuid"])
+        else:
             def tags_formatter(t):
                 if not t["tags"]:
                     return ""
@@ -528,18 +598,22 @@ class TaskCommands(object):
                 "Created at": lambda t: t["created_at"].replace("T", " ")
             }
 
-            cliutils.print_list(
-                task_list, fields=headers, normalize_field_names=True,
-                sortby_index=headers.index("Created at"),
-                formatters=formatters)
-        else:
-            if status:
-                print("There are no tasks in '%s' status. "
-                      "To run a new task, use:\n\trally task start"
-                      % status)
-            else:
-                print("There are no tasks. To run a new task, use:\n"
-                      "\trally task start")
+            # tasks are consumed page by page while rows are added to the
+            #   table; they already arrive in the order of creation, so rows
+            #   are not sorted
+            cliutils.print_list(task_list, fields=headers,
+                                normalize_field_names=True,
+                                sortby_index=None, formatters=formatters)
+
+    def _iter_tasks(self, api, **filters):
+        """Fetch tasks page by page to not load all of them at once."""
+        while True:
+            tasks = api.task.list(limit=self.LIST_BATCH_SIZE, **filters)
+            for task in tasks:
+                yield task
+            if len(tasks) < self.LIST_BATCH_SIZE:
+                break
+            filters["marker"] = tasks[-1]["uuid"]
 
     @cliutils.args("--out", metavar="<path>",
                    type=str, dest="out", required=False,
@@ -550,6 +624,9 @@ class TaskCommands(object):
                    help="UUIDs of tasks, or JSON files with task results")
     @cliutils.args("--html-static", dest="out_format",
                    action="store_const", const="trends-html-static")
+    @cliutils.args("--no-cache", dest="use_cache", action="store_false",
+                   help="Process results of workloads from scratch instead "
+                        "of using the report cache.")
     @cliutils.suppress_warnings
     def trends(self, api, *args, **kwargs):
         """Generate workloads trends HTML report."""
@@ -562,7 +639,8 @@ class TaskCommands(object):
         self.export(api, tasks=tasks,
                     output_type=kwargs.get("out_format", "trends-html"),
                     output_dest=kwargs.get("out"),
-                    open_it=kwargs.get("open_it", False))
+                    open_it=kwargs.get("open_it", False),
+                    use_cache=kwargs.get("use_cache", True))
 
     @cliutils.args("--out", metavar="<path>",
                    type=str, dest="out", required=False,
@@ -575,6 +653,10 @@ class TaskCommands(object):
                    action="store_const", const="html")
     @cliutils.args("--html-static", dest="out_format",
                    action="store_const", const="html-static")
+    @cliutils.args("--html-lazy", dest="out_format",
+                   action="store_const", const="html-lazy",
+                   help="HTML report which decompresses data of workloads "
+                        "only when they are opened. Suits big tasks.")
     @cliutils.args("--json", dest="out_format",
                    action="store_const", const="json")
     @cliutils.args("--uuid", dest="tasks", nargs="+", type=str,
@@ -582,16 +664,21 @@ class TaskCommands(object):
     @cliutils.args("--deployment", dest="deployment", type=str,
                    help="Report all tasks with defined deployment",
                    required=False)
+    @cliutils.args("--no-cache", dest="use_cache", action="store_false",
+                   help="Process results of workloads from scratch instead "
+                        "of using the report cache.")
     @envutils.default_from_global("tasks", envutils.ENV_TASK, "uuid")
     @cliutils.suppress_warnings
     def report(self, api, tasks=None, out=None,
-               open_it=False, out_format="html", deployment=None):
+               open_it=False, out_format="html", deployment=None,
+               use_cache=True):
         """Generate a report for the specified task(s)."""
         self.export(api, tasks=tasks,
                     output_type=out_format,
                     output_dest=out,
                     open_it=open_it,
-                    deployment=deployment)
+                    deployment=deployment,
+                    use_cache=use_cache)
 
     @cliutils.args("--force", action="store_true", help="force delete")
     @cliutils.args("--uuid", type=str, dest="task_id", nargs="*",
@@ -616,6 +703,35 @@ class TaskCommands(object):
         else:
             _delete_single_task(task_id, force)
 
+    @cliutils.args("--older-than", dest="older_than", type=int,
+                   metavar="<days>", required=False,
+                   help="Compact workloads created more than <days> ago.")
+    @cliutils.args("--tag", nargs="+", dest="tags", type=str, required=False,
+                   help="Compact workloads of tasks with any of the tags.")
+    @cliutils.args("--iterations-limit", dest="iterations_limit", type=int,
+                   metavar="<n>", required=False, default=1000,
+                   help="Maximum number of raw iterations to keep for "
+                        "a workload.")
+    @cliutils.args("--batch-size", dest="batch_size", type=int,
+                   metavar="<n>", required=False, default=100,
+                   help="Number of workloads to process at once.")
+    def compact(self, api, older_than=None, tags=None, iterations_limit=1000,
+                batch_size=100):
+        """Replace raw iterations of old tasks by a compact representation.
+
+        Only a sample of iterations and a summary of the whole data are kept,
+        which are enough for trends and HTML reports.
+        """
+        if older_than is None and not tags:
+            print("ERROR: At least one of --older-than or --tag arguments "
+                  "should be specified.", file=sys.stderr)
+            return 1
+
+        count = api.task.compact(older_than=older_than, tags=tags,
+                                 iterations_limit=iterations_limit,
+                                 batch_size=batch_size)
+        print("%s workload(s) have been compacted." % count)
+
     @cliutils.args("--uuid", type=str, dest="task_id", help="UUID of task.")
     @cliutils.args("--json", dest="tojson",
                    action="store_true",
@@ -676,10 +792,13 @@ class TaskCommands(object):
     @cliutils.args("--deployment", dest="deployment", type=str,
                    help="Report all tasks with defined deployment",
                    required=False)
+    @cliutils.args("--no-cache", dest="use_cache", action="store_false",
+                   help="Process results of workloads from scratch instead "
+                        "of using the report cache.")
     @envutils.default_from_global("tasks", envutils.ENV_TASK, "uuid")
     @plugins.ensure_plugins_are_loaded
     def export(self, api, tasks=None, output_type=None, output_dest=None,
-               open_it=False, deployment=None):
+               open_it=False, deployment=None, use_cache=True):
         """Export task results to the custom task's exporting system."""
 
         if deployment is not None:
@@ -699,15 +818,16 @@ class TaskCommands(object):
 
         report = api.task.export(tasks=exported_tasks,
                                  output_type=output_type,
-                                 output_dest=output_dest)
+                                 output_dest=output_dest,
+                                 use_cache=use_cache)
         if "files" in report:
             for path in report["files"]:
                 output_file = os.path.expanduser(path)
                 with open(output_file, "w+") as f:
                     f.write(report["files"][path])
-                if open_it:
-                    if "open" in report:
-                        webbrowser.open_new_tab(report["open"])
+        # NOTE: streaming exporters write files by themselves
+        if open_it and "open" in report:
+            webbrowser.open_new_tab(report["open"])
 
         if "print" in report:
             print(report["print"])
@@ -749,7 +869,8 @@ class TaskCommands(object):
         """Import json results of a test into rally database"""
 
         if os.path.exists(os.path.expanduser(task_file)):
-            tasks_results = task_results_loader.load(task_file)
+            # results are stored to the database while the file is read
+            tasks_results = task_results_loader.iterload(task_file)
             for task_results in tasks_results:
                 task = api.task.import_results(deployment=deployment,
                                                task_results=task_results,
@@ -759,3 +880,100 @@ class TaskCommands(object):
             print("ERROR: Invalid file name passed: %s" % task_file,
                   file=sys.stderr)
             return 1
+
+    @cliutils.args("--path", dest="path", type=str, metavar="<path>",
+                   required=True,
+                   help="Directory with JSON files of task results (they "
+                        "are searched recursively) or a glob pattern, i.e. "
+                        "'results/**/*.json'.")
+    @cliutils.args("--deployment", dest="deployment", type=str,
+                   metavar="<uuid>", required=False,
+                   help="UUID or name of a deployment.")
+    @cliutils.args("--tag", nargs="+", dest="tags", type=str, required=False,
+                   help="Mark the tasks with a tag or a few tags.")
+    @cliutils.args("--workers", dest="workers", type=int, metavar="<n>",
+                   required=False,
+                   help="Number of processes to parse and validate files "
+                        "in. Defaults to the number of CPUs.")
+    @cliutils.args("--state-file", dest="state_file", type=str,
+                   metavar="<path>", required=False,
+                   help="File to record imported tasks and files in. "
+                        "Tasks and files recorded there are skipped, so an "
+                        "interrupted import can be restarted. Defaults to a "
+                        "file in "
+                        "~/.rally/import/ specific to --path.")
+    @envutils.with_default_deployment(cli_arg_name="deployment")
+    @cliutils.suppress_warnings
+    def import_bulk(self, api, path, deployment=None, tags=None, workers=None,
+                    state_file=None):
+        """Import many files with json results of tasks into rally database.
+
+        Files are parsed and validated in parallel processes, while results
+        are stored to the database by the current process one file after
+        another. A failure of a file is reported and does not stop the
+        import.
+        """
+
+        files = task_results_loader.find_files(path)
+        if not files:
+            print("ERROR: No files found at %s" % path, file=sys.stderr)
+            return 1
+
+        if not state_file:
+            key = hashlib.sha1(
+                os.path.abspath(os.path.expanduser(path)).encode("utf-8"))
+            state_file = "~/.rally/import/%s.jsonl" % key.hexdigest()
+        state = task_results_loader.ImportState(state_file)
+        skipped = []
+        to_import = []
+        for task_file in files:
+            if state.is_imported(task_file):
+                skipped.append(task_file)
+            else:
+                to_import.append(task_file)
+        files = to_import
+        if skipped:
+            print("Skipping %s already imported file(s) recorded in %s."
+                  % (len(skipped), state.path))
+
+        workers = workers or os.cpu_count() or 1
+        imported = failed = tasks_count = 0
+        with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            # limit the number of parsed files waiting to be stored, since
+            #   they are kept in memory
+            loaded = _bounded_map(executor,
+                                  task_results_loader.load_validated, files,
+                                  limit=workers * 2)
+            for i, (task_file, tasks_results, error) in enumerate(loaded, 1):
+                uuids = []
+                if error is None:
+                    # tasks of the file which were imported before the
+                    #   previous import was interrupted
+                    uuids = state.imported_tasks(task_file)
+                    try:
+                        for task_results in tasks_results[len(uuids):]:
+                            task = api.task.import_results(
+                                deployment=deployment,
+                                task_results=task_results, tags=tags,
+                                validate=False)
+                            state.add_task(task_file, task["uuid"])
+                            uuids.append(task["uuid"])
+                    except Exception as e:
+                        error = str(e) or type(e).__name__
+                if error is not None:
+                    failed += 1
+                    print("[%s/%s] %s: FAILED: %s"
+                          % (i, len(files), task_file, error),
+                          file=sys.stderr)
+                    continue
+                state.add(task_file, uuids)
+                imported += 1
+                tasks_count += len(uuids)
+                print("[%s/%s] %s: Task UUID(s): %s."
+                      % (i, len(files), task_file, ", ".join(uuids)))
+
+        print("%s file(s) with %s task(s) imported, %s file(s) failed, "
+              "%s file(s) skipped." % (imported, tasks_count, failed,
+                                       len(skipped)))
+        if failed:
+            return 1
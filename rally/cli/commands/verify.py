@@ -45,6 +45,10 @@ ACTIVE = u":-)"
 class VerifyCommands(object):
     """Verify an OpenStack cloud via a verifier."""
 
+    # columns of verifications which are displayed by `rally verify list`
+    LIST_FIELDS = ["uuid", "verifier_uuid", "env_uuid", "created_at",
+                   "updated_at", "status"]
+
     @staticmethod
     def _print_totals(totals):
         print("\n======\n"
@@ -598,7 +602,7 @@ class VerifyCommands(object):
         """Show detailed information about a verification."""
 
         verification = api.verification.get(
-            verification_uuid=verification_uuid)
+            verification_uuid=verification_uuid, load_tests=False)
         verifier = api.verifier.get(verifier_id=verification["verifier_uuid"])
         deployment = api.deployment.get(
             deployment=verification["deployment_uuid"])
@@ -650,9 +654,10 @@ class VerifyCommands(object):
             print("\n%s" % cliutils.make_header(h, len(h)).strip())
             print("\n%s\n" % json.dumps(verification["run_args"], indent=4))
 
-        # Tests table
-        tests = verification["tests"]
-        values = [tests[test_id] for test_id in tests]
+        # Tests table (tracebacks are loaded only for failed tests)
+        tests = api.verification.get_tests(
+            verification_uuid=verification["uuid"], detailed=False)
+        values = list(tests.values())
         fields = ["Name", "Duration, sec", "Status"]
         formatters = {"Duration, sec": lambda v: v["duration"]}
         index = ("name", "duration", "status").index(sort_by)
@@ -661,7 +666,9 @@ class VerifyCommands(object):
                             sortby_index=index)
 
         if detailed:
-            failures = [t for t in tests.values() if t["status"] == "fail"]
+            failures = list(api.verification.get_tests(
+                verification_uuid=verification["uuid"],
+                status="fail").values())
             if failures:
                 self._print_failures("Failures", failures)
             else:
@@ -677,22 +684,73 @@ class VerifyCommands(object):
                    help="Tags to filter verifications by.")
     @cliutils.args("--status", dest="status", type=str, required=False,
                    help="Status to filter verifications by.")
+    @cliutils.args("--created-after", dest="created_after",
+                   type=cliutils.datetime_type, metavar="<date>",
+                   required=False,
+                   help="List verifications created after the date "
+                        "(YYYY-MM-DD[THH:MM:SS]).")
+    @cliutils.args("--created-before", dest="created_before",
+                   type=cliutils.datetime_type, metavar="<date>",
+                   required=False,
+                   help="List verifications created before the date "
+                        "(YYYY-MM-DD[THH:MM:SS]).")
+    @cliutils.args("--newest-first", action="store_true",
+                   dest="newest_first",
+                   help="Order verifications from the newest to the oldest.")
+    @cliutils.args("--limit", dest="limit", type=int, metavar="<n>",
+                   required=False,
+                   help="Maximum number of verifications to list.")
+    @cliutils.args("--marker", dest="marker", type=str, metavar="<uuid>",
+                   required=False,
+                   help="List verifications after the verification with the "
+                        "UUID (the last verification of the previous page).")
     def list(self, api, verifier_id=None, deployment=None, tags=None,
-             status=None):
+             status=None, created_after=None, created_before=None,
+             newest_first=False, limit=None, marker=None):
         """List all verifications."""
 
+        filters = {}
+        if created_after:
+            filters["created_after"] = created_after
+        if created_before:
+            filters["created_before"] = created_before
+        if newest_first:
+            filters["sort_desc"] = True
+        if limit is not None:
+            filters["limit"] = limit
+        if marker:
+            filters["marker"] = marker
+
         verifications = api.verification.list(verifier_id=verifier_id,
                                               deployment_id=deployment,
-                                              tags=tags, status=status)
+                                              tags=tags, status=status,
+                                              fields=self.LIST_FIELDS,
+                                              **filters)
         if verifications:
             fields = ["UUID", "Tags", "Verifier name", "Deployment name",
                       "Started at", "Finished at", "Duration", "Status"]
+            # the same verifiers and deployments are used by most of
+            # verifications, so do not fetch them for each row
+            verifier_names = {}
+            deployment_names = {}
+
+            def verifier_name(v):
+                if v["verifier_uuid"] not in verifier_names:
+                    verifier_names[v["verifier_uuid"]] = api.verifier.get(
+                        verifier_id=v["verifier_uuid"])["name"]
+                return verifier_names[v["verifier_uuid"]]
+
+            def deployment_name(v):
+                if v["deployment_uuid"] not in deployment_names:
+                    deployment_names[v["deployment_uuid"]] = (
+                        api.deployment.get(
+                            deployment=v["deployment_uuid"])["name"])
+                return deployment_names[v["deployment_uuid"]]
+
             formatters = {
                 "Tags": lambda v: ", ".join(v["tags"]) or "-",
-                "Verifier name": (lambda v: api.verifier.get(
-                    verifier_id=v["verifier_uuid"])["name"]),
-                "Deployment name": (lambda v: api.deployment.get(
-                    deployment=v["deployment_uuid"])["name"]),
+                "Verifier name": verifier_name,
+                "Deployment name": deployment_name,
                 "Started at": lambda v: v["created_at"],
                 "Finished at": lambda v: v["updated_at"],
                 "Duration": lambda v:
@@ -700,8 +758,9 @@ class VerifyCommands(object):
                  - dt.datetime.strptime(v["created_at"], TIME_FORMAT))
             }
             cliutils.print_list(verifications, fields, formatters=formatters,
-                                normalize_field_names=True, sortby_index=4)
-        elif verifier_id or deployment or status or tags:
+                                normalize_field_names=True,
+                                sortby_index=None if newest_first else 4)
+        elif (verifier_id or deployment or status or tags or filters):
             print("There are no verifications that meet specified criteria.")
         else:
             print("There are no verifications. You can start verification, "
@@ -758,13 +817,15 @@ class VerifyCommands(object):
                     f.write(result["files"][path])
             print("The report has been successfully saved.")
 
-            if open_it:
-                if "open" not in result:
-                    print("Cannot open '%s' report in the browser because "
-                          "report type doesn't support it." % output_type)
-                    return 1
-                webbrowser.open_new_tab(
-                    "file://" + os.path.abspath(result["open"]))
+        # NOTE: streaming reporters write files by themselves
+        if open_it and ("files" in result or "open" in result):
+            if "open" not in result:
+                print("Cannot open '%s' report in the browser because "
+                      "report type doesn't support it." % output_type)
+                return 1
+            webbrowser.open_new_tab(
+                "file://" + os.path.abspath(os.path.expanduser(
+                    result["open"])))
 
         if "print" in result:
             # NOTE(andreykurilin): we need a separation between logs and
@@ -18,22 +18,16 @@
 import sys
 
 from rally.cli import cliutils
-from rally.cli.commands import db
-from rally.cli.commands import deployment
-from rally.cli.commands import env
-from rally.cli.commands import plugin
-from rally.cli.commands import task
-from rally.cli.commands import verify
-
-
-categories = {
-    "db": db.DBCommands,
-    "env": env.EnvCommands,
-    "deployment": deployment.DeploymentCommands,
-    "plugin": plugin.PluginCommands,
-    "task": task.TaskCommands,
-    "verify": verify.VerifyCommands
-}
+
+
+categories = cliutils.LazyCategories({
+    "db": "rally.cli.commands.db.DBCommands",
+    "env": "rally.cli.commands.env.EnvCommands",
+    "deployment": "rally.cli.commands.deployment.DeploymentCommands",
+    "plugin": "rally.cli.commands.plugin.PluginCommands",
+    "task": "rally.cli.commands.task.TaskCommands",
+    "verify": "rally.cli.commands.verify.VerifyCommands"
+})
 
 
 def main():
@@ -10,13 +10,16 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import datetime as dt
+import glob
 import json
 import os
 
 import jsonschema
 
 from rally import api
+from rally.common.io import json_stream
 from rally import consts
 from rally import exceptions
 from rally.task.processing import charts
@@ -219,26 +222,163 @@ def _update_old_results(tasks_results, path):
     return [task]
 
 
+def _validate(obj, schema):
+    try:
+        jsonschema.validate(obj, schema)
+    except jsonschema.ValidationError as e:
+        raise exceptions.RallyException(
+            "ERROR: Invalid task result format\n\n\t%s" % str(e)) from None
+
+
+def _update_new_task(task_result):
+    task_result.setdefault("env_name", "n/a")
+    task_result.setdefault("env_uuid", "n/a")
+
+
+def _update_new_workload(workload):
+    workload.setdefault("contexts_results", [])
+    workload["runner_type"], workload["runner"] = list(
+        workload["runner"].items())[0]
+    workload["name"], workload["args"] = list(
+        workload.pop("scenario").items())[0]
+
+
 def _update_new_results(tasks_results):
     for task_result in tasks_results["tasks"]:
-        try:
-            jsonschema.validate(task_result, api._Task.TASK_SCHEMA)
-        except jsonschema.ValidationError as e:
-            raise exceptions.RallyException(
-                "ERROR: Invalid task result format\n\n\t%s" % str(e)) from None
-        task_result.setdefault("env_name", "n/a")
-        task_result.setdefault("env_uuid", "n/a")
+        _validate(task_result, api._Task.TASK_SCHEMA)
+        _update_new_task(task_result)
         for subtask in task_result["subtasks"]:
             for workload in subtask["workloads"]:
-                workload.setdefault("contexts_results", [])
-                workload["runner_type"], workload["runner"] = list(
-                    workload["runner"].items())[0]
-                workload["name"], workload["args"] = list(
-                    workload.pop("scenario").items())[0]
+                _update_new_workload(workload)
 
     return tasks_results["tasks"]
 
 
+_TASK_SCHEMA = api._Task.TASK_SCHEMA
+_SUBTASK_SCHEMA = dict(_TASK_SCHEMA["properties"]["subtasks"]["items"],
+                       definitions=_TASK_SCHEMA["definitions"])
+_SUBTASK_SCHEMA["$schema"] = _TASK_SCHEMA["$schema"]
+_WORKLOAD_SCHEMA = dict(_TASK_SCHEMA["definitions"]["workload"],
+                        definitions=_TASK_SCHEMA["definitions"])
+_WORKLOAD_SCHEMA["$schema"] = _TASK_SCHEMA["$schema"]
+# keys of a workload which should be known before iterations to stream them,
+#   since they are used for creating the workload in the database
+_WORKLOAD_STREAMING_KEYS = (
+    set(_WORKLOAD_SCHEMA["required"]) - {"data"} | {"description", "hooks"})
+
+
+class _LazyResultsParser(object):
+    """Incremental parser of tasks results in the new format.
+
+    Tasks are yielded when their `subtasks` key is reached. Subtasks (and
+    workloads of a subtask) are iterators which continue parsing the file,
+    the rest of the parent object is read when they are exhausted. The same
+    is true for raw iterations of a workload if all the keys which are
+    required for creating a workload go before `data`. Otherwise iterations
+    of the workload are loaded at once.
+    """
+
+    def __init__(self, path, reader):
+        self._path = path
+        self._reader = reader
+
+    def _guard(self, iterator):
+        """Transform errors of parsing JSON to FailedToLoadResults."""
+        try:
+            yield from iterator
+        except ValueError as e:
+            raise FailedToLoadResults(
+                source=self._path,
+                msg="error while loading JSON: %s" % e) from None
+
+    def _lazy_object(self, schema, children_key, parse_children,
+                     update=None, is_ready=None):
+        """Read an object and yield it with lazily loaded children."""
+        obj = {}
+        keys = self._reader.iter_object()
+        for key in keys:
+            if key == children_key and (is_ready is None or is_ready(obj)):
+                break
+            obj[key] = self._reader.read_value()
+        else:
+            # children are loaded at once (or missed at all)
+            _validate(obj, schema)
+            if update:
+                update(obj)
+            yield obj
+            return
+
+        _validate(dict(obj, **{children_key: []}), schema)
+        if update:
+            update(obj)
+
+        def children():
+            yield from parse_children()
+            rest = {}
+            for key in keys:
+                rest[key] = self._reader.read_value()
+            _validate(rest, dict((k, v) for k, v in schema.items()
+                                 if k != "required"))
+            obj.update(rest)
+
+        obj[children_key] = self._guard(children())
+        yield obj
+        # skip children which were not consumed
+        collections.deque(obj[children_key], maxlen=0)
+
+    def _iterations(self):
+        for _ in self._reader.iter_array():
+            yield self._reader.read_value()
+
+    def _workloads(self):
+        for _ in self._reader.iter_array():
+            yield from self._lazy_object(
+                _WORKLOAD_SCHEMA, "data", self._iterations,
+                update=_update_new_workload,
+                is_ready=lambda w: _WORKLOAD_STREAMING_KEYS <= set(w))
+
+    def _subtasks(self):
+        for _ in self._reader.iter_array():
+            yield from self._lazy_object(
+                _SUBTASK_SCHEMA, "workloads", self._workloads)
+
+    def _tasks(self):
+        found = False
+        for key in self._reader.iter_object():
+            if key != "tasks":
+                self._reader.read_value()
+                continue
+            found = True
+            for _ in self._reader.iter_array():
+                yield from self._lazy_object(
+                    _TASK_SCHEMA, "subtasks", self._subtasks,
+                    update=_update_new_task)
+        self._reader.check_end()
+        if not found:
+            raise FailedToLoadResults(source=self._path, msg="Wrong format")
+
+    def tasks(self):
+        return self._guard(self._tasks())
+
+
+def iterload(path):
+    """Load tasks results from the file incrementally.
+
+    Unlike `load`, tasks are yielded one by one while parsing the file.
+    Subtasks of a task, workloads of a subtask and raw iterations of
+    a workload are iterators which continue reading the file, so they should
+    be consumed in the order they are stored in the file. The rest keys of
+    an object which go after its children become available when the
+    children are consumed. Results in the old format are loaded at once.
+    """
+    with open(os.path.expanduser(path)) as f:
+        reader = json_stream.Reader(f)
+        if reader.peek() == "{":
+            yield from _LazyResultsParser(path, reader).tasks()
+            return
+    yield from load(path)
+
+
 def load(path):
     with open(os.path.expanduser(path)) as f:
         raw_tasks_results = f.read()
@@ -256,3 +396,140 @@ def load(path):
     else:
         raise FailedToLoadResults(
             source=path, msg="Wrong format")
+
+
+def find_files(path):
+    """Find files of tasks results for bulk import.
+
+    :param path: a directory (JSON files are searched in it recursively) or
+        a glob pattern (i.e. "results/**/*.json")
+    :returns: a sorted list of paths
+    """
+    path = os.path.expanduser(path)
+    if os.path.isdir(path):
+        files = []
+        for root, _dirs, names in os.walk(path):
+            files.extend(os.path.join(root, name) for name in names
+                         if name.endswith(".json"))
+    else:
+        files = [p for p in glob.glob(path, recursive=True)
+                 if os.path.isfile(p)]
+    return sorted(files)
+
+
+def load_validated(path):
+    """Load tasks results of the file and validate all iterations.
+
+    It is a function to be called in a pool of processes, so it never
+    raises, but returns an error message instead.
+
+    :returns: a tuple of the path, a list of tasks results (None in case of
+        failure) and an error message (None in case of success)
+    """
+    try:
+        tasks_results = load(path)
+        for task in tasks_results:
+            for subtask in task["subtasks"]:
+                for workload in subtask["workloads"]:
+                    for i, itr in enumerate(workload["data"], 1):
+                        message = api.check_task_result(itr)
+                        if message:
+                            raise FailedToLoadResults(
+                                source=path,
+                                msg="Iteration #%s of workload %s has "
+                                    "wrong format: %s"
+                                    % (i, workload["name"], message))
+    except Exception as e:
+        return path, None, str(e) or type(e).__name__
+    return path, tasks_results, None
+
+
+class ImportState(object):
+    """A journal of tasks and files imported by bulk import.
+
+    Each task is recorded as a JSON line with the path, size and time of
+    modification of its file and its UUID just after it is stored to the
+    database. When all tasks of a file are stored, the file is recorded
+    with UUIDs of all its tasks. So an interrupted import can be restarted,
+    skips already imported files and does not import tasks of partially
+    imported files twice. Changed files are imported again.
+
+    :param path: a path to the journal file
+    """
+
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        self._imported = {}
+        # UUIDs of tasks of partially imported files
+        self._tasks = {}
+        # whether the last line is broken and the next record should start
+        #   from a new line
+        self._broken = False
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                for line in f:
+                    self._broken = not line.endswith("\n")
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # the last line of the interrupted import
+                        continue
+                    stat = (record["size"], record["mtime"])
+                    if "task" in record:
+                        key, uuids = self._tasks.get(record["path"],
+                                                     (stat, []))
+                        if key != stat:
+                            # the file was changed in the middle of import
+                            uuids = []
+                        uuids.append(record["task"])
+                        self._tasks[record["path"]] = (stat, uuids)
+                    else:
+                        self._imported[record["path"]] = stat
+                        self._tasks.pop(record["path"], None)
+
+    @staticmethod
+    def _stat(path):
+        stat = os.stat(path)
+        return os.path.abspath(path), stat.st_size, stat.st_mtime
+
+    def is_imported(self, path):
+        abspath, size, mtime = self._stat(path)
+        return self._imported.get(abspath) == (size, mtime)
+
+    def imported_tasks(self, path):
+        """Return UUIDs of already imported tasks of the file.
+
+        :returns: a list of UUIDs of tasks in the order they are stored in
+            the file. It is empty if the file is changed since then.
+        """
+        abspath, size, mtime = self._stat(path)
+        stat, uuids = self._tasks.get(abspath, (None, []))
+        return list(uuids) if stat == (size, mtime) else []
+
+    def _write(self, record):
+        dirname = os.path.dirname(self.path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        with open(self.path, "a") as f:
+            if self._broken:
+                f.write("\n")
+                self._broken = False
+            f.write(json.dumps(record))
+            f.write("\n")
+
+    def add_task(self, path, task_uuid):
+        abspath, size, mtime = self._stat(path)
+        stat, uuids = self._tasks.get(abspath, ((size, mtime), []))
+        if stat != (size, mtime):
+            uuids = []
+        uuids.append(task_uuid)
+        self._tasks[abspath] = ((size, mtime), uuids)
+        self._write({"path": abspath, "size": size, "mtime": mtime,
+                     "task": task_uuid})
+
+    def add(self, path, task_uuids):
+        abspath, size, mtime = self._stat(path)
+        self._imported[abspath] = (size, mtime)
+        self._tasks.pop(abspath, None)
+        self._write({"path": abspath, "size": size, "mtime": mtime,
+                     "tasks": task_uuids})
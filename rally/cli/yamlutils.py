@@ -51,7 +51,9 @@ def _construct_mapping(loader, node, deep=False):
     return OrderedDict(loader.construct_pairs(node))
 
 
-class _SafeLoader(loader.SafeLoader):
+# NOTE: the loader based on LibYAML is several times faster, while the
+#   constructors are the same, so loaded objects do not differ
+class _SafeLoader(getattr(yaml, "CSafeLoader", loader.SafeLoader)):
     pass
 
 
@@ -40,8 +40,10 @@ these objects be simple dictionaries.
 
 """
 
+import collections
 import datetime as dt
 import functools
+import random
 import tempfile
 import time
 
@@ -52,7 +54,9 @@ import sqlalchemy as sa
 import sqlalchemy.orm   # noqa
 
 from rally.common import cfg
+from rally.common.db import chunks
 from rally.common.db import models
+from rally.common.db import sa_types
 from rally import consts
 from rally import exceptions
 from rally.task.processing import charts
@@ -98,6 +102,14 @@ def engine_reset():
 
 
 def serialize(data):
+    """Convert results of DB queries into plain python structures.
+
+    Only model objects are converted, containers are walked just to find
+    them. Values of JSON-encoded columns are decoded by the json module, so
+    they are plain structures already and are returned without copying. It
+    is the reason why dicts are not walked: the API functions build dicts
+    only from serialized models and decoded JSON data.
+    """
     if data is None:
         return None
     if isinstance(data, (int,
@@ -105,40 +117,77 @@ def serialize(data):
                          dt.date,
                          dt.time,
                          float,
+                         dict,
                          )):
         return data
     if isinstance(data, models.RallyBase):
-        result = data.as_dict()
-        for k in result:
-            result[k] = serialize(result[k])
-        return result
+        return _serialize_model(data)
     if isinstance(data, (list, tuple)):
         return [serialize(d) for d in data]
-    if isinstance(data, dict):
-        result = {}
-        for k in data:
-            result[k] = serialize(data[k])
-        return result
 
     raise ValueError("Failed to serialize %r data type." % type(data).__name__)
 
 
+def _serialize_model(obj):
+    result = obj.as_dict()
+    for c in obj.__table__.columns:
+        if c.name not in result:
+            continue
+        value = result[c.name]
+        if isinstance(c.type, sa_types.JSONEncodedDict):
+            # detach mutable containers from the ORM change tracking (it is
+            # a shallow copy, the decoded data itself is shared)
+            if isinstance(value, sa_types.MutableDict):
+                result[c.name] = dict(value)
+            elif isinstance(value, sa_types.MutableList):
+                result[c.name] = list(value)
+        else:
+            result[c.name] = serialize(value)
+    for r in obj.__mapper__.relationships:
+        if r.key in result:
+            result[r.key] = serialize(result[r.key])
+    return result
+
+
+# SQLite does not wait for a lock if concurrent transactions (which read
+#   before writing, i.e. from parallel workloads) would deadlock, but fails
+#   one of them at once, so it is retried. Only functions which have not
+#   committed anything yet are retried, since committed rows would be
+#   created twice otherwise
+LOCKED_RETRIES = 10
+
+
+def _is_locked(e):
+    return (isinstance(e, sa.exc.OperationalError)
+            and "database is locked" in str(e.orig))
+
+
 def with_session(f):
 
     @functools.wraps(f)
     def wrapper(*args, **kwargs):
-        session = get_session()
-        session.expire_on_commit = False
-        try:
-            result = f(session, *args, **kwargs)
-            session.commit()
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            session.close()
-
-        return serialize(result)
+        attempt = 0
+        while True:
+            attempt += 1
+            session = get_session()
+            session.expire_on_commit = False
+            committed = []
+            sa.event.listen(session, "after_commit",
+                            lambda s: committed.append(True))
+            try:
+                result = f(session, *args, **kwargs)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                if (attempt < LOCKED_RETRIES and not committed
+                        and _is_locked(e)):
+                    time.sleep(random.uniform(0, 0.05 * attempt))
+                    continue
+                raise
+            finally:
+                session.close()
+
+            return serialize(result)
 
     return wrapper
 
@@ -157,44 +206,49 @@ def _uuids_by_tags_get(session, tag_type, tags):
 
 
 def _task_workload_data_get_all(session, workload_uuid):
-    results = (session.query(models.WorkloadData)
-                      .filter_by(workload_uuid=workload_uuid)
+    # query only the column with data to not spend time on building model
+    # objects and tracking changes of huge dicts
+    results = (session.query(models.WorkloadData.chunk_data)
+                      .filter(models.WorkloadData.workload_uuid
+                              == workload_uuid)
                       .order_by(models.WorkloadData.chunk_order.asc()))
 
-    return sorted([raw for workload_data in results
-                   for raw in workload_data.chunk_data["raw"]],
+    return sorted([raw for chunk_data, in results
+                   for raw in chunks.decode(chunk_data)],
                   key=lambda x: x["timestamp"])
 
 
-def _subtasks_get_all_by_task_uuid(session, task_uuid):
+def _subtasks_get_all_by_task_uuid(session, task_uuid, load_data=True):
     result = session.query(models.Subtask).filter_by(task_uuid=task_uuid).all()
     subtasks = []
     for subtask in result:
-        subtask = subtask.as_dict()
+        subtask = serialize(subtask)
         subtask["workloads"] = []
         workloads = (session.query(models.Workload).
                      filter_by(subtask_uuid=subtask["uuid"]).all())
         for workload in workloads:
-            workload = workload.as_dict()
-            workload["data"] = _task_workload_data_get_all(
-                session, workload["uuid"])
+            workload = serialize(workload)
+            if load_data:
+                workload["data"] = _task_workload_data_get_all(
+                    session, workload["uuid"])
             subtask["workloads"].append(workload)
         subtasks.append(subtask)
     return subtasks
 
 
 @with_session
-def task_get(session, uuid=None, detailed=False):
+def task_get(session, uuid=None, detailed=False, load_data=True):
 
     task = session.query(models.Task).filter_by(uuid=uuid).first()
     if not task:
         raise exceptions.DBRecordNotFound(
             criteria="uuid: %s" % uuid, table="tasks")
-    task = task.as_dict()
+    task = serialize(task)
     task["tags"] = sorted(tags_get(uuid, consts.TagType.TASK))
 
     if detailed:
-        task["subtasks"] = _subtasks_get_all_by_task_uuid(session, uuid)
+        task["subtasks"] = _subtasks_get_all_by_task_uuid(
+            session, uuid, load_data=load_data)
 
     return task
 
@@ -213,6 +267,8 @@ def task_get_status(session, uuid=None):
 
 @with_session
 def task_create(session, values):
+    # values are not changed in place, since the function can be retried
+    values = dict(values)
     tags = values.pop("tags", [])
     # TODO(ikhudoshyn): currently 'input_task'
     # does not come in 'values'
@@ -224,8 +280,10 @@ def task_create(session, values):
     # and 'validation_duration'
     task = models.Task(**values)
     session.add(task)
-    session.commit()
-    task = task.as_dict()
+    # tags are saved in the same transaction, so the whole function can be
+    #   retried by with_session
+    session.flush()
+    task = serialize(task)
 
     if tags:
         session.bulk_save_objects(
@@ -238,6 +296,7 @@ def task_create(session, values):
 
 @with_session
 def task_update(session, uuid, values):
+    values = dict(values)
     values.pop("uuid", None)
     tags = values.pop("tags", None)
 
@@ -246,7 +305,7 @@ def task_update(session, uuid, values):
         raise exceptions.DBRecordNotFound(
             criteria="uuid: %s" % uuid, table="tasks")
     task.update(values)
-    task = task.as_dict()
+    task = serialize(task)
 
     if tags is not None:
         # TODO(boris-42): create separate method for tags editing
@@ -284,9 +343,77 @@ def task_update_status(session, uuid, status, allowed_statuses):
     return result
 
 
+def _tags_get_all(session, uuids, tag_type):
+    """Get tags of a bunch of objects by a single query."""
+    tags = dict((uuid, []) for uuid in uuids)
+    # split uuids into parts to not exceed limits of sql variables
+    for i in range(0, len(uuids), 500):
+        query = (session.query(models.Tag.uuid, models.Tag.tag)
+                        .filter(models.Tag.type == tag_type,
+                                models.Tag.uuid.in_(uuids[i:i + 500]))
+                        .distinct())
+        for uuid, tag in query.all():
+            tags[uuid].append(tag)
+    for uuid in tags:
+        tags[uuid].sort()
+    return tags
+
+
+def _paginate(session, query, model, created_after=None, created_before=None,
+              sort_desc=False, marker=None, limit=None, offset=None,
+              fields=None):
+    """Apply common filters, ordering, pagination and projection to a query.
+
+    Results are ordered by the creation order (i.e. by id) which allows to
+    use keyset pagination via `marker` argument (the uuid of the last record
+    from the previous page) that works well even for huge tables. Simple
+    `offset` is also supported.
+    """
+    if created_after is not None:
+        query = query.filter(model.created_at >= created_after)
+    if created_before is not None:
+        query = query.filter(model.created_at < created_before)
+
+    if marker is not None:
+        marker_obj = (session.query(model)
+                             .options(sa.orm.load_only("id"))
+                             .filter_by(uuid=marker).first())
+        if not marker_obj:
+            raise exceptions.DBRecordNotFound(
+                criteria="uuid: %s" % marker, table=model.__tablename__)
+        if sort_desc:
+            query = query.filter(model.id < marker_obj.id)
+        else:
+            query = query.filter(model.id > marker_obj.id)
+
+    query = query.order_by(model.id.desc() if sort_desc else model.id.asc())
+    if offset:
+        query = query.offset(offset)
+    if limit is not None:
+        query = query.limit(limit)
+    if fields:
+        query = query.options(sa.orm.load_only(*set(["uuid"] + fields)))
+    return query
+
+
 @with_session
-def task_list(session, status=None, env=None, tags=None, uuids_only=False):
-    tasks = []
+def task_list(session, status=None, env=None, tags=None, uuids_only=False,
+              created_after=None, created_before=None, sort_desc=False,
+              marker=None, limit=None, offset=None, fields=None):
+    """List tasks.
+
+    :param status: filter tasks by status
+    :param env: filter tasks by the environment (name or uuid)
+    :param tags: filter tasks by tags
+    :param uuids_only: load only uuids of tasks
+    :param created_after: filter tasks created after the datetime
+    :param created_before: filter tasks created before the datetime
+    :param sort_desc: return the newest tasks first
+    :param marker: uuid of the last task of the previous page
+    :param limit: maximum number of tasks to return
+    :param offset: number of tasks to skip
+    :param fields: names of columns to load (all columns by default)
+    """
     query = session.query(models.Task)
 
     filters = {}
@@ -304,19 +431,29 @@ def task_list(session, status=None, env=None, tags=None, uuids_only=False):
         query = query.filter(models.Task.uuid.in_(uuids))
 
     if uuids_only:
-        query = query.options(sa.orm.load_only("uuid"))
+        fields = ["uuid"]
+
+    query = _paginate(session, query, models.Task,
+                      created_after=created_after,
+                      created_before=created_before,
+                      sort_desc=sort_desc, marker=marker, limit=limit,
+                      offset=offset, fields=fields)
 
-    for task in query.all():
-        task = task.as_dict()
-        if not uuids_only:
-            task["tags"] = sorted(tags_get(task["uuid"], consts.TagType.TASK))
-        tasks.append(task)
+    tasks = [serialize(task) for task in query.all()]
+    if not uuids_only and tasks:
+        tags = _tags_get_all(session, [t["uuid"] for t in tasks],
+                             consts.TagType.TASK)
+        for task in tasks:
+            task["tags"] = tags[task["uuid"]]
 
     return tasks
 
 
 @with_session
 def task_delete(session, uuid, status=None):
+    (session.query(models.TrendPoint).filter_by(task_uuid=uuid).
+     delete(synchronize_session=False))
+
     (session.query(models.WorkloadData).filter_by(task_uuid=uuid).
      delete(synchronize_session=False))
 
@@ -351,11 +488,13 @@ def task_delete(session, uuid, status=None):
 
 
 @with_session
-def subtask_create(session, task_uuid, title, description=None, contexts=None):
+def subtask_create(session, task_uuid, title, description=None, contexts=None,
+                   run_in_parallel=False):
     subtask = models.Subtask(task_uuid=task_uuid,
                              title=title,
                              description=description or "",
-                             contexts=contexts or {})
+                             contexts=contexts or {},
+                             run_in_parallel=run_in_parallel)
     session.add(subtask)
     return subtask
 
@@ -375,7 +514,8 @@ def workload_get(session, workload_uuid):
 
 @with_session
 def workload_create(session, task_uuid, subtask_uuid, name, description,
-                    position, runner, runner_type, hooks, contexts, sla, args):
+                    position, runner, runner_type, hooks, contexts, sla, args,
+                    parameters=None):
     workload = models.Workload(task_uuid=task_uuid,
                                subtask_uuid=subtask_uuid,
                                name=name,
@@ -386,13 +526,21 @@ def workload_create(session, task_uuid, subtask_uuid, name, description,
                                hooks=hooks,
                                contexts=contexts or {},
                                sla=sla,
-                               args=args)
+                               args=args,
+                               parameters=parameters or {})
     session.add(workload)
     return workload
 
 
 @with_session
-def workload_data_create(session, task_uuid, workload_uuid, chunk_order, data):
+def workload_data_create(session, task_uuid, workload_uuid, chunk_order, data,
+                         chunk_format=chunks.JSON):
+    """Store a chunk of raw iterations of the workload.
+
+    :param data: dict with the list of iterations under "raw" key
+    :param chunk_format: format to store iterations in (see
+        rally.common.db.chunks)
+    """
     workload_data = models.WorkloadData(task_uuid=task_uuid,
                                         workload_uuid=workload_uuid)
 
@@ -429,7 +577,7 @@ def workload_data_create(session, task_uuid, workload_uuid, chunk_order, data):
         "chunk_order": chunk_order,
         "iteration_count": iter_count,
         "failed_iteration_count": failed_iter_count,
-        "chunk_data": {"raw": raw_data},
+        "chunk_data": chunks.encode(raw_data, chunk_format),
         # TODO(ikhudoshyn)
         "chunk_size": 0,
         "compressed_chunk_size": 0,
@@ -508,6 +656,152 @@ def workload_set_results(session, workload_uuid, subtask_uuid, task_uuid,
         subtask_values)
 
 
+@with_session
+def workload_data_get_all(session, workload_uuid):
+    return _task_workload_data_get_all(session, workload_uuid)
+
+
+@with_session
+def workload_data_list_chunks(session, workload_uuid):
+    """Return orders of all chunks of the workload data in ascending order."""
+    query = (session.query(models.WorkloadData.chunk_order)
+                    .filter_by(workload_uuid=workload_uuid)
+                    .order_by(models.WorkloadData.chunk_order.asc()))
+    return [chunk_order for chunk_order, in query]
+
+
+@with_session
+def workload_data_get_chunk(session, workload_uuid, chunk_order):
+    """Return raw iterations of a single chunk sorted by timestamp."""
+    chunk = (session.query(models.WorkloadData.chunk_data)
+                    .filter_by(workload_uuid=workload_uuid,
+                               chunk_order=chunk_order).first())
+    if not chunk:
+        raise exceptions.DBRecordNotFound(
+            criteria="workload_uuid: %s, chunk_order: %s"
+                     % (workload_uuid, chunk_order),
+            table="workloaddata")
+    return sorted(chunks.decode(chunk.chunk_data),
+                  key=lambda x: x["timestamp"])
+
+
+@with_session
+def workload_list_for_compaction(session, created_before=None, tags=None,
+                                 marker=None, limit=100):
+    """List workloads of finished tasks which raw data can be compacted.
+
+    :param created_before: select only workloads created before the datetime
+    :param tags: select only workloads of tasks with any of the tags
+    :param marker: ID of the last workload from the previous batch
+    :param limit: maximum number of workloads to return
+    """
+    query = (session.query(models.Workload.id,
+                           models.Workload.uuid,
+                           models.Workload.task_uuid)
+                    .join(models.Task,
+                          models.Task.uuid == models.Workload.task_uuid)
+                    .filter(models.Task.status.in_(
+                        [consts.TaskStatus.FINISHED,
+                         consts.TaskStatus.ABORTED,
+                         consts.TaskStatus.CRASHED])))
+    if created_before is not None:
+        query = query.filter(models.Workload.created_at < created_before)
+    if tags:
+        uuids = _uuids_by_tags_get(session, consts.TagType.TASK, tags)
+        if not uuids:
+            return []
+        query = query.filter(models.Task.uuid.in_(uuids))
+    if marker is not None:
+        query = query.filter(models.Workload.id > marker)
+
+    query = query.order_by(models.Workload.id.asc()).limit(limit)
+    return [{"id": w.id, "uuid": w.uuid, "task_uuid": w.task_uuid}
+            for w in query.all()]
+
+
+@with_session
+def workload_compact(session, workload_uuid, raw_data, statistics,
+                     chunk_format=chunks.JSON):
+    """Replace all chunks of workload raw data by a single one.
+
+    :param raw_data: the list of iterations to keep
+    :param statistics: new statistics of the workload
+    :param chunk_format: format to store iterations in (see
+        rally.common.db.chunks)
+    :returns: True if the workload has been compacted, False if it is
+        already compacted
+    """
+    workload = session.query(models.Workload).filter_by(
+        uuid=workload_uuid).first()
+    if not workload:
+        raise exceptions.DBRecordNotFound(
+            criteria="uuid: %s" % workload_uuid, table="workloads")
+    if "compacted" in workload.statistics:
+        return False
+
+    started_at, finished_at = (
+        session.query(sa.func.min(models.WorkloadData.started_at),
+                      sa.func.max(models.WorkloadData.finished_at))
+               .filter(models.WorkloadData.workload_uuid == workload_uuid)
+               .first())
+    (session.query(models.WorkloadData).filter_by(workload_uuid=workload_uuid)
+            .delete(synchronize_session=False))
+
+    session.add(models.WorkloadData(
+        task_uuid=workload.task_uuid,
+        workload_uuid=workload_uuid,
+        chunk_order=0,
+        iteration_count=len(raw_data),
+        failed_iteration_count=len([r for r in raw_data if r["error"]]),
+        chunk_data=chunks.encode(raw_data, chunk_format),
+        chunk_size=0,
+        compressed_chunk_size=0,
+        started_at=started_at or workload.created_at,
+        finished_at=finished_at or workload.created_at))
+    workload.statistics = statistics
+    return True
+
+
+@with_session
+def trend_points_set(session, task_uuid, points):
+    """Store summaries of workloads of the task for trends.
+
+    The previously stored points of the task are replaced.
+
+    :param task_uuid: uuid of the task
+    :param points: a list of dicts with "workload_uuid" and "point" keys,
+        where "point" is made by `rally.task.processing.plot.Trends`
+    """
+    (session.query(models.TrendPoint).filter_by(task_uuid=task_uuid)
+            .delete(synchronize_session=False))
+    session.bulk_insert_mappings(
+        models.TrendPoint,
+        [{"task_uuid": task_uuid,
+          "workload_uuid": p["workload_uuid"],
+          "config_hash": p["point"]["key"],
+          "name": p["point"]["name"],
+          "data": p["point"]} for p in points])
+
+
+@with_session
+def trend_points_get(session, task_uuids):
+    """Get stored summaries of workloads of the tasks.
+
+    :param task_uuids: uuids of tasks to get points of
+    :returns: a dict where keys are uuids of tasks and values are lists of
+        points in the order they were stored. Tasks without stored points
+        are missed.
+    """
+    result = collections.OrderedDict()
+    query = (session.query(models.TrendPoint.task_uuid,
+                           models.TrendPoint.data)
+             .filter(models.TrendPoint.task_uuid.in_(task_uuids))
+             .order_by(models.TrendPoint.id.asc()))
+    for row in query:
+        result.setdefault(row.task_uuid, []).append(row.data)
+    return result
+
+
 @with_session
 def env_get(session, uuid_or_name):
     env = (session.query(models.Env)
@@ -554,7 +848,7 @@ def env_create(session, name, status, description, extras, config,
             extras=extras, config=config, spec=spec
         )
         session.add(env)
-        session.commit()
+        session.flush()
         session.bulk_save_objects(
             [models.Platform(**p) for p in platforms])
     except db_exc.DBDuplicateEntry:
@@ -604,6 +898,12 @@ def env_set_status(session, uuid, old_status, new_status):
 
 @with_session
 def env_delete_cascade(session, uuid):
+    verifications = (session.query(models.Verification.uuid)
+                            .filter_by(env_uuid=uuid))
+    (session.query(models.VerificationResult)
+            .filter(models.VerificationResult.verification_uuid.in_(
+                verifications))
+            .delete(synchronize_session=False))
     for model in [models.Task, models.Verification, models.Platform]:
         session.query(model).filter_by(env_uuid=uuid).delete()
     session.query(models.Env).filter_by(uuid=uuid).delete()
@@ -712,7 +1012,7 @@ def verification_create(session, verifier_id, env, tags=None, run_args=None):
                                        env_uuid=env["uuid"],
                                        run_args=run_args)
     session.add(verification)
-    session.commit()
+    session.flush()
 
     if tags:
         session.bulk_save_objects(
@@ -742,7 +1042,15 @@ def _verification_get(session, verification_uuid):
 
 @with_session
 def verification_list(session,
-                      verifier_id=None, env=None, tags=None, status=None):
+                      verifier_id=None, env=None, tags=None, status=None,
+                      created_after=None, created_before=None,
+                      sort_desc=False, marker=None, limit=None, offset=None,
+                      fields=None):
+    """List verifications.
+
+    Arguments `created_after`, `created_before`, `sort_desc`, `marker`,
+    `limit`, `offset` and `fields` have the same meaning as in `task_list`.
+    """
     filter_by = {}
     if verifier_id:
         verifier = _verifier_get(session, verifier_id)
@@ -762,15 +1070,26 @@ def verification_list(session,
                                    consts.TagType.VERIFICATION, tags)
         query = query.filter(models.Verification.uuid.in_(uuids))
 
-    verifications = [verification.as_dict() for verification in query.all()]
-    for verification in verifications:
-        verification["tags"] = sorted(tags_get(verification["uuid"],
-                                               consts.TagType.VERIFICATION))
+    query = _paginate(session, query, models.Verification,
+                      created_after=created_after,
+                      created_before=created_before,
+                      sort_desc=sort_desc, marker=marker, limit=limit,
+                      offset=offset, fields=fields)
+
+    verifications = [serialize(v) for v in query.all()]
+    if verifications:
+        tags = _tags_get_all(session, [v["uuid"] for v in verifications],
+                             consts.TagType.VERIFICATION)
+        for verification in verifications:
+            verification["tags"] = tags[verification["uuid"]]
     return verifications
 
 
 @with_session
 def verification_delete(session, uuid):
+    (session.query(models.VerificationResult)
+            .filter_by(verification_uuid=uuid)
+            .delete(synchronize_session=False))
     count = session.query(models.Verification).filter_by(uuid=uuid).delete()
     if not count:
         raise exceptions.DBRecordNotFound(criteria="uuid: %s" % uuid,
@@ -779,6 +1098,88 @@ def verification_delete(session, uuid):
 
 @with_session
 def verification_update(session, verification_uuid, **properties):
+    """Update a verification.
+
+    Results of tests can be passed via `tests` argument (a dict where keys
+    are names of tests), they replace the stored ones.
+    """
     verification = _verification_get(session, verification_uuid)
+    tests = properties.pop("tests", None)
     verification.update(properties)
+    if tests is not None:
+        _verification_results_set(session, verification_uuid, tests)
     return verification
+
+
+def _verification_results_set(session, verification_uuid, tests):
+    # results are stored in order the tests were run, so they can be read
+    #   in this order by batches just ordering them by ID
+    tests = sorted(tests.items(),
+                   key=lambda t: (t[1].get("timestamp") or "", t[0]))
+    (session.query(models.VerificationResult)
+            .filter_by(verification_uuid=verification_uuid)
+            .delete(synchronize_session=False))
+    session.bulk_insert_mappings(
+        models.VerificationResult,
+        [{"verification_uuid": verification_uuid,
+          "name": name,
+          "status": result.get("status", ""),
+          "duration": float(result.get("duration") or 0),
+          "data": result} for name, result in tests])
+
+
+@with_session
+def verification_results_get(session, verification_uuids=None, status=None,
+                             names=None, detailed=True, marker=None,
+                             limit=None):
+    """Get results of tests.
+
+    Results are ordered as they were stored, i.e. tests of a verification
+    are ordered as they were run (see `_verification_results_set`).
+
+    :param verification_uuids: uuids of verifications to get results of
+    :param status: status (or list of statuses) of tests to filter by
+    :param names: names of tests to filter by. In combination with
+        `verification_uuids` it allows to look at a test across many runs
+    :param detailed: whether to load the whole results (tracebacks, tags,
+        etc) or only names, statuses and durations of tests
+    :param marker: ID of the last result from the previous batch
+    :param limit: maximum number of results to return
+    :returns: list of dicts with "id", "verification_uuid", "name" and
+        "result" keys
+    """
+    columns = [models.VerificationResult.id,
+               models.VerificationResult.verification_uuid,
+               models.VerificationResult.name,
+               models.VerificationResult.status,
+               models.VerificationResult.duration]
+    if detailed:
+        columns.append(models.VerificationResult.data)
+    query = session.query(*columns)
+    if verification_uuids is not None:
+        query = query.filter(models.VerificationResult.verification_uuid.in_(
+            verification_uuids))
+    if status is not None:
+        if isinstance(status, str):
+            status = [status]
+        query = query.filter(models.VerificationResult.status.in_(status))
+    if names is not None:
+        query = query.filter(models.VerificationResult.name.in_(names))
+    if marker is not None:
+        query = query.filter(models.VerificationResult.id > marker)
+
+    query = query.order_by(models.VerificationResult.id.asc())
+    if limit is not None:
+        query = query.limit(limit)
+    results = []
+    for row in query:
+        if detailed:
+            result = row.data
+        else:
+            result = {"name": row.name, "status": row.status,
+                      "duration": row.duration}
+        results.append({"id": row.id,
+                        "verification_uuid": row.verification_uuid,
+                        "name": row.name,
+                        "result": result})
+    return results
@@ -0,0 +1,295 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Encodings of raw iterations stored in `WorkloadData.chunk_data`.
+
+There are two formats of chunks:
+
+* json - the original one, `{"raw": [<iteration>, ...]}`, where every
+  iteration is a dict as it is produced by scenario runners;
+* columnar - iterations are split into columns (struct-of-arrays). Numeric
+  columns (timestamps, durations, indexes) are packed as little-endian
+  binary arrays (base64 encoded, since the chunk is stored in JSON column),
+  names of atomic actions and types of errors are interned in a string
+  table and only rare fields (error messages, output, unknown keys) are kept
+  as JSON:
+
+      {"format": "columnar",
+       "version": 1,
+       "count": <number of iterations>,
+       "strings": [<interned string>, ...],
+       "columns": {<column name>: <base64 encoded array>, ...},
+       "atomic_failed": [<index of failed atomic action>, ...],
+       "errors": {<iteration index>: [<message>, <traceback>]},
+       "extra": {<iteration index>: {<key>: <value>}},
+       "fallback": {<iteration index>: <iteration>}}
+
+  Atomic actions are stored in the pre-order (parents go before children)
+  with index of a parent inside the iteration (-1 for root actions).
+  Iterations which do not fit the format are stored as is in "fallback".
+
+`decode` accepts both formats, so chunks which were stored before the
+columnar format appeared keep working.
+"""
+
+import array
+import base64
+import sys
+
+from rally import exceptions
+
+
+JSON = "json"
+COLUMNAR = "columnar"
+FORMATS = (JSON, COLUMNAR)
+
+_VERSION = 1
+
+_FLOAT = "d"
+_INT = "i"
+
+_ITERATION_COLUMNS = (("timestamp", _FLOAT),
+                      ("duration", _FLOAT),
+                      ("idle_duration", _FLOAT),
+                      ("error_type", _INT),
+                      ("atomics_count", _INT))
+_ATOMIC_COLUMNS = (("atomic_name", _INT),
+                   ("atomic_parent", _INT),
+                   ("atomic_started_at", _FLOAT),
+                   ("atomic_finished_at", _FLOAT))
+
+_ITERATION_KEYS = {"timestamp", "duration", "idle_duration", "error",
+                   "output", "atomic_actions"}
+_REQUIRED_ATOMIC_KEYS = {"name", "children", "started_at", "finished_at"}
+_ATOMIC_KEYS = _REQUIRED_ATOMIC_KEYS | {"failed"}
+
+_NAN = float("nan")
+
+
+class _Unsupported(Exception):
+    """The iteration can not be represented by columns."""
+
+
+def _pack(typecode, values):
+    data = array.array(typecode, values)
+    if sys.byteorder != "little":
+        data.byteswap()
+    return base64.b64encode(data.tobytes()).decode("ascii")
+
+
+def _unpack(typecode, value):
+    data = array.array(typecode)
+    data.frombytes(base64.b64decode(value))
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data.tolist()
+
+
+def _float(value, nullable=False):
+    if value is None and nullable:
+        return _NAN
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        raise _Unsupported()
+    return value
+
+
+def _flatten_atomics(actions, parent, intern, result):
+    if not isinstance(actions, list):
+        raise _Unsupported()
+    for action in actions:
+        if (not isinstance(action, dict)
+                or not _REQUIRED_ATOMIC_KEYS <= set(action) <= _ATOMIC_KEYS
+                or not isinstance(action["name"], str)
+                or action.get("failed", True) is not True):
+            raise _Unsupported()
+        result.append((intern(action["name"]), parent,
+                       _float(action["started_at"], nullable=True),
+                       _float(action["finished_at"], nullable=True),
+                       "failed" in action))
+        _flatten_atomics(action["children"], len(result) - 1,
+                         intern, result)
+
+
+def _default_output():
+    return {"additive": [], "complete": []}
+
+
+def encode(raw_data, chunk_format=COLUMNAR):
+    """Build `chunk_data` of the specified format from raw iterations."""
+    if chunk_format == JSON:
+        return {"raw": raw_data}
+    if chunk_format != COLUMNAR:
+        raise exceptions.RallyException(
+            "Unknown format of workload data chunk: %s" % chunk_format)
+
+    strings = {}
+
+    def intern(value):
+        return strings.setdefault(value, len(strings))
+
+    columns = dict((name, []) for name, _t in
+                   _ITERATION_COLUMNS + _ATOMIC_COLUMNS)
+    atomic_failed = []
+    errors = {}
+    extra = {}
+    fallback = {}
+
+    for i, itr in enumerate(raw_data):
+        try:
+            if (not isinstance(itr, dict)
+                    or not _ITERATION_KEYS <= set(itr)):
+                raise _Unsupported()
+            timestamp = _float(itr["timestamp"])
+            duration = _float(itr["duration"])
+            idle_duration = _float(itr["idle_duration"])
+            error = itr["error"]
+            if error:
+                if (not isinstance(error, list) or len(error) != 3
+                        or not all(isinstance(e, str) for e in error)):
+                    raise _Unsupported()
+            elif error != []:
+                raise _Unsupported()
+            atomics = []
+            _flatten_atomics(itr["atomic_actions"], -1, intern, atomics)
+        except _Unsupported:
+            fallback[str(i)] = itr
+            timestamp = duration = idle_duration = _NAN
+            error = []
+            atomics = []
+
+        if str(i) not in fallback:
+            rare = dict((k, v) for k, v in itr.items()
+                        if k not in _ITERATION_KEYS)
+            if itr["output"] != _default_output():
+                rare["output"] = itr["output"]
+            if rare:
+                extra[str(i)] = rare
+
+        columns["timestamp"].append(timestamp)
+        columns["duration"].append(duration)
+        columns["idle_duration"].append(idle_duration)
+        if error:
+            columns["error_type"].append(intern(error[0]))
+            errors[str(i)] = error[1:]
+        else:
+            columns["error_type"].append(-1)
+        columns["atomics_count"].append(len(atomics))
+        for name, parent, started_at, finished_at, failed in atomics:
+            if failed:
+                atomic_failed.append(len(columns["atomic_name"]))
+            columns["atomic_name"].append(name)
+            columns["atomic_parent"].append(parent)
+            columns["atomic_started_at"].append(started_at)
+            columns["atomic_finished_at"].append(finished_at)
+
+    return {
+        "format": COLUMNAR,
+        "version": _VERSION,
+        "count": len(raw_data),
+        "strings": sorted(strings, key=strings.get),
+        "columns": dict((name, _pack(typecode, columns[name]))
+                        for name, typecode in (_ITERATION_COLUMNS
+                                               + _ATOMIC_COLUMNS)),
+        "atomic_failed": atomic_failed,
+        "errors": errors,
+        "extra": extra,
+        "fallback": fallback
+    }
+
+
+def get_format(chunk_data):
+    """Return the format of `chunk_data`."""
+    if "raw" in chunk_data:
+        return JSON
+    chunk_format = chunk_data.get("format")
+    if chunk_format == COLUMNAR and chunk_data.get("version") == _VERSION:
+        return COLUMNAR
+    raise exceptions.RallyException(
+        "Unknown format of workload data chunk: %s (version %s)"
+        % (chunk_format, chunk_data.get("version")))
+
+
+def decode(chunk_data):
+    """Return the list of raw iterations stored in `chunk_data`."""
+    if get_format(chunk_data) == JSON:
+        return chunk_data["raw"]
+
+    strings = chunk_data["strings"]
+    columns = dict((name, _unpack(typecode, chunk_data["columns"][name]))
+                   for name, typecode in _ITERATION_COLUMNS + _ATOMIC_COLUMNS)
+    atomic_failed = set(chunk_data["atomic_failed"])
+    errors = chunk_data["errors"]
+    extra = chunk_data["extra"]
+    fallback = chunk_data["fallback"]
+
+    a_names = columns["atomic_name"]
+    a_parents = columns["atomic_parent"]
+    a_started = columns["atomic_started_at"]
+    a_finished = columns["atomic_finished_at"]
+
+    raw_data = []
+    pos = 0
+    for i, (timestamp, duration, idle_duration, error_type,
+            atomics_count) in enumerate(zip(columns["timestamp"],
+                                            columns["duration"],
+                                            columns["idle_duration"],
+                                            columns["error_type"],
+                                            columns["atomics_count"])):
+        key = str(i)
+        if key in fallback:
+            raw_data.append(fallback[key])
+            continue
+
+        atomics = []
+        if atomics_count:
+            nodes = []
+            for j in range(pos, pos + atomics_count):
+                started_at = a_started[j]
+                finished_at = a_finished[j]
+                node = {"name": strings[a_names[j]],
+                        "children": [],
+                        # NaN is used for None values
+                        "started_at": (started_at
+                                       if started_at == started_at else None),
+                        "finished_at": (finished_at
+                                        if finished_at == finished_at
+                                        else None)}
+                if j in atomic_failed:
+                    node["failed"] = True
+                parent = a_parents[j]
+                if parent < 0:
+                    atomics.append(node)
+                else:
+                    nodes[parent]["children"].append(node)
+                nodes.append(node)
+            pos += atomics_count
+
+        itr = {"timestamp": timestamp,
+               "duration": duration,
+               "idle_duration": idle_duration,
+               "error": ([strings[error_type]] + errors[key]
+                         if error_type >= 0 else []),
+               "output": _default_output(),
+               "atomic_actions": atomics}
+        if key in extra:
+            itr.update(extra[key])
+        raw_data.append(itr)
+    return raw_data
+
+
+def convert(chunk_data, chunk_format):
+    """Convert `chunk_data` to the specified format."""
+    if get_format(chunk_data) == chunk_format:
+        return chunk_data
+    return encode(decode(chunk_data), chunk_format)
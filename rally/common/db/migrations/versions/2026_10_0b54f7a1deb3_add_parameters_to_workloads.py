@@ -0,0 +1,47 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Add parameters of matrix to workloads
+
+Revision ID: 0b54f7a1deb3
+Revises: ecade935ac58
+Create Date: 2026-10-19 10:12:43.518305
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from rally.common.db import sa_types
+from rally import exceptions
+
+
+# revision identifiers, used by Alembic.
+revision = "0b54f7a1deb3"
+down_revision = "ecade935ac58"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # values of parameters of a matrix the workload is expanded from. Old
+    #   workloads do not have them
+    with op.batch_alter_table("workloads") as batch_op:
+        batch_op.add_column(
+            sa.Column("parameters", sa_types.MutableJSONEncodedDict,
+                      nullable=True))
+
+
+def downgrade():
+    raise exceptions.DowngradeNotSupported()
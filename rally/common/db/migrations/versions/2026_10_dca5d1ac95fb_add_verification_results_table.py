@@ -0,0 +1,109 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Move results of verification tests to a separate table
+
+Revision ID: dca5d1ac95fb
+Revises: bc908ac9a1fc
+Create Date: 2026-10-18 12:03:11.512345
+
+"""
+
+import datetime as dt
+
+from alembic import op
+import sqlalchemy as sa
+
+from rally.common.db import sa_types
+from rally import exceptions
+
+
+# revision identifiers, used by Alembic.
+revision = "dca5d1ac95fb"
+down_revision = "bc908ac9a1fc"
+branch_labels = None
+depends_on = None
+
+
+verifications_helper = sa.Table(
+    "verifications",
+    sa.MetaData(),
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("uuid", sa.String(36), nullable=False),
+    sa.Column("tests", sa_types.MutableJSONEncodedDict, default={})
+)
+
+verification_results_helper = sa.Table(
+    "verification_results",
+    sa.MetaData(),
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("verification_uuid", sa.String(36), nullable=False),
+    sa.Column("name", sa.String(1024), nullable=False),
+    sa.Column("status", sa.String(36), nullable=False),
+    sa.Column("duration", sa.Float),
+    sa.Column("data", sa_types.JSONEncodedDict, nullable=False),
+    sa.Column("created_at", sa.DateTime),
+    sa.Column("updated_at", sa.DateTime)
+)
+
+
+def upgrade():
+    op.create_table(
+        "verification_results",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("verification_uuid", sa.String(36),
+                  sa.ForeignKey("verifications.uuid"), nullable=False),
+        sa.Column("name", sa.String(1024), nullable=False),
+        sa.Column("status", sa.String(36), nullable=False),
+        sa.Column("duration", sa.Float),
+        sa.Column("data", sa_types.JSONEncodedDict, nullable=False),
+        sa.Column("created_at", sa.DateTime),
+        sa.Column("updated_at", sa.DateTime)
+    )
+
+    op.create_index("verification_result_verification_uuid_status",
+                    "verification_results", ["verification_uuid", "status"])
+    op.create_index("verification_result_name", "verification_results",
+                    ["name"], mysql_length=255)
+
+    connection = op.get_bind()
+    now = dt.datetime.utcnow()
+    # load tests of verifications one by one, since they can be huge
+    v_ids = [v.id for v in connection.execute(
+        sa.select([verifications_helper.c.id]))]
+    for v_id in v_ids:
+        v = connection.execute(verifications_helper.select().where(
+            verifications_helper.c.id == v_id)).first()
+        if not v.tests:
+            continue
+        # results are stored in order the tests were run
+        tests = sorted(v.tests.items(),
+                       key=lambda t: (t[1].get("timestamp") or "", t[0]))
+        connection.execute(
+            verification_results_helper.insert(),
+            [{"verification_uuid": v.uuid,
+              "name": name,
+              "status": test.get("status", ""),
+              "duration": float(test.get("duration") or 0),
+              "data": test,
+              "created_at": now,
+              "updated_at": now} for name, test in tests]
+        )
+
+    with op.batch_alter_table("verifications") as batch_op:
+        batch_op.drop_column("tests")
+
+
+def downgrade():
+    raise exceptions.DowngradeNotSupported()
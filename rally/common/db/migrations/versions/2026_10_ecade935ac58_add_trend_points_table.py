@@ -0,0 +1,59 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Add a table for trends index
+
+Revision ID: ecade935ac58
+Revises: dca5d1ac95fb
+Create Date: 2026-10-18 16:41:27.104721
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from rally.common.db import sa_types
+from rally import exceptions
+
+
+# revision identifiers, used by Alembic.
+revision = "ecade935ac58"
+down_revision = "dca5d1ac95fb"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # the table is filled on demand, while building trends of old tasks
+    op.create_table(
+        "trend_points",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("task_uuid", sa.String(36),
+                  sa.ForeignKey("tasks.uuid"), nullable=False),
+        sa.Column("workload_uuid", sa.String(36),
+                  sa.ForeignKey("workloads.uuid"), nullable=False),
+        sa.Column("config_hash", sa.String(32), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("data", sa_types.JSONEncodedDict, nullable=False),
+        sa.Column("created_at", sa.DateTime),
+        sa.Column("updated_at", sa.DateTime)
+    )
+
+    op.create_index("trend_point_task_uuid", "trend_points", ["task_uuid"])
+    op.create_index("trend_point_config_hash", "trend_points",
+                    ["config_hash"])
+
+
+def downgrade():
+    raise exceptions.DowngradeNotSupported()
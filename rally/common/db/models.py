@@ -174,7 +174,6 @@ class Subtask(BASE, RallyBase):
     sla = sa.Column(
         sa_types.JSONEncodedDict, default={}, nullable=False)
 
-    # It is always False for now
     run_in_parallel = sa.orm.deferred(
         sa.Column(sa.Boolean, default=False, nullable=False))
 
@@ -238,6 +237,9 @@ class Workload(BASE, RallyBase):
     hooks = sa.Column(
         sa_types.JSONEncodedList, default=[], nullable=False)
 
+    # values of parameters of a matrix the workload is expanded from
+    parameters = sa.Column(sa_types.MutableJSONEncodedDict, default={})
+
     start_time = sa.Column(sa_types.TimeStamp)
 
     load_duration = sa.Column(sa.Float, default=0.0)
@@ -367,4 +369,50 @@ class Verification(BASE, RallyBase):
     expected_failures = sa.Column(sa.Integer, default=0)
     tests_duration = sa.Column(sa.Float, default=0.0)
 
-    tests = sa.Column(sa_types.MutableJSONEncodedDict, default={})
+
+class VerificationResult(BASE, RallyBase):
+    """Represents a result of a single test of a verification."""
+
+    __tablename__ = "verification_results"
+    __table_args__ = (
+        sa.Index("verification_result_verification_uuid_status",
+                 "verification_uuid", "status"),
+        sa.Index("verification_result_name", "name", mysql_length=255),
+    )
+
+    id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
+
+    verification_uuid = sa.Column(sa.String(36),
+                                  sa.ForeignKey(Verification.uuid),
+                                  nullable=False)
+
+    name = sa.Column(sa.String(1024), nullable=False)
+    status = sa.Column(sa.String(36), nullable=False)
+    duration = sa.Column(sa.Float, default=0.0)
+
+    # the whole result of the test (tags, traceback, reason, etc)
+    data = sa.Column(sa_types.JSONEncodedDict, default={}, nullable=False)
+
+
+class TrendPoint(BASE, RallyBase):
+    """Represents a summary of a workload used to build trends."""
+
+    __tablename__ = "trend_points"
+    __table_args__ = (
+        sa.Index("trend_point_task_uuid", "task_uuid"),
+        sa.Index("trend_point_config_hash", "config_hash"),
+    )
+
+    id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
+
+    task_uuid = sa.Column(sa.String(36), sa.ForeignKey(Task.uuid),
+                          nullable=False)
+    workload_uuid = sa.Column(sa.String(36), sa.ForeignKey(Workload.uuid),
+                              nullable=False)
+
+    # a hash of the workload configuration which identifies the trend
+    config_hash = sa.Column(sa.String(32), nullable=False)
+    name = sa.Column(sa.String(255), nullable=False)
+
+    # the point itself (see rally.task.processing.plot.Trends.make_point)
+    data = sa.Column(sa_types.JSONEncodedDict, default={}, nullable=False)
@@ -12,6 +12,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import hashlib
+import json
 import os
 
 import alembic
@@ -21,11 +23,25 @@ import alembic.script
 import sqlalchemy as sa
 import sqlalchemy.schema  # noqa
 
+from rally.common import cfg
 from rally.common.db import api
 from rally.common.db import models
+from rally.common import version
 from rally import exceptions
 
 
+CONF = cfg.CONF
+
+DB_REVISION_OPTS = [
+    cfg.StrOpt("db_revision_stamp",
+               default="~/.rally/cache/db_revision.json",
+               help="Path to the file where the fact that the database is "
+                    "at the latest revision is recorded. The revision is "
+                    "checked again only if the connection string, the "
+                    "version of Rally or migrations are changed. Empty value"
+                    " means that the revision is checked every time."),
+]
+
 INITIAL_REVISION_UUID = "ca3626f62937"
 
 
@@ -35,6 +51,79 @@ def _alembic_config():
     return config
 
 
+def _revision_stamp():
+    """Identify the database and migrations which the revision is valid for.
+
+    The connection string is not stored as is since it can contain
+    credentials.
+    """
+    connection = CONF.database.connection
+    if not connection:
+        return None
+    migrations = os.path.join(os.path.dirname(__file__), "migrations",
+                              "versions")
+    stamp = {
+        "connection": hashlib.sha256(connection.encode("utf-8")).hexdigest(),
+        "rally_version": version.version_string(),
+        "migrations": os.stat(migrations).st_mtime}
+
+    url = sa.engine.url.make_url(connection)
+    if url.get_backend_name() == "sqlite" and url.database:
+        # the file of the database can be removed or replaced
+        try:
+            stamp["sqlite_inode"] = os.stat(url.database).st_ino
+        except OSError:
+            return None
+    return stamp
+
+
+def _revision_stamp_path():
+    # NOTE: options are registered by rally.api, but the schema can be managed
+    #   without it
+    if "db_revision_stamp" not in CONF or not CONF.db_revision_stamp:
+        return None
+    return os.path.expanduser(CONF.db_revision_stamp)
+
+
+def is_revision_verified():
+    """Check that the latest revision of the database was verified before."""
+    path = _revision_stamp_path()
+    stamp = path and _revision_stamp()
+    if not stamp:
+        return False
+    try:
+        with open(path) as f:
+            return json.load(f) == stamp
+    except (OSError, ValueError):
+        return False
+
+
+def set_revision_verified():
+    """Record that the database is at the latest revision."""
+    path = _revision_stamp_path()
+    stamp = path and _revision_stamp()
+    if not stamp:
+        return
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = "%s.%s.tmp" % (path, os.getpid())
+        with open(tmp_path, "w") as f:
+            json.dump(stamp, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def reset_revision_verified():
+    """Forget that the revision was verified, since the schema is changed."""
+    path = _revision_stamp_path()
+    if path:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
 def schema_cleanup():
     """Drop all database objects.
 
@@ -42,6 +131,7 @@ def schema_cleanup():
     engine. Per-db implementations will also need to drop items specific to
     those systems, such as sequences, custom types (e.g. pg ENUM), etc.
     """
+    reset_revision_verified()
     engine = api.get_engine()
     with engine.begin() as conn:
         inspector = sa.inspect(engine)
@@ -109,6 +199,7 @@ def schema_upgrade(revision=None, config=None, engine=None):
     :param config: Instance of alembic config
     :param engine: Instance of DB engine
     """
+    reset_revision_verified()
     revision = revision or "head"
     config = config or _alembic_config()
     engine = engine or api.get_engine()
@@ -148,5 +239,6 @@ def schema_stamp(revision, config=None):
     :type revision: string
     :param config: Instance of alembic config
     """
+    reset_revision_verified()
     config = config or _alembic_config()
     return alembic.command.stamp(config, revision)
@@ -0,0 +1,151 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Incremental reading of big JSON documents.
+
+Reader walks through a document piece by piece, so a caller can enter only
+containers it is interested in and decode all other values at once:
+
+    reader = Reader(f)
+    for key in reader.iter_object():
+        if key == "items":
+            for _ in reader.iter_array():
+                process(reader.read_value())
+        else:
+            reader.read_value()
+
+Only a value which is decoded at once (plus a small buffer) is kept in
+memory. Malformed documents cause ValueError.
+"""
+
+import json
+
+
+_WHITESPACE = " \t\n\r"
+
+
+class Reader(object):
+    """Reads a JSON document from a file-like object incrementally.
+
+    :param fp: a file-like object opened in a text mode
+    :param buffer_size: a number of characters to read from the file at once
+    """
+
+    def __init__(self, fp, buffer_size=65536):
+        self._fp = fp
+        self._buffer_size = buffer_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        # the position of the buffer start in the document
+        self._offset = 0
+        self._eof = False
+
+    def _fill(self, size=None):
+        """Read more data to the buffer.
+
+        :returns: False if there is nothing to read
+        """
+        if self._eof:
+            return False
+        data = self._fp.read(size or self._buffer_size)
+        if not data:
+            self._eof = True
+            return False
+        # drop already consumed data
+        self._offset += self._pos
+        self._buf = self._buf[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def _fail(self, msg):
+        raise ValueError("%s: char %s" % (msg, self._offset + self._pos))
+
+    def peek(self):
+        """Return the next non-whitespace character or '' at the end."""
+        while True:
+            while (self._pos < len(self._buf)
+                    and self._buf[self._pos] in _WHITESPACE):
+                self._pos += 1
+            if self._pos < len(self._buf) or not self._fill():
+                return self._buf[self._pos:self._pos + 1]
+
+    def _expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            expected = " or ".join("'%s'" % c for c in chars)
+            self._fail("Expecting %s" % expected)
+        self._pos += 1
+        return char
+
+    def read_value(self):
+        """Decode the next value entirely."""
+        self.peek()
+        size = self._buffer_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                if self._fill(size):
+                    # read a twice bigger piece every time to not decode
+                    #   a big value too many times
+                    size *= 2
+                    continue
+                self._fail(e.msg)
+            # the number at the end of the buffer can be continued in the
+            #   next piece of data
+            if end == len(self._buf) and self._fill(size):
+                continue
+            self._pos = end
+            return value
+
+    def iter_array(self):
+        """Enter an array and yield once per its item.
+
+        An item should be consumed by the caller (by `read_value` or by
+        entering it) before the next iteration.
+        """
+        self._expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield
+            if self._expect(",]") == "]":
+                return
+
+    def iter_object(self):
+        """Enter an object and yield its keys.
+
+        A value of the key should be consumed by the caller (by `read_value`
+        or by entering it) before the next iteration.
+        """
+        self._expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            if self.peek() != "\"":
+                self._fail("Expecting property name enclosed in double "
+                           "quotes")
+            key = self.read_value()
+            self._expect(":")
+            yield key
+            if self._expect(",}") == "}":
+                return
+
+    def check_end(self):
+        """Check that there is nothing after the document."""
+        if self.peek():
+            self._fail("Extra data")
@@ -46,6 +46,21 @@ def _filter_attrs(**attrs):
         (k, v) for k, v in sorted(attrs.items()) if v is not None)
 
 
+def _make_comment():
+    return ET.Comment("Report is generated by Rally %s at %s" % (
+        version.version_string(), dt.datetime.utcnow().isoformat()))
+
+
+def _start_tag(elem):
+    """Serialize the start tag of an element without children."""
+    elem.text = "\n"
+    try:
+        raw = ET.tostring(elem, encoding="unicode")
+    finally:
+        elem.text = None
+    return raw[:-len("\n</%s>" % elem.tag)]
+
+
 class _TestCase(object):
     def __init__(self, parent, classname, name, id=None, time=None,
                  timestamp=None):
@@ -137,11 +152,7 @@ class JUnitXML(object):
         self._root = ET.Element("testsuites")
         self._test_suites = []
 
-        self._root.append(
-            ET.Comment("Report is generated by Rally %s at %s" % (
-                version.version_string(),
-                dt.datetime.utcnow().isoformat()))
-        )
+        self._root.append(_make_comment())
 
     def __str__(self):
         return self.to_string()
@@ -159,3 +170,94 @@ class JUnitXML(object):
             self._root, id=id, time=time, timestamp=timestamp)
         self._test_suites.append(test_suite)
         return test_suite
+
+
+class _StreamedTestSuite(object):
+    def __init__(self, writer, id, time, timestamp, tests, skipped,
+                 failures):
+        self._writer = writer
+        attrs = _filter_attrs(id=id, time=time, tests=tests,
+                              errors="0", skipped=skipped,
+                              failures=failures, timestamp=timestamp)
+        self._elem = ET.Element("testsuite", **attrs)
+        self._started = False
+        self._test_case = None
+
+    def _increment(self, status):
+        # final stats are known in advance
+        pass
+
+    def _flush(self):
+        if self._test_case is None:
+            return
+        elem = self._test_case._elem
+        self._elem.remove(elem)
+        self._test_case = None
+        if not self._started:
+            self._writer._write("\n  " + _start_tag(self._elem))
+            self._started = True
+        _prettify_xml(elem, level=2)
+        elem.tail = None
+        self._writer._write("\n    " + ET.tostring(elem, encoding="unicode"))
+
+    def _close(self):
+        self._flush()
+        if self._started:
+            self._writer._write("\n  </testsuite>")
+        else:
+            self._writer._write(
+                "\n  " + ET.tostring(self._elem, encoding="unicode"))
+
+    def add_test_case(self, classname, name, id=None, time=None,
+                      timestamp=None):
+        # the previous test case is complete at this point
+        self._flush()
+        self._test_case = _TestCase(self, id=id, classname=classname,
+                                    name=name, time=time,
+                                    timestamp=timestamp)
+        return self._test_case
+
+
+class JUnitXMLWriter(object):
+    """A helper class to write JUnit-XML report into a stream incrementally.
+
+    Unlike JUnitXML, it does not build the whole tree in memory. Each test
+    case is written as soon as the next one is added (or the test suite is
+    finished), so final stats of test suites should be known in advance.
+    The output matches JUnitXML.to_string() of the same report.
+
+    :param stream: a file-like object to write the report to
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._test_suite = None
+        self._closed = False
+        self._write("<testsuites>\n  ")
+        self._write(ET.tostring(_make_comment(), encoding="unicode"))
+
+    def _write(self, data):
+        self._stream.write(data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+
+    def add_test_suite(self, id, time, timestamp, tests, skipped, failures):
+        if self._test_suite is not None:
+            self._test_suite._close()
+        self._test_suite = _StreamedTestSuite(
+            self, id=id, time=time, timestamp=timestamp, tests=tests,
+            skipped=skipped, failures=failures)
+        return self._test_suite
+
+    def close(self):
+        if not self._closed:
+            if self._test_suite is not None:
+                self._test_suite._close()
+                self._test_suite = None
+            self._write("\n</testsuites>\n")
+            self._closed = True
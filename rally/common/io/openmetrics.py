@@ -0,0 +1,147 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Writer of metrics in OpenMetrics text format.
+
+The format is understood by Prometheus and other monitoring systems, see
+https://github.com/OpenObservability/OpenMetrics for the specification.
+"""
+
+import bisect
+import collections
+import math
+
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# buckets of latency histograms (in seconds). Iterations of load tests are
+#   usually longer than requests of web services, so the default buckets of
+#   Prometheus clients are extended up to 5 minutes.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0, 60.0, 120.0, 300.0)
+
+_TYPES = ("gauge", "counter", "histogram")
+
+
+def escape(value):
+    """Escape a value of a label."""
+    return (str(value).replace("\\", "\\\\").replace("\"", "\\\"")
+            .replace("\n", "\\n"))
+
+
+def format_value(value):
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{%s}" % ",".join("%s=\"%s\"" % (k, escape(v))
+                             for k, v in labels.items())
+
+
+class MetricFamily(object):
+    """A set of samples of one metric with different labels.
+
+    :param name: name of the metric. In case of a unit, the name should end
+        with it (i.e. "request_duration_seconds")
+    :param mtype: type of the metric: gauge, counter or histogram
+    :param help: a description of the metric
+    :param unit: a unit of the metric
+    """
+
+    def __init__(self, name, mtype, help, unit=None):
+        if mtype not in _TYPES:
+            raise ValueError("Unsupported type of metric '%s'." % mtype)
+        if unit and not name.endswith("_" + unit):
+            raise ValueError("Name of metric '%s' should end with its unit "
+                             "'%s'." % (name, unit))
+        self.name = name
+        self.type = mtype
+        self.help = help
+        self.unit = unit
+        self._samples = []
+
+    def add(self, labels, value):
+        """Add a sample of a gauge or a counter.
+
+        :param labels: an ordered dict of labels of the sample
+        :param value: a value of the sample (a total of a counter)
+        """
+        suffix = "_total" if self.type == "counter" else ""
+        self._samples.append((suffix, labels, value))
+
+    def add_histogram(self, labels, histogram):
+        """Add samples of a histogram.
+
+        :param labels: an ordered dict of labels of the histogram
+        :param histogram: an instance of Histogram
+        """
+        cumulative = 0
+        for le, count in zip(histogram.buckets + (float("inf"),),
+                             histogram.counts):
+            cumulative += count
+            bucket_labels = collections.OrderedDict(labels)
+            bucket_labels["le"] = format_value(float(le))
+            self._samples.append(("_bucket", bucket_labels, cumulative))
+        self._samples.append(("_count", labels, histogram.count))
+        self._samples.append(("_sum", labels, histogram.sum))
+
+    def to_lines(self):
+        lines = ["# TYPE %s %s" % (self.name, self.type)]
+        if self.unit:
+            lines.append("# UNIT %s %s" % (self.name, self.unit))
+        lines.append("# HELP %s %s" % (self.name, escape(self.help)))
+        for suffix, labels, value in self._samples:
+            lines.append("%s%s%s %s" % (self.name, suffix,
+                                        format_labels(labels),
+                                        format_value(value)))
+        return lines
+
+
+def to_string(families):
+    """Make an OpenMetrics exposition of metric families.
+
+    Families without samples are omitted.
+    """
+    lines = []
+    for family in families:
+        if family._samples:
+            lines.extend(family.to_lines())
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+class Histogram(object):
+    """Histogram of observed values with fixed buckets."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # the last one is for values greater than all buckets (+Inf)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
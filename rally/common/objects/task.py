@@ -14,8 +14,9 @@
 #    under the License.
 
 import collections
-import copy
 import datetime as dt
+import heapq
+import itertools
 import uuid
 
 from rally.common import db
@@ -116,6 +117,7 @@ TASK_SCHEMA = {
                 "contexts": {"type": "object"},
                 "contexts_results": {"type": "array"},
                 "position": {"type": "integer"},
+                "parameters": {"type": "object"},
                 "pass_sla": {"type": "boolean"},
                 "sla_results": {
                     "type": "object",
@@ -315,16 +317,15 @@ class Task(object):
 
     @staticmethod
     def _serialize_dt(obj):
-        if isinstance(obj["created_at"], dt.datetime):
-            obj["created_at"] = obj["created_at"].strftime(
-                consts.TimeFormat.ISO8601)
-            obj["updated_at"] = obj["updated_at"].strftime(
-                consts.TimeFormat.ISO8601)
+        for key in ("created_at", "updated_at"):
+            if isinstance(obj.get(key), dt.datetime):
+                obj[key] = obj[key].strftime(consts.TimeFormat.ISO8601)
 
     def to_dict(self):
         db_task = self.task
         if self.task.get("env_uuid"):
-            env_name = db.env_get(self.task["env_uuid"])["name"]
+            env_name = (self.task.get("env_name")
+                        or db.env_get(self.task["env_uuid"])["name"])
             db_task["env_name"] = env_name
             db_task["deployment_name"] = env_name
             db_task["deployment_uuid"] = db_task["env_uuid"]
@@ -336,22 +337,60 @@ class Task(object):
         return db_task
 
     @classmethod
-    def get(cls, uuid, detailed=False):
-        return cls(db.api.task_get(uuid, detailed=detailed))
+    def get(cls, uuid, detailed=False, lazy_data=False):
+        """Get a task by UUID.
+
+        :param uuid: UUID of the task
+        :param detailed: whether to load subtasks and workloads
+        :param lazy_data: whether to replace raw iterations of workloads by
+            WorkloadRawData objects which load them chunk by chunk while
+            iterating
+        """
+        task = db.api.task_get(uuid, detailed=detailed,
+                               load_data=not lazy_data)
+        if detailed and lazy_data:
+            for subtask in task["subtasks"]:
+                for workload in subtask["workloads"]:
+                    workload["data"] = WorkloadRawData(workload["uuid"])
+        return cls(task)
 
     @staticmethod
     def get_status(uuid):
         return db.task_get_status(uuid)
 
     @staticmethod
-    def list(status=None, deployment=None, tags=None, uuids_only=False):
-        return [Task(db_task) for db_task in db.task_list(
-            status, env=deployment, tags=tags, uuids_only=False)]
+    def list(status=None, deployment=None, tags=None, uuids_only=False,
+             **kwargs):
+        """List tasks.
+
+        :param kwargs: pagination, ordering, date-range and projection
+            arguments of `db.task_list`
+        """
+        tasks = db.task_list(status, env=deployment, tags=tags,
+                             uuids_only=uuids_only, **kwargs)
+        env_names = {}
+        for task in tasks:
+            if task.get("env_uuid"):
+                if task["env_uuid"] not in env_names:
+                    env_names[task["env_uuid"]] = db.env_get(
+                        task["env_uuid"])["name"]
+                task["env_name"] = env_names[task["env_uuid"]]
+        return [Task(db_task) for db_task in tasks]
 
     @staticmethod
     def delete_by_uuid(uuid, status=None):
         db.task_delete(uuid, status=status)
 
+    @staticmethod
+    def set_trend_points(uuid, points):
+        """Store summaries of workloads of the task for trends."""
+        db.trend_points_set(uuid, points)
+
+    @staticmethod
+    def get_trend_points(uuids):
+        """Get stored summaries of workloads of the tasks by their uuids."""
+        return db.trend_points_get(uuids)
+
     def _update(self, values):
         if not self.is_temporary:
             self.task = db.task_update(self.task["uuid"], values)
@@ -373,9 +412,13 @@ class Task(object):
                       "validation_result": {
                           "etype": etype, "msg": msg, "trace": etraceback}})
 
-    def add_subtask(self, title, description=None, contexts=None):
+    def set_validation_duration(self, duration):
+        self._update({"validation_duration": duration})
+
+    def add_subtask(self, title, description=None, contexts=None,
+                    run_in_parallel=False):
         return Subtask(self.task["uuid"], title=title, description=description,
-                       contexts=contexts)
+                       contexts=contexts, run_in_parallel=run_in_parallel)
 
     def delete(self, status=None):
         db.task_delete(self.task["uuid"], status=status)
@@ -403,93 +446,91 @@ class Task(object):
 
     def result_has_valid_schema(self, result):
         """Check whatever result has valid schema or not."""
-        # NOTE(boris-42): We can't use here jsonschema, this method is called
-        #                 to check every iteration result schema. And this
-        #                 method works 200 times faster then jsonschema
-        #                 which totally makes sense.
-        _RESULT_SCHEMA = {
-            "fields": [("duration", float), ("timestamp", float),
-                       ("idle_duration", float), ("output", dict),
-                       ("atomic_actions", list), ("error", list)]
-        }
-        for key, proper_type in _RESULT_SCHEMA["fields"]:
-            if key not in result:
-                LOG.warning("'%s' is not result" % key)
-                return False
-            if not isinstance(result[key], proper_type):
-                LOG.warning(
-                    "Task %(uuid)s | result['%(key)s'] has wrong type "
-                    "'%(actual_type)s', should be '%(proper_type)s'"
-                    % {"uuid": self.task["uuid"],
-                       "key": key,
-                       "actual_type": type(result[key]),
+        message = check_result(result)
+        if message:
+            LOG.warning("Task %(uuid)s | %(message)s"
+                        % {"uuid": self.task["uuid"], "message": message})
+            return False
+        return True
+
+
+# NOTE(boris-42): We can't use here jsonschema, results of every iteration
+#                 are checked and a plain check works 200 times faster
+#                 than jsonschema which totally makes sense.
+_RESULT_FIELDS = (("duration", float), ("timestamp", float),
+                  ("idle_duration", float), ("output", dict),
+                  ("atomic_actions", list), ("error", list))
+_ATOMIC_ACTION_KEYS = ("name", "started_at", "finished_at", "children")
+_OUTPUT_KEYS = ("additive", "complete")
+
+
+def check_result(result):
+    """Check the schema of a raw result of an iteration.
+
+    The result is not modified or copied, nested atomic actions are walked
+    without recursion and output items are checked only if there are any.
+
+    :param result: a raw result of an iteration
+    :returns: a message describing the first found issue or None if the
+        result is valid
+    """
+    for key, proper_type in _RESULT_FIELDS:
+        if key not in result:
+            return "'%s' is not result" % key
+        if not isinstance(result[key], proper_type):
+            return ("result['%(key)s'] has wrong type '%(actual_type)s', "
+                    "should be '%(proper_type)s'"
+                    % {"key": key, "actual_type": type(result[key]),
                        "proper_type": proper_type.__name__})
-                return False
 
-        actions_list = copy.deepcopy(result["atomic_actions"])
-        for action in actions_list:
-            for key in ("name", "started_at", "finished_at", "children"):
+    pending = [result["atomic_actions"]]
+    while pending:
+        for action in pending.pop():
+            for key in _ATOMIC_ACTION_KEYS:
                 if key not in action:
-                    LOG.warning(
-                        "Task %(uuid)s | Atomic action %(action)s "
-                        "missing key '%(key)s'"
-                        % {"uuid": self.task["uuid"],
-                           "action": action,
-                           "key": key})
-                    return False
+                    return ("Atomic action %(action)s missing key '%(key)s'"
+                            % {"action": action, "key": key})
             for key in ("started_at", "finished_at"):
                 if not isinstance(action[key], float):
-                    LOG.warning(
-                        "Task %(uuid)s | Atomic action %(action)s has "
-                        "wrong type '%(type)s', should be 'float'"
-                        % {"uuid": self.task["uuid"],
-                           "action": action,
-                           "type": type(action[key])})
-                    return False
+                    return ("Atomic action %(action)s has wrong type "
+                            "'%(type)s', should be 'float'"
+                            % {"action": action, "type": type(action[key])})
             if action["children"]:
-                actions_list.extend(action["children"])
-
-        for e in result["error"]:
-            if not isinstance(e, str):
-                LOG.warning("error value has wrong type '%s', should be 'str'"
-                            % type(e))
-                return False
-
-        for key in ("additive", "complete"):
-            if key not in result["output"]:
-                LOG.warning("Task %(uuid)s | Output missing key '%(key)s'"
-                            % {"uuid": self.task["uuid"], "key": key})
-                return False
-
-            type_ = type(result["output"][key])
-            if type_ != list:
-                LOG.warning(
-                    "Task %(uuid)s | Value of result['output']['%(key)s'] "
-                    "has wrong type '%(type)s', must be 'list'"
-                    % {"uuid": self.task["uuid"],
-                       "key": key, "type": type_.__name__})
-                return False
-
-        for key in result["output"]:
-            for output_data in result["output"][key]:
+                pending.append(action["children"])
+
+    for e in result["error"]:
+        if not isinstance(e, str):
+            return "error value has wrong type '%s', should be 'str'" % type(e)
+
+    output = result["output"]
+    for key in _OUTPUT_KEYS:
+        if key not in output:
+            return "Output missing key '%s'" % key
+        if type(output[key]) != list:
+            return ("Value of result['output']['%(key)s'] has wrong type "
+                    "'%(type)s', must be 'list'"
+                    % {"key": key, "type": type(output[key]).__name__})
+
+    if output["additive"] or output["complete"] or len(output) > 2:
+        for key in output:
+            for output_data in output[key]:
                 message = charts.validate_output(key, output_data)
                 if message:
-                    LOG.warning("Task %(uuid)s | %(message)s"
-                                % {"uuid": self.task["uuid"],
-                                   "message": message})
-                    return False
+                    return message
 
-        return True
+    return None
 
 
 class Subtask(object):
     """Represents a subtask object."""
 
-    def __init__(self, task_uuid, title, description=None, contexts=None):
+    def __init__(self, task_uuid, title, description=None, contexts=None,
+                 run_in_parallel=False):
         self.subtask = db.subtask_create(task_uuid,
                                          title=title,
                                          description=description,
-                                         contexts=contexts)
+                                         contexts=contexts,
+                                         run_in_parallel=run_in_parallel)
 
     def __getitem__(self, key):
         return self.subtask[key]
@@ -501,7 +542,7 @@ class Subtask(object):
         self._update({"status": status})
 
     def add_workload(self, name, description, position, runner, runner_type,
-                     contexts, hooks, sla, args):
+                     contexts, hooks, sla, args, parameters=None):
         # store hooks config as it will look after adding results
         if hooks:
             hooks = [{"config": hook} for hook in hooks]
@@ -509,27 +550,53 @@ class Subtask(object):
                         subtask_uuid=self.subtask["uuid"], name=name,
                         description=description, position=position,
                         runner=runner, runner_type=runner_type, hooks=hooks,
-                        contexts=contexts, sla=sla, args=args)
+                        contexts=contexts, sla=sla, args=args,
+                        parameters=parameters)
+
+
+class WorkloadRawData(object):
+    """Raw iterations of a workload which are loaded chunk by chunk.
+
+    Every iteration over the object queries the database again. Iterations
+    are ordered by timestamp. Chunks are filled in order iterations finish,
+    so they can overlap in time and sorted chunks are merged.
+    """
+
+    def __init__(self, workload_uuid):
+        self.workload_uuid = workload_uuid
+
+    def _iter_chunk(self, chunk_order):
+        # the chunk is loaded on the first request of its iteration
+        yield from db.workload_data_get_chunk(self.workload_uuid,
+                                              chunk_order)
+
+    def __iter__(self):
+        return heapq.merge(
+            *[self._iter_chunk(chunk_order) for chunk_order
+              in db.workload_data_list_chunks(self.workload_uuid)],
+            key=lambda x: x["timestamp"])
 
 
 class Workload(object):
     """Represents a workload object."""
 
     def __init__(self, task_uuid, subtask_uuid, name, description, position,
-                 runner, runner_type, hooks, contexts, sla, args):
+                 runner, runner_type, hooks, contexts, sla, args,
+                 parameters=None):
         self.workload = db.workload_create(
             task_uuid=task_uuid, subtask_uuid=subtask_uuid, name=name,
             description=description, position=position, runner=runner,
             runner_type=runner_type, hooks=hooks, contexts=contexts, sla=sla,
-            args=args)
+            args=args, parameters=parameters)
 
     def __getitem__(self, key):
         return self.workload[key]
 
-    def add_workload_data(self, chunk_order, workload_data):
+    def add_workload_data(self, chunk_order, workload_data,
+                          chunk_format="json"):
         db.workload_data_create(self.workload["task_uuid"],
                                 self.workload["uuid"], chunk_order,
-                                workload_data)
+                                workload_data, chunk_format=chunk_format)
 
     def set_results(self, load_duration, full_duration, start_time,
                     sla_results, contexts_results, hooks_results=None):
@@ -543,6 +610,75 @@ class Workload(object):
                                 hooks_results=hooks_results,
                                 contexts_results=contexts_results)
 
+    @staticmethod
+    def list_for_compaction(created_before=None, tags=None, marker=None,
+                            limit=100):
+        return db.workload_list_for_compaction(
+            created_before=created_before, tags=tags, marker=marker,
+            limit=limit)
+
+    @staticmethod
+    def compact(workload_uuid, iterations_limit=1000, chunk_format="json"):
+        """Replace raw iterations of the workload by a compact representation.
+
+        The compact representation consists of a sample of iterations evenly
+        distributed over the load (tracebacks of errors are dropped) and
+        a sketch of the whole data that is stored in workload statistics.
+        The sketch is used by reports in addition to the sample.
+
+        Raw iterations are read chunk by chunk in two passes: the first one
+        builds the sketch, the second one picks the sample.
+
+        :param workload_uuid: UUID of the workload
+        :param iterations_limit: maximum number of iterations to keep
+        :param chunk_format: format to store the sample in (see
+            rally.common.db.chunks)
+        :returns: True if the workload has been compacted, False if it is
+            already compacted
+        """
+        workload = db.workload_get(workload_uuid)
+        raw_data = WorkloadRawData(workload_uuid)
+        # the load profile chart starts from the first iteration
+        workload["data"] = list(itertools.islice(raw_data, 1))
+
+        iterations_count = 0
+        errors = collections.Counter()
+        durations = []
+        load_profile = charts.LoadProfileChart(workload)
+        for itr in raw_data:
+            iterations_count += 1
+            if itr["error"]:
+                errors[itr["error"][0]] += 1
+            durations.append(itr["duration"])
+            load_profile.add_iteration(itr)
+        durations.sort()
+        quantiles = [
+            charts.utils.percentile(durations, q / 100.0, ignore_sorting=True)
+            for q in range(101)] if durations else []
+
+        step = max(1.0, iterations_count / float(iterations_limit))
+        indexes = set(int(i * step)
+                      for i in range(min(iterations_count, iterations_limit)))
+        sample = []
+        for i, itr in enumerate(raw_data):
+            if i not in indexes:
+                continue
+            if itr["error"]:
+                itr = dict(itr, error=itr["error"][:2] + [""])
+            sample.append(itr)
+
+        statistics = dict(workload["statistics"])
+        statistics["compacted"] = {
+            "iterations_count": iterations_count,
+            "stored_iterations_count": len(sample),
+            "errors": dict(errors),
+            "duration_quantiles": quantiles,
+            "load_profile": load_profile.render()
+        }
+        return db.workload_compact(workload_uuid, raw_data=sample,
+                                   statistics=statistics,
+                                   chunk_format=chunk_format)
+
     @classmethod
     def to_task(cls, workload):
         """Format a single workload as a full Task to launch.
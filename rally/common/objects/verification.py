@@ -20,6 +20,8 @@ from rally import consts
 class Verification(object):
     """Represents a verification object."""
     TIME_FORMAT = consts.TimeFormat.ISO8601
+    # number of results of tests to load from the database at once
+    RESULTS_BATCH_SIZE = 1000
 
     def __init__(self, verification):
         """Init a verification object.
@@ -34,20 +36,82 @@ class Verification(object):
         return self._db_entry[attr]
 
     def __getitem__(self, item):
+        if item == "tests":
+            return self.tests
         return self._db_entry[item]
 
+    @property
+    def tests(self):
+        """Results of all tests (they are loaded on the first access)."""
+        if "tests" not in self._db_entry:
+            self._db_entry["tests"] = self.get_tests()
+        return self._db_entry["tests"]
+
+    def get_tests(self, status=None, detailed=True):
+        """Get results of tests of the verification.
+
+        :param status: status (or list of statuses) of tests to filter by
+        :param detailed: whether to load the whole results or only names,
+            statuses and durations of tests
+        :returns: dict where keys are names of tests
+        """
+        results = db.verification_results_get([self.uuid], status=status,
+                                              detailed=detailed)
+        return dict((r["name"], r["result"]) for r in results)
+
+    def iter_tests(self):
+        """Iterate over results of tests in order they were run.
+
+        Results are loaded from the database by batches, unless all of them
+        are loaded already.
+        """
+        if "tests" in self._db_entry:
+            yield from sorted(
+                self._db_entry["tests"].values(),
+                key=lambda t: (t.get("timestamp") or "", t["name"]))
+            return
+        marker = None
+        while True:
+            results = db.verification_results_get(
+                [self.uuid], marker=marker, limit=self.RESULTS_BATCH_SIZE)
+            for r in results:
+                yield r["result"]
+            if len(results) < self.RESULTS_BATCH_SIZE:
+                break
+            marker = results[-1]["id"]
+
+    @staticmethod
+    def get_test_results(names, verification_uuids=None):
+        """Get results of the tests across many verifications.
+
+        :param names: names of tests
+        :param verification_uuids: uuids of verifications to look in (all
+            verifications by default)
+        :returns: dict where keys are uuids of verifications and values are
+            dicts with results of tests
+        """
+        results = {}
+        for r in db.verification_results_get(verification_uuids,
+                                             names=names):
+            results.setdefault(r["verification_uuid"], {})[r["name"]] = (
+                r["result"])
+        return results
+
     def to_dict(self, item=None):
         data = {}
         formatters = ["created_at", "updated_at"]
         fields = ["deployment_uuid", "env_uuid", "verifier_uuid", "uuid", "id",
-                  "unexpected_success", "status", "tests", "skipped",
+                  "unexpected_success", "status", "skipped",
                   "tags", "tests_duration", "run_args", "success",
                   "expected_failures", "tests_count", "failures"]
         for field in fields:
             data[field] = self._db_entry.get(field, "")
+        if "tests" in self._db_entry:
+            data["tests"] = self._db_entry["tests"]
         for field in formatters:
-            data[field] = self._db_entry.get(field, "").strftime(
-                self.TIME_FORMAT)
+            if field in self._db_entry:
+                data[field] = self._db_entry[field].strftime(
+                    self.TIME_FORMAT)
         return data
 
     @classmethod
@@ -61,9 +125,9 @@ class Verification(object):
 
     @classmethod
     def list(cls, verifier_id=None, deployment_id=None, tags=None,
-             status=None):
+             status=None, **kwargs):
         verification_list = db.verification_list(verifier_id, deployment_id,
-                                                 tags, status)
+                                                 tags, status, **kwargs)
         return [cls(db_entry) for db_entry in verification_list]
 
     def delete(self):
@@ -82,6 +146,7 @@ class Verification(object):
         else:
             status = consts.VerificationStatus.FAILED
         self._update(status=status, tests=tests, **totals)
+        self._db_entry["tests"] = tests
 
     def set_error(self, error_message):
         # TODO(andreykurilin): Save error message in the database.
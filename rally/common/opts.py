@@ -15,8 +15,13 @@
 import importlib
 
 from rally.common import cfg
+from rally.common.db import schema
 from rally.common import logging
+from rally.common.plugin import manifest
 from rally.task import engine
+from rally.task import live_metrics
+from rally.task.processing import report_cache
+from rally.task import template
 
 CONF = cfg.CONF
 
@@ -26,6 +31,11 @@ def list_opts():
     merged_opts = {"DEFAULT": []}
     merged_opts["DEFAULT"].extend(logging.DEBUG_OPTS)
     merged_opts["DEFAULT"].extend(engine.TASK_ENGINE_OPTS)
+    merged_opts["DEFAULT"].extend(report_cache.REPORT_CACHE_OPTS)
+    merged_opts["DEFAULT"].extend(live_metrics.LIVE_METRICS_OPTS)
+    merged_opts["DEFAULT"].extend(manifest.PLUGINS_MANIFEST_OPTS)
+    merged_opts["DEFAULT"].extend(schema.DB_REVISION_OPTS)
+    merged_opts["DEFAULT"].extend(template.TEMPLATE_CACHE_OPTS)
 
     return merged_opts.items()
 
@@ -15,22 +15,38 @@
 
 import importlib
 import os
-import pkg_resources
 import pkgutil
+import re
 import sys
 
+try:
+    from importlib import metadata as importlib_metadata
+except ImportError:
+    # Python < 3.8
+    import importlib_metadata
+
 import rally
 from rally.common import logging
 
 LOG = logging.getLogger(__name__)
 
+ENTRY_POINT_GROUP = "rally_plugins"
+
 
-def itersubclasses(cls, seen=None):
+def itersubclasses(cls, seen=None, load_lazy_modules=True):
     """Generator over all subclasses of a given class in depth first order.
 
     NOTE: Use 'seen' to exclude cls which was reduplicated found, because
     cls maybe has multiple super classes of the same plugin.
+
+    Subclasses can be defined in modules which are imported lazily (see
+    rally.common.plugin.manifest), so such modules are imported first,
+    unless load_lazy_modules is False.
     """
+    if seen is None and load_lazy_modules:
+        from rally.common.plugin import plugin
+
+        plugin.load_lazy_modules()
 
     seen = seen or set()
     try:
@@ -62,34 +78,83 @@ def import_modules_from_package(package):
                 sys.modules[module_name] = importlib.import_module(module_name)
 
 
-def find_packages_by_entry_point():
-    """Find all packages with rally_plugins entry-point"""
-    loaded_packages = []
+def _parse_entry_point(ep):
+    """Return module and attributes of an entry point."""
+    # NOTE: `module` and `attr` properties appeared only in Python 3.9
+    module, _sep, attr = ep.value.partition(":")
+    attr = re.sub(r"\[.*\]", "", attr).strip()
+    return module.strip(), tuple(attr.split(".")) if attr else tuple()
+
 
-    for package in pkg_resources.working_set:
-        entry_map = package.get_entry_map("rally_plugins")
-        if not entry_map:
-            # this package doesn't have rally_plugins entry-point
+def _iter_distributions():
+    """Iterate over installed distributions in the order of sys.path."""
+    seen = set()
+    for dist in importlib_metadata.distributions():
+        name = dist.metadata["Name"]
+        if not name:
             continue
+        key = re.sub(r"[-_.]+", "-", name).lower()
+        if key in seen:
+            # the same distribution in the next directory of sys.path is
+            #   shadowed by the first one
+            continue
+        seen.add(key)
+        yield dist
+
+
+def get_package_name(dist):
+    """Return a name of distribution in the same form as pkg_resources."""
+    return re.sub(r"[^A-Za-z0-9.]+", "-", dist.metadata["Name"])
 
+
+def find_entry_points():
+    """Find rally_plugins entry-points of installed distributions.
+
+    :returns: a list of pairs of distributions and dicts with entry-points
+        of the distribution by names
+    """
+    result = []
+    for dist in _iter_distributions():
+        entry_map = dict((ep.name, ep) for ep in dist.entry_points
+                         if ep.group == ENTRY_POINT_GROUP)
+        if entry_map:
+            result.append((dist, entry_map))
+    return result
+
+
+_found_packages = None
+
+
+def find_packages_by_entry_point():
+    """Find all packages with rally_plugins entry-point
+
+    Installed distributions are scanned once per process.
+    """
+    global _found_packages
+
+    if _found_packages is not None:
+        return [dict(p) for p in _found_packages]
+
+    loaded_packages = []
+    for package, entry_map in find_entry_points():
         package_info = {}
 
         if "path" in entry_map:
-            ep = entry_map["path"]
-            package_info["plugins_path"] = ep.module_name
+            package_info["plugins_path"] = _parse_entry_point(
+                entry_map["path"])[0]
         if "options" in entry_map:
-            ep = entry_map["options"]
+            module, attrs = _parse_entry_point(entry_map["options"])
             package_info["options"] = "%s:%s" % (
-                ep.module_name,
-                ep.attrs[0] if ep.attrs else "list_opts",
-            )
+                module, attrs[0] if attrs else "list_opts")
 
         if package_info:
             package_info.update(
-                name=package.project_name,
+                name=get_package_name(package),
                 version=package.version)
             loaded_packages.append(package_info)
-    return loaded_packages
+
+    _found_packages = loaded_packages
+    return [dict(p) for p in _found_packages]
 
 
 def import_modules_by_entry_point(_packages=None):
@@ -98,10 +163,9 @@ def import_modules_by_entry_point(_packages=None):
 
     for package in loaded_packages:
         if "plugins_path" in package:
-            em = pkg_resources.get_entry_map(package["name"])
-            ep = em["rally_plugins"]["path"]
+            module_name = package["plugins_path"]
             try:
-                m = ep.load()
+                m = importlib.import_module(module_name)
                 if hasattr(m, "__path__"):
                     path = pkgutil.extend_path(m.__path__, m.__name__)
                 else:
@@ -113,7 +177,7 @@ def import_modules_by_entry_point(_packages=None):
             except Exception as e:
                 msg = ("\t Failed to load plugins from module '%(module)s' "
                        "(package: '%(package)s')" %
-                       {"module": ep.module_name,
+                       {"module": module_name,
                         "package": "%s %s" % (package["name"],
                                               package["version"])})
                 if logging.is_debug():
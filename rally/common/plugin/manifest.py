@@ -0,0 +1,243 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Manifest of plugins for loading them lazily.
+
+Importing all modules with plugins and looking for plugins of installed
+packages takes a while, even if a command does not need any plugin at all.
+The manifest records names, bases, platforms and modules of plugins, so
+modules can be imported only when their plugins are requested. Other modules
+under the same roots (i.e. implementations of services or exceptions which
+are found by walking subclasses) are recorded as well and are imported
+before any such walk (see `rally.common.plugin.discover.itersubclasses`).
+
+The manifest is valid while none of the recorded files and directories
+(including directories of sys.path where packages are installed) is
+modified and the version of Rally is the same.
+"""
+
+import importlib
+import json
+import os
+import sys
+import threading
+
+from rally.common import cfg
+from rally.common import logging
+from rally.common.plugin import plugin
+from rally.common import version
+
+
+LOG = logging.getLogger(__name__)
+
+PLUGINS_MANIFEST_OPTS = [
+    cfg.StrOpt("plugins_manifest",
+               default="~/.rally/cache/plugins_manifest.json",
+               help="Path to the manifest of plugins. Plugins are imported "
+                    "by CLI commands only when they are requested, using "
+                    "the manifest which is rebuilt automatically once "
+                    "plugins or installed packages are changed. Empty value"
+                    " means that all plugins are imported at once."),
+]
+
+# Revisions:
+#    1 - initial version
+#    2 - all loaded modules under roots are recorded
+FORMAT_VERSION = 2
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _collect_mtimes(roots):
+    """Collect mtimes of roots and directories and .py files under them."""
+    mtimes = {}
+    for path in roots:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs[:] = [d for d in dirs if d != "__pycache__"]
+                mtimes[root] = _mtime(root)
+                for name in files:
+                    if name.endswith(".py"):
+                        file_path = os.path.join(root, name)
+                        mtimes[file_path] = _mtime(file_path)
+        else:
+            mtimes[path] = _mtime(path)
+    return mtimes
+
+
+def _sys_path_mtimes():
+    # packages are (un)installed into directories of sys.path, which changes
+    #   their mtimes. The first item is a directory of the running script (or
+    #   the current directory) which does not matter
+    return dict((path, _mtime(path)) for path in sys.path[1:]
+                if path and os.path.isdir(path))
+
+
+def _is_under(path, roots):
+    return any(path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+               for root in roots)
+
+
+def _base_name(base):
+    return "%s.%s" % (base.__module__, base.__name__)
+
+
+def build(roots, packages):
+    """Make a manifest of loaded plugins defined in modules under roots.
+
+    :param roots: files and directories with modules which can be imported
+        lazily. Plugins from other modules (i.e. plugins loaded from
+        directories by path) are not recorded
+    :param packages: packages with plugins found by entry points
+    """
+    roots = [os.path.abspath(r) for r in roots]
+    plugins = []
+    for p in plugin.Plugin.get_all(allow_hidden=True):
+        module = sys.modules.get(p.__module__)
+        module_file = getattr(module, "__file__", None)
+        if not module_file or not _is_under(os.path.abspath(module_file),
+                                            roots):
+            continue
+        plugins.append({"name": p.get_name(),
+                        "base": _base_name(p._get_base()),
+                        "platform": p.get_platform(),
+                        "module": p.__module__})
+    plugins.sort(key=lambda p: (p["module"], p["name"]))
+
+    modules = []
+    for name, module in list(sys.modules.items()):
+        module_file = getattr(module, "__file__", None)
+        if (name != "__main__" and module_file
+                and _is_under(os.path.abspath(module_file), roots)):
+            modules.append(name)
+
+    return {"format_version": FORMAT_VERSION,
+            "rally_version": version.version_string(),
+            "sys_path": _sys_path_mtimes(),
+            "mtimes": _collect_mtimes(roots),
+            "packages": packages,
+            "plugins": plugins,
+            "modules": sorted(modules)}
+
+
+def is_valid(manifest):
+    """Check that the manifest matches the current installation."""
+    if (manifest.get("format_version") != FORMAT_VERSION
+            or manifest.get("rally_version") != version.version_string()
+            or manifest.get("sys_path") != _sys_path_mtimes()):
+        return False
+    for path, mtime in manifest.get("mtimes", {}).items():
+        if _mtime(path) != mtime:
+            return False
+    return True
+
+
+def load(path):
+    """Read a valid manifest from the file or return None."""
+    try:
+        with open(os.path.expanduser(path)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or not is_valid(manifest):
+        LOG.debug("The manifest of plugins %s is outdated." % path)
+        return None
+    return manifest
+
+
+def save(path, manifest):
+    path = os.path.expanduser(path)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = "%s.%s.tmp" % (path, os.getpid())
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        LOG.debug("Failed to save the manifest of plugins to %s: %s"
+                  % (path, e))
+
+
+class LazyLoader(object):
+    """Imports modules of plugins from the manifest on demand.
+
+    An instance is installed by plugin.set_lazy_loader and is called before
+    each lookup of plugins. Modules with plugins of the requested name (or
+    of the requested base, if the name is unknown) are imported once. All
+    recorded modules are imported by `load_all` before walking subclasses.
+    """
+
+    def __init__(self, manifest):
+        self._lock = threading.RLock()
+        self._by_name = {}
+        self._by_base = {}
+        for p in manifest["plugins"]:
+            for index, key in ((self._by_name, p["name"]),
+                               (self._by_base, p["base"])):
+                modules = index.setdefault(key, [])
+                if p["module"] not in modules:
+                    modules.append(p["module"])
+        self._modules = manifest["modules"]
+        self._imported = set()
+
+    def _import(self, modules):
+        for module in modules:
+            if module in self._imported:
+                continue
+            self._imported.add(module)
+            try:
+                importlib.import_module(module)
+            except Exception as e:
+                msg = "\t Failed to load plugins from module '%s'" % module
+                if logging.is_debug():
+                    LOG.exception(msg)
+                else:
+                    LOG.warning("%s: %s" % (msg, e))
+
+    def __call__(self, cls, name=None):
+        """Import modules which can define requested plugins.
+
+        :param cls: a class which plugins are requested of
+        :param name: a name of requested plugins. If None, all plugins of
+            the base of the class are requested
+        """
+        with self._lock:
+            if name is not None:
+                modules = self._by_name.pop(name, [])
+            else:
+                base = cls._get_base()
+                if base is plugin.Plugin:
+                    modules = [m for ms in self._by_base.values()
+                               for m in ms]
+                    self._by_base.clear()
+                else:
+                    modules = self._by_base.pop(_base_name(base), [])
+            self._import(modules)
+            if not self._by_base:
+                self.load_all()
+
+    def load_all(self):
+        """Import all recorded modules."""
+        with self._lock:
+            self._import([m for ms in self._by_base.values() for m in ms])
+            self._import(self._modules)
+            self._by_base.clear()
+            self._by_name.clear()
+            # everything is imported
+            plugin.set_lazy_loader(None)
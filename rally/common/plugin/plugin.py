@@ -13,7 +13,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import sys
+import weakref
 
 from rally.common.plugin import discover
 from rally.common.plugin import info
@@ -21,6 +23,60 @@ from rally.common.plugin import meta
 from rally import exceptions
 
 
+# NOTE: An index of configured plugins for fast lookups by name:
+#   {name: {(base, platform): weakref to plugin}}. Only weak references
+#   are kept, so plugin classes can be garbage collected as before (e.g.
+#   plugins defined in tests) and their entries are dropped then. Entries are
+#   re-checked on lookup, so plugins which were loaded dynamically, reloaded
+#   or cleared directly do not need any other invalidation.
+_REGISTRY = {}
+
+
+# NOTE: A callable which imports modules of requested plugins, if plugins
+#   are loaded lazily (see rally.common.plugin.manifest). It is called with
+#   the class which plugins are requested of and the name of plugins (None
+#   for all plugins of the class).
+_lazy_loader = None
+
+
+def set_lazy_loader(loader):
+    global _lazy_loader
+    _lazy_loader = loader
+
+
+def load_lazy_modules():
+    """Import all modules which are to be imported lazily, if any."""
+    if _lazy_loader is not None:
+        _lazy_loader.load_all()
+
+
+def _registry_add(plugin):
+    name = plugin.get_name()
+    key = (plugin._get_base(), plugin.get_platform())
+
+    def forget(ref):
+        entries = _REGISTRY.get(name)
+        if entries is not None and entries.get(key) is ref:
+            del entries[key]
+            if not entries:
+                del _REGISTRY[name]
+
+    entries = _REGISTRY.setdefault(name, collections.OrderedDict())
+    entries[key] = weakref.ref(plugin, forget)
+
+
+def _registry_remove(plugin):
+    if not plugin._meta_is_inited(raise_exc=False):
+        return
+    name = plugin.get_name()
+    entries = _REGISTRY.get(name, {})
+    key = (plugin._get_base(), plugin.get_platform())
+    if key in entries and entries[key]() is plugin:
+        del entries[key]
+        if not entries:
+            del _REGISTRY[name]
+
+
 def base():
     """Mark Plugin as a base.
 
@@ -88,6 +144,7 @@ def configure(name, platform="default", hidden=False):
                 new_path=sys.modules[plugin.__module__].__file__
             )
         plugin._meta_set("hidden", hidden)
+        _registry_add(plugin)
         return plugin
 
     return decorator
@@ -131,6 +188,7 @@ class Plugin(meta.MetaMixin, info.InfoMixin):
     @classmethod
     def unregister(cls):
         """Removes all plugin meta information and makes it undiscoverable."""
+        _registry_remove(cls)
         cls._meta_clear()
 
     @classmethod
@@ -180,9 +238,17 @@ class Plugin(meta.MetaMixin, info.InfoMixin):
         :param name: return only plugins with specified name.
         :param allow_hidden: if False return only non hidden plugins
         """
+        if _lazy_loader is not None:
+            _lazy_loader(cls, name or None)
+
+        if name:
+            return cls._get_all_by_name(name, platform=platform,
+                                        allow_hidden=allow_hidden)
+
         plugins = []
 
-        for p in discover.itersubclasses(cls):
+        # modules of the base are imported by the lazy loader already
+        for p in discover.itersubclasses(cls, load_lazy_modules=False):
             if not issubclass(p, Plugin):
                 continue
             if not p._meta_is_inited(raise_exc=False):
@@ -197,6 +263,28 @@ class Plugin(meta.MetaMixin, info.InfoMixin):
 
         return plugins
 
+    @classmethod
+    def _get_all_by_name(cls, name, platform=None, allow_hidden=False):
+        # the same as get_all(), but only configured plugins with the name
+        #   are checked instead of the whole tree of subclasses
+        plugins = []
+
+        for ref in list(_REGISTRY.get(name, {}).values()):
+            p = ref()
+            if p is None or p is cls or not issubclass(p, cls):
+                continue
+            if not p._meta_is_inited(raise_exc=False):
+                continue
+            if name != p.get_name():
+                continue
+            if platform and platform != p.get_platform():
+                continue
+            if not allow_hidden and p.is_hidden():
+                continue
+            plugins.append(p)
+
+        return plugins
+
     @classmethod
     def get_name(cls):
         """Return plugin's name."""
@@ -35,14 +35,7 @@ def database_revision():
 
 def plugins_versions():
     """Show packages version"""
-    import pkg_resources
+    from rally.common.plugin import discover
 
-    packages = {}
-    for package in pkg_resources.working_set:
-        entry_map = package.get_entry_map("rally_plugins")
-        if not entry_map:
-            # this package doesn't have rally_plugins entry-point
-            continue
-        packages[package.project_name] = package.version
-
-    return packages
+    return dict((discover.get_package_name(package), package.version)
+                for package, _entry_map in discover.find_entry_points())
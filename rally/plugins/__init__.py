@@ -14,16 +14,64 @@
 #    under the License.
 
 import os
+import sys
 
 import decorator
 
+import rally
+from rally.common import cfg
 from rally.common.plugin import discover
+from rally.common.plugin import manifest
+from rally.common.plugin import plugin
 
 
 PLUGINS_LOADED = False
 
 
-def load():
+def _import_plugins(opts, packages=None):
+    # NOTE(andreykurilin): `rally.plugins.common` includes deprecated
+    #   modules. As soon as they will be removed the direct import of
+    #   validators should be replaced by
+    #
+    #       discover.import_modules_from_package("rally.plugins.common")
+    from rally.plugins.common import validators  # noqa: F401
+
+    discover.import_modules_from_package("rally.plugins.task")
+    discover.import_modules_from_package("rally.plugins.verification")
+
+    if packages is None:
+        packages = discover.find_packages_by_entry_point()
+    for package in packages:
+        if "options" in package:
+            opts.register_options_from_path(package["options"])
+    discover.import_modules_by_entry_point(_packages=packages)
+    return packages
+
+
+def _plugin_roots(packages):
+    """Files and directories of modules with plugins to import lazily."""
+    roots = [os.path.dirname(rally.__file__)]
+    for package in packages:
+        module = sys.modules.get(package.get("plugins_path"))
+        if module is None:
+            continue
+        if hasattr(module, "__path__"):
+            roots.extend(module.__path__)
+        else:
+            roots.append(module.__file__)
+    return roots
+
+
+def load(use_manifest=False):
+    """Load all plugins.
+
+    :param use_manifest: whether to import modules of plugins lazily using
+        the manifest of plugins (see `plugins_manifest` option). The manifest
+        is (re)built by importing all plugins, if it is missing or outdated.
+        Otherwise, all plugins are imported, but packages with plugins are
+        taken from the valid manifest instead of scanning installed
+        distributions
+    """
     global PLUGINS_LOADED
 
     if not PLUGINS_LOADED:
@@ -31,22 +79,24 @@ def load():
 
         opts.register()
 
-        # NOTE(andreykurilin): `rally.plugins.common` includes deprecated
-        #   modules. As soon as they will be removed the direct import of
-        #   validators should be replaced by
-        #
-        #       discover.import_modules_from_package("rally.plugins.common")
-        from rally.plugins.common import validators  # noqa: F401
-
-        discover.import_modules_from_package("rally.plugins.task")
-        discover.import_modules_from_package("rally.plugins.verification")
-
-        packages = discover.find_packages_by_entry_point()
-        for package in packages:
-            if "options" in package:
-                opts.register_options_from_path(package["options"])
-        discover.import_modules_by_entry_point(_packages=packages)
-
+        manifest_path = cfg.CONF.plugins_manifest
+        plugins_manifest = None
+        if manifest_path:
+            plugins_manifest = manifest.load(manifest_path)
+
+        if use_manifest and plugins_manifest:
+            for package in plugins_manifest["packages"]:
+                if "options" in package:
+                    opts.register_options_from_path(package["options"])
+            plugin.set_lazy_loader(manifest.LazyLoader(plugins_manifest))
+        else:
+            packages = _import_plugins(
+                opts, plugins_manifest and plugins_manifest["packages"])
+            if use_manifest and manifest_path:
+                manifest.save(manifest_path, manifest.build(
+                    _plugin_roots(packages), packages))
+
+        # plugins from directories are not recorded in the manifest
         discover.load_plugins("/opt/rally/plugins/")
         discover.load_plugins(os.path.expanduser("~/.rally/plugins/"))
 
@@ -55,5 +105,5 @@ def load():
 
 @decorator.decorator
 def ensure_plugins_are_loaded(f, *args, **kwargs):
-    load()
+    load(use_manifest=True)
     return f(*args, **kwargs)
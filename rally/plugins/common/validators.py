@@ -14,6 +14,7 @@
 
 import inspect
 import os
+import weakref
 
 import jsonschema
 
@@ -27,10 +28,25 @@ LOG = logging.getLogger(__name__)
 class JsonSchemaValidator(validation.Validator):
     """JSON schema validator"""
 
+    # compiled validators of schemas by plugin classes. A schema is checked
+    #   and compiled only once, while a plugin can be validated many times
+    _validators = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def _get_validator(cls, plugin_cls):
+        schema = plugin_cls.CONFIG_SCHEMA
+        cached = cls._validators.get(plugin_cls)
+        if cached is None or cached[0] is not schema:
+            validator_cls = jsonschema.validators.validator_for(schema)
+            validator_cls.check_schema(schema)
+            cached = (schema, validator_cls(schema))
+            cls._validators[plugin_cls] = cached
+        return cached[1]
+
     def validate(self, context, config, plugin_cls, plugin_cfg):
-        try:
-            jsonschema.validate(plugin_cfg, plugin_cls.CONFIG_SCHEMA)
-        except jsonschema.ValidationError as err:
+        errors = self._get_validator(plugin_cls).iter_errors(plugin_cfg)
+        err = jsonschema.exceptions.best_match(errors)
+        if err is not None:
             self.fail(str(err))
 
 
@@ -12,9 +12,13 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from concurrent import futures
 import copy
+import threading
+import time
 
 import requests
+from requests import adapters
 
 from rally.common import logging
 from rally import exceptions
@@ -27,10 +31,24 @@ class ElasticSearchClient(object):
 
     # a number of documents to push to the cluster at once.
     CHUNK_LENGTH = 10000
+    # a number of chunks which are pushed in parallel
+    WORKERS = 4
+    # a number of attempts to push a single chunk
+    RETRIES = 3
+    # the delay before the first retry. it is doubled for every next one
+    RETRY_DELAY = 1
+    # the cluster is overloaded or temporary unavailable, it makes sense to
+    #   repeat the request a bit later
+    RETRY_STATUSES = (429, 502, 503, 504)
+    # a number of seconds to wait for the cluster to respond on a chunk
+    TIMEOUT = 60
 
     def __init__(self, url):
         self._url = url.rstrip("/") if url else "http://localhost:9200"
         self._version = None
+        # sessions are not thread-safe, so each worker has its own one
+        self._local = threading.local()
+        self._sessions = []
 
     @staticmethod
     def _check_response(resp, action=None):
@@ -83,28 +101,125 @@ class ElasticSearchClient(object):
                 "build_timestamp")
         return data
 
+    def _get_session(self):
+        """Get the session of the current thread."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            # keep the connection of the worker alive between chunks
+            adapter = adapters.HTTPAdapter(pool_connections=1,
+                                           pool_maxsize=1)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._local.session = session
+            self._sessions.append(session)
+        return session
+
+    def _close_sessions(self):
+        while self._sessions:
+            self._sessions.pop().close()
+        self._local = threading.local()
+
+    def _make_chunks(self, documents):
+        chunk = []
+        for line in documents:
+            chunk.append(line)
+            if len(chunk) == self.CHUNK_LENGTH:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _push_chunk(self, chunk):
+        """Push a single chunk of documents, retrying on temporary errors.
+
+        :returns: a number of pushed documents and a size of the chunk
+        """
+        data = ("\n".join(chunk) + "\n").encode("utf-8")
+        session = self._get_session()
+        for attempt in range(1, self.RETRIES + 1):
+            try:
+                resp = session.post(
+                    self._url + "/_bulk", data=data,
+                    headers={"Content-Type": "application/x-ndjson"},
+                    timeout=self.TIMEOUT)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.RETRIES:
+                    raise exceptions.RallyException(
+                        "Failed to push documents to ElasticSearch cluster: "
+                        "%s" % e)
+                reason = str(e)
+            else:
+                if (resp.status_code not in self.RETRY_STATUSES
+                        or attempt == self.RETRIES):
+                    self._check_response(resp, action="push documents to")
+                    return len(resp.json()["items"]), len(data)
+                reason = "HTTP %s" % resp.status_code
+            delay = self.RETRY_DELAY * 2 ** (attempt - 1)
+            LOG.debug("Failed to push documents to ElasticSearch (%s). "
+                      "Retrying in %s seconds." % (reason, delay))
+            time.sleep(delay)
+
     def push_documents(self, documents):
         """Push documents to the ElasticSearch cluster using bulk API.
 
-        :param documents: a list of documents to push
+        Documents are consumed lazily and pushed by chunks from a pool of
+        `WORKERS` threads. Not more than 2 * `WORKERS` chunks are kept in
+        memory at once, so the producer of documents waits while the cluster
+        is busy.
+
+        :param documents: an iterable of lines to push (an action and the
+            document itself for every document)
+        :returns: a dict with a number of pushed documents, a size of pushed
+            data in bytes and a duration of pushing in seconds
         """
-        LOG.debug("Pushing %s documents by chunks (up to %s documents at once)"
+        LOG.debug("Pushing documents by chunks (up to %s documents at once)"
                   " to ElasticSearch." %
                   # dividing numbers by two, since each documents has 2 lines
                   #     in `documents` (action and document itself).
-                  (len(documents) / 2, self.CHUNK_LENGTH / 2))
+                  (self.CHUNK_LENGTH / 2))
 
-        for pos in range(0, len(documents), self.CHUNK_LENGTH):
-            data = "\n".join(documents[pos:pos + self.CHUNK_LENGTH]) + "\n"
+        stats = {"documents": 0, "bytes": 0}
 
-            raw_resp = requests.post(
-                self._url + "/_bulk", data=data,
-                headers={"Content-Type": "application/x-ndjson"}
-            )
-            self._check_response(raw_resp, action="push documents to")
+        def collect(done):
+            for future in done:
+                count, size = future.result()
+                stats["documents"] += count
+                stats["bytes"] += size
+                LOG.debug("Successfully pushed %s documents." % count)
+
+        started_at = time.time()
+        pending = set()
+        try:
+            with futures.ThreadPoolExecutor(
+                    max_workers=self.WORKERS) as executor:
+                try:
+                    for chunk in self._make_chunks(documents):
+                        if len(pending) >= 2 * self.WORKERS:
+                            done, pending = futures.wait(
+                                pending, return_when=futures.FIRST_COMPLETED)
+                            collect(done)
+                        pending.add(executor.submit(self._push_chunk, chunk))
+                    done, pending = futures.wait(pending)
+                    collect(done)
+                except Exception:
+                    for future in pending:
+                        future.cancel()
+                    raise
+        finally:
+            # workers are stopped already
+            self._close_sessions()
+        stats["duration"] = time.time() - started_at
 
-            LOG.debug("Successfully pushed %s documents." %
-                      len(raw_resp.json()["items"]))
+        LOG.info("Pushed %(documents)s documents (%(size).1f MiB) to "
+                 "ElasticSearch in %(duration).2f seconds: %(rate).0f "
+                 "documents/s." % {
+                     "documents": stats["documents"],
+                     "size": stats["bytes"] / 1024.0 / 1024.0,
+                     "duration": stats["duration"],
+                     "rate": (stats["documents"] / stats["duration"]
+                              if stats["duration"] else 0)})
+        return stats
 
     def list_indices(self):
         """List all indices."""
@@ -85,6 +85,8 @@ class ElasticSearchExporter(exporter.TaskExporter):
     will be used.
     """
 
+    STREAMING = True
+
     TASK_INDEX = "rally_task_data_v1"
     WORKLOAD_INDEX = "rally_workload_data_v1"
     AA_INDEX = "rally_atomic_action_data_v1"
@@ -139,7 +141,6 @@ class ElasticSearchExporter(exporter.TaskExporter):
         super(ElasticSearchExporter, self).__init__(tasks_results,
                                                     output_destination,
                                                     api=api)
-        self._report = []
         self._remote = (
             output_destination is None or (
                 output_destination.startswith("http://")
@@ -147,7 +148,8 @@ class ElasticSearchExporter(exporter.TaskExporter):
         if self._remote:
             self._client = client.ElasticSearchClient(self.output_destination)
 
-    def _add_index(self, index, body, doc_id=None, doc_type="data"):
+    @staticmethod
+    def _make_index(index, body, doc_id=None, doc_type="data"):
         """Create a document for the specified index with specified id.
 
         :param index: The name of the index
@@ -155,17 +157,17 @@ class ElasticSearchExporter(exporter.TaskExporter):
             scenario, iteration and atomic action)
         :param doc_id: Document ID. Here we use task/subtask/workload uuid
         :param doc_type: The type of document
-
+        :returns: two lines for bulk API - the action and the document
         """
-        self._report.append(
+        return (
             json.dumps(
                 # use OrderedDict to make the report more unified
                 {"index": collections.OrderedDict([
                     ("_index", index),
                     ("_type", doc_type),
                     ("_id", doc_id)])},
-                sort_keys=False))
-        self._report.append(json.dumps(body))
+                sort_keys=False),
+            json.dumps(body))
 
     def _ensure_indices(self):
         """Check available indices and create require ones if they missed."""
@@ -204,7 +206,7 @@ class ElasticSearchExporter(exporter.TaskExporter):
     def _process_atomic_actions(self, itr, workload, workload_id,
                                 atomic_actions=None, _parent=None, _depth=0,
                                 _cache=None):
-        """Process atomic actions of an iteration
+        """Generate documents for atomic actions of an iteration
 
         :param atomic_actions: A list with an atomic actions
         :param itr: The iteration data
@@ -250,10 +252,10 @@ class ElasticSearchExporter(exporter.TaskExporter):
                 error=(itr["error"] if action.get("failed", False) else None)
             )
 
-            self._add_index(self.AA_INDEX, action_report,
-                            doc_id=act_id)
+            yield from self._make_index(self.AA_INDEX, action_report,
+                                        doc_id=act_id)
 
-            self._process_atomic_actions(
+            yield from self._process_atomic_actions(
                 atomic_actions=action["children"],
                 itr=itr,
                 workload=workload,
@@ -292,20 +294,12 @@ class ElasticSearchExporter(exporter.TaskExporter):
                 parent=_parent,
                 error=itr["error"]
             )
-            self._add_index(self.AA_INDEX, action_report, doc_id=act_id)
-
-    def generate(self):
-        if self._remote:
-            self._ensure_indices()
+            yield from self._make_index(self.AA_INDEX, action_report,
+                                        doc_id=act_id)
 
+    def _generate_documents(self):
+        """Generate lines for bulk API one by one."""
         for task in self.tasks_results:
-            if self._remote:
-                if self._client.check_document(self.TASK_INDEX, task["uuid"]):
-                    raise exceptions.RallyException(
-                        "Failed to push the task %s to the ElasticSearch "
-                        "cluster. The document with such UUID already exists" %
-                        task["uuid"])
-
             task_report = {
                 "task_uuid": task["uuid"],
                 "deployment_uuid": task["env_uuid"],
@@ -316,8 +310,8 @@ class ElasticSearchExporter(exporter.TaskExporter):
                 "pass_sla": task["pass_sla"],
                 "tags": task["tags"]
             }
-            self._add_index(self.TASK_INDEX, task_report,
-                            doc_id=task["uuid"])
+            yield from self._make_index(self.TASK_INDEX, task_report,
+                                        doc_id=task["uuid"])
 
             # NOTE(andreykurilin): The subtasks do not have much logic now, so
             #   there is no reason to save the info about them.
@@ -357,8 +351,9 @@ class ElasticSearchExporter(exporter.TaskExporter):
                                     if not s["success"]]}
 
                 # do we need to store hooks ?!
-                self._add_index(self.WORKLOAD_INDEX, workload_report,
-                                doc_id=workload["uuid"])
+                yield from self._make_index(self.WORKLOAD_INDEX,
+                                            workload_report,
+                                            doc_id=workload["uuid"])
 
                 # Iterations
                 for idx, itr in enumerate(workload.get("data", []), 1):
@@ -366,21 +361,41 @@ class ElasticSearchExporter(exporter.TaskExporter):
                         "uuid": workload["uuid"],
                         "num": str(idx)}
 
-                    self._process_atomic_actions(
+                    yield from self._process_atomic_actions(
                         itr=itr,
                         workload=workload_report,
                         workload_id=workload["uuid"])
+
+    def generate(self):
         if self._remote:
+            self._ensure_indices()
+
+            # check all tasks before pushing anything, since documents are
+            #   pushed while they are generated
+            for task in self.tasks_results:
+                if self._client.check_document(self.TASK_INDEX, task["uuid"]):
+                    raise exceptions.RallyException(
+                        "Failed to push the task %s to the ElasticSearch "
+                        "cluster. The document with such UUID already exists" %
+                        task["uuid"])
+
             LOG.debug("The info of ElasticSearch cluster to which the results "
                       "will be exported: %s" % self._client.info())
-            self._client.push_documents(self._report)
+            stats = self._client.push_documents(self._generate_documents())
 
             msg = ("Successfully exported results to ElasticSearch at url "
-                   "'%s'" % self.output_destination)
+                   "'%s' (%s documents in %.2f seconds)"
+                   % (self.output_destination, stats["documents"],
+                      stats["duration"]))
             return {"print": msg}
         else:
-            # a new line is required in the end of the file.
-            report = "\n".join(self._report) + "\n"
-            return {"files": {self.output_destination: report},
-                    "open": "file://" + os.path.abspath(
-                        self.output_destination)}
+            # documents are written one by one instead of building the whole
+            #   report in memory. a new line is required in the end of the
+            #   file.
+            path = os.path.abspath(
+                os.path.expanduser(self.output_destination))
+            with open(path, "w") as f:
+                for line in self._generate_documents():
+                    f.write(line)
+                    f.write("\n")
+            return {"open": "file://" + path}
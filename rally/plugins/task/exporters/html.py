@@ -17,12 +17,17 @@ import os
 
 from rally.task import exporter
 from rally.task.processing import plot
+from rally.task.processing import report_cache
 
 
 @exporter.configure("html")
 class HTMLExporter(exporter.TaskExporter):
     """Generates task report in HTML format."""
     INCLUDE_LIBS = False
+    LAZY = False
+
+    # raw iterations are needed only for workloads missed in the cache
+    STREAMING = True
 
     def _generate_results(self):
         results = []
@@ -39,8 +44,10 @@ class HTMLExporter(exporter.TaskExporter):
         return results
 
     def generate(self):
+        cache = report_cache.ReportCache() if self.use_cache else None
         report = plot.plot(self._generate_results(),
-                           include_libs=self.INCLUDE_LIBS)
+                           include_libs=self.INCLUDE_LIBS, lazy=self.LAZY,
+                           cache=cache)
 
         if self.output_destination:
             return {"files": {self.output_destination: report},
@@ -54,3 +61,15 @@ class HTMLExporter(exporter.TaskExporter):
 class HTMLStaticExporter(HTMLExporter):
     """Generates task report in HTML format with embedded JS/CSS."""
     INCLUDE_LIBS = True
+
+
+@exporter.configure("html-lazy")
+class HTMLLazyExporter(HTMLExporter):
+    """Generates task report in HTML format for big tasks.
+
+    Only the task overview is loaded on opening of the report. Data of each
+    workload is embedded as a compressed blob which is decompressed by the
+    browser only when the workload is opened, so the report is several
+    times smaller and does not freeze the browser.
+    """
+    LAZY = True
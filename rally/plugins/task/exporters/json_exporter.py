@@ -15,6 +15,7 @@
 import collections
 import datetime as dt
 import json
+import os
 
 from rally.common import version as rally_version
 from rally.task import exporter
@@ -22,9 +23,58 @@ from rally.task import exporter
 TIMEFORMAT = "%Y-%m-%dT%H:%M:%S"
 
 
+def _newline(level):
+    return "\n" + " " * 4 * level
+
+
+def _dumps(obj, level):
+    """Encode the object as it is nested at the level of indentation."""
+    return json.dumps(obj, sort_keys=False, indent=4).replace(
+        "\n", _newline(level))
+
+
+def _encode(obj, level, path):
+    """Encode the object piece by piece.
+
+    The value of the first key of the path is the last value of the object.
+    It is an iterable which is encoded item by item, while all other values
+    are encoded at once. Items are encoded in the same way with the rest of
+    the path. The output is the same as `json.dumps(obj, indent=4)` makes.
+
+    :param obj: a dict to encode
+    :param level: the level of indentation of the object
+    :param path: keys of nested iterables
+    """
+    key, path = path[0], path[1:]
+    head = collections.OrderedDict((k, v) for k, v in obj.items() if k != key)
+    if head:
+        # encode all fields but the last one and cut the closing brace off
+        encoded = _dumps(head, level)
+        yield encoded[:-len(_newline(level) + "}")] + ","
+    else:
+        yield "{"
+    yield "%s%s: [" % (_newline(level + 1), json.dumps(key))
+    empty = True
+    for item in obj[key]:
+        yield ("%s" if empty else ",%s") % _newline(level + 2)
+        if path:
+            yield from _encode(item, level + 2, path)
+        else:
+            yield _dumps(item, level + 2)
+        empty = False
+    if not empty:
+        yield _newline(level + 1)
+    yield "]%s}" % _newline(level)
+
+
 @exporter.configure("json")
 class JSONExporter(exporter.TaskExporter):
-    """Generates task report in JSON format."""
+    """Generates task report in JSON format.
+
+    The report is written to the destination file by the exporter itself
+    while raw iterations are streamed, so only the "open" key is returned
+    in that case, there is no "files" key with the content of the report.
+    """
 
     # Revisions:
     #    1.0 - the json report v1
@@ -32,7 +82,11 @@ class JSONExporter(exporter.TaskExporter):
     #          workloads.
     #    1.2 - add `env_uuid` and `env_uuid` which represent environment name
     #          and UUID where task was executed
-    REVISION = "1.2"
+    #    1.3 - `data` is the last key of workloads, so all information about
+    #          a workload is known before its iterations while streaming
+    REVISION = "1.3"
+
+    STREAMING = True
 
     def _generate_tasks(self):
         tasks = []
@@ -47,37 +101,39 @@ class JSONExporter(exporter.TaskExporter):
                                    "description": h["config"]["description"]},
                         "results": h["results"],
                         "summary": h["summary"], } for h in workload["hooks"]]
-                    workloads.append(
-                        collections.OrderedDict(
-                            [("uuid", workload["uuid"]),
-                             ("description", workload["description"]),
-                             ("runner", {
-                                 workload["runner_type"]: workload["runner"]}),
-                             ("hooks", hooks),
-                             ("scenario", {
-                                 workload["name"]: workload["args"]}),
-                             ("min_duration", workload["min_duration"]),
-                             ("max_duration", workload["max_duration"]),
-                             ("start_time", workload["start_time"]),
-                             ("load_duration", workload["load_duration"]),
-                             ("full_duration", workload["full_duration"]),
-                             ("statistics", workload["statistics"]),
-                             ("data", workload["data"]),
-                             ("failed_iteration_count",
-                              workload["failed_iteration_count"]),
-                             ("total_iteration_count",
-                              workload["total_iteration_count"]),
-                             ("created_at", workload["created_at"]),
-                             ("updated_at", workload["updated_at"]),
-                             ("contexts", workload["contexts"]),
-                             ("contexts_results",
-                              workload["contexts_results"]),
-                             ("position", workload["position"]),
-                             ("pass_sla", workload["pass_sla"]),
-                             ("sla_results", workload["sla_results"]),
-                             ("sla", workload["sla"])]
-                        )
-                    )
+                    workload_result = collections.OrderedDict(
+                        [("uuid", workload["uuid"]),
+                         ("description", workload["description"]),
+                         ("runner", {
+                             workload["runner_type"]: workload["runner"]}),
+                         ("hooks", hooks),
+                         ("scenario", {
+                             workload["name"]: workload["args"]}),
+                         ("min_duration", workload["min_duration"]),
+                         ("max_duration", workload["max_duration"]),
+                         ("start_time", workload["start_time"]),
+                         ("load_duration", workload["load_duration"]),
+                         ("full_duration", workload["full_duration"]),
+                         ("statistics", workload["statistics"]),
+                         ("failed_iteration_count",
+                          workload["failed_iteration_count"]),
+                         ("total_iteration_count",
+                          workload["total_iteration_count"]),
+                         ("created_at", workload["created_at"]),
+                         ("updated_at", workload["updated_at"]),
+                         ("contexts", workload["contexts"]),
+                         ("contexts_results",
+                          workload["contexts_results"]),
+                         ("position", workload["position"]),
+                         ("pass_sla", workload["pass_sla"]),
+                         ("sla_results", workload["sla_results"]),
+                         ("sla", workload["sla"]),
+                         ("data", workload["data"])])
+                    if workload.get("parameters"):
+                        # parameters of a matrix go before raw iterations
+                        workload_result["parameters"] = workload["parameters"]
+                        workload_result.move_to_end("data")
+                    workloads.append(workload_result)
                 subtasks.append(
                     collections.OrderedDict(
                         [("uuid", subtask["uuid"]),
@@ -114,10 +170,25 @@ class JSONExporter(exporter.TaskExporter):
                             "format_version": self.REVISION},
                    "tasks": self._generate_tasks()}
 
-        results = json.dumps(results, sort_keys=False, indent=4)
-
+        # raw iterations can be loaded from the database chunk by chunk, so
+        #   they are encoded and written one by one instead of building the
+        #   whole report in memory
+        report = _encode(results, 0, ("tasks", "subtasks", "workloads",
+                                      "data"))
         if self.output_destination:
-            return {"files": {self.output_destination: results},
-                    "open": "file://" + self.output_destination}
+            path = os.path.expanduser(self.output_destination)
+            # the report is written to a temporary file next to the
+            #   destination, so a failure in the middle of streaming does not
+            #   leave a truncated report in place of the previous one
+            tmp_path = "%s.%s.tmp" % (path, os.getpid())
+            try:
+                with open(tmp_path, "w") as f:
+                    f.writelines(report)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            return {"open": "file://" + self.output_destination}
         else:
-            return {"print": results}
+            return {"print": "".join(report)}
@@ -13,6 +13,7 @@
 #    under the License.
 
 import datetime as dt
+import io
 import itertools
 import os
 
@@ -55,42 +56,54 @@ class JUnitXMLExporter(exporter.TaskExporter):
       </testsuites>
     """
 
-    def generate(self):
-        root = junit.JUnitXML()
+    # raw iterations are not used, so they are not loaded at all
+    STREAMING = True
 
-        for t in self.tasks_results:
-            created_at = dt.datetime.strptime(t["created_at"],
-                                              "%Y-%m-%dT%H:%M:%S")
-            updated_at = dt.datetime.strptime(t["updated_at"],
-                                              "%Y-%m-%dT%H:%M:%S")
-            test_suite = root.add_test_suite(
-                id=t["uuid"],
-                time="%.2f" % (updated_at - created_at).total_seconds(),
-                timestamp=t["created_at"]
-            )
-            for workload in itertools.chain(
-                    *[s["workloads"] for s in t["subtasks"]]):
-                class_name, name = workload["name"].split(".", 1)
-                test_case = test_suite.add_test_case(
-                    id=workload["uuid"],
-                    time="%.2f" % workload["full_duration"],
-                    classname=class_name,
-                    name=name,
-                    timestamp=workload["created_at"]
+    def _write(self, stream):
+        with junit.JUnitXMLWriter(stream) as writer:
+            for t in self.tasks_results:
+                created_at = dt.datetime.strptime(t["created_at"],
+                                                  "%Y-%m-%dT%H:%M:%S")
+                updated_at = dt.datetime.strptime(t["updated_at"],
+                                                  "%Y-%m-%dT%H:%M:%S")
+                workloads = list(itertools.chain(
+                    *[s["workloads"] for s in t["subtasks"]]))
+                test_suite = writer.add_test_suite(
+                    id=t["uuid"],
+                    time="%.2f" % (updated_at - created_at).total_seconds(),
+                    timestamp=t["created_at"],
+                    tests=str(len(workloads)),
+                    skipped="0",
+                    failures=str(len([w for w in workloads
+                                      if not w["pass_sla"]]))
                 )
-                if not workload["pass_sla"]:
-                    details = "\n".join(
-                        [s["detail"]
-                         for s in workload["sla_results"]["sla"]
-                         if not s["success"]]
+                for workload in workloads:
+                    class_name, name = workload["name"].split(".", 1)
+                    test_case = test_suite.add_test_case(
+                        id=workload["uuid"],
+                        time="%.2f" % workload["full_duration"],
+                        classname=class_name,
+                        name=name,
+                        timestamp=workload["created_at"]
                     )
-                    test_case.mark_as_failed(details)
-
-        raw_report = root.to_string()
+                    if not workload["pass_sla"]:
+                        details = "\n".join(
+                            [s["detail"]
+                             for s in workload["sla_results"]["sla"]
+                             if not s["success"]]
+                        )
+                        test_case.mark_as_failed(details)
 
+    def generate(self):
         if self.output_destination:
-            return {"files": {self.output_destination: raw_report},
-                    "open": "file://" + os.path.abspath(
-                        self.output_destination)}
+            # test cases are written one by one instead of building the
+            #   whole report in memory
+            path = os.path.abspath(
+                os.path.expanduser(self.output_destination))
+            with open(path, "w") as f:
+                self._write(f)
+            return {"open": "file://" + path}
         else:
-            return {"print": raw_report}
+            stream = io.StringIO()
+            self._write(stream)
+            return {"print": stream.getvalue()}
@@ -0,0 +1,154 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import itertools
+import os
+
+from rally.common.io import openmetrics
+from rally.task import exporter
+
+
+# names of duration statistics and values of "stat" label for them
+STATS = collections.OrderedDict([("min", "min"), ("median", "median"),
+                                 ("90%ile", "p90"), ("95%ile", "p95"),
+                                 ("max", "max"), ("avg", "avg")])
+
+
+def _to_float(value):
+    """Convert a value of statistics to float or None in case of 'n/a'."""
+    if isinstance(value, str):
+        value = value.rstrip("%")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@exporter.configure("openmetrics")
+class OpenMetricsExporter(exporter.TaskExporter):
+    """Exports statistics of workloads in OpenMetrics text format.
+
+    The report can be pushed to Prometheus (i.e. via textfile collector of
+    node exporter or Pushgateway) or any other system which understands
+    OpenMetrics. Each sample is labeled by task UUID, workload UUID and
+    scenario name. There are duration statistics (min, median, 90 and 95
+    percentiles, max and average) of the whole iterations ("total" action)
+    and each atomic action, success ratio of actions, numbers of iterations
+    and failed ones, failure ratio, throughput (iterations per second), load
+    duration, start time and SLA status.
+
+    .. code-block:: text
+
+      # TYPE rally_workload_duration_seconds gauge
+      # UNIT rally_workload_duration_seconds seconds
+      # HELP rally_workload_duration_seconds Statistics of durations ...
+      rally_workload_duration_seconds{task_uuid="t",workload_uuid="w",
+        scenario="Dummy.dummy",action="total",stat="p90"} 1.05
+      ...
+      # EOF
+
+    (the sample is wrapped here for readability)
+
+    Raw iterations are not loaded, since only statistics are used.
+    """
+
+    STREAMING = True
+
+    def _make_families(self):
+        families = collections.OrderedDict()
+
+        def family(name, mtype, help, unit=None):
+            families[name] = openmetrics.MetricFamily(name, mtype, help,
+                                                      unit=unit)
+
+        family("rally_workload_duration_seconds", "gauge",
+               "Statistics of durations of iterations (action=total) and "
+               "atomic actions.", unit="seconds")
+        family("rally_workload_action_success_ratio", "gauge",
+               "Ratio of successful runs of iterations (action=total) and "
+               "atomic actions.")
+        family("rally_workload_iterations", "gauge",
+               "Number of iterations.")
+        family("rally_workload_failed_iterations", "gauge",
+               "Number of failed iterations.")
+        family("rally_workload_failure_ratio", "gauge",
+               "Ratio of failed iterations.")
+        family("rally_workload_throughput", "gauge",
+               "Number of iterations per second of the load.")
+        family("rally_workload_load_duration_seconds", "gauge",
+               "Duration of the load.", unit="seconds")
+        family("rally_workload_start_timestamp_seconds", "gauge",
+               "Time when the load was started.", unit="seconds")
+        family("rally_workload_sla_passed", "gauge",
+               "Whether all SLA checks of the workload passed.")
+        return families
+
+    def _add_workload(self, families, task, workload):
+        labels = collections.OrderedDict([("task_uuid", task["uuid"]),
+                                          ("workload_uuid", workload["uuid"]),
+                                          ("scenario", workload["name"])])
+
+        durations = (workload.get("statistics") or {}).get("durations")
+        if durations:
+            for action in itertools.chain([durations["total"]],
+                                          durations["atomics"]):
+                action_labels = collections.OrderedDict(labels)
+                action_labels["action"] = action["display_name"]
+                for key, stat in STATS.items():
+                    value = _to_float(action["data"][key])
+                    if value is not None:
+                        stat_labels = collections.OrderedDict(action_labels)
+                        stat_labels["stat"] = stat
+                        families["rally_workload_duration_seconds"].add(
+                            stat_labels, value)
+                success = _to_float(action["data"]["success"])
+                if success is not None:
+                    families["rally_workload_action_success_ratio"].add(
+                        action_labels, success / 100.0)
+
+        total = workload["total_iteration_count"]
+        failed = workload["failed_iteration_count"]
+        families["rally_workload_iterations"].add(labels, total)
+        families["rally_workload_failed_iterations"].add(labels, failed)
+        if total:
+            families["rally_workload_failure_ratio"].add(labels,
+                                                         failed / total)
+        load_duration = workload["load_duration"]
+        families["rally_workload_load_duration_seconds"].add(
+            labels, load_duration)
+        if load_duration:
+            families["rally_workload_throughput"].add(
+                labels, total / load_duration)
+        if workload["start_time"]:
+            families["rally_workload_start_timestamp_seconds"].add(
+                labels, workload["start_time"])
+        families["rally_workload_sla_passed"].add(labels,
+                                                  bool(workload["pass_sla"]))
+
+    def generate(self):
+        families = self._make_families()
+        for task in self.tasks_results:
+            for subtask in task["subtasks"]:
+                for workload in subtask["workloads"]:
+                    self._add_workload(families, task, workload)
+
+        report = openmetrics.to_string(families.values())
+
+        if self.output_destination:
+            return {"files": {self.output_destination: report},
+                    "open": "file://" + os.path.abspath(
+                        self.output_destination)}
+        else:
+            return {"print": report}
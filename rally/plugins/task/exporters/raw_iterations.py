@@ -0,0 +1,149 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import abc
+import collections
+import csv
+import gzip
+import io
+import json
+import os
+
+from rally.task import atomic
+from rally.task import exporter
+
+
+FIELDS = ["task_uuid", "subtask_uuid", "workload_uuid", "workload_name",
+          "iteration", "timestamp", "duration", "idle_duration", "error"]
+
+ATOMIC_PREFIX = "atomic."
+
+
+class _RawIterationsExporter(exporter.TaskExporter):
+    """Base class for exporters of raw iterations as flat rows."""
+
+    STREAMING = True
+
+    def _rows(self):
+        """Generate one flat dict per iteration of all workloads."""
+        for task in self.tasks_results:
+            for subtask in task["subtasks"]:
+                for workload in subtask["workloads"]:
+                    for i, itr in enumerate(workload["data"], 1):
+                        row = {
+                            "task_uuid": task["uuid"],
+                            "subtask_uuid": subtask["uuid"],
+                            "workload_uuid": workload["uuid"],
+                            "workload_name": workload["name"],
+                            "iteration": i,
+                            "timestamp": itr["timestamp"],
+                            "duration": itr["duration"],
+                            "idle_duration": itr["idle_duration"],
+                            "error": itr["error"][0] if itr["error"] else None
+                        }
+                        # repeated atomic actions of an iteration are summed
+                        atomics = atomic.merge_atomic_actions(
+                            itr["atomic_actions"], depth_of_processing=0)
+                        for name, action in atomics.items():
+                            row[ATOMIC_PREFIX + name] = action["duration"]
+                        yield row
+
+    @abc.abstractmethod
+    def _write(self, f):
+        """Write all rows to the file-like object opened in a text mode.
+
+        :returns: a number of written rows
+        """
+
+    def generate(self):
+        if self.output_destination:
+            path = os.path.expanduser(self.output_destination)
+            # line endings are written as is, csv module takes care of them
+            if path.endswith(".gz"):
+                f = gzip.open(path, "wt", encoding="utf-8", newline="")
+            else:
+                f = open(path, "w", encoding="utf-8", newline="")
+            with f:
+                count = self._write(f)
+            return {"print": "Successfully exported %s iterations to '%s'"
+                             % (count, self.output_destination)}
+        f = io.StringIO(newline="")
+        self._write(f)
+        return {"print": f.getvalue().rstrip("\r\n")}
+
+
+@exporter.configure("ndjson")
+class NDJSONExporter(_RawIterationsExporter):
+    """Exports raw iterations of workloads as newline-delimited JSON.
+
+    Each line is a flat JSON object which describes one iteration: UUIDs of
+    the task, the subtask and the workload, the workload (scenario) name,
+    the number of the iteration, its timestamp, duration, idle duration,
+    error type (null for successful iterations) and one "atomic.<name>" key
+    per root atomic action with its duration. Iterations are loaded from the
+    database and written chunk by chunk, so it suits well for big tasks.
+    In case of a destination with ".gz" suffix, the file is compressed by
+    gzip. The result is suitable for loading into pandas, DuckDB, etc.
+    """
+
+    def _write(self, f):
+        count = 0
+        for row in self._rows():
+            f.write(json.dumps(row))
+            f.write("\n")
+            count += 1
+        return count
+
+
+@exporter.configure("csv")
+class CSVExporter(_RawIterationsExporter):
+    """Exports raw iterations of workloads in CSV format.
+
+    There is one row per iteration with the same columns as "ndjson"
+    exporter has. The columns for atomic actions are the union of root
+    atomic actions of all exported workloads (cells of missing actions are
+    empty). The names of atomic actions are taken from the workload
+    statistics, so usually the iterations are read only once, chunk by
+    chunk. In case of a destination with ".gz" suffix, the file is
+    compressed by gzip.
+    """
+
+    def _atomic_columns(self):
+        columns = collections.OrderedDict()
+        for task in self.tasks_results:
+            for subtask in task["subtasks"]:
+                for workload in subtask["workloads"]:
+                    durations = (workload.get("statistics") or {}).get(
+                        "durations")
+                    if durations:
+                        names = [a["name"] for a in durations["atomics"]]
+                    else:
+                        # statistics are missing (i.e. imported results of
+                        #   old format), so look through the iterations
+                        names = []
+                        for itr in workload["data"]:
+                            names.extend(a["name"]
+                                         for a in itr["atomic_actions"])
+                    columns.update((ATOMIC_PREFIX + n, None) for n in names)
+        return list(columns)
+
+    def _write(self, f):
+        writer = csv.DictWriter(f, FIELDS + self._atomic_columns(),
+                                extrasaction="ignore")
+        writer.writeheader()
+        count = 0
+        for row in self._rows():
+            writer.writerow(row)
+            count += 1
+        return count
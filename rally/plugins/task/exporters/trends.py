@@ -24,8 +24,19 @@ class TrendsExporter(exporter.TaskExporter):
     """Generates task trends report in HTML format."""
     INCLUDE_LIBS = False
 
+    # trends are built from summaries of workloads stored in the trends
+    #   index, so neither workloads nor raw iterations are loaded
+    STREAMING = True
+    DETAILED = False
+
     def generate(self):
-        report = plot.trends(self.tasks_results, self.INCLUDE_LIBS)
+        uuids = [task["uuid"] for task in self.tasks_results
+                 if "subtasks" not in task]
+        points = self.api.task.get_trend_points(uuids) if uuids else {}
+        tasks = [task if "subtasks" in task
+                 else dict(task, trend_points=points[task["uuid"]])
+                 for task in self.tasks_results]
+        report = plot.trends(tasks, self.INCLUDE_LIBS)
         if self.output_destination:
             return {"files": {self.output_destination: report},
                     "open": "file://" + os.path.abspath(
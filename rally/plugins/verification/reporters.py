@@ -13,7 +13,9 @@
 #    under the License.
 
 import collections
+import io
 import json
+import os
 import re
 
 from rally.common.io import junit
@@ -406,58 +408,64 @@ class JUnitXMLReporter(reporter.VerificationReporter):
     def validate(cls, output_destination):
         pass
 
-    def generate(self):
-        report = junit.JUnitXML()
+    def _write(self, stream):
+        with junit.JUnitXMLWriter(stream) as writer:
+            for v in self.verifications:
+                test_suite = writer.add_test_suite(
+                    id=v.uuid,
+                    time=str(v.tests_duration),
+                    timestamp=v.created_at.strftime(TIME_FORMAT),
+                    tests=str(v.tests_count),
+                    skipped=str(v.skipped),
+                    failures=str(v.failures + v.unexpected_success)
+                )
+
+                # results are loaded by batches in order tests were run
+                for result in v.iter_tests():
+                    class_name, name = result["name"].rsplit(".", 1)
+
+                    test_id = [tag[3:] for tag in result.get("tags", [])
+                               if tag.startswith("id-")]
+
+                    test_case = test_suite.add_test_case(
+                        id=(test_id[0] if test_id else None),
+                        time=result["duration"], name=name,
+                        classname=class_name,
+                        timestamp=result.get("timestamp"))
+
+                    if result["status"] == "success":
+                        # nothing to add
+                        pass
+                    elif result["status"] == "uxsuccess":
+                        test_case.mark_as_uxsuccess(
+                            result.get("reason"))
+                    elif result["status"] == "fail":
+                        test_case.mark_as_failed(
+                            result.get("traceback", None))
+                    elif result["status"] == "xfail":
+                        trace = result.get("traceback", None)
+                        test_case.mark_as_xfail(
+                            result.get("reason", None),
+                            f"Traceback:\n{trace}" if trace else None)
+                    elif result["status"] == "skip":
+                        test_case.mark_as_skipped(
+                            result.get("reason", None))
+                    else:
+                        # wtf is it?! we should add validation of results...
+                        pass
 
-        for v in self.verifications:
-            test_suite = report.add_test_suite(
-                id=v.uuid,
-                time=str(v.tests_duration),
-                timestamp=v.created_at.strftime(TIME_FORMAT)
-            )
-            test_suite.setup_final_stats(
-                tests=str(v.tests_count),
-                skipped=str(v.skipped),
-                failures=str(v.failures + v.unexpected_success)
-            )
-
-            tests = sorted(v.tests.values(),
-                           key=lambda t: (t.get("timestamp", ""), t["name"]))
-            for result in tests:
-                class_name, name = result["name"].rsplit(".", 1)
-
-                test_id = [tag[3:] for tag in result.get("tags", [])
-                           if tag.startswith("id-")]
-
-                test_case = test_suite.add_test_case(
-                    id=(test_id[0] if test_id else None),
-                    time=result["duration"], name=name, classname=class_name,
-                    timestamp=result.get("timestamp"))
-
-                if result["status"] == "success":
-                    # nothing to add
-                    pass
-                elif result["status"] == "uxsuccess":
-                    test_case.mark_as_uxsuccess(
-                        result.get("reason"))
-                elif result["status"] == "fail":
-                    test_case.mark_as_failed(
-                        result.get("traceback", None))
-                elif result["status"] == "xfail":
-                    trace = result.get("traceback", None)
-                    test_case.mark_as_xfail(
-                        result.get("reason", None),
-                        f"Traceback:\n{trace}" if trace else None)
-                elif result["status"] == "skip":
-                    test_case.mark_as_skipped(
-                        result.get("reason", None))
-                else:
-                    # wtf is it?! we should add validation of results...
-                    pass
-
-        raw_report = report.to_string()
+    def generate(self):
         if self.output_destination:
-            return {"files": {self.output_destination: raw_report},
-                    "open": self.output_destination}
+            # test cases are written one by one instead of building the
+            #   whole report in memory
+            path = os.path.abspath(
+                os.path.expanduser(self.output_destination))
+            if not os.path.exists(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(path, "w") as f:
+                self._write(f)
+            return {"open": self.output_destination}
         else:
-            return {"print": raw_report}
+            stream = io.StringIO()
+            self._write(stream)
+            return {"print": stream.getvalue()}
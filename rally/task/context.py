@@ -15,6 +15,8 @@
 
 import abc
 import collections
+from concurrent import futures
+import itertools
 
 from rally.common import cfg
 from rally.common import logging
@@ -218,87 +220,136 @@ class ContextManager(object):
     def _log_prefix(self):
         return "Task %s |" % self.context_obj["task"]["uuid"]
 
+    @staticmethod
+    def _workers():
+        # the option is registered with options of the task engine, but
+        #   the manager can be used without them
+        if "context_workers" in CONF:
+            return CONF.context_workers
+        return 1
+
+    @staticmethod
+    def _groups(ctx_lst, workers):
+        """Split sorted contexts into groups which can run concurrently."""
+        if workers == 1:
+            return [[ctx] for ctx in ctx_lst]
+        return [list(group) for _order, group in itertools.groupby(
+            ctx_lst, key=lambda c: c.get_order())]
+
+    def _start_setup(self, ctx):
+        ctx_data = {
+            "plugin_name": ctx.get_fullname(),
+            "plugin_cfg": ctx.config,
+            "setup": {
+                "started_at": None,
+                "finished_at": None,
+                "atomic_actions": None,
+                "error": None
+            },
+            "cleanup": {
+                "started_at": None,
+                "finished_at": None,
+                "atomic_actions": None,
+                "error": None
+            }
+        }
+        self._data[ctx.get_fullname()] = ctx_data
+        self._visited.append(ctx)
+
+    def _setup_context(self, ctx):
+        ctx_data = self._data[ctx.get_fullname()]
+        msg = ("%(log_prefix)s Context %(name)s setup() "
+               % {"log_prefix": self._log_prefix(),
+                  "name": ctx.get_fullname()})
+
+        timer = utils.Timer()
+        try:
+            with timer:
+                ctx.setup()
+        except Exception as exc:
+            ctx_data["setup"]["error"] = task_utils.format_exc(exc)
+            raise
+        finally:
+            ctx_data["setup"]["atomic_actions"] = ctx.atomic_actions()
+            ctx_data["setup"]["started_at"] = timer.timestamp()
+            ctx_data["setup"]["finished_at"] = timer.finish_timestamp()
+
+        LOG.info("%(msg)s finished in %(duration)s"
+                 % {"msg": msg, "duration": timer.duration(fmt=True)})
+
     def setup(self):
-        """Creates environment by executing provided context plugins."""
+        """Creates environment by executing provided context plugins.
+
+        Contexts with the same order are set up concurrently if
+        context_workers option is greater than 1.
+        """
         self._visited = []
-        for ctx in self._get_sorted_context_lst():
-            ctx_data = {
-                "plugin_name": ctx.get_fullname(),
-                "plugin_cfg": ctx.config,
-                "setup": {
-                    "started_at": None,
-                    "finished_at": None,
-                    "atomic_actions": None,
-                    "error": None
-                },
-                "cleanup": {
-                    "started_at": None,
-                    "finished_at": None,
-                    "atomic_actions": None,
-                    "error": None
-                }
-            }
-            self._data[ctx.get_fullname()] = ctx_data
-            self._visited.append(ctx)
-            msg = ("%(log_prefix)s Context %(name)s setup() "
-                   % {"log_prefix": self._log_prefix(),
-                      "name": ctx.get_fullname()})
-
-            timer = utils.Timer()
-            try:
-                with timer:
-                    ctx.setup()
-            except Exception as exc:
-                ctx_data["setup"]["error"] = task_utils.format_exc(exc)
-                raise
-            finally:
-                ctx_data["setup"]["atomic_actions"] = ctx.atomic_actions()
-                ctx_data["setup"]["started_at"] = timer.timestamp()
-                ctx_data["setup"]["finished_at"] = timer.finish_timestamp()
+        workers = self._workers()
+        for group in self._groups(self._get_sorted_context_lst(), workers):
+            # all contexts of a group are started, so all of them should
+            #   be cleaned up in case of a failure
+            for ctx in group:
+                self._start_setup(ctx)
+            if len(group) == 1:
+                self._setup_context(group[0])
+                continue
+            with futures.ThreadPoolExecutor(
+                    max_workers=min(workers, len(group))) as executor:
+                results = [executor.submit(self._setup_context, ctx)
+                           for ctx in group]
+            for result in results:
+                result.result()
+
+        return self.context_obj
 
+    def _cleanup_context(self, ctx):
+        ctx.reset_atomic_actions()
+        msg = ("%(log_prefix)s Context %(name)s cleanup()"
+               % {"log_prefix": self._log_prefix(),
+                  "name": ctx.get_fullname()})
+        # NOTE(andreykurilin): As for our code, ctx_data is
+        #   always presented. The further checks for `ctx_data is None` are
+        #   added just for "disaster cleanup". It is not officially
+        #   presented feature and not we provide out-of-the-box, but some
+        #   folks have own scripts which are based on ContextManager and
+        #   it would be nice to not break them.
+        ctx_data = None
+        if ctx.get_fullname() in self._data:
+            ctx_data = self._data[ctx.get_fullname()]
+
+        timer = utils.Timer()
+        try:
+            with timer:
+                LOG.info("%s started" % msg)
+                ctx.cleanup()
             LOG.info("%(msg)s finished in %(duration)s"
                      % {"msg": msg, "duration": timer.duration(fmt=True)})
-
-        return self.context_obj
+        except Exception as exc:
+            LOG.exception(
+                "%(msg)s failed after %(duration)s"
+                % {"msg": msg, "duration": timer.duration(fmt=True)})
+            if ctx_data is not None:
+                ctx_data["cleanup"]["error"] = task_utils.format_exc(exc)
+        finally:
+            if ctx_data is not None:
+                aa = ctx.atomic_actions()
+                ctx_data["cleanup"]["atomic_actions"] = aa
+                ctx_data["cleanup"]["started_at"] = timer.timestamp()
+                finished_at = timer.finish_timestamp()
+                ctx_data["cleanup"]["finished_at"] = finished_at
 
     def cleanup(self):
         """Cleans up  environment by executing provided context plugins."""
         ctxlst = self._visited or self._get_sorted_context_lst()
-        for ctx in ctxlst[::-1]:
-            ctx.reset_atomic_actions()
-            msg = ("%(log_prefix)s Context %(name)s cleanup()"
-                   % {"log_prefix": self._log_prefix(),
-                      "name": ctx.get_fullname()})
-            # NOTE(andreykurilin): As for our code, ctx_data is
-            #   always presented. The further checks for `ctx_data is None` are
-            #   added just for "disaster cleanup". It is not officially
-            #   presented feature and not we provide out-of-the-box, but some
-            #   folks have own scripts which are based on ContextManager and
-            #   it would be nice to not break them.
-            ctx_data = None
-            if ctx.get_fullname() in self._data:
-                ctx_data = self._data[ctx.get_fullname()]
-
-            timer = utils.Timer()
-            try:
-                with timer:
-                    LOG.info("%s started" % msg)
-                    ctx.cleanup()
-                LOG.info("%(msg)s finished in %(duration)s"
-                         % {"msg": msg, "duration": timer.duration(fmt=True)})
-            except Exception as exc:
-                LOG.exception(
-                    "%(msg)s failed after %(duration)s"
-                    % {"msg": msg, "duration": timer.duration(fmt=True)})
-                if ctx_data is not None:
-                    ctx_data["cleanup"]["error"] = task_utils.format_exc(exc)
-            finally:
-                if ctx_data is not None:
-                    aa = ctx.atomic_actions()
-                    ctx_data["cleanup"]["atomic_actions"] = aa
-                    ctx_data["cleanup"]["started_at"] = timer.timestamp()
-                    finished_at = timer.finish_timestamp()
-                    ctx_data["cleanup"]["finished_at"] = finished_at
+        workers = self._workers()
+        for group in self._groups(ctxlst, workers)[::-1]:
+            if len(group) == 1:
+                self._cleanup_context(group[0])
+                continue
+            # errors of cleanup are logged and stored by _cleanup_context
+            with futures.ThreadPoolExecutor(
+                    max_workers=min(workers, len(group))) as executor:
+                list(executor.map(self._cleanup_context, group[::-1]))
 
     def __enter__(self):
         try:
@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from concurrent import futures
 import copy
 import json
 import threading
@@ -26,9 +27,11 @@ from rally import consts
 from rally import exceptions
 from rally.task import context
 from rally.task import hook
+from rally.task import live_metrics
 from rally.task import runner
 from rally.task import scenario
 from rally.task import sla
+from rally.task import task_cfg
 from rally.utils import strutils
 
 
@@ -39,9 +42,47 @@ CONF = cfg.CONF
 TASK_ENGINE_OPTS = [
     cfg.IntOpt("raw_result_chunk_size", default=1000, min=1,
                help="Size of raw result chunk in iterations"),
+    cfg.StrOpt("raw_result_chunk_format", default="json",
+               choices=["json", "columnar"],
+               help="Format to store raw result chunks in. 'columnar' keeps "
+                    "timestamps and durations of iterations as binary arrays"
+                    " and names of atomic actions in a string table which "
+                    "takes less space than 'json'."),
+    cfg.IntOpt("result_validation_sample_rate", default=1, min=1,
+               help="Check the format of only every Nth result of iterations"
+                    " sent by scenario runners. Results of the first "
+                    "iteration and every Nth one after it are checked. "
+                    "Increase it only for high-rate loads of trusted "
+                    "plugins, since results of unchecked iterations are "
+                    "stored as is."),
+    cfg.IntOpt("validation_workers", default=4, min=1,
+               help="Number of threads which validate workloads of a task "
+                    "against the environment (semantic validation). 1 means"
+                    " that workloads are validated one by one."),
+    cfg.IntOpt("context_workers", default=1, min=1,
+               help="Number of threads which set up and clean up contexts "
+                    "of a workload with the same order. 1 means that "
+                    "contexts are set up one by one. Increase it only if "
+                    "contexts with the same order do not depend on each "
+                    "other."),
 ]
 
 
+def _freeze(obj):
+    """Make a hashable key of a configuration of a plugin.
+
+    Types are kept in the key, since validators distinguish e.g. 1 and True
+    or lists and tuples. TypeError is raised for unhashable objects.
+    """
+    if isinstance(obj, dict):
+        return type(obj), tuple(sorted((k, _freeze(v))
+                                       for k, v in obj.items()))
+    if isinstance(obj, (list, tuple)):
+        return type(obj), tuple(_freeze(v) for v in obj)
+    hash(obj)
+    return type(obj), obj
+
+
 class ResultConsumer(object):
     """ResultConsumer class stores results from ScenarioRunner, checks SLA.
 
@@ -50,7 +91,7 @@ class ResultConsumer(object):
     """
 
     def __init__(self, workload_cfg, task, subtask, workload, runner,
-                 abort_on_sla_failure, ctx_manager):
+                 abort_on_sla_failure, ctx_manager, metrics=None, group=None):
         """ResultConsumer constructor.
 
         :param workload_cfg: A configuration of the Workload
@@ -62,6 +103,9 @@ class ResultConsumer(object):
         :param abort_on_sla_failure: True if the execution should be stopped
                                      when some SLA check fails
         :param ctx_manager: ContextManager instance
+        :param metrics: LiveMetrics instance to account results in
+        :param group: WorkloadGroup instance, if the workload is run in
+                      parallel with other workloads of the subtask
         """
 
         self.task = task
@@ -84,8 +128,16 @@ class ResultConsumer(object):
         if self.workload_cfg["hooks"]:
             self.event_thread = threading.Thread(target=self._consume_events)
         self._cm = ctx_manager
+        self.metrics = metrics
+        self.group = group
+        if self.group:
+            self.group.add_consumer(self)
 
     def __enter__(self):
+        if self.metrics:
+            self.metrics.start_workload(self.task["uuid"],
+                                        self.workload["uuid"],
+                                        self.workload_cfg["name"])
         self.thread.start()
         self.aborting_checker.start()
         if self.workload_cfg["hooks"]:
@@ -108,11 +160,17 @@ class ResultConsumer(object):
                     if (self.abort_on_sla_failure
                             and not success
                             and not task_aborted):
-                        self.sla_checker.set_aborted_on_sla()
-                        self.runner.abort()
+                        if self.group:
+                            self.group.abort_on_sla()
+                        else:
+                            self.abort_on_sla()
                         self.task.update_status(
                             consts.TaskStatus.SOFT_ABORTING)
                         task_aborted = True
+                if self.metrics and results:
+                    # the status of SLA checks after the last iteration
+                    self.metrics.add_iterations(self.workload["uuid"],
+                                                results, sla_passed=success)
 
                 # save results chunks
                 chunk_size = CONF.raw_result_chunk_size
@@ -120,8 +178,9 @@ class ResultConsumer(object):
                     results_chunk = self.results[:chunk_size]
                     self.results = self.results[chunk_size:]
                     results_chunk.sort(key=lambda x: x["timestamp"])
-                    self.workload.add_workload_data(self.workload_data_count,
-                                                    {"raw": results_chunk})
+                    self.workload.add_workload_data(
+                        self.workload_data_count, {"raw": results_chunk},
+                        chunk_format=CONF.raw_result_chunk_format)
                     self.workload_data_count += 1
 
             elif self.is_done.isSet():
@@ -143,6 +202,8 @@ class ResultConsumer(object):
         self.is_done.set()
         self.aborting_checker.join()
         self.thread.join()
+        if self.metrics:
+            self.metrics.finish_workload(self.workload["uuid"])
 
         if exc_type:
             self.sla_checker.set_unexpected_failure(exc_value)
@@ -169,8 +230,9 @@ class ResultConsumer(object):
             # NOTE(boris-42): Sort in order of starting
             #                 instead of order of ending
             self.results.sort(key=lambda x: x["timestamp"])
-            self.workload.add_workload_data(self.workload_data_count,
-                                            {"raw": self.results})
+            self.workload.add_workload_data(
+                self.workload_data_count, {"raw": self.results},
+                chunk_format=CONF.raw_result_chunk_format)
         start_time = (self.load_started_at
                       if self.load_started_at != float("inf") else None)
         self.workload.set_results(load_duration=load_duration,
@@ -180,6 +242,11 @@ class ResultConsumer(object):
                                   contexts_results=self._cm.contexts_results(),
                                   **results)
 
+    def abort_on_sla(self):
+        """Stop the load of the workload due to SLA failure(s)."""
+        self.sla_checker.set_aborted_on_sla()
+        self.runner.abort()
+
     @staticmethod
     def is_task_in_aborting_status(task_uuid, check_soft=True):
         """Checks task is in abort stages
@@ -210,6 +277,50 @@ class ResultConsumer(object):
             time.sleep(2.0)
 
 
+class WorkloadGroup(object):
+    """Workloads of a subtask which generate load at the same time.
+
+    Each workload of the group has its own runner, contexts and
+    ResultConsumer. The load of all of them is started once contexts of all
+    workloads are set up, and the load of all of them is stopped if SLA of
+    any of them fails (in case of abort on SLA failure).
+    """
+
+    def __init__(self, size):
+        self._barrier = threading.Barrier(size)
+        self._started = False
+        self._consumers = []
+        self._lock = threading.Lock()
+
+    def add_consumer(self, consumer):
+        with self._lock:
+            self._consumers.append(consumer)
+
+    def start(self):
+        """Wait until all workloads of the group are ready to start load."""
+        try:
+            self._barrier.wait()
+        except threading.BrokenBarrierError:
+            raise exceptions.RallyException(
+                "Load is not started, since another workload of the subtask "
+                "which should be run in parallel failed to start.")
+        self._started = True
+
+    def leave(self):
+        """Mark that a workload of the group is finished.
+
+        If it has failed before the start of load, other workloads should
+        not wait for it.
+        """
+        if not self._started:
+            self._barrier.abort()
+
+    def abort_on_sla(self):
+        with self._lock:
+            for consumer in self._consumers:
+                consumer.abort_on_sla()
+
+
 class TaskAborted(Exception):
     """Task aborted exception
 
@@ -248,6 +359,43 @@ class TaskEngine(object):
         self.task = task
         self.env = env
         self.abort_on_sla_failure = abort_on_sla_failure
+        # metrics of running workloads if the live metrics endpoint is on
+        self.metrics = None
+        # results of validation of plugins by their configurations
+        self._validation_cache = {}
+        self._validation_stats = {"validations": 0, "cached": 0}
+        self._validation_lock = threading.Lock()
+
+    def _validate_plugin(self, plugin_base, **kwargs):
+        """Validate a plugin or reuse results of the same validation.
+
+        Identical plugins are often used by many workloads of a task (the same
+        context, runner or SLA), so validation results are memoized by
+        (base, name, type of validation and configuration). A validation
+        context is the same during each stage of validation.
+        """
+        config = kwargs["config"]
+        if config is not None:
+            # these keys do not affect validation
+            config = dict((k, v) for k, v in config.items()
+                          if k not in ("uuid", "position"))
+        try:
+            key = (plugin_base, kwargs["name"], kwargs["vtype"],
+                   kwargs.get("allow_hidden", False),
+                   _freeze(config), _freeze(kwargs["plugin_cfg"]))
+        except TypeError:
+            key = None
+
+        results = self._validation_cache.get(key) if key is not None else None
+        with self._validation_lock:
+            self._validation_stats["validations"] += 1
+            if results is not None:
+                self._validation_stats["cached"] += 1
+        if results is None:
+            results = plugin_base.validate(**kwargs)
+            if key is not None:
+                self._validation_cache[key] = results
+        return list(results)
 
     def _validate_workload(self, workload, vcontext=None, vtype=None):
         """Validate a workload.
@@ -268,7 +416,8 @@ class TaskEngine(object):
         scenario_context = copy.deepcopy(scenario_cls.get_default_context())
         results = []
 
-        results.extend(scenario.Scenario.validate(
+        results.extend(self._validate_plugin(
+            scenario.Scenario,
             name=workload["name"],
             context=vcontext,
             config=workload,
@@ -276,7 +425,8 @@ class TaskEngine(object):
             vtype=vtype))
 
         if workload["runner_type"]:
-            results.extend(runner.ScenarioRunner.validate(
+            results.extend(self._validate_plugin(
+                runner.ScenarioRunner,
                 name=workload["runner_type"],
                 context=vcontext,
                 config=None,
@@ -284,7 +434,8 @@ class TaskEngine(object):
                 vtype=vtype))
 
         for context_name, context_conf in workload["contexts"].items():
-            results.extend(context.Context.validate(
+            results.extend(self._validate_plugin(
+                context.Context,
                 name=context_name,
                 context=vcontext,
                 config=None,
@@ -292,7 +443,8 @@ class TaskEngine(object):
                 vtype=vtype))
 
         for context_name, context_conf in scenario_context.items():
-            results.extend(context.Context.validate(
+            results.extend(self._validate_plugin(
+                context.Context,
                 name=context_name,
                 context=vcontext,
                 config=None,
@@ -301,7 +453,8 @@ class TaskEngine(object):
                 vtype=vtype))
 
         for sla_name, sla_conf in workload["sla"].items():
-            results.extend(sla.SLA.validate(
+            results.extend(self._validate_plugin(
+                sla.SLA,
                 name=sla_name,
                 context=vcontext,
                 config=None,
@@ -310,7 +463,8 @@ class TaskEngine(object):
 
         for hook_conf in workload["hooks"]:
             action_name, action_cfg = hook_conf["action"]
-            results.extend(hook.HookAction.validate(
+            results.extend(self._validate_plugin(
+                hook.HookAction,
                 name=action_name,
                 context=vcontext,
                 config=None,
@@ -318,7 +472,8 @@ class TaskEngine(object):
                 vtype=vtype))
 
             trigger_name, trigger_cfg = hook_conf["trigger"]
-            results.extend(hook.HookTrigger.validate(
+            results.extend(self._validate_plugin(
+                hook.HookTrigger,
                 name=trigger_name,
                 context=vcontext,
                 config=None,
@@ -336,7 +491,12 @@ class TaskEngine(object):
     def _validate_config_syntax(self, config):
         for subtask in config.subtasks:
             for workload in subtask["workloads"]:
-                self._validate_workload(workload, vtype="syntax")
+                # NOTE: each value of parameters of a matrix is checked at
+                #   its path once instead of checking the whole product of
+                #   values, which can be huge
+                for expanded in task_cfg.expand_workload(
+                        workload, each_value_once=True):
+                    self._validate_workload(expanded, vtype="syntax")
 
     @logging.log_task_wrapper(LOG.info,
                               "Task validation of required platforms.")
@@ -350,7 +510,8 @@ class TaskEngine(object):
         for subtask in config.subtasks:
             for workload in subtask["workloads"]:
                 self._validate_workload(
-                    workload, vcontext=ctx, vtype="platform")
+                    next(task_cfg.expand_workload(workload)), vcontext=ctx,
+                    vtype="platform")
 
     @logging.log_task_wrapper(LOG.info, "Task validation of semantic.")
     def _validate_config_semantic(self, config):
@@ -378,11 +539,34 @@ class TaskEngine(object):
                    "config": validation_ctx,
                    "env": env_data}
 
+        # NOTE: values of parameters of a matrix are checked by syntax
+        #   validation, while required platforms and resources of the
+        #   environment do not depend on them, so only the first combination
+        #   of values is validated against the environment
+        workloads = [next(task_cfg.expand_workload(w))
+                     for subtask in config.subtasks
+                     for w in subtask["workloads"]]
+        workers = min(CONF.validation_workers, len(workloads))
         with context.ContextManager(ctx_obj):
-            for subtask in config.subtasks:
-                for workload in subtask["workloads"]:
+            if workers <= 1:
+                for workload in workloads:
                     self._validate_workload(
                         workload, vcontext=ctx_obj, vtype="semantic")
+                return
+            # workloads are independent, while semantic validation mostly
+            #   waits for responses of the environment
+            with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                fs = [executor.submit(self._validate_workload, workload,
+                                      vcontext=ctx_obj, vtype="semantic")
+                      for workload in workloads]
+                try:
+                    # the first invalid workload in the task is reported
+                    for f in fs:
+                        f.result()
+                except Exception:
+                    for f in fs:
+                        f.cancel()
+                    raise
 
     @logging.log_task_wrapper(LOG.info, "Task validation.")
     def validate(self, only_syntax=False):
@@ -391,6 +575,9 @@ class TaskEngine(object):
         :param only_syntax: Check only syntax of task configuration
         """
         self.task.update_status(consts.TaskStatus.VALIDATING)
+        self._validation_cache = {}
+        self._validation_stats = {"validations": 0, "cached": 0}
+        started_at = time.time()
         try:
             self._validate_config_syntax(self.config)
             if only_syntax:
@@ -413,6 +600,14 @@ class TaskEngine(object):
                 LOG.exception("Unexpected error had happened while validating "
                               "task.")
             raise
+        finally:
+            duration = time.time() - started_at
+            LOG.info("Task %s validation took %.2f seconds (%s validations of"
+                     " plugins, %s of them reused results of the same ones)."
+                     % (self.task["uuid"], duration,
+                        self._validation_stats["validations"],
+                        self._validation_stats["cached"]))
+            self.task.set_validation_duration(duration)
 
     def _prepare_context(self, ctx, scenario_name, owner_id):
         context_config = {}
@@ -449,6 +644,7 @@ class TaskEngine(object):
         """
         self.task.update_status(consts.TaskStatus.RUNNING)
 
+        metrics_server = self._start_metrics_server()
         try:
             for subtask in self.config.subtasks:
                 self._run_subtask(subtask)
@@ -459,16 +655,44 @@ class TaskEngine(object):
             if objects.Task.get_status(
                     self.task["uuid"]) != consts.TaskStatus.ABORTED:
                 self.task.update_status(consts.TaskStatus.FINISHED)
+        finally:
+            if metrics_server:
+                metrics_server.stop()
+
+    def _start_metrics_server(self):
+        if not CONF.live_metrics_endpoint:
+            return None
+        self.metrics = live_metrics.LiveMetrics()
+        server = live_metrics.MetricsServer(CONF.live_metrics_endpoint,
+                                            self.metrics)
+        try:
+            server.start()
+        except (ValueError, OSError) as e:
+            # the endpoint is a helper for monitoring, so its failure
+            #   should not break the task
+            LOG.warning("Failed to start live metrics endpoint: %s" % e)
+            self.metrics = None
+            return None
+        return server
 
     def _run_subtask(self, subtask):
-        subtask_obj = self.task.add_subtask(title=subtask["title"],
-                                            description=subtask["description"],
-                                            contexts=subtask["contexts"])
+        subtask_obj = self.task.add_subtask(
+            title=subtask["title"],
+            description=subtask["description"],
+            contexts=subtask["contexts"],
+            run_in_parallel=subtask.get("run_in_parallel", False))
 
         try:
             # TODO(astudenov): add subtask context here
-            for workload in subtask["workloads"]:
-                self._run_workload(subtask_obj, workload)
+            workloads = self._expand_workloads(subtask["workloads"])
+            if subtask.get("run_in_parallel"):
+                # NOTE: workloads of such subtasks cannot have a matrix (it is
+                #   checked by TaskConfig), so the number of them is bounded
+                #   by the config
+                self._run_workloads_in_parallel(subtask_obj, list(workloads))
+            else:
+                for workload in workloads:
+                    self._run_workload(subtask_obj, workload)
         except TaskAborted:
             subtask_obj.update_status(consts.SubtaskStatus.ABORTED)
             raise
@@ -483,7 +707,35 @@ class TaskEngine(object):
         else:
             subtask_obj.update_status(consts.SubtaskStatus.FINISHED)
 
-    def _run_workload(self, subtask_obj, workload):
+    @staticmethod
+    def _expand_workloads(workloads):
+        position = 0
+        for workload in workloads:
+            # workloads of a matrix are made one by one while running
+            for expanded in task_cfg.expand_workload(workload):
+                expanded["position"] = position
+                position += 1
+                yield expanded
+
+    def _run_workloads_in_parallel(self, subtask_obj, workloads):
+        group = WorkloadGroup(len(workloads))
+
+        def run(workload):
+            try:
+                self._run_workload(subtask_obj, workload, group=group)
+            finally:
+                group.leave()
+
+        LOG.info("Running %s workloads in parallel." % len(workloads))
+        with futures.ThreadPoolExecutor(
+                max_workers=len(workloads)) as executor:
+            results = [executor.submit(run, w) for w in workloads]
+        # all workloads are finished here, so errors are raised in the
+        #   order of workloads
+        for result in results:
+            result.result()
+
+    def _run_workload(self, subtask_obj, workload, group=None):
         if ResultConsumer.is_task_in_aborting_status(self.task["uuid"]):
             raise TaskAborted()
         workload_obj = subtask_obj.add_workload(
@@ -495,7 +747,8 @@ class TaskEngine(object):
             hooks=workload["hooks"],
             contexts=workload["contexts"],
             sla=workload["sla"],
-            args=workload["args"])
+            args=workload["args"],
+            parameters=workload.get("parameters"))
         workload["uuid"] = workload_obj["uuid"]
 
         workload_cfg = objects.Workload.to_task(workload)
@@ -507,6 +760,8 @@ class TaskEngine(object):
 
         runner_cls = runner.ScenarioRunner.get(workload["runner_type"])
         runner_obj = runner_cls(self.task, workload["runner"])
+        runner_obj.validation_sample_rate = (
+            CONF.result_validation_sample_rate)
         context_obj = self._prepare_context(
             workload["contexts"], workload["name"], workload_obj["uuid"])
         try:
@@ -514,8 +769,11 @@ class TaskEngine(object):
             with ResultConsumer(workload, task=self.task, subtask=subtask_obj,
                                 workload=workload_obj, runner=runner_obj,
                                 abort_on_sla_failure=self.abort_on_sla_failure,
-                                ctx_manager=ctx_manager):
+                                ctx_manager=ctx_manager,
+                                metrics=self.metrics, group=group):
                 with ctx_manager:
+                    if group:
+                        group.start()
                     runner_obj.run(workload["name"], context_obj,
                                    workload["args"])
         except Exception:
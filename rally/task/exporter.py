@@ -72,6 +72,16 @@ class TaskExporter(plugin.Plugin, validation.ValidatablePluginMixin,
 
     """
 
+    # Whether the exporter iterates over raw iterations of each workload
+    #   (`workload["data"]`) only sequentially. In this case tasks are passed
+    #   with iterables which load iterations from the database chunk by chunk
+    #   instead of lists of all iterations.
+    STREAMING = False
+
+    # Whether the exporter needs subtasks and workloads of tasks. If not,
+    #   only the tasks themselves are loaded from the database.
+    DETAILED = True
+
     def __init__(self, tasks_results, output_destination, api=None):
         """Init reporter
 
@@ -83,6 +93,9 @@ class TaskExporter(plugin.Plugin, validation.ValidatablePluginMixin,
         self.tasks_results = tasks_results
         self.output_destination = output_destination
         self.api = api
+        # whether processed data can be taken from (and stored to) the report
+        #   cache. It is set by `make` to not change signatures of plugins
+        self.use_cache = True
 
     @abc.abstractmethod
     def generate(self):
@@ -95,10 +108,15 @@ class TaskExporter(plugin.Plugin, validation.ValidatablePluginMixin,
             - key "print" - data to print at CLI level
             - key "open" - path to file which should be open in case of
               --open flag
+
+            Exporters which write big reports piece by piece (see
+            STREAMING) save the file to the destination by themselves and
+            return only "open" key.
         """
 
     @staticmethod
-    def make(exporter_cls, task_results, output_destination, api=None):
+    def make(exporter_cls, task_results, output_destination, api=None,
+             use_cache=True):
         """Initialize exporter, generate and validate result.
 
         It is a base method which is called from API layer. It cannot be
@@ -108,9 +126,11 @@ class TaskExporter(plugin.Plugin, validation.ValidatablePluginMixin,
         :param task_results: list of results to generate report for
         :param output_destination: destination of export
         :param api: an instance of rally.api.API object
+        :param use_cache: whether to use the cache of processed data
         """
-        report = exporter_cls(task_results, output_destination,
-                              api).generate()
+        task_exporter = exporter_cls(task_results, output_destination, api)
+        task_exporter.use_cache = use_cache
+        report = task_exporter.generate()
 
         jsonschema.validate(report, REPORT_RESPONSE_SCHEMA)
 
@@ -0,0 +1,195 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Live metrics of running workloads.
+
+While a task is running, `LiveMetrics` collects counters of iterations and
+histograms of their durations from result consumers of workloads and
+`MetricsServer` serves them over HTTP in OpenMetrics text format, so they
+can be scraped by Prometheus to watch the load in real time.
+"""
+
+import collections
+import http.server
+import socketserver
+import threading
+
+from rally.common import cfg
+from rally.common.io import openmetrics
+from rally.common import logging
+
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+
+LIVE_METRICS_OPTS = [
+    cfg.StrOpt("live_metrics_endpoint", default=None,
+               help="Address (host:port) to serve live metrics of running "
+                    "workloads in OpenMetrics text format on. The metrics "
+                    "are available at /metrics path only while a task is "
+                    "running. The endpoint is disabled by default."),
+]
+
+
+class _WorkloadMetrics(object):
+    def __init__(self, labels):
+        self.labels = labels
+        self.iterations = 0
+        self.failed_iterations = 0
+        self.running = True
+        self.sla_passed = True
+        self.durations = openmetrics.Histogram()
+        self.atomics = collections.OrderedDict()
+
+
+class LiveMetrics(object):
+    """Thread-safe registry of metrics of running workloads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._workloads = collections.OrderedDict()
+
+    def start_workload(self, task_uuid, workload_uuid, name):
+        labels = collections.OrderedDict([("task_uuid", task_uuid),
+                                          ("workload_uuid", workload_uuid),
+                                          ("scenario", name)])
+        with self._lock:
+            self._workloads[workload_uuid] = _WorkloadMetrics(labels)
+
+    def add_iterations(self, workload_uuid, iterations, sla_passed=True):
+        """Account results of iterations of the workload.
+
+        :param workload_uuid: UUID of the workload
+        :param iterations: a list of raw results of iterations
+        :param sla_passed: whether SLA checks of the workload pass so far
+        """
+        with self._lock:
+            workload = self._workloads[workload_uuid]
+            workload.sla_passed = sla_passed
+            for itr in iterations:
+                workload.iterations += 1
+                if itr["error"]:
+                    workload.failed_iterations += 1
+                workload.durations.observe(itr["duration"])
+                for action in itr["atomic_actions"]:
+                    if action.get("finished_at") is None:
+                        continue
+                    if action["name"] not in workload.atomics:
+                        workload.atomics[action["name"]] = (
+                            openmetrics.Histogram())
+                    workload.atomics[action["name"]].observe(
+                        action["finished_at"] - action["started_at"])
+
+    def finish_workload(self, workload_uuid):
+        with self._lock:
+            self._workloads[workload_uuid].running = False
+
+    def to_string(self):
+        """Make an OpenMetrics exposition of all metrics."""
+        running = openmetrics.MetricFamily(
+            "rally_workload_running", "gauge",
+            "Whether the workload is running.")
+        iterations = openmetrics.MetricFamily(
+            "rally_iterations", "counter", "Number of finished iterations.")
+        failed = openmetrics.MetricFamily(
+            "rally_failed_iterations", "counter",
+            "Number of failed iterations.")
+        sla = openmetrics.MetricFamily(
+            "rally_workload_sla_passed", "gauge",
+            "Whether SLA checks of the workload pass so far.")
+        durations = openmetrics.MetricFamily(
+            "rally_iteration_duration_seconds", "histogram",
+            "Durations of iterations.", unit="seconds")
+        atomics = openmetrics.MetricFamily(
+            "rally_atomic_action_duration_seconds", "histogram",
+            "Durations of root atomic actions.", unit="seconds")
+
+        with self._lock:
+            for workload in self._workloads.values():
+                running.add(workload.labels, workload.running)
+                iterations.add(workload.labels, workload.iterations)
+                failed.add(workload.labels, workload.failed_iterations)
+                sla.add(workload.labels, workload.sla_passed)
+                durations.add_histogram(workload.labels, workload.durations)
+                for name, histogram in workload.atomics.items():
+                    labels = collections.OrderedDict(workload.labels)
+                    labels["action"] = name
+                    atomics.add_histogram(labels, histogram)
+
+            return openmetrics.to_string(
+                [running, iterations, failed, sla, durations, atomics])
+
+
+class _HTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.server.metrics.to_string().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", openmetrics.CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        LOG.debug("Live metrics endpoint: %s" % (format % args))
+
+
+class MetricsServer(object):
+    """HTTP server of live metrics which runs in a background thread.
+
+    :param endpoint: an address to listen on in "host:port" format. Port 0
+        means any free port
+    :param metrics: an instance of LiveMetrics to serve
+    """
+
+    def __init__(self, endpoint, metrics):
+        host, _sep, port = endpoint.rpartition(":")
+        if not host or not port.isdigit():
+            raise ValueError("Invalid address of live metrics endpoint '%s',"
+                             " 'host:port' is expected." % endpoint)
+        self._address = (host, int(port))
+        self.metrics = metrics
+        self._server = None
+        self._thread = None
+
+    @property
+    def address(self):
+        """A pair of host and port the server listens on."""
+        if self._server:
+            return self._server.server_address[:2]
+        return self._address
+
+    def start(self):
+        self._server = _HTTPServer(self._address, _MetricsHandler)
+        self._server.metrics = self.metrics
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        LOG.info("Live metrics are served at http://%s:%s/metrics"
+                 % self.address)
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
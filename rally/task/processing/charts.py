@@ -394,6 +394,15 @@ class MainStatsTable(Table):
     def __init__(self, *args, **kwargs):
         super(MainStatsTable, self).__init__(*args, **kwargs)
         self.iters_num = self._workload["total_iteration_count"]
+        self._results = None
+
+    def load_results(self, durations):
+        """Use already calculated statistics instead of iterations data.
+
+        :param durations: dict with "atomics" and "total" items, i.e.
+            "durations" item of the workload statistics
+        """
+        self._results = list(durations["atomics"]) + [durations["total"]]
 
     def _initialize_atomic(self, name, root, real_name=None, count=1):
         real_name = real_name or name
@@ -515,6 +524,8 @@ class MainStatsTable(Table):
                 "children": children}
 
     def _get_results(self):
+        if self._results is not None:
+            return self._results
         if self._data:
             # NOTE(andreykurilin): In case when the specific atomic action was
             #   not executed in the first iteration, it will be added to
@@ -13,8 +13,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import base64
 import collections
 import datetime as dt
+import gzip
 import hashlib
 import itertools
 import json
@@ -22,6 +24,7 @@ import json
 from rally.common import objects
 from rally.common.plugin import plugin
 from rally.common import version
+from rally import consts
 from rally import exceptions
 from rally.task.processing import charts
 from rally.task import scenario
@@ -85,13 +88,21 @@ def _process_hooks(hooks):
 
 
 def _process_workload(workload, workload_cfg, pos):
-    main_area = charts.MainStackedAreaChart(workload)
-    main_hist = charts.MainHistogramChart(workload)
+    compacted = workload["statistics"].get("compacted")
+    if compacted:
+        # raw data of the workload was replaced by a sample of iterations,
+        # so charts should be built from the sample, while the whole data
+        # is represented by precalculated statistics
+        sample = dict(workload, total_iteration_count=len(workload["data"]))
+    else:
+        sample = workload
+    main_area = charts.MainStackedAreaChart(sample)
+    main_hist = charts.MainHistogramChart(sample)
     main_stat = charts.MainStatsTable(workload)
     load_profile = charts.LoadProfileChart(workload)
-    atomic_pie = charts.AtomicAvgChart(workload)
-    atomic_area = charts.AtomicStackedAreaChart(workload)
-    atomic_hist = charts.AtomicHistogramChart(workload)
+    atomic_pie = charts.AtomicAvgChart(sample)
+    atomic_area = charts.AtomicStackedAreaChart(sample)
+    atomic_hist = charts.AtomicHistogramChart(sample)
 
     errors = []
     output_errors = []
@@ -111,7 +122,7 @@ def _process_workload(workload, workload_cfg, pos):
             except IndexError:
                 chart_cls = plugin.Plugin.get(additive["chart_plugin"])
                 chart = chart_cls(
-                    workload, title=additive["title"],
+                    sample, title=additive["title"],
                     description=additive.get("description", ""),
                     label=additive.get("label", ""),
                     axis_label=additive.get("axis_label",
@@ -126,9 +137,20 @@ def _process_workload(workload, workload_cfg, pos):
             complete_charts.append(chart_cls.render_complete_data(complete))
         complete_output.append(complete_charts)
 
-        for chart in (main_area, main_hist, main_stat, load_profile,
-                      atomic_pie, atomic_area, atomic_hist):
+        for chart in (main_area, main_hist, atomic_pie, atomic_area,
+                      atomic_hist):
             chart.add_iteration(itr)
+        if not compacted:
+            main_stat.add_iteration(itr)
+            load_profile.add_iteration(itr)
+
+    if compacted:
+        main_stat.load_results(workload["statistics"]["durations"])
+        load_profile_data = compacted["load_profile"]
+        failed_iterations_count = workload["failed_iteration_count"]
+    else:
+        load_profile_data = load_profile.render()
+        failed_iterations_count = len(errors)
 
     cls, method = workload["name"].split(".")
     additive_output = [chart.render() for chart in additive_output_charts]
@@ -142,13 +164,14 @@ def _process_workload(workload, workload_cfg, pos):
         "config": json.dumps(workload_cfg, indent=2),
         "hooks": _process_hooks(workload["hooks"]),
         "description": workload.get("description", ""),
+        "parameters": workload.get("parameters") or None,
         "iterations": {
             "iter": main_area.render(),
             "pie": [("success", (workload["total_iteration_count"]
-                                 - len(errors))),
-                    ("errors", len(errors))],
+                                 - failed_iterations_count)),
+                    ("errors", failed_iterations_count)],
             "histogram": main_hist.render()},
-        "load_profile": load_profile.render(),
+        "load_profile": load_profile_data,
         "atomic": {"histogram": atomic_hist.render(),
                    "iter": atomic_area.render(),
                    "pie": atomic_pie.render()},
@@ -167,21 +190,73 @@ def _process_workload(workload, workload_cfg, pos):
     }
 
 
-def _process_workloads(workloads):
+def _process_workloads(workloads, cache=None, cacheable=()):
+    """Process workloads for the report.
+
+    :param workloads: a list of workloads
+    :param cache: an instance of ReportCache to take processed data of
+        workloads from
+    :param cacheable: UUIDs of workloads which results are final
+    """
     p_workloads = []
     position = collections.defaultdict(lambda: -1)
 
     for workload in workloads:
         name = workload["name"]
         position[name] += 1
-        workload_cfg = objects.Workload.to_task(workload)
-        p_workloads.append(_process_workload(workload, workload_cfg,
-                                             position[name]))
+        key = None
+        if cache and workload.get("uuid") in cacheable:
+            key = cache.make_key(workload, position[name])
+        p_workload = key and cache.get(key)
+        if not p_workload:
+            if not isinstance(workload.get("data", []), list):
+                # raw data is loaded lazily, so it is fetched from the
+                #   database only if the workload is not cached
+                workload = dict(workload, data=list(workload["data"]))
+            workload_cfg = objects.Workload.to_task(workload)
+            p_workload = _process_workload(workload, workload_cfg,
+                                           position[name])
+            if key:
+                cache.set(key, p_workload)
+        p_workloads.append(p_workload)
 
     return sorted(p_workloads,
                   key=lambda r: (r["cls"], r["met"], int(r["pos"])))
 
 
+_FINAL_STATUSES = (consts.TaskStatus.FINISHED, consts.TaskStatus.ABORTED,
+                   consts.TaskStatus.CRASHED)
+
+
+# keys of processed workloads which are required for the task overview and
+#   the navigation of HTML report
+_SUMMARY_KEYS = ("cls", "met", "pos", "name", "runner", "description",
+                 "load_duration", "full_duration", "created_at",
+                 "iterations_count", "sla_success")
+
+
+def _make_lazy(workloads):
+    """Split processed workloads into summaries and compressed details.
+
+    Details of workloads are embedded into the report as base64 of gzipped
+    JSON, so a browser decodes them only when the workload is opened.
+
+    :returns: a tuple of summaries and a list of pairs (id, details)
+    """
+    summaries = []
+    blobs = []
+    for idx, workload in enumerate(workloads):
+        summary = dict((k, workload.pop(k)) for k in _SUMMARY_KEYS)
+        summary["errors_count"] = len(workload["errors"])
+        summary["hooks_count"] = len(workload["hooks"])
+        summary["lazy"] = "workload-data-%s" % idx
+        summaries.append(summary)
+        details = json.dumps(workload).encode("utf-8")
+        blobs.append((summary["lazy"],
+                      base64.b64encode(gzip.compress(details)).decode()))
+    return summaries, blobs
+
+
 def _make_source(tasks):
     # TODO(andreykurilin): include tags someday
     source = collections.OrderedDict([("version", 2)])
@@ -222,28 +297,48 @@ def _make_source(tasks):
     return json.dumps(source, indent=2)
 
 
-def plot(tasks_results, include_libs=False):
+def plot(tasks_results, include_libs=False, lazy=False, cache=None):
     source = _make_source(tasks_results)
     tasks = []
     subtasks = []
     workloads = []
+    # workloads of tasks which are still in progress can get new iterations
+    #   without changing `updated_at`, so they are never cached
+    cacheable = set()
     for task in tasks_results:
         tasks.append(task)
         for subtask in tasks[-1]["subtasks"]:
+            if task.get("status") in _FINAL_STATUSES:
+                cacheable.update(w.get("uuid") for w in subtask["workloads"])
             workloads.extend(subtask.pop("workloads"))
         subtasks.extend(tasks[-1].pop("subtasks"))
 
     template = ui_utils.get_template("task/report.html")
-    data = _process_workloads(workloads)
+    data = _process_workloads(workloads, cache=cache, cacheable=cacheable)
+    blobs = []
+    if lazy:
+        data, blobs = _make_lazy(data)
     return template.render(version=version.version_string(),
                            source=json.dumps(source),
                            data=json.dumps(data),
+                           blobs=blobs,
                            include_libs=include_libs)
 
 
 def trends(tasks, include_libs=False):
+    """Make trends HTML report.
+
+    :param tasks: a list of tasks. Instead of subtasks a task can contain
+        "trend_points" key with summaries of workloads made by
+        `Trends.make_point` (i.e. taken from the trends index)
+    :param include_libs: whether to embed JS/CSS libraries into the report
+    """
     trends = Trends()
     for task in tasks:
+        if "trend_points" in task:
+            for point in task["trend_points"]:
+                trends.add_point(task["uuid"], point)
+            continue
         for workload in itertools.chain(
                 *[s["workloads"] for s in task["subtasks"]]):
             trends.add_result(task["uuid"], workload)
@@ -282,7 +377,15 @@ class Trends(object):
     def _make_hash(self, obj):
         return hashlib.md5(self._to_str(obj).encode("utf8")).hexdigest()
 
-    def add_result(self, task_uuid, workload):
+    def make_point(self, workload):
+        """Make a summary of the workload which is a point of trends.
+
+        The point contains everything what trends need to know about the
+        workload, so it can be stored and used later instead of the
+        workload itself.
+
+        :returns: a JSON-serializable dict
+        """
         workload_cfg = objects.Workload.to_task(workload)
         # NOTE(andreykurilin): workload_cfg is a complite task with one only
         #   one workload. Task format v2 includes such fields like task
@@ -292,22 +395,6 @@ class Trends(object):
         #   workloads with equal configs.
         del workload_cfg["description"]
         w_description = workload_cfg["subtasks"][0].pop("description")
-        key = self._make_hash(workload_cfg)
-        if key not in self._data:
-            self._data[key] = {
-                "actions": {},
-                "sla_failures": 0,
-                "name": workload["name"],
-                "tasks": [],
-                "description": w_description,
-                "config": workload_cfg}
-
-        self._data[key]["tasks"].append(task_uuid)
-        if (self._data[key]["description"]
-                and self._data[key]["description"] != w_description):
-            self._data[key]["description"] = None
-
-        self._data[key]["sla_failures"] += not workload["pass_sla"]
 
         duration_stats = workload["statistics"]["durations"]
         if not workload["start_time"]:
@@ -317,9 +404,55 @@ class Trends(object):
         else:
             ts = int(workload["start_time"] * 1000)
 
+        actions = []
         for action in itertools.chain(duration_stats["atomics"],
                                       [duration_stats["total"]]):
-            action_name = action["display_name"]
+            try:
+                success = float(action["data"]["success"].rstrip("%"))
+            except ValueError:
+                # Got "n/a" for some reason
+                success = 0
+            actions.append({
+                "name": action["display_name"],
+                "success": success,
+                "durations": dict(
+                    (tgt, action["data"][tgt])
+                    for tgt in ("min", "median", "90%ile", "95%ile", "max",
+                                "avg"))})
+
+        return {"key": self._make_hash(workload_cfg),
+                "name": workload["name"],
+                "description": w_description,
+                "parameters": workload.get("parameters") or None,
+                "config": workload_cfg,
+                "pass_sla": workload["pass_sla"],
+                "timestamp": ts,
+                "actions": actions}
+
+    def add_point(self, task_uuid, point):
+        """Add a summary of a workload made by `make_point`."""
+        key = point["key"]
+        if key not in self._data:
+            self._data[key] = {
+                "actions": {},
+                "sla_failures": 0,
+                "name": point["name"],
+                "tasks": [],
+                "description": point["description"],
+                # points stored before matrix workloads have no parameters
+                "parameters": point.get("parameters"),
+                "config": point["config"]}
+
+        self._data[key]["tasks"].append(task_uuid)
+        if (self._data[key]["description"]
+                and self._data[key]["description"] != point["description"]):
+            self._data[key]["description"] = None
+
+        self._data[key]["sla_failures"] += not point["pass_sla"]
+
+        ts = point["timestamp"]
+        for action in point["actions"]:
+            action_name = action["name"]
             # NOTE(amaretskiy): some atomic actions can be missed due to
             #   failures. We can ignore that because we use NVD3 lineChart()
             #   for displaying trends, which is safe for missed points
@@ -328,18 +461,16 @@ class Trends(object):
                     "durations": {"min": [], "median": [], "90%ile": [],
                                   "95%ile": [], "max": [], "avg": []},
                     "success": []}
-            try:
-                success = float(action["data"]["success"].rstrip("%"))
-            except ValueError:
-                # Got "n/a" for some reason
-                success = 0
 
             self._data[key]["actions"][action_name]["success"].append(
-                (ts, success))
+                (ts, action["success"]))
 
             for tgt in ("min", "median", "90%ile", "95%ile", "max", "avg"):
                 d = self._data[key]["actions"][action_name]["durations"]
-                d[tgt].append((ts, action["data"][tgt]))
+                d[tgt].append((ts, action["durations"][tgt]))
+
+    def add_result(self, task_uuid, workload):
+        self.add_point(task_uuid, self.make_point(workload))
 
     def get_data(self):
         trends = []
@@ -364,6 +495,7 @@ class Trends(object):
                      "cls": wload["name"].split(".")[0],
                      "met": wload["name"].split(".")[1],
                      "sla_failures": wload["sla_failures"],
+                     "parameters": wload["parameters"],
                      "config": json.dumps(workload_cfg, indent=2),
                      "actions": []}
 
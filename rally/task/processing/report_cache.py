@@ -0,0 +1,169 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""On-disk cache of processed data of workloads for reports.
+
+Processing of raw iterations is the most expensive part of building HTML
+reports, while the results of finished workloads never change. The cache
+stores the processed data of each workload in a separate gzipped JSON file.
+The key includes the workload UUID, the time of its last update and the
+version of Rally, so stale entries are never used. The least recently used
+entries are evicted when the total size exceeds the limit.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+
+from rally.common import cfg
+from rally.common import logging
+from rally.common import version
+
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+
+REPORT_CACHE_OPTS = [
+    cfg.StrOpt("report_cache_dir", default="~/.rally/cache/reports",
+               help="Directory to cache processed data of workloads for "
+                    "task reports in."),
+    cfg.IntOpt("report_cache_size", default=256, min=0,
+               help="Maximum size of the report cache in MiB. The least "
+                    "recently used entries are removed when the size is "
+                    "exceeded. 0 disables the cache."),
+]
+
+_SUFFIX = ".json.gz"
+
+
+class ReportCache(object):
+    """Cache of processed data of workloads.
+
+    Any failure of reading or writing the cache is logged and ignored, so
+    it never breaks building of a report.
+
+    :param path: a directory to store cached entries in
+    :param max_size: maximum total size of entries in bytes
+    """
+
+    def __init__(self, path=None, max_size=None):
+        self.path = os.path.expanduser(path or CONF.report_cache_dir)
+        if max_size is None:
+            max_size = CONF.report_cache_size * 1024 * 1024
+        self.max_size = max_size
+        # the total size of entries is calculated on the first write
+        self._size = None
+
+    @staticmethod
+    def make_key(workload, *args):
+        """Make a key for processed data of the workload.
+
+        :param workload: a workload which data is processed
+        :param args: other arguments which processed data depends on
+        :returns: a string key or None if the workload cannot be cached
+        """
+        if not workload.get("uuid") or not workload.get("updated_at"):
+            return None
+        parts = [workload["uuid"], str(workload["updated_at"]),
+                 version.version_string()]
+        parts.extend(str(a) for a in args)
+        return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.path, key + _SUFFIX)
+
+    def get(self, key):
+        """Return cached data or None."""
+        if not self.max_size:
+            return None
+        path = self._entry_path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+            # mark the entry as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError) as e:
+            LOG.warning("Failed to read the report cache entry %s: %s"
+                        % (path, e))
+            return None
+        return data
+
+    def set(self, key, data):
+        """Store data and evict old entries if the cache is too big."""
+        if not self.max_size:
+            return
+        path = self._entry_path(key)
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            # write to a temporary file first, so concurrent readers never
+            #   see a partially written entry
+            fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as raw:
+                    with gzip.open(raw, "wt", encoding="utf-8") as f:
+                        json.dump(data, f)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+            if self._size is None:
+                self._size = sum(size for _p, size, _t in self._entries())
+            else:
+                self._size += os.path.getsize(path)
+        except OSError as e:
+            LOG.warning("Failed to write the report cache entry %s: %s"
+                        % (path, e))
+            return
+        if self._size > self.max_size:
+            self.evict()
+
+    def _entries(self):
+        """Yield paths, sizes and last usage times of all entries."""
+        try:
+            names = os.listdir(self.path)
+        except FileNotFoundError:
+            return
+        for name in names:
+            if not name.endswith(_SUFFIX):
+                continue
+            path = os.path.join(self.path, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                # removed by a concurrent process
+                continue
+            yield path, stat.st_size, stat.st_mtime
+
+    def evict(self):
+        """Remove the least recently used entries exceeding the size."""
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        size = sum(e[1] for e in entries)
+        for path, entry_size, _mtime in entries:
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                LOG.warning("Failed to remove the report cache entry %s: %s"
+                            % (path, e))
+                continue
+            size -= entry_size
+        self._size = size
@@ -140,6 +140,10 @@ class ScenarioRunner(plugin.Plugin, validation.ValidatablePluginMixin,
         self.run_duration = 0
         self.batch_size = batch_size
         self.result_batch = []
+        # check the format of only every Nth result, see
+        # result_validation_sample_rate option
+        self.validation_sample_rate = 1
+        self._results_count = 0
 
     @abc.abstractmethod
     def _run_scenario(self, cls, method_name, context, args):
@@ -233,7 +237,9 @@ class ScenarioRunner(plugin.Plugin, validation.ValidatablePluginMixin,
                        ValidationError is raised.
         """
 
-        if not self.task.result_has_valid_schema(result):
+        self._results_count += 1
+        if ((self._results_count - 1) % self.validation_sample_rate == 0
+                and not self.task.result_has_valid_schema(result)):
             LOG.warning(
                 "Task %(task)s | Runner `%(runner)s` is trying to send "
                 "results in wrong format"
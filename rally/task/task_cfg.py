@@ -14,6 +14,7 @@
 
 import collections
 import copy
+import itertools
 
 import jsonschema
 
@@ -29,6 +30,68 @@ LOG = logging.getLogger(__name__)
 CONF = cfg.CONF
 
 
+def _each_value_once(values):
+    """Make combinations where each value of each parameter is met once.
+
+    The first combination consists of the first values of all parameters,
+    then each other value of a parameter is combined with the first values
+    of the rest ones.
+    """
+    first = tuple(v[0] for v in values)
+    yield first
+    for i, param_values in enumerate(values):
+        for value in param_values[1:]:
+            yield first[:i] + (value,) + first[i + 1:]
+
+
+def expand_workload(workload, each_value_once=False):
+    """Iterate over workloads which the workload expands to by its matrix.
+
+    A workload without matrix is yielded as is. Otherwise, copies of the
+    workload are made lazily, one per combination of values of parameters.
+    Values are set by paths of parameters and the copy gets "parameters"
+    property which maps these paths to their values.
+
+    :param workload: a workload configuration made by TaskConfig
+    :param each_value_once: whether to make only combinations which cover
+        each value of each parameter instead of the whole product of values.
+        Its number grows as a sum of numbers of values instead of their
+        product, so it is enough to check values of parameters one by one.
+    """
+    matrix = workload.get("matrix")
+    if not matrix:
+        yield workload
+        return
+
+    mode, parameters = list(matrix.items())[0]
+    if mode == "zip":
+        combinations = zip(*parameters.values())
+    elif each_value_once:
+        combinations = _each_value_once(list(parameters.values()))
+    else:
+        combinations = itertools.product(*parameters.values())
+
+    for values in combinations:
+        expanded = copy.deepcopy(workload)
+        del expanded["matrix"]
+        expanded["parameters"] = collections.OrderedDict(
+            zip(parameters, values))
+        for path, value in expanded["parameters"].items():
+            keys = path.split(".")
+            target = expanded
+            for key in keys[:-1]:
+                if target.get(key) is None:
+                    target[key] = {}
+                target = target[key]
+                if not isinstance(target, dict):
+                    raise exceptions.InvalidTaskException(
+                        "Parameter '%s' of the matrix of workload %s[%s] "
+                        "does not point to a property of an object."
+                        % (path, workload["name"], workload["position"]))
+            target[keys[-1]] = copy.deepcopy(value)
+        yield expanded
+
+
 class TaskConfig(object):
     """Version-aware wrapper around task config."""
 
@@ -120,6 +183,11 @@ class TaskConfig(object):
                     hook_cfg["trigger"] = list(hook_cfg["trigger"].items())[0]
                     wconf["hooks"].append(hook_cfg)
 
+                if "matrix" in wconf:
+                    # paths of parameters are the same for all combinations
+                    #   of values, so it is enough to check the first one
+                    next(expand_workload(wconf))
+
                 workloads.append(wconf)
             sconf["workloads"] = workloads
             self.subtasks.append(sconf)
@@ -264,6 +332,33 @@ class TaskConfig(object):
         "additionalProperties": False
     }
 
+    CONFIG_SCHEMA_V2_MATRIX_PARAMETERS = {
+        "type": "object",
+        "description": "Paths to properties of a workload (starting with "
+                       "'args', 'runner', 'contexts' or 'sla') and lists of "
+                       "their values.",
+        "minProperties": 1,
+        "patternProperties": {
+            r"^(args|runner|contexts|sla)\.[^.]": {
+                "type": "array", "minItems": 1}
+        },
+        "additionalProperties": False
+    }
+
+    CONFIG_SCHEMA_V2_MATRIX = {
+        "type": "object",
+        "description": "Run the workload for each combination of values of "
+                       "parameters (product) or for each set of values with "
+                       "the same index (zip).",
+        "minProperties": 1,
+        "maxProperties": 1,
+        "properties": {
+            "product": CONFIG_SCHEMA_V2_MATRIX_PARAMETERS,
+            "zip": CONFIG_SCHEMA_V2_MATRIX_PARAMETERS
+        },
+        "additionalProperties": False
+    }
+
     CONFIG_SCHEMA_V2_SUBTASK_SIMPLE = {
         "type": "object",
         "$schema": consts.JSON_SCHEMA,
@@ -282,7 +377,8 @@ class TaskConfig(object):
                 "type": "array",
                 "items": CONFIG_SCHEMA_V2_HOOK,
             },
-            "contexts": {"type": "object"}
+            "contexts": {"type": "object"},
+            "matrix": CONFIG_SCHEMA_V2_MATRIX
         },
         "additionalProperties": False,
         "required": ["title", "scenario"],
@@ -313,7 +409,8 @@ class TaskConfig(object):
                             "type": "array",
                             "items": CONFIG_SCHEMA_V2_HOOK,
                         },
-                        "contexts": {"type": "object"}
+                        "contexts": {"type": "object"},
+                        "matrix": CONFIG_SCHEMA_V2_MATRIX
                     },
                     "additionalProperties": False,
                     "required": ["scenario"]
@@ -405,6 +502,20 @@ class TaskConfig(object):
                 raise exceptions.InvalidTaskException(
                     "Subtask #%s. %s" % (i + 1, e))
 
+            for workload in subtask.get("workloads", [subtask]):
+                if subtask.get("run_in_parallel") and "matrix" in workload:
+                    # all combinations of values would be run at once, each
+                    #   with its own runner and contexts
+                    raise exceptions.InvalidTaskException(
+                        "Subtask #%s. Workloads of a subtask which are run "
+                        "in parallel cannot have a matrix." % (i + 1))
+                values = list(workload.get("matrix", {}).get("zip",
+                                                             {}).values())
+                if len(set(len(v) for v in values)) > 1:
+                    raise exceptions.InvalidTaskException(
+                        "Subtask #%s. Lists of values of zipped parameters "
+                        "of a matrix should have the same length." % (i + 1))
+
             if "workloads" not in subtask:
                 workload = copy.deepcopy(subtask)
                 subtask = {"title": workload.pop("title"),
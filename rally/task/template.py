@@ -0,0 +1,146 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Cache of compiled Jinja2 templates of tasks.
+
+The same templates of tasks are often rendered many times with different
+arguments. Parsing a template, looking for its undeclared variables and
+compiling it is much more expensive than rendering, so compiled templates
+are kept in memory by the hash of their content and the directory of
+included templates. Compiled bytecode of templates (including the included
+ones) is also stored on disk, so new processes do not compile the same
+templates again.
+"""
+
+import collections
+import hashlib
+import os
+import threading
+
+from rally.common import cfg
+from rally.common import logging
+
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+
+TEMPLATE_CACHE_OPTS = [
+    cfg.StrOpt("template_cache_dir", default="~/.rally/cache/templates",
+               help="Directory to cache compiled bytecode of templates of "
+                    "tasks in. Empty value means that templates are "
+                    "compiled in each process."),
+]
+
+# the number of compiled templates kept in memory
+CACHE_SIZE = 32
+
+_cache = collections.OrderedDict()
+_lock = threading.Lock()
+
+
+class CompiledTemplate(object):
+    """A compiled template of a task.
+
+    :ivar environment: jinja2.Environment the template is compiled in
+    :ivar template: jinja2.Template ready to be rendered
+    :ivar undeclared: names of variables which are not declared in the
+        template itself
+    """
+
+    def __init__(self, environment, template, undeclared):
+        self.environment = environment
+        self.template = template
+        self.undeclared = undeclared
+
+    def render(self, **kwargs):
+        return self.template.render(**kwargs)
+
+
+def _bytecode_cache():
+    path = None
+    if "template_cache_dir" in CONF:
+        path = CONF.template_cache_dir
+    if not path:
+        return None
+
+    import jinja2
+
+    path = os.path.expanduser(path)
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError as e:
+        LOG.debug("Failed to create the cache of templates %s: %s"
+                  % (path, e))
+        return None
+    return jinja2.FileSystemBytecodeCache(path)
+
+
+def _compile(source, template_dir, template_globals):
+    import jinja2
+    import jinja2.meta
+
+    env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(template_dir, encoding="utf8"),
+        bytecode_cache=_bytecode_cache())
+    env.globals.update(template_globals)
+    undeclared = jinja2.meta.find_undeclared_variables(env.parse(source))
+
+    # NOTE: templates which are not loaded by loaders (i.e. from strings)
+    #   are not stored in the bytecode cache by jinja2, so it is done here.
+    #   A bucket is looked up by the name and the "filename", and the hash
+    #   of the source is used as the name to keep a bucket per template
+    name = hashlib.sha256(source.encode("utf-8")).hexdigest()
+    bucket = None
+    code = None
+    if env.bytecode_cache is not None:
+        bucket = env.bytecode_cache.get_bucket(env, name, template_dir,
+                                               source)
+        code = bucket.code
+    if code is None:
+        code = env.compile(source)
+        if bucket is not None:
+            bucket.code = code
+            try:
+                env.bytecode_cache.set_bucket(bucket)
+            except OSError as e:
+                LOG.debug("Failed to store the compiled template: %s" % e)
+    template = env.template_class.from_code(env, code,
+                                            env.make_globals(None))
+    return CompiledTemplate(env, template, undeclared)
+
+
+def get(source, template_dir, template_globals):
+    """Get a compiled template of a task.
+
+    :param source: a source of the template
+    :param template_dir: a directory to look for included templates in
+    :param template_globals: a dict with global functions of templates. It
+        should not change between calls, since it is not a part of the key
+    :returns: CompiledTemplate instance
+    """
+    key = (hashlib.sha256(source.encode("utf-8")).hexdigest(),
+           os.path.abspath(template_dir))
+    with _lock:
+        compiled = _cache.get(key)
+        if compiled is not None:
+            _cache.move_to_end(key)
+            return compiled
+
+    compiled = _compile(source, template_dir, template_globals)
+    with _lock:
+        _cache[key] = compiled
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return compiled
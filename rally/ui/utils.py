@@ -13,10 +13,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import jinja2
-
 
 def get_template(template):
+    # NOTE: jinja2 is imported only for rendering of reports, not by every
+    #   module which can render them
+    import jinja2
 
     def include_raw_file(file_name):
         try:
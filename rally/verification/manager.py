@@ -20,8 +20,6 @@ import re
 import shutil
 import sys
 
-import pkg_resources
-
 from rally.common.io import subunit_v2
 from rally.common import logging
 from rally.common.plugin import plugin
@@ -283,6 +281,9 @@ class VerifierManager(plugin.Plugin, metaclass=abc.ABCMeta):
                 p for p in f.read().split("\n")
                 if p.strip() and not p.startswith("#")
             ]
+        # NOTE: pkg_resources takes a while to import
+        import pkg_resources
+
         try:
             pkg_resources.require(required_packages)
         except (pkg_resources.DistributionNotFound,
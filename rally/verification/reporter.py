@@ -84,6 +84,9 @@ class VerificationReporter(plugin.Plugin, metaclass=abc.ABCMeta):
             - key "print" - data to print at CLI level
             - key "open" - path to file which should be open in case of
               --open flag
+
+            Reporters which write big reports piece by piece save the file
+            to the destination by themselves and return only "open" key.
         """
 
     @staticmethod
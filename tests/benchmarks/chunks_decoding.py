@@ -0,0 +1,92 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Compare size and decode throughput of workload data chunk formats.
+
+The chunks are decoded the same way as they are loaded from the database,
+i.e. starting from the JSON text stored in `WorkloadData.chunk_data` column.
+
+    python tests/benchmarks/chunks_decoding.py --iterations 1000
+"""
+
+import argparse
+import json
+import random
+import timeit
+
+from rally.common.db import chunks
+
+
+def make_raw_data(iterations, atomics, failure_rate):
+    raw_data = []
+    timestamp = 1500000000.0
+    for i in range(iterations):
+        started_at = timestamp
+        atomic_actions = []
+        for j in range(atomics):
+            duration = random.random()
+            atomic_actions.append(
+                {"name": "action_%s" % j,
+                 "children": [{"name": "action_%s.child" % j,
+                               "children": [],
+                               "started_at": started_at,
+                               "finished_at": started_at + duration / 2}],
+                 "started_at": started_at,
+                 "finished_at": started_at + duration})
+            started_at += duration
+        error = []
+        if random.random() < failure_rate:
+            error = ["TimeoutException", "Timed out after 300 seconds",
+                     "Traceback (most recent call last):\n  ..."]
+        raw_data.append({"timestamp": timestamp,
+                         "duration": started_at - timestamp,
+                         "idle_duration": 0.0,
+                         "error": error,
+                         "output": {"additive": [], "complete": []},
+                         "atomic_actions": atomic_actions})
+        timestamp = started_at
+    return raw_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--iterations", type=int, default=1000,
+                        help="Number of iterations in a chunk.")
+    parser.add_argument("--atomics", type=int, default=3,
+                        help="Number of root atomic actions per iteration.")
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(42)
+    raw_data = make_raw_data(args.iterations, args.atomics,
+                             args.failure_rate)
+
+    print("%-10s %12s %16s %16s" % ("format", "size, KiB", "decode, ms",
+                                    "iterations/s"))
+    for chunk_format in chunks.FORMATS:
+        stored = json.dumps(chunks.encode(raw_data, chunk_format))
+        assert chunks.decode(json.loads(stored)) == raw_data
+
+        def decode():
+            return chunks.decode(json.loads(stored))
+
+        best = min(timeit.repeat(decode, number=1, repeat=args.repeat))
+        print("%-10s %12.1f %16.2f %16.0f" % (
+            chunk_format, len(stored) / 1024.0, best * 1000,
+            args.iterations / best))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure startup time and import time of common CLI commands.
+
+Every command is run in a new interpreter with `-X importtime`, so besides
+the wall time, the total time spent on imports, the number of imported
+modules and the heaviest top-level imports are reported. Commands are run
+against a fresh SQLite database in a temporary HOME, so results do not
+depend on local configuration of Rally.
+
+    python tests/benchmarks/cli_startup.py --runs 5
+    python tests/benchmarks/cli_startup.py --command "deployment list"
+"""
+
+import argparse
+import os
+import shlex
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+DEFAULT_COMMANDS = ["--version", "task list",
+                    "task status 00000000-0000-0000-0000-000000000000",
+                    "verify list-verifiers"]
+
+RALLY = "import sys; from rally.cli import main; sys.exit(main.main())"
+
+
+def run(args, env):
+    """Run rally with arguments and return wall time and import times."""
+    started_at = time.time()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", RALLY]
+                          + args, env=env, stdout=subprocess.DEVNULL,
+                          stderr=subprocess.PIPE, universal_newlines=True)
+    duration = time.time() - started_at
+    imports = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            # the header
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((name.strip(), depth, int(self_us),
+                        int(cumulative_us)))
+    return duration, imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--command", action="append", dest="commands",
+                        help="A command to measure (can be repeated). "
+                             "Default: %s" % ", ".join(DEFAULT_COMMANDS))
+    parser.add_argument("--runs", type=int, default=5,
+                        help="Number of runs of each command.")
+    parser.add_argument("--top", type=int, default=5,
+                        help="Number of the heaviest imports to show.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        env = dict(os.environ, HOME=home)
+        env["PYTHONPATH"] = os.pathsep.join(
+            [os.getcwd()] + env.get("PYTHONPATH", "").split(os.pathsep))
+        env.pop("RALLY_PLUGIN_PATHS", None)
+        os.makedirs(os.path.join(home, ".rally"))
+        with open(os.path.join(home, ".rally", "rally.conf"), "w") as f:
+            f.write("[database]\nconnection = sqlite:///%s\n"
+                    % os.path.join(home, "rally.sqlite"))
+        # create the database and warm up caches (.pyc files, the manifest
+        #   of plugins)
+        run(["db", "create"], env)
+
+        print("%-55s %10s %10s %12s %8s" % ("command", "best, ms",
+                                            "median, ms", "imports, ms",
+                                            "modules"))
+        for command in args.commands or DEFAULT_COMMANDS:
+            argv = shlex.split(command)
+            run(argv, env)
+            results = [run(argv, env) for i in range(args.runs)]
+            durations = [d for d, _ in results]
+            imports = min(results)[1]
+            print("%-55s %10.0f %10.0f %12.0f %8d" % (
+                command, min(durations) * 1000,
+                statistics.median(durations) * 1000,
+                sum(i[2] for i in imports) / 1000.0, len(imports)))
+            top = sorted((i for i in imports if i[1] == 0),
+                         key=lambda i: i[3], reverse=True)[:args.top]
+            for name, _, _, cumulative in top:
+                print("    %-51s %10.0f" % (name, cumulative / 1000.0))
+
+
+if __name__ == "__main__":
+    main()
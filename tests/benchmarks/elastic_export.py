@@ -0,0 +1,89 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure throughput of exporting a task to a stub ElasticSearch cluster.
+
+The stub cluster imitates the latency of processing bulk requests, so the
+effect of pushing chunks in parallel can be seen without a real cluster.
+
+    python tests/benchmarks/elastic_export.py --iterations 20000
+"""
+
+import argparse
+import time
+
+from rally.plugins.task.exporters.elastic import client
+from rally.plugins.task.exporters.elastic import exporter
+from tests.benchmarks import chunks_decoding
+from tests.unit.plugins.task.exporters.elastic import stub_server
+
+
+def make_task(iterations, atomics):
+    workload = {
+        "uuid": "workload-uuid",
+        "task_uuid": "task-uuid",
+        "subtask_uuid": "subtask-uuid",
+        "name": "Dummy.dummy",
+        "description": "",
+        "args": {},
+        "runner_type": "constant",
+        "runner": {"times": iterations},
+        "contexts": {},
+        "start_time": 1500000000.0,
+        "load_duration": 1,
+        "full_duration": 2,
+        "pass_sla": True,
+        "sla_results": {"sla": []},
+        "statistics": {"durations": {"total": {"data": {"success": "100%"}}}},
+        "data": chunks_decoding.make_raw_data(iterations, atomics, 0.05)}
+    return {"uuid": "task-uuid",
+            "env_uuid": "env-uuid",
+            "env_name": "env",
+            "title": "",
+            "description": "",
+            "status": "finished",
+            "pass_sla": True,
+            "tags": [],
+            "subtasks": [{"workloads": [workload]}]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--atomics", type=int, default=3,
+                        help="Number of root atomic actions per iteration.")
+    parser.add_argument("--latency", type=float, default=0.2,
+                        help="Seconds the stub cluster spends on each bulk "
+                             "request.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    task = make_task(args.iterations, args.atomics)
+
+    print("%-8s %12s %12s %14s" % ("workers", "documents", "seconds",
+                                   "documents/s"))
+    for workers in args.workers:
+        client.ElasticSearchClient.WORKERS = workers
+        with stub_server.StubElasticSearch(latency=args.latency) as stub:
+            es_exporter = exporter.ElasticSearchExporter([task], stub.url)
+            started_at = time.time()
+            es_exporter.generate()
+            duration = time.time() - started_at
+        print("%-8s %12s %12.2f %14.0f" % (workers, len(stub.documents),
+                                           duration,
+                                           len(stub.documents) / duration))
+
+
+if __name__ == "__main__":
+    main()
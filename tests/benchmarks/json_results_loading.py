@@ -0,0 +1,109 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Compare memory usage of exporting and loading task results in JSON.
+
+A task with one big workload is exported by JSON exporter (iterations are
+generated on the fly) and then loaded at once and incrementally.
+
+    python tests/benchmarks/json_results_loading.py --iterations 100000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from rally.cli import task_results_loader
+from rally.plugins.task.exporters import json_exporter
+from tests.benchmarks import chunks_decoding
+
+
+def make_task(iterations, atomics):
+    def data():
+        # generate iterations by small portions to not keep them in memory
+        for _ in range(0, iterations, 1000):
+            yield from chunks_decoding.make_raw_data(1000, atomics, 0.05)
+
+    workload = {
+        "uuid": "workload-uuid", "description": "", "hooks": [],
+        "name": "Dummy.dummy", "args": {},
+        "runner_type": "constant", "runner": {"times": iterations},
+        "min_duration": 0, "max_duration": 1, "start_time": 1500000000.0,
+        "load_duration": 1, "full_duration": 2, "statistics": {},
+        "failed_iteration_count": 0, "total_iteration_count": iterations,
+        "created_at": "2017-06-04T05:14:44",
+        "updated_at": "2017-06-04T05:14:44",
+        "contexts": {}, "contexts_results": [], "position": 0,
+        "pass_sla": True, "sla_results": {"sla": []}, "sla": {},
+        "data": data()}
+    return {"uuid": "task-uuid", "title": "", "description": "",
+            "status": "finished", "tags": [], "env_uuid": "env-uuid",
+            "env_name": "env", "created_at": "2017-06-04T05:14:44",
+            "updated_at": "2017-06-04T05:14:44", "pass_sla": True,
+            "subtasks": [{"uuid": "subtask-uuid", "title": "",
+                          "description": "", "status": "finished", "sla": {},
+                          "created_at": "2017-06-04T05:14:44",
+                          "updated_at": "2017-06-04T05:14:44",
+                          "workloads": [workload]}]}
+
+
+def measure(func):
+    tracemalloc.start()
+    started_at = time.time()
+    func()
+    duration = time.time() - started_at
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return duration, peak / 1024.0 / 1024.0
+
+
+def consume(tasks):
+    count = 0
+    for task in tasks:
+        for subtask in task["subtasks"]:
+            for workload in subtask["workloads"]:
+                for _itr in workload["data"]:
+                    count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--iterations", type=int, default=50000)
+    parser.add_argument("--atomics", type=int, default=3,
+                        help="Number of root atomic actions per iteration.")
+    args = parser.parse_args()
+
+    path = tempfile.mktemp(suffix=".json")
+    try:
+        print("%-10s %12s %16s" % ("operation", "seconds", "peak, MiB"))
+        task = make_task(args.iterations, args.atomics)
+        exporter = json_exporter.JSONExporter([task], path)
+        print("%-10s %12.2f %16.1f" % (("export",) + measure(
+            exporter.generate)))
+        print("file size: %.1f MiB" % (os.path.getsize(path) / 1024.0 / 1024))
+
+        for name, load in (("load", task_results_loader.load),
+                           ("iterload", task_results_loader.iterload)):
+            print("%-10s %12.2f %16.1f" % ((name,) + measure(
+                lambda: consume(load(path)))))
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
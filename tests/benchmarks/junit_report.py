@@ -0,0 +1,81 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Compare peak memory and time of building and streaming JUnit-XML reports.
+
+    python tests/benchmarks/junit_report.py --tests 50000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from rally.common.io import junit
+
+
+def add_test_cases(test_suite, tests):
+    for i in range(tests):
+        test_case = test_suite.add_test_case(
+            classname="tempest.api.compute.servers.test_servers.ServersTest",
+            name="test_%s" % i, id="id-%s" % i, time="1.23",
+            timestamp="2017-06-04T05:14:00")
+        if i % 10 == 0:
+            test_case.mark_as_failed("Traceback (most recent call last):\n"
+                                     "  ...\nAssertionError: %s" % i)
+
+
+def build(path, tests):
+    report = junit.JUnitXML()
+    add_test_cases(report.add_test_suite("uuid", time="1", timestamp="0"),
+                   tests)
+    with open(path, "w") as f:
+        f.write(report.to_string())
+
+
+def stream(path, tests):
+    with open(path, "w") as f:
+        with junit.JUnitXMLWriter(f) as writer:
+            add_test_cases(
+                writer.add_test_suite("uuid", time="1", timestamp="0",
+                                      tests=str(tests), skipped="0",
+                                      failures=str((tests + 9) // 10)),
+                tests)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--tests", type=int, default=50000,
+                        help="Number of test cases in the report.")
+    args = parser.parse_args()
+
+    print("%-10s %16s %12s %12s" % ("method", "peak memory, MiB", "time, s",
+                                    "size, MiB"))
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, func in (("build", build), ("stream", stream)):
+            path = os.path.join(tmp, "%s.xml" % name)
+            tracemalloc.start()
+            started_at = time.time()
+            func(path, args.tests)
+            duration = time.time() - started_at
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print("%-10s %16.1f %12.2f %12.1f" % (
+                name, peak / 1024.0 ** 2, duration,
+                os.path.getsize(path) / 1024.0 ** 2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure the cost of looking up plugins by name.
+
+A few thousand plugins are registered in addition to the plugins of Rally,
+then lookups by name (served by the index of configured plugins) are
+compared with a walk over the whole tree of subclasses which every lookup
+did before.
+
+    python tests/benchmarks/plugin_lookup.py --plugins 5000
+"""
+
+import argparse
+import timeit
+
+from rally.common.plugin import plugin
+from rally import plugins
+from rally.task import scenario
+
+
+def make_plugins(count):
+    classes = []
+    for i in range(count):
+        cls = type("BenchmarkScenario%s" % i, (scenario.Scenario,),
+                   {"run": lambda self: None})
+        classes.append(plugin.configure(
+            name="Benchmark.scenario_%s" % i)(cls))
+    return classes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--plugins", type=int, default=5000,
+                        help="Number of additionally registered plugins.")
+    parser.add_argument("--number", type=int, default=1000,
+                        help="Number of lookups per measurement.")
+    args = parser.parse_args()
+
+    plugins.load()
+    classes = make_plugins(args.plugins)
+    print("Registered plugins: %s" % len(plugin.Plugin.get_all(
+        allow_hidden=True)))
+
+    def walk():
+        # what a lookup by name cost before the index
+        return [p for p in scenario.Scenario.get_all(allow_hidden=True)
+                if p.get_name() == "Dummy.dummy"]
+
+    cases = [
+        ("Scenario.get (rally plugin)",
+         lambda: scenario.Scenario.get("Dummy.dummy")),
+        ("Scenario.get (benchmark plugin)",
+         lambda: scenario.Scenario.get("Benchmark.scenario_0")),
+        ("Plugin.get@platform",
+         lambda: plugin.Plugin.get("Dummy.dummy@default")),
+        ("walk over subclasses", walk)]
+
+    print("%-35s %16s" % ("case", "per lookup, us"))
+    for name, func in cases:
+        number = args.number if func is not walk else 10
+        best = min(timeit.repeat(func, number=number, repeat=5))
+        print("%-35s %16.2f" % (name, best / number * 10 ** 6))
+
+    for cls in classes:
+        cls.unregister()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure throughput of checking the format of results of iterations.
+
+Results are checked the same way as scenario runners do it before sending
+them to the consumer, i.e. with and without sampling of checked results.
+
+    python tests/benchmarks/result_validation.py --iterations 10000
+"""
+
+import argparse
+import random
+import timeit
+
+from rally.common import objects
+from rally.task import runner as runner_lib
+from tests.benchmarks import chunks_decoding
+
+
+class _Runner(runner_lib.ScenarioRunner):
+    def _run_scenario(self, cls, method_name, context, args):
+        pass
+
+
+def make_output():
+    return {"additive": [{"title": "Foo", "description": "",
+                          "chart_plugin": "StackedArea",
+                          "data": [["foo", 1.0], ["bar", 2.0]],
+                          "label": "", "axis_label": ""}],
+            "complete": []}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--iterations", type=int, default=10000)
+    parser.add_argument("--atomics", type=int, default=3,
+                        help="Number of root atomic actions per iteration.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(42)
+    results = {
+        "no output": chunks_decoding.make_raw_data(
+            args.iterations, args.atomics, failure_rate=0.05)}
+    results["with output"] = [dict(r, output=make_output())
+                              for r in results["no output"]]
+
+    task = objects.Task(temporary=True)
+
+    print("%-30s %16s %16s" % ("case", "total, ms", "iterations/s"))
+
+    def report(name, func):
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        print("%-30s %16.2f %16.0f" % (name, best * 1000,
+                                       args.iterations / best))
+
+    for name, data in results.items():
+        assert all(task.result_has_valid_schema(r) for r in data)
+
+        def check(data=data):
+            for r in data:
+                task.result_has_valid_schema(r)
+
+        report("check, %s" % name, check)
+
+    for rate in (1, 10, 100):
+        def send(rate=rate):
+            runner = _Runner(task, {}, batch_size=args.iterations)
+            runner.validation_sample_rate = rate
+            for r in results["no output"]:
+                runner._send_result(r)
+
+        report("send, sample rate %s" % rate, send)
+
+
+if __name__ == "__main__":
+    main()
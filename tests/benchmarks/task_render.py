@@ -0,0 +1,126 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure rendering and loading of task templates.
+
+A template with many workloads (and an included template) is rendered with
+different arguments and the result is loaded as YAML, like `rally task
+start` does. The first render in a process compiles the template (or loads
+its bytecode from the cache), next ones reuse the compiled template. It is
+compared with building a new jinja2 environment and the pure Python YAML
+loader on each render, which is what Rally did before.
+
+    python tests/benchmarks/task_render.py --workloads 200 --renders 20
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import yaml
+
+from rally import api
+from rally.cli import yamlutils
+from rally.common import cfg
+from rally.task import template
+
+
+WORKLOAD = """
+  - title: workload {{ i }}
+    scenario:
+      Dummy.dummy:
+        sleep: {{ sleep }}
+    runner:
+      constant:
+        times: {{ times }}
+        concurrency: {{ [concurrency, times] | min }}
+    contexts:
+      {% include "contexts.yaml" %}
+    sla:
+      failure_rate:
+        max: 0
+"""
+
+CONTEXTS = """dummy_context:
+        value: {{ value | default(1) }}"""
+
+
+def make_template(workloads):
+    return ("---\nversion: 2\ntitle: benchmark\nsubtasks:\n"
+            "{% for i in range(" + str(workloads) + ") %}"
+            + WORKLOAD + "{% endfor %}\n")
+
+
+def render_without_cache(source, template_dir, **kwargs):
+    import jinja2.meta
+
+    env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(template_dir, encoding="utf8"))
+    jinja2.meta.find_undeclared_variables(env.parse(source))
+    rendered = env.from_string(source).render(**kwargs)
+
+    class Loader(yaml.SafeLoader):
+        pass
+
+    Loader.add_constructor(yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG,
+                           yamlutils._construct_mapping)
+    return yaml.load(rendered, Loader)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--workloads", type=int, default=200,
+                        help="Number of workloads in the template.")
+    parser.add_argument("--renders", type=int, default=20,
+                        help="Number of renders with different arguments.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "contexts.yaml"), "w") as f:
+            f.write(CONTEXTS)
+        cfg.CONF.set_override("template_cache_dir",
+                              os.path.join(tmp, "cache"))
+        source = make_template(args.workloads)
+        task_api = api._Task(None)
+
+        def render(i):
+            return yamlutils.safe_load(task_api.render_template(
+                source, template_dir=tmp, sleep=0, times=i + 1,
+                concurrency=2))
+
+        def render_old(i):
+            return render_without_cache(source, tmp, sleep=0, times=i + 1,
+                                        concurrency=2)
+
+        assert render(0) == render_old(0)
+        template._cache.clear()
+
+        print("%-40s %12s %12s" % ("case", "first, ms", "next, ms"))
+        for name, func in (("without cache, pure Python YAML", render_old),
+                           ("cached template, LibYAML if available",
+                            render)):
+            durations = []
+            for i in range(args.renders):
+                started_at = time.time()
+                func(i)
+                durations.append(time.time() - started_at)
+            print("%-40s %12.1f %12.1f" % (
+                name, durations[0] * 1000,
+                sum(durations[1:]) / max(len(durations) - 1, 1) * 1000))
+        print("LibYAML is available: %s" % yaml.__with_libyaml__)
+
+
+if __name__ == "__main__":
+    main()
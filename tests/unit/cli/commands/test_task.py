@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from concurrent import futures
 import datetime as dt
 import io
 import json
@@ -21,11 +22,13 @@ import sys
 from unittest import mock
 
 import ddt
+import fixtures
 
 import rally
 from rally import api
 from rally.cli import cliutils
 from rally.cli.commands import task
+from rally.cli import task_results_loader
 from rally.cli import yamlutils as yaml
 from rally import consts
 from rally import exceptions
@@ -677,7 +680,13 @@ class TaskCommandsTestCase(test.TestCase):
                          out="output.html")
         self.task.export.assert_called_once_with(
             self.fake_api, tasks=["uuid"], output_type="trends-html",
-            output_dest="output.html", open_it=False)
+            output_dest="output.html", open_it=False, use_cache=True)
+
+        self.task.export.reset_mock()
+        self.task.trends(self.fake_api, tasks=["uuid"], use_cache=False)
+        self.task.export.assert_called_once_with(
+            self.fake_api, tasks=["uuid"], output_type="trends-html",
+            output_dest=None, open_it=False, use_cache=False)
 
     def test_trends_no_tasks_given(self):
         ret = self.task.trends(self.fake_api, tasks=[],
@@ -690,7 +699,16 @@ class TaskCommandsTestCase(test.TestCase):
                          out="out", open_it=False, out_format="junit-xml")
         self.task.export.assert_called_once_with(
             self.fake_api, tasks="uuid", output_type="junit-xml",
-            output_dest="out", open_it=False, deployment=None
+            output_dest="out", open_it=False, deployment=None,
+            use_cache=True
+        )
+
+        self.task.export.reset_mock()
+        self.task.report(self.fake_api, tasks="uuid", use_cache=False)
+        self.task.export.assert_called_once_with(
+            self.fake_api, tasks="uuid", output_type="html",
+            output_dest=None, open_it=False, deployment=None,
+            use_cache=False
         )
 
     @mock.patch("rally.cli.commands.task.cliutils.print_list")
@@ -707,16 +725,90 @@ class TaskCommandsTestCase(test.TestCase):
         self.task.list(self.fake_api, status="running")
         self.fake_api.task.list.assert_called_once_with(
             deployment=mock_get_global.return_value,
-            status=consts.TaskStatus.RUNNING)
+            status=consts.TaskStatus.RUNNING,
+            fields=task.TaskCommands.LIST_FIELDS,
+            limit=task.TaskCommands.LIST_BATCH_SIZE)
 
         headers = ["UUID", "Deployment name", "Created at", "Load duration",
                    "Status", "Tag(s)"]
 
         mock_print_list.assert_called_once_with(
-            self.fake_api.task.list.return_value, fields=headers,
+            mock.ANY, fields=headers,
             normalize_field_names=True,
-            sortby_index=headers.index("Created at"),
+            sortby_index=None,
             formatters=mock.ANY)
+        self.assertEqual(self.fake_api.task.list.return_value,
+                         list(mock_print_list.call_args[0][0]))
+
+    @mock.patch("rally.cli.commands.task.cliutils.print_list")
+    def test_list_page(self, mock_print_list):
+        created_after = dt.datetime(2007, 1, 1)
+        self.fake_api.task.list.return_value = [
+            {"uuid": "a",
+             "created_at": "2007-01-01T00:00:01",
+             "updated_at": "2007-01-01T00:00:03",
+             "status": consts.TaskStatus.RUNNING,
+             "tags": ["d"],
+             "deployment_name": "some_name"}]
+        self.task.list(self.fake_api, deployment="fake",
+                       all_deployments=True, created_after=created_after,
+                       newest_first=True, limit=20, marker="b")
+        self.fake_api.task.list.assert_called_once_with(
+            created_after=created_after, sort_desc=True, marker="b",
+            limit=20, fields=task.TaskCommands.LIST_FIELDS)
+
+        mock_print_list.assert_called_once_with(
+            mock.ANY, fields=mock.ANY, normalize_field_names=True,
+            sortby_index=None, formatters=mock.ANY)
+        self.assertEqual(self.fake_api.task.list.return_value,
+                         list(mock_print_list.call_args[0][0]))
+
+    def test_list_stream_all_deployments(self):
+        self.task.LIST_BATCH_SIZE = 2
+        pages = [[{"uuid": "a"}, {"uuid": "b"}],
+                 [{"uuid": "c"}, {"uuid": "d"}],
+                 [{"uuid": "e"}]]
+        self.fake_api.task.list.side_effect = pages
+        out = io.StringIO()
+        with mock.patch.object(sys, "stdout", new=out):
+            self.task.list(self.fake_api, deployment="fake",
+                           all_deployments=True, uuids_only=True)
+        self.assertEqual("a\nb\nc\nd\ne\n", out.getvalue())
+        self.assertEqual(
+            [mock.call(limit=2, uuids_only=True),
+             mock.call(limit=2, uuids_only=True, marker="b"),
+             mock.call(limit=2, uuids_only=True, marker="d")],
+            self.fake_api.task.list.call_args_list)
+
+    def test_list_stream_prints_one_table(self):
+        self.task.LIST_BATCH_SIZE = 2
+        self.fake_api.task.list.side_effect = [
+            [{"uuid": "a", "created_at": "2007-01-01T00:00:01",
+              "status": "finished", "tags": [], "task_duration": 1,
+              "deployment_name": "some_name"},
+             {"uuid": "b", "created_at": "2007-01-01T00:00:02",
+              "status": "finished", "tags": [], "task_duration": 1,
+              "deployment_name": "some_name"}],
+            [{"uuid": "c", "created_at": "2007-01-01T00:00:03",
+              "status": "finished", "tags": [], "task_duration": 1,
+              "deployment_name": "some_name"}]]
+        out = io.StringIO()
+        original_print_list = cliutils.print_list
+        with mock.patch.object(task.cliutils, "print_list") as print_list:
+            print_list.side_effect = (
+                lambda *args, **kwargs: original_print_list(
+                    *args, out=out, **kwargs))
+            self.task.list(self.fake_api, deployment="fake")
+
+        self.assertEqual(1, print_list.call_count)
+        self.assertEqual(2, self.fake_api.task.list.call_count)
+        lines = out.getvalue().splitlines()
+        # a single table: the header is printed once and rows keep the order
+        #   in which tasks arrive
+        self.assertEqual(1, len([line for line in lines if "UUID" in line]))
+        self.assertEqual(
+            ["a", "b", "c"],
+            [line.split("|")[1].strip() for line in lines[3:-1]])
 
     @mock.patch("rally.cli.commands.task.envutils.get_global",
                 return_value="123456789")
@@ -734,7 +826,8 @@ class TaskCommandsTestCase(test.TestCase):
             self.assertEqual("a\n", out.getvalue())
         self.fake_api.task.list.assert_called_once_with(
             deployment=mock_get_global.return_value,
-            status=consts.TaskStatus.RUNNING)
+            status=consts.TaskStatus.RUNNING, uuids_only=True,
+            limit=task.TaskCommands.LIST_BATCH_SIZE)
 
     def test_list_wrong_status(self):
         self.assertEqual(1, self.task.list(self.fake_api, deployment="fake",
@@ -744,13 +837,17 @@ class TaskCommandsTestCase(test.TestCase):
         self.fake_api.task.list.return_value = []
         self.assertIsNone(self.task.list(self.fake_api, deployment="fake",
                                          all_deployments=True))
-        self.fake_api.task.list.assert_called_once_with()
+        self.fake_api.task.list.assert_called_once_with(
+            fields=task.TaskCommands.LIST_FIELDS,
+            limit=task.TaskCommands.LIST_BATCH_SIZE)
         self.fake_api.task.list.reset_mock()
 
         self.assertIsNone(self.task.list(self.fake_api, deployment="d",
                                          status=consts.TaskStatus.RUNNING))
         self.fake_api.task.list.assert_called_once_with(
-            deployment="d", status=consts.TaskStatus.RUNNING)
+            deployment="d", status=consts.TaskStatus.RUNNING,
+            fields=task.TaskCommands.LIST_FIELDS,
+            limit=task.TaskCommands.LIST_BATCH_SIZE)
 
     @mock.patch("rally.cli.commands.task.envutils.get_global",
                 return_value="123456789")
@@ -820,6 +917,18 @@ class TaskCommandsTestCase(test.TestCase):
                                     force=force) for task_uuid in task_uuids]
         self.assertTrue(self.fake_api.task.delete.mock_calls == expected_calls)
 
+    def test_compact(self):
+        self.fake_api.task.compact.return_value = 3
+        self.assertIsNone(self.task.compact(self.fake_api, older_than=30,
+                                            tags=["foo"]))
+        self.fake_api.task.compact.assert_called_once_with(
+            older_than=30, tags=["foo"], iterations_limit=1000,
+            batch_size=100)
+
+    def test_compact_without_policy(self):
+        self.assertEqual(1, self.task.compact(self.fake_api))
+        self.assertFalse(self.fake_api.task.compact.called)
+
     @mock.patch("rally.cli.commands.task.cliutils.print_list")
     def test_sla_check(self, mock_print_list):
         task_obj = self._make_task()
@@ -925,6 +1034,16 @@ class TaskCommandsTestCase(test.TestCase):
         )
         mock_open.assert_called_once_with("output_file", "w+")
         mock_fd.return_value.write.assert_called_once_with("content")
+        mock_open_new_tab.assert_called_once_with("output_dest")
+
+        # the file is written by the exporter
+        mock_open.reset_mock()
+        mock_open_new_tab.reset_mock()
+        self.fake_api.task.export.return_value = {"open": "output_dest"}
+        self.task.export(self.fake_api, tasks="uuid", output_type="json",
+                         output_dest="output_dest", open_it=True)
+        self.assertFalse(mock_open.called)
+        mock_open_new_tab.assert_called_once_with("output_dest")
 
         # print
         self.fake_api.task.export.reset_mock()
@@ -1034,18 +1153,18 @@ class TaskCommandsTestCase(test.TestCase):
             mock.call(error_traceback or "No traceback available.")
         ], any_order=False)
 
-    @mock.patch("rally.cli.task_results_loader.load")
+    @mock.patch("rally.cli.task_results_loader.iterload")
     @mock.patch("rally.cli.commands.task.os.path")
-    def test_import_results(self, mock_os_path, mock_load):
+    def test_import_results(self, mock_os_path, mock_iterload):
         mock_os_path.exists.return_value = True
         mock_os_path.expanduser = lambda path: path
-        mock_load.return_value = ["results"]
+        mock_iterload.return_value = iter(["results"])
 
         self.task.import_results(self.fake_api,
                                  "deployment_uuid",
                                  "task_file", tags=["tag"])
 
-        mock_load.assert_called_once_with("task_file")
+        mock_iterload.assert_called_once_with("task_file")
         self.fake_api.task.import_results.assert_called_once_with(
             deployment="deployment_uuid", task_results="results",
             tags=["tag"])
@@ -1058,3 +1177,103 @@ class TaskCommandsTestCase(test.TestCase):
                                      "deployment_uuid",
                                      "task_file", ["tag"])
         )
+
+    @mock.patch("rally.cli.task_results_loader.load")
+    def test_import_bulk(self, mock_load):
+        # worker processes would not see mocks, so use threads instead
+        self.useFixture(fixtures.MonkeyPatch(
+            "rally.cli.commands.task.futures.ProcessPoolExecutor",
+            futures.ThreadPoolExecutor))
+        tempdir = self.useFixture(fixtures.TempDir()).path
+        files = []
+        for name in ("a.json", "b.json", "c.json", "d.json"):
+            files.append(os.path.join(tempdir, "results", name))
+            os.makedirs(os.path.dirname(files[-1]), exist_ok=True)
+            with open(files[-1], "w") as f:
+                f.write(name)
+        state_file = os.path.join(tempdir, "state.jsonl")
+
+        def load(path):
+            name = os.path.basename(path)
+            if name == "b.json":
+                raise task_results_loader.FailedToLoadResults(
+                    source=path, msg="Wrong format")
+            return [{"name": name, "subtasks": []}]
+
+        def import_results(deployment, task_results, tags, validate):
+            if task_results["name"] == "c.json":
+                raise exceptions.RallyException("DB is gone")
+            return {"uuid": "uuid-%s" % task_results["name"]}
+
+        mock_load.side_effect = load
+        self.fake_api.task.import_results.side_effect = import_results
+
+        self.assertEqual(1, self.task.import_bulk(
+            self.fake_api, os.path.join(tempdir, "results"),
+            deployment="deployment", tags=["tag"], workers=2,
+            state_file=state_file))
+
+        self.assertEqual(
+            [mock.call(deployment="deployment",
+                       task_results={"name": name, "subtasks": []},
+                       tags=["tag"], validate=False)
+             for name in ("a.json", "c.json", "d.json")],
+            self.fake_api.task.import_results.call_args_list)
+
+        # only failed files are imported again
+        self.fake_api.task.import_results.reset_mock()
+        self.fake_api.task.import_results.side_effect = None
+        self.fake_api.task.import_results.return_value = {"uuid": "uuid"}
+        mock_load.side_effect = None
+        mock_load.return_value = []
+        self.assertIsNone(self.task.import_bulk(
+            self.fake_api, os.path.join(tempdir, "results", "*.json"),
+            deployment="deployment", state_file=state_file))
+        self.assertEqual([mock.call(files[1]), mock.call(files[2])],
+                         mock_load.call_args_list[-2:])
+
+    @mock.patch("rally.cli.task_results_loader.load")
+    def test_import_bulk_interrupted_in_the_middle_of_file(self, mock_load):
+        self.useFixture(fixtures.MonkeyPatch(
+            "rally.cli.commands.task.futures.ProcessPoolExecutor",
+            futures.ThreadPoolExecutor))
+        tempdir = self.useFixture(fixtures.TempDir()).path
+        task_file = os.path.join(tempdir, "a.json")
+        with open(task_file, "w") as f:
+            f.write("a.json")
+        state_file = os.path.join(tempdir, "state.jsonl")
+        mock_load.return_value = [{"name": name, "subtasks": []}
+                                  for name in ("foo", "bar", "baz")]
+
+        def import_results(deployment, task_results, tags, validate):
+            if task_results["name"] == "bar":
+                raise KeyboardInterrupt()
+            return {"uuid": "uuid-%s" % task_results["name"]}
+
+        self.fake_api.task.import_results.side_effect = import_results
+        self.assertRaises(KeyboardInterrupt, self.task.import_bulk,
+                          self.fake_api, task_file, deployment="deployment",
+                          workers=1, state_file=state_file)
+
+        # the already imported task is not imported again
+        self.fake_api.task.import_results.reset_mock()
+        self.fake_api.task.import_results.side_effect = (
+            lambda task_results, **kw: {"uuid": "uuid-%s"
+                                        % task_results["name"]})
+        self.assertIsNone(self.task.import_bulk(
+            self.fake_api, task_file, deployment="deployment", workers=1,
+            state_file=state_file))
+        self.assertEqual(
+            [mock.call(deployment="deployment",
+                       task_results={"name": name, "subtasks": []},
+                       tags=None, validate=False)
+             for name in ("bar", "baz")],
+            self.fake_api.task.import_results.call_args_list)
+
+        state = task_results_loader.ImportState(state_file)
+        self.assertTrue(state.is_imported(task_file))
+
+    def test_import_bulk_no_files(self):
+        self.assertEqual(1, self.task.import_bulk(
+            self.fake_api, "/not/existing/path/*.json",
+            deployment="deployment"))
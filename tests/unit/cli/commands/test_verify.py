@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime as dt
 import io
 import tempfile
 from unittest import mock
@@ -508,6 +509,13 @@ class VerifyCommandsTestCase(test.TestCase):
         verification = self.verification_data
         self.fake_api.verifier.get.return_value = self.verifier_data
         self.fake_api.verification.get.return_value = verification
+
+        def get_tests(verification_uuid, status=None, detailed=True):
+            return dict((name, test)
+                        for name, test in verification["tests"].items()
+                        if status in (None, test["status"]))
+
+        self.fake_api.verification.get_tests.side_effect = get_tests
         self.fake_api.deployment.get.return_value = {
             "name": self.deployment_name, "uuid": self.deployment_uuid}
 
@@ -576,7 +584,13 @@ class VerifyCommandsTestCase(test.TestCase):
             "--------------------+\n", print_dict_calls[0].getvalue())
 
         self.fake_api.verification.get.assert_called_once_with(
-            verification_uuid=self.verifier_uuid)
+            verification_uuid=self.verifier_uuid, load_tests=False)
+        self.fake_api.verification.get_tests.assert_has_calls(
+            [mock.call(verification_uuid=self.verification_uuid,
+                       detailed=False),
+             mock.call(verification_uuid=self.verification_uuid,
+                       status="fail")])
+        self.fake_api.verification.get_tests.reset_mock()
 
         with mock.patch.object(verify.cliutils, "print_dict",
                                new=print_dict):
@@ -634,7 +648,9 @@ class VerifyCommandsTestCase(test.TestCase):
         )
 
         self.fake_api.verification.get.assert_called_with(
-            verification_uuid=self.verifier_uuid)
+            verification_uuid=self.verifier_uuid, load_tests=False)
+        self.fake_api.verification.get_tests.assert_called_once_with(
+            verification_uuid=self.verification_uuid, detailed=False)
 
     @mock.patch("rally.cli.commands.verify.cliutils.print_list")
     def test_list_empty_verifications(self, mock_print_list):
@@ -646,15 +662,44 @@ class VerifyCommandsTestCase(test.TestCase):
                          self.deployment_uuid, "foo", "bar")
         self.verify.list(self.fake_api)
 
+        fields = verify.VerifyCommands.LIST_FIELDS
         self.fake_api.verification.list.assert_has_calls(
             [mock.call(verifier_id=self.verifier_uuid,
                        deployment_id=self.deployment_uuid,
-                       tags=None, status=None),
+                       tags=None, status=None, fields=fields),
              mock.call(verifier_id=self.verifier_uuid,
                        deployment_id=self.deployment_uuid,
-                       tags="foo", status="bar"),
+                       tags="foo", status="bar", fields=fields),
              mock.call(verifier_id=None, deployment_id=None,
-                       tags=None, status=None)])
+                       tags=None, status=None, fields=fields)])
+
+    @mock.patch("rally.cli.commands.verify.cliutils.print_list")
+    def test_list_page(self, mock_print_list):
+        created_before = dt.datetime(2017, 1, 1)
+        self.fake_api.verification.list.return_value = [
+            self.verification_data, self.verification_data]
+        self.verify.list(self.fake_api, created_before=created_before,
+                         newest_first=True, limit=2, marker="m")
+
+        self.fake_api.verification.list.assert_called_once_with(
+            verifier_id=None, deployment_id=None, tags=None, status=None,
+            fields=verify.VerifyCommands.LIST_FIELDS,
+            created_before=created_before, sort_desc=True, limit=2,
+            marker="m")
+        mock_print_list.assert_called_once_with(
+            self.fake_api.verification.list.return_value, mock.ANY,
+            formatters=mock.ANY, normalize_field_names=True,
+            sortby_index=None)
+
+        # verifiers and deployments are fetched only once
+        formatters = mock_print_list.call_args[1]["formatters"]
+        for v in self.fake_api.verification.list.return_value:
+            formatters["Verifier name"](v)
+            formatters["Deployment name"](v)
+        self.fake_api.verifier.get.assert_called_once_with(
+            verifier_id=self.verification_data["verifier_uuid"])
+        self.fake_api.deployment.get.assert_called_once_with(
+            deployment=self.verification_data["deployment_uuid"])
 
     @mock.patch("rally.cli.commands.verify.cliutils.print_list")
     def test_list(self, mock_print_list):
@@ -722,6 +767,18 @@ class VerifyCommandsTestCase(test.TestCase):
         self.assertFalse(mock_open_new_tab.called)
         self.assertFalse(mock_os.makedirs.called)
 
+        # the report is written by the reporter itself
+        mock_os.reset_mock()
+        self.fake_api.verification.report.return_value = {"open": output_dest}
+
+        self.verify.report(self.fake_api, self.verifier_uuid,
+                           output_type=output_type,
+                           output_dest=output_dest, open_it=True)
+
+        self.assertFalse(mock_open.called)
+        mock_open_new_tab.assert_called_once_with(
+            "file://" + mock_os.path.abspath.return_value)
+
     @mock.patch("rally.cli.commands.verify.VerifyCommands.use")
     @mock.patch("rally.cli.commands.verify.open", create=True)
     @mock.patch("rally.cli.commands.verify.os.path.exists")
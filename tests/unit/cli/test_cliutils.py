@@ -13,6 +13,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import argparse
+import datetime as dt
 import io
 from unittest import mock
 
@@ -201,6 +203,17 @@ class CliUtilsTestCase(test.TestCase):
         else:
             self.assertEqual(expected, formatter(obj))
 
+    @ddt.data(("2017-01-02", dt.datetime(2017, 1, 2)),
+              ("2017-01-02T03:04:05", dt.datetime(2017, 1, 2, 3, 4, 5)),
+              ("2017-01-02 03:04:05", dt.datetime(2017, 1, 2, 3, 4, 5)))
+    @ddt.unpack
+    def test_datetime_type(self, value, expected):
+        self.assertEqual(expected, cliutils.datetime_type(value))
+
+    def test_datetime_type_invalid(self):
+        self.assertRaises(argparse.ArgumentTypeError,
+                          cliutils.datetime_type, "02.01.2017")
+
     def test__methods_of_with_class(self):
         class fake_class(object):
             def public(self):
@@ -282,6 +295,43 @@ class CliUtilsTestCase(test.TestCase):
         self.assertTrue(mock_validate_args.called)
         self.assertEqual(1, ret)
 
+    @mock.patch("rally.api.API.check_db_revision")
+    def test_run_imports_only_requested_categories(
+            self, mock_api_check_db_revision):
+        categories = mock.MagicMock()
+        categories.__iter__.return_value = iter(["foo", "bar"])
+
+        class FooCommands(object):
+
+            def action(self, api):
+                return 42
+
+        categories.__getitem__.return_value = FooCommands
+
+        ret = cliutils.run(["rally", "foo", "action"], categories)
+
+        self.assertEqual(42, ret)
+        categories.__getitem__.assert_has_calls([mock.call("foo")])
+        self.assertNotIn(mock.call("bar"),
+                         categories.__getitem__.call_args_list)
+
+    @mock.patch("rally.cli.cliutils.importlib.import_module")
+    def test_lazy_categories(self, mock_import_module):
+        categories = cliutils.LazyCategories({
+            "task": "rally.cli.commands.task.TaskCommands",
+            "verify": "rally.cli.commands.verify.VerifyCommands"})
+
+        self.assertEqual(["task", "verify"], list(categories))
+        self.assertEqual(2, len(categories))
+        self.assertFalse(mock_import_module.called)
+
+        self.assertEqual(mock_import_module.return_value.TaskCommands,
+                         categories["task"])
+        self.assertEqual(mock_import_module.return_value.TaskCommands,
+                         categories["task"])
+        mock_import_module.assert_called_once_with("rally.cli.commands.task")
+        self.assertRaises(KeyError, categories.__getitem__, "unknown")
+
     @mock.patch("rally.api.API.check_db_revision")
     def test_run_failed_to_open_file(self, mock_api_check_db_revision):
 
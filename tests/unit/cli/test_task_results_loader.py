@@ -13,9 +13,15 @@
 #    under the License.
 
 import collections
+import json
+import os
 from unittest import mock
 
+import ddt
+import fixtures
+
 from rally.cli import task_results_loader
+from rally import exceptions
 from tests.unit import test
 
 PATH = "rally.cli.task_results_loader"
@@ -238,3 +244,239 @@ class LoaderTestCase(test.TestCase):
             ],
             task_results_loader._update_atomic_actions(atomic_actions, 1)
         )
+
+
+@ddt.ddt
+class IterLoadTestCase(test.TestCase):
+
+    def setUp(self):
+        super(IterLoadTestCase, self).setUp()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 "results.json")
+
+    def _make_workload(self, data):
+        # `data` goes last like in the files generated by JSON exporter
+        return collections.OrderedDict([
+            ("description", ""),
+            ("hooks", []),
+            ("contexts", {"xxx": {}}),
+            ("scenario", {"Foo.bar": {"arg": 1}}),
+            ("runner", {"constant": {"times": len(data)}}),
+            ("sla", {}),
+            ("sla_results", {}),
+            ("position", 0),
+            ("pass_sla", True),
+            ("statistics", {}),
+            ("full_duration", 5),
+            ("load_duration", 2),
+            ("total_iteration_count", len(data)),
+            ("failed_iteration_count", 0),
+            ("data", data)])
+
+    def _write(self, results):
+        with open(self.path, "w") as f:
+            json.dump(results, f, indent=4)
+
+    def _consume(self, tasks):
+        # consume everything in the order of the file
+        results = []
+        for task in tasks:
+            subtasks = []
+            for subtask in task["subtasks"]:
+                subtask["workloads"] = [
+                    dict(workload, data=list(workload["data"]))
+                    for workload in subtask["workloads"]]
+                subtasks.append(subtask)
+            task["subtasks"] = subtasks
+            results.append(task)
+        return results
+
+    @ddt.data(True, False)
+    def test_iterload(self, data_last):
+        workloads = [self._make_workload([{"timestamp": i}
+                                          for i in range(3)]),
+                     self._make_workload([])]
+        if not data_last:
+            workloads[0].move_to_end("data", last=False)
+        results = {"info": {"format_version": "1.3"},
+                   "tasks": [{"title": "foo",
+                              "subtasks": [{"title": "bar",
+                                            "workloads": workloads}]},
+                             {"subtasks": [], "title": "empty"}]}
+        self._write(results)
+
+        tasks = task_results_loader.iterload(self.path)
+        task = next(tasks)
+        self.assertEqual("foo", task["title"])
+        self.assertEqual("n/a", task["env_name"])
+        subtask = next(task["subtasks"])
+        self.assertEqual("bar", subtask["title"])
+        workload = next(subtask["workloads"])
+        self.assertEqual("Foo.bar", workload["name"])
+        self.assertEqual({"arg": 1}, workload["args"])
+        self.assertEqual("constant", workload["runner_type"])
+        if data_last:
+            self.assertNotIsInstance(workload["data"], list)
+        self.assertEqual([{"timestamp": i} for i in range(3)],
+                         list(workload["data"]))
+
+        self.assertEqual(task_results_loader.load(self.path),
+                         self._consume(task_results_loader.iterload(
+                             self.path)))
+
+    def test_iterload_skips_not_consumed(self):
+        workload = self._make_workload([{"timestamp": 1}])
+        self._write({"tasks": [
+            {"subtasks": [{"workloads": [workload, workload]}],
+             "title": "foo"},
+            {"title": "bar", "subtasks": []}]})
+
+        tasks = task_results_loader.iterload(self.path)
+        task = next(tasks)
+        next(next(task["subtasks"])["workloads"])
+        self.assertNotIn("title", task)
+        # the rest of the first task is skipped, keys after subtasks are read
+        task2 = next(tasks)
+        self.assertEqual("foo", task["title"])
+        self.assertEqual("bar", task2["title"])
+        self.assertEqual([], list(task2["subtasks"]))
+        self.assertRaises(StopIteration, next, tasks)
+
+    @mock.patch("%s.load" % PATH)
+    def test_iterload_old_format(self, mock_load):
+        mock_load.return_value = [{"title": "foo"}]
+        self._write([])
+
+        self.assertEqual(mock_load.return_value,
+                         list(task_results_loader.iterload(self.path)))
+        mock_load.assert_called_once_with(self.path)
+
+    @ddt.data("{\"tasks\": [{\"subtasks\": [}]}", "{\"tasks\": [] ]", "{}")
+    def test_iterload_malformed(self, content):
+        with open(self.path, "w") as f:
+            f.write(content)
+
+        self.assertRaises(task_results_loader.FailedToLoadResults,
+                          self._consume,
+                          task_results_loader.iterload(self.path))
+
+    def test_iterload_invalid_schema(self):
+        workload = self._make_workload([])
+        workload.pop("runner")
+        self._write({"tasks": [{"subtasks": [{"workloads": [workload]}]}]})
+
+        tasks = task_results_loader.iterload(self.path)
+        e = self.assertRaises(exceptions.RallyException,
+                              self._consume, tasks)
+        self.assertIn("Invalid task result format", e.format_message())
+
+
+class BulkImportTestCase(test.TestCase):
+
+    def setUp(self):
+        super(BulkImportTestCase, self).setUp()
+        self.tempdir = self.useFixture(fixtures.TempDir()).path
+
+    def _touch(self, *parts):
+        path = os.path.join(self.tempdir, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write("[]")
+        return path
+
+    def test_find_files(self):
+        files = [self._touch("b.json"), self._touch("a", "c.json"),
+                 self._touch("a", "d", "e.json")]
+        self._touch("a", "foo.txt")
+
+        self.assertEqual(sorted(files),
+                         task_results_loader.find_files(self.tempdir))
+        self.assertEqual(
+            [files[1], files[2]],
+            task_results_loader.find_files(
+                os.path.join(self.tempdir, "a", "**", "*.json")))
+        self.assertEqual(
+            [], task_results_loader.find_files(
+                os.path.join(self.tempdir, "missing*")))
+
+    @mock.patch("%s.load" % PATH)
+    def test_load_validated(self, mock_load):
+        itr = {"duration": 1.0, "timestamp": 1.0, "idle_duration": 0.0,
+               "output": {"additive": [], "complete": []},
+               "atomic_actions": [], "error": []}
+        mock_load.return_value = [{"subtasks": [
+            {"workloads": [{"name": "Foo.bar", "data": [itr, itr]}]}]}]
+
+        self.assertEqual(("path", mock_load.return_value, None),
+                         task_results_loader.load_validated("path"))
+        mock_load.assert_called_once_with("path")
+
+        mock_load.return_value[0]["subtasks"][0]["workloads"][0]["data"][
+            1] = {"duration": 1}
+        path, results, error = task_results_loader.load_validated("path")
+        self.assertIsNone(results)
+        self.assertIn("Iteration #2 of workload Foo.bar has wrong format",
+                      error)
+
+        mock_load.side_effect = task_results_loader.FailedToLoadResults(
+            source="path", msg="Wrong format")
+        path, results, error = task_results_loader.load_validated("path")
+        self.assertIsNone(results)
+        self.assertIn("Wrong format", error)
+
+    def test_import_state(self):
+        path_1 = self._touch("a.json")
+        path_2 = self._touch("b.json")
+        state_file = os.path.join(self.tempdir, "state", "import.jsonl")
+
+        state = task_results_loader.ImportState(state_file)
+        self.assertFalse(state.is_imported(path_1))
+        state.add(path_1, ["uuid-1"])
+        state.add(path_2, ["uuid-2", "uuid-3"])
+        self.assertTrue(state.is_imported(path_1))
+
+        # simulate an interruption while writing the journal
+        with open(state_file, "a") as f:
+            f.write("{\"path\": ")
+        # a changed file is imported again
+        with open(path_2, "w") as f:
+            f.write("[] ")
+
+        state = task_results_loader.ImportState(state_file)
+        self.assertTrue(state.is_imported(path_1))
+        self.assertFalse(state.is_imported(path_2))
+        state.add(path_2, ["uuid-4"])
+
+        state = task_results_loader.ImportState(state_file)
+        self.assertTrue(state.is_imported(path_2))
+
+    def test_import_state_partially_imported_file(self):
+        path = self._touch("a.json")
+        state_file = os.path.join(self.tempdir, "import.jsonl")
+
+        state = task_results_loader.ImportState(state_file)
+        self.assertEqual([], state.imported_tasks(path))
+        state.add_task(path, "uuid-1")
+        state.add_task(path, "uuid-2")
+        self.assertEqual(["uuid-1", "uuid-2"], state.imported_tasks(path))
+
+        state = task_results_loader.ImportState(state_file)
+        self.assertFalse(state.is_imported(path))
+        self.assertEqual(["uuid-1", "uuid-2"], state.imported_tasks(path))
+        state.add_task(path, "uuid-3")
+        state.add(path, ["uuid-1", "uuid-2", "uuid-3"])
+
+        state = task_results_loader.ImportState(state_file)
+        self.assertTrue(state.is_imported(path))
+        self.assertEqual([], state.imported_tasks(path))
+
+        # tasks of a changed file are imported again
+        with open(path, "w") as f:
+            f.write("[] ")
+        state.add_task(path, "uuid-4")
+        state = task_results_loader.ImportState(state_file)
+        self.assertFalse(state.is_imported(path))
+        self.assertEqual(["uuid-4"], state.imported_tasks(path))
+        with open(path, "w") as f:
+            f.write("[ ]  ")
+        self.assertEqual([], state.imported_tasks(path))
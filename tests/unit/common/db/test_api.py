@@ -16,9 +16,16 @@
 """Tests for db.api layer."""
 
 import datetime as dt
+import os
+import sqlite3
 from unittest import mock
 
+import fixtures
+import sqlalchemy as sa
+
+from rally.common import cfg
 from rally.common import db
+from rally.common.db import chunks
 from rally import consts
 from rally import exceptions
 from tests.unit import test
@@ -33,6 +40,145 @@ class ConnectionTestCase(test.DBTestCase):
         self.assertEqual(drev["revision"], rev)
         self.assertEqual(drev["revision"], drev["current_head"])
 
+    @mock.patch("rally.common.version.version_string")
+    def test_revision_verified(self, mock_version_string):
+        mock_version_string.return_value = "1.0"
+        self.assertFalse(db.schema.is_revision_verified())
+        db.schema.set_revision_verified()
+        self.assertTrue(db.schema.is_revision_verified())
+
+        # rally is upgraded
+        mock_version_string.return_value = "2.0"
+        self.assertFalse(db.schema.is_revision_verified())
+        mock_version_string.return_value = "1.0"
+        self.assertTrue(db.schema.is_revision_verified())
+
+        # another database is used
+        conf = self.useFixture(cfg.fixture.Config())
+        conf.config(connection="sqlite://?foo=bar", group="database")
+        self.assertFalse(db.schema.is_revision_verified())
+        conf.config(connection="sqlite://", group="database")
+        self.assertTrue(db.schema.is_revision_verified())
+
+        # the schema is changed
+        db.schema.schema_stamp("head")
+        self.assertFalse(db.schema.is_revision_verified())
+
+        # the check is disabled
+        db.schema.set_revision_verified()
+        conf.config(db_revision_stamp="")
+        self.assertFalse(db.schema.is_revision_verified())
+
+    def test_revision_verified_sqlite_file(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            "rally.sqlite")
+        conf = self.useFixture(cfg.fixture.Config())
+        conf.config(connection="sqlite:///%s" % path, group="database")
+
+        db.schema.set_revision_verified()
+        self.assertFalse(db.schema.is_revision_verified())
+
+        open(path, "w").close()
+        db.schema.set_revision_verified()
+        self.assertTrue(db.schema.is_revision_verified())
+        with open(os.path.expanduser(conf.conf.db_revision_stamp)) as f:
+            self.assertNotIn(path, f.read())
+
+        # the database is removed
+        os.remove(path)
+        self.assertFalse(db.schema.is_revision_verified())
+
+    @mock.patch("rally.common.db.api.time.sleep")
+    def test_with_session_retries_locked_database(self, mock_sleep):
+        locked = sa.exc.OperationalError(
+            "UPDATE", {}, sqlite3.OperationalError("database is locked"))
+        func = mock.Mock(__name__="func", side_effect=[locked, locked, 1])
+
+        self.assertEqual(1, db.api.with_session(func)("foo"))
+        self.assertEqual(3, func.call_count)
+        self.assertEqual(2, mock_sleep.call_count)
+
+        # the database is locked for too long
+        func.side_effect = [locked] * db.api.LOCKED_RETRIES
+        func.reset_mock()
+        self.assertRaises(sa.exc.OperationalError,
+                          db.api.with_session(func), "foo")
+        self.assertEqual(db.api.LOCKED_RETRIES, func.call_count)
+
+        # other errors are not retried
+        func.side_effect = sa.exc.OperationalError(
+            "UPDATE", {}, sqlite3.OperationalError("no such table"))
+        func.reset_mock()
+        self.assertRaises(sa.exc.OperationalError,
+                          db.api.with_session(func), "foo")
+        self.assertEqual(1, func.call_count)
+
+    @mock.patch("rally.common.db.api.time.sleep")
+    def test_with_session_does_not_retry_after_commit(self, mock_sleep):
+        locked = sa.exc.OperationalError(
+            "INSERT", {}, sqlite3.OperationalError("database is locked"))
+
+        def func(session):
+            session.commit()
+            raise locked
+
+        func = mock.Mock(__name__="func", side_effect=func)
+
+        self.assertRaises(sa.exc.OperationalError,
+                          db.api.with_session(func))
+        self.assertEqual(1, func.call_count)
+        self.assertFalse(mock_sleep.called)
+
+    @mock.patch("rally.common.db.api.time.sleep")
+    def test_task_create_is_retried_once_locked(self, mock_sleep):
+        env = db.env_create(self.id(), "INIT", "", {}, {}, {}, [])
+        locked = sa.exc.OperationalError(
+            "INSERT", {}, sqlite3.OperationalError("database is locked"))
+        bulk_save_objects = sa.orm.Session.bulk_save_objects
+        calls = []
+
+        def save_tags(session, objects):
+            calls.append(objects)
+            if len(calls) == 1:
+                raise locked
+            return bulk_save_objects(session, objects)
+
+        with mock.patch("sqlalchemy.orm.Session.bulk_save_objects",
+                        autospec=True) as mock_bulk_save_objects:
+            # the task is created, but saving of its tags fails
+            mock_bulk_save_objects.side_effect = save_tags
+            task = db.task_create({"env_uuid": env["uuid"],
+                                   "tags": ["foo"]})
+
+        self.assertEqual(2, len(calls))
+        self.assertEqual([task["uuid"]],
+                         [t["uuid"] for t in db.task_list()])
+        self.assertEqual(["foo"], db.task_get(task["uuid"])["tags"])
+
+
+class SerializeTestCase(test.DBTestCase):
+    def test_serialize_primitives(self):
+        self.assertIsNone(db.serialize(None))
+        self.assertEqual(1, db.serialize(1))
+        self.assertEqual("a", db.serialize("a"))
+        self.assertEqual(NOW, db.serialize(NOW))
+        self.assertEqual([1, "a"], db.serialize((1, "a")))
+
+    def test_serialize_dict_is_not_copied(self):
+        data = {"raw": [{"duration": 1}]}
+        self.assertIs(data, db.serialize(data))
+
+    def test_serialize_model(self):
+        env = db.env_create(self.id(), "INIT", "", {"a": {"b": 1}}, {}, {},
+                            [])
+        self.assertIsInstance(env, dict)
+        self.assertIs(dict, type(env["extras"]))
+        self.assertEqual({"a": {"b": 1}}, env["extras"])
+        self.assertEqual([env], db.env_list())
+
+    def test_serialize_wrong_type(self):
+        self.assertRaises(ValueError, db.serialize, {1, 2})
+
 
 class TasksTestCase(test.DBTestCase):
     def setUp(self):
@@ -145,6 +291,53 @@ class TasksTestCase(test.DBTestCase):
         self.assertEqual(task_init, get_uuids(INIT))
         self.assertEqual(sorted(task_finished), get_uuids(FINISHED))
 
+    def test_task_list_pagination(self):
+        tasks = [self._create_task()["uuid"] for i in range(5)]
+
+        def get_uuids(**kwargs):
+            return [t["uuid"] for t in db.task_list(**kwargs)]
+
+        self.assertEqual(tasks, get_uuids())
+        self.assertEqual(tasks[:2], get_uuids(limit=2))
+        self.assertEqual(tasks[2:4], get_uuids(limit=2, marker=tasks[1]))
+        self.assertEqual(tasks[4:], get_uuids(limit=2, marker=tasks[3]))
+        self.assertEqual(tasks[1:3], get_uuids(limit=2, offset=1))
+        self.assertEqual(tasks[::-1], get_uuids(sort_desc=True))
+        self.assertEqual(tasks[2::-1],
+                         get_uuids(sort_desc=True, marker=tasks[3]))
+        self.assertRaises(exceptions.DBRecordNotFound,
+                          get_uuids, marker="non-existing-task")
+
+    def test_task_list_created_range(self):
+        task1 = self._create_task()["uuid"]
+        task2 = self._create_task()["uuid"]
+        db.task_update(task1, {"created_at": dt.datetime(2017, 1, 1)})
+        db.task_update(task2, {"created_at": dt.datetime(2018, 1, 1)})
+
+        def get_uuids(**kwargs):
+            return [t["uuid"] for t in db.task_list(**kwargs)]
+
+        self.assertEqual(
+            [task2], get_uuids(created_after=dt.datetime(2017, 6, 1)))
+        self.assertEqual(
+            [task1], get_uuids(created_before=dt.datetime(2017, 6, 1)))
+        self.assertEqual(
+            [], get_uuids(created_after=dt.datetime(2017, 2, 1),
+                          created_before=dt.datetime(2017, 6, 1)))
+
+    def test_task_list_fields(self):
+        task = self._create_task({"title": "foo"})["uuid"]
+        tasks = db.task_list(fields=["status"])
+        self.assertEqual(1, len(tasks))
+        self.assertEqual(task, tasks[0]["uuid"])
+        self.assertEqual(consts.TaskStatus.INIT, tasks[0]["status"])
+        self.assertEqual([], tasks[0]["tags"])
+        self.assertNotIn("title", tasks[0])
+
+        tasks = db.task_list(uuids_only=True)
+        self.assertEqual([task], [t["uuid"] for t in tasks])
+        self.assertNotIn("status", tasks[0])
+
     def test_task_delete(self):
         task1, task2 = self._create_task()["uuid"], self._create_task()["uuid"]
         db.task_delete(task1)
@@ -237,7 +430,7 @@ class TasksTestCase(test.DBTestCase):
              "task_uuid": task1["uuid"],
              "name": w_name, "description": w_description,
              "id": 1, "position": w_position,
-             "data": [],
+             "data": [], "parameters": {},
              "args": w_args,
              "contexts": w_contexts,
              "contexts_results": w_ctx_results,
@@ -375,6 +568,10 @@ class TasksTestCase(test.DBTestCase):
         self.assertEqual(10, workload["total_iteration_count"])
         self.assertEqual(w_ctx_results, workload["contexts_results"])
 
+        detailed_task = db.task_get(task_id, detailed=True, load_data=False)
+        self.assertNotIn(
+            "data", detailed_task["subtasks"][0]["workloads"][0])
+
         db.task_delete(task_id)
 
 
@@ -388,6 +585,11 @@ class SubtaskTestCase(test.DBTestCase):
         subtask = db.subtask_create(self.task["uuid"], title="foo")
         self.assertEqual("foo", subtask["title"])
         self.assertEqual(self.task["uuid"], subtask["task_uuid"])
+        self.assertFalse(subtask["run_in_parallel"])
+
+        subtask = db.subtask_create(self.task["uuid"], title="foo",
+                                    run_in_parallel=True)
+        self.assertTrue(subtask["run_in_parallel"])
 
     def test_subtask_update(self):
         subtask = db.subtask_create(self.task["uuid"], title="foo")
@@ -435,7 +637,7 @@ class WorkloadTestCase(test.DBTestCase):
              "subtask_uuid": self.subtask_uuid,
              "task_uuid": self.task_uuid,
              "name": w_name, "description": w_description,
-             "id": 1, "position": w_position,
+             "id": 1, "position": w_position, "parameters": {},
              "args": w_args, "hooks": w_hooks,
              "contexts": w_contexts, "contexts_results": [],
              "runner": w_runner, "runner_type": w_runner_type,
@@ -587,6 +789,32 @@ class WorkloadDataTestCase(test.DBTestCase):
         self.assertEqual(self.task_uuid, workload_data["task_uuid"])
         self.assertEqual(self.workload_uuid, workload_data["workload_uuid"])
 
+    def test_workload_data_create_columnar(self):
+        raw_data = [
+            {"timestamp": 1, "duration": 1, "idle_duration": 0,
+             "error": ["KeyError", "msg", "tb"], "atomic_actions": [],
+             "output": {"additive": [], "complete": []}},
+            {"timestamp": 2, "duration": 2, "idle_duration": 0,
+             "error": [], "atomic_actions": [
+                 {"name": "foo", "children": [], "started_at": 2,
+                  "finished_at": 3}],
+             "output": {"additive": [], "complete": []}}]
+        workload_data = db.workload_data_create(
+            self.task_uuid, self.workload_uuid, 0, {"raw": raw_data},
+            chunk_format="columnar")
+        self.assertEqual(2, workload_data["iteration_count"])
+        self.assertEqual(1, workload_data["failed_iteration_count"])
+        self.assertEqual("columnar", workload_data["chunk_data"]["format"])
+
+        # chunks of different formats can be mixed
+        db.workload_data_create(
+            self.task_uuid, self.workload_uuid, 1,
+            {"raw": [{"timestamp": 0, "duration": 0, "error": []}]})
+
+        self.assertEqual(
+            [{"timestamp": 0, "duration": 0, "error": []}] + raw_data,
+            db.workload_data_get_all(self.workload_uuid))
+
     @mock.patch("time.time")
     def test_workload_data_create_empty(self, mock_time):
         mock_time.return_value = 10
@@ -603,6 +831,144 @@ class WorkloadDataTestCase(test.DBTestCase):
         self.assertEqual(self.task_uuid, workload_data["task_uuid"])
         self.assertEqual(self.workload_uuid, workload_data["workload_uuid"])
 
+    def test_workload_data_get_all(self):
+        db.workload_data_create(self.task_uuid, self.workload_uuid, 1,
+                                {"raw": [{"duration": 1, "timestamp": 3}]})
+        db.workload_data_create(self.task_uuid, self.workload_uuid, 0,
+                                {"raw": [{"duration": 1, "timestamp": 1},
+                                         {"duration": 1, "timestamp": 2}]})
+        self.assertEqual([1, 2, 3],
+                         [r["timestamp"] for r in
+                          db.workload_data_get_all(self.workload_uuid)])
+
+    def test_workload_data_chunks(self):
+        self.assertEqual([], db.workload_data_list_chunks(self.workload_uuid))
+        db.workload_data_create(self.task_uuid, self.workload_uuid, 1,
+                                {"raw": [{"duration": 1, "timestamp": 3}]})
+        db.workload_data_create(self.task_uuid, self.workload_uuid, 0,
+                                {"raw": [{"duration": 1, "timestamp": 2},
+                                         {"duration": 1, "timestamp": 1}]},
+                                chunk_format="columnar")
+
+        self.assertEqual([0, 1],
+                         db.workload_data_list_chunks(self.workload_uuid))
+        self.assertEqual([{"duration": 1, "timestamp": 1},
+                          {"duration": 1, "timestamp": 2}],
+                         db.workload_data_get_chunk(self.workload_uuid, 0))
+        self.assertEqual([{"duration": 1, "timestamp": 3}],
+                         db.workload_data_get_chunk(self.workload_uuid, 1))
+        self.assertRaises(exceptions.DBRecordNotFound,
+                          db.workload_data_get_chunk, self.workload_uuid, 2)
+
+    def test_workload_list_for_compaction(self):
+        self.assertEqual([], db.workload_list_for_compaction())
+
+        db.task_update(self.task_uuid,
+                       {"status": consts.TaskStatus.FINISHED,
+                        "tags": ["foo"]})
+        workload2 = db.workload_create(
+            self.task_uuid, self.subtask_uuid, name="atata", description="",
+            position=1, args={}, contexts={}, sla={}, runner={},
+            runner_type="r", hooks={})
+
+        self.assertEqual(
+            [{"id": self.workload["id"], "uuid": self.workload_uuid,
+              "task_uuid": self.task_uuid},
+             {"id": workload2["id"], "uuid": workload2["uuid"],
+              "task_uuid": self.task_uuid}],
+            db.workload_list_for_compaction())
+        self.assertEqual(
+            [workload2["uuid"]],
+            [w["uuid"] for w in db.workload_list_for_compaction(
+                marker=self.workload["id"])])
+        self.assertEqual(
+            [self.workload_uuid],
+            [w["uuid"] for w in db.workload_list_for_compaction(limit=1)])
+        self.assertEqual(
+            2, len(db.workload_list_for_compaction(tags=["foo", "bar"])))
+        self.assertEqual([], db.workload_list_for_compaction(tags=["bar"]))
+        self.assertEqual(
+            [], db.workload_list_for_compaction(
+                created_before=dt.datetime.utcnow() - dt.timedelta(days=1)))
+
+    def test_workload_compact(self):
+        for i in range(3):
+            db.workload_data_create(
+                self.task_uuid, self.workload_uuid, i,
+                {"raw": [{"duration": 1, "timestamp": i, "error": []}]})
+        sample = [{"duration": 1, "timestamp": 0, "error": []},
+                  {"duration": 1, "timestamp": 2, "error": ["E", "m", ""]}]
+
+        with mock.patch("rally.common.db.api.chunks.encode",
+                        wraps=chunks.encode) as mock_encode:
+            self.assertTrue(db.workload_compact(
+                self.workload_uuid, raw_data=sample,
+                statistics={"compacted": {"foo": "bar"}},
+                chunk_format=chunks.COLUMNAR))
+        mock_encode.assert_called_once_with(sample, chunks.COLUMNAR)
+
+        self.assertEqual(sample, db.workload_data_get_all(self.workload_uuid))
+        self.assertEqual([0], db.workload_data_list_chunks(self.workload_uuid))
+        workload = db.workload_get(self.workload_uuid)
+        self.assertEqual({"compacted": {"foo": "bar"}},
+                         workload["statistics"])
+
+        # the already compacted workload is left as is
+        self.assertFalse(db.workload_compact(
+            self.workload_uuid, raw_data=[],
+            statistics={"compacted": {"foo": "baz"}}))
+        self.assertEqual(sample, db.workload_data_get_all(self.workload_uuid))
+        workload = db.workload_get(self.workload_uuid)
+        self.assertEqual({"compacted": {"foo": "bar"}},
+                         workload["statistics"])
+
+    def test_workload_compact_not_found(self):
+        self.assertRaises(exceptions.DBRecordNotFound,
+                          db.workload_compact, "unknown", [], {})
+
+
+class TrendPointsTestCase(test.DBTestCase):
+    def setUp(self):
+        super(TrendPointsTestCase, self).setUp()
+        self.env = db.env_create(self.id(), "INIT", "", {}, {}, {}, [])
+
+    def _create_task(self, workloads_count):
+        task = db.task_create({"env_uuid": self.env["uuid"]})
+        subtask = db.subtask_create(task["uuid"], title="foo")
+        workloads = [
+            db.workload_create(task["uuid"], subtask["uuid"], name="foo",
+                               description="", position=i, args={},
+                               contexts={}, sla={}, hooks=[], runner={},
+                               runner_type="constant")["uuid"]
+            for i in range(workloads_count)]
+        return task["uuid"], workloads
+
+    def test_trend_points_set_and_get(self):
+        task1, workloads1 = self._create_task(2)
+        task2, workloads2 = self._create_task(1)
+        task3, _workloads3 = self._create_task(1)
+
+        def point(key):
+            return {"key": key, "name": "Foo.bar", "actions": []}
+
+        db.trend_points_set(task1, [
+            {"workload_uuid": workloads1[0], "point": point("a")},
+            {"workload_uuid": workloads1[1], "point": point("b")}])
+        db.trend_points_set(task2, [
+            {"workload_uuid": workloads2[0], "point": point("a")}])
+
+        self.assertEqual(
+            {task1: [point("a"), point("b")], task2: [point("a")]},
+            db.trend_points_get([task1, task2, task3]))
+
+        # points are replaced by the new ones
+        db.trend_points_set(task1, [
+            {"workload_uuid": workloads1[1], "point": point("c")}])
+        self.assertEqual({task1: [point("c")]}, db.trend_points_get([task1]))
+
+        db.task_delete(task1)
+        self.assertEqual({}, db.trend_points_get([task1]))
+
 
 class EnvTestCase(test.DBTestCase):
 
@@ -912,6 +1278,105 @@ class VerificationTestCase(test.DBTestCase):
         self.assertEqual(1, len(vs))
         self.assertEqual(v2["uuid"], vs[0]["uuid"])
 
+    def test_verification_list_pagination(self):
+        vs = [self._create_verification(tags=["foo"])["uuid"]
+              for i in range(3)]
+
+        def get_uuids(**kwargs):
+            return [v["uuid"] for v in db.verification_list(**kwargs)]
+
+        self.assertEqual(vs[:2], get_uuids(limit=2))
+        self.assertEqual(vs[2:], get_uuids(limit=2, marker=vs[1]))
+        self.assertEqual(vs[::-1], get_uuids(sort_desc=True))
+        self.assertEqual(
+            vs, get_uuids(created_after=dt.datetime(2000, 1, 1)))
+        self.assertEqual(
+            [], get_uuids(created_before=dt.datetime(2000, 1, 1)))
+
+        verifications = db.verification_list(fields=["status"], limit=1)
+        self.assertEqual(vs[0], verifications[0]["uuid"])
+        self.assertEqual(["foo"], verifications[0]["tags"])
+        self.assertNotIn("tests", verifications[0])
+
+    def test_verification_results(self):
+        v1 = self._create_verification()["uuid"]
+        v2 = self._create_verification()["uuid"]
+        tests = {
+            "test_1": {"name": "test_1", "status": "success",
+                       "duration": "1.5", "tags": ["smoke"]},
+            "test_2": {"name": "test_2", "status": "fail",
+                       "duration": "2", "traceback": "Some traceback"}}
+        v = db.verification_update(v1, status="finished", tests=tests)
+        self.assertEqual("finished", v["status"])
+        self.assertNotIn("tests", v)
+        db.verification_update(
+            v2, tests={"test_1": {"name": "test_1", "status": "fail",
+                                  "duration": "0"}})
+
+        def get(*args, **kwargs):
+            return [(r["verification_uuid"], r["name"], r["result"])
+                    for r in db.verification_results_get(*args, **kwargs)]
+
+        self.assertEqual([(v1, name, tests[name]) for name in sorted(tests)],
+                         get([v1]))
+        self.assertEqual([(v1, "test_2", tests["test_2"])],
+                         get([v1], status="fail"))
+        self.assertEqual(
+            [(v1, "test_1", {"name": "test_1", "status": "success",
+                             "duration": 1.5})],
+            get([v1], status=["success", "skip"], detailed=False))
+        # one test across many runs
+        self.assertEqual(
+            [(v1, "test_1", "success"), (v2, "test_1", "fail")],
+            [(u, n, r["status"]) for u, n, r in get(names=["test_1"])])
+
+        # results are read by batches
+        first = db.verification_results_get([v1], limit=1)
+        self.assertEqual(["test_1"], [r["name"] for r in first])
+        self.assertEqual(
+            ["test_2"],
+            [r["name"] for r in db.verification_results_get(
+                [v1], marker=first[-1]["id"], limit=1)])
+
+        # results are replaced by the new ones
+        db.verification_update(v1, tests={})
+        self.assertEqual([], get([v1]))
+
+        db.verification_delete(v2)
+        self.assertEqual([], get(names=["test_1"]))
+
+    def test_verification_results_are_stored_in_order_of_run(self):
+        v = self._create_verification()["uuid"]
+        tests = {
+            "test_a": {"name": "test_a", "status": "success",
+                       "timestamp": "2001-01-01T00:00:02"},
+            "test_b": {"name": "test_b", "status": "success",
+                       "timestamp": "2001-01-01T00:00:01"},
+            "test_c": {"name": "test_c", "status": "skip"},
+            "test_d": {"name": "test_d", "status": "success",
+                       "timestamp": "2001-01-01T00:00:01"}}
+        db.verification_update(v, tests=tests)
+
+        self.assertEqual(
+            ["test_c", "test_b", "test_d", "test_a"],
+            [r["name"] for r in db.verification_results_get([v])])
+
+    def test_verification_results_of_deleted_env(self):
+        env = db.env_create("another", "INIT", "", {}, {}, {}, [])
+        v1 = self._create_verification(env_uuid=env["uuid"])["uuid"]
+        v2 = self._create_verification()["uuid"]
+        tests = {"test_1": {"name": "test_1", "status": "success"}}
+        db.verification_update(v1, tests=tests)
+        db.verification_update(v2, tests=tests)
+
+        db.env_delete_cascade(env["uuid"])
+
+        self.assertRaises(exceptions.DBRecordNotFound,
+                          db.verification_get, v1)
+        self.assertEqual(
+            [v2], [r["verification_uuid"]
+                   for r in db.verification_results_get(names=["test_1"])])
+
     def test_verification_delete(self):
         v = self._create_verification()
         db.verification_delete(v["uuid"])
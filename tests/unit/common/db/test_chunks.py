@@ -0,0 +1,141 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import copy
+import json
+
+import ddt
+
+from rally.common.db import chunks
+from rally import exceptions
+from tests.unit import test
+
+
+def make_iteration(timestamp, **kwargs):
+    itr = {"timestamp": timestamp,
+           "duration": 1.5,
+           "idle_duration": 0.5,
+           "error": [],
+           "output": {"additive": [], "complete": []},
+           "atomic_actions": [
+               {"name": "foo",
+                "children": [{"name": "bar", "children": [],
+                              "started_at": timestamp,
+                              "finished_at": timestamp + 0.5}],
+                "started_at": timestamp,
+                "finished_at": timestamp + 1},
+               {"name": "foo", "children": [],
+                "started_at": timestamp + 1,
+                "finished_at": timestamp + 1.5}]}
+    itr.update(kwargs)
+    return itr
+
+
+@ddt.ddt
+class ChunksTestCase(test.TestCase):
+
+    def _check_roundtrip(self, raw_data):
+        chunk_data = chunks.encode(copy.deepcopy(raw_data))
+        # the chunk is stored in JSON column
+        chunk_data = json.loads(json.dumps(chunk_data))
+        self.assertEqual(chunks.COLUMNAR, chunks.get_format(chunk_data))
+        self.assertEqual(raw_data, chunks.decode(chunk_data))
+        return chunk_data
+
+    def test_encode_json(self):
+        raw_data = [make_iteration(1)]
+        chunk_data = chunks.encode(raw_data, chunks.JSON)
+        self.assertEqual({"raw": raw_data}, chunk_data)
+        self.assertEqual(chunks.JSON, chunks.get_format(chunk_data))
+        self.assertEqual(raw_data, chunks.decode(chunk_data))
+
+    def test_encode_unknown_format(self):
+        self.assertRaises(exceptions.RallyException,
+                          chunks.encode, [], "xml")
+
+    def test_encode_empty(self):
+        self._check_roundtrip([])
+
+    def test_encode(self):
+        raw_data = [make_iteration(i) for i in range(10)]
+        chunk_data = self._check_roundtrip(raw_data)
+
+        self.assertEqual(10, chunk_data["count"])
+        self.assertEqual(["foo", "bar"], chunk_data["strings"])
+        self.assertEqual({}, chunk_data["errors"])
+        self.assertEqual({}, chunk_data["extra"])
+        self.assertEqual({}, chunk_data["fallback"])
+        self.assertLess(len(json.dumps(chunk_data)),
+                        len(json.dumps({"raw": raw_data})))
+
+    def test_encode_rare_fields(self):
+        raw_data = [
+            make_iteration(1, error=["KeyError", "msg", "traceback"]),
+            make_iteration(2, output={"additive": [{"title": "foo"}],
+                                      "complete": []}),
+            make_iteration(3, custom_key="value"),
+            make_iteration(4, atomic_actions=[
+                {"name": "foo", "children": [], "started_at": 4,
+                 "finished_at": None, "failed": True}]),
+            make_iteration(5, error=["ValueError", "", ""])]
+        chunk_data = self._check_roundtrip(raw_data)
+
+        self.assertEqual(["foo", "bar", "KeyError", "ValueError"],
+                         chunk_data["strings"])
+        self.assertEqual({"0": ["msg", "traceback"], "4": ["", ""]},
+                         chunk_data["errors"])
+        self.assertEqual(["1", "2"], sorted(chunk_data["extra"]))
+        self.assertEqual(1, len(chunk_data["atomic_failed"]))
+        self.assertEqual({}, chunk_data["fallback"])
+
+    @ddt.data({"error": "not a list"},
+              {"error": ["only type"]},
+              {"idle_duration": "1"},
+              {"duration": None},
+              {"atomic_actions": [{"name": "foo", "children": []}]},
+              {"atomic_actions": [{"name": "foo", "children": [],
+                                   "started_at": 1, "finished_at": 2,
+                                   "unknown": 3}]},
+              {"atomic_actions": [{"name": 1, "children": [],
+                                   "started_at": 1, "finished_at": 2}]})
+    def test_encode_fallback(self, values):
+        raw_data = [make_iteration(1), make_iteration(2, **values),
+                    make_iteration(3)]
+        chunk_data = self._check_roundtrip(raw_data)
+        self.assertEqual({"1": raw_data[1]}, chunk_data["fallback"])
+
+    def test_encode_fallback_missing_key(self):
+        raw_data = [make_iteration(1), make_iteration(2)]
+        del raw_data[0]["idle_duration"]
+        chunk_data = self._check_roundtrip(raw_data)
+        self.assertEqual({"0": raw_data[0]}, chunk_data["fallback"])
+
+    def test_get_format_unknown(self):
+        self.assertRaises(exceptions.RallyException,
+                          chunks.get_format, {"format": "xml"})
+        self.assertRaises(exceptions.RallyException,
+                          chunks.get_format,
+                          {"format": chunks.COLUMNAR, "version": 100500})
+
+    def test_convert(self):
+        raw_data = [make_iteration(i) for i in range(3)]
+        json_chunk = {"raw": raw_data}
+
+        self.assertIs(json_chunk, chunks.convert(json_chunk, chunks.JSON))
+        columnar_chunk = chunks.convert(json_chunk, chunks.COLUMNAR)
+        self.assertEqual(chunks.COLUMNAR, chunks.get_format(columnar_chunk))
+        self.assertIs(columnar_chunk,
+                      chunks.convert(columnar_chunk, chunks.COLUMNAR))
+        self.assertEqual(json_chunk,
+                         chunks.convert(columnar_chunk, chunks.JSON))
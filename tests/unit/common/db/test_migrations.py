@@ -2626,3 +2626,107 @@ class MigrationWalkTestCase(rtest.DBTestCase,
                 conn.execute(
                     env_table.delete().where(
                         env_table.c.uuid == d_uuid))
+
+    def _pre_upgrade_dca5d1ac95fb(self, engine):
+        self._dca5d1ac95fb_env_uuid = str(uuid.uuid4())
+        self._dca5d1ac95fb_verifier_uuid = str(uuid.uuid4())
+        self._dca5d1ac95fb_verifications = {
+            str(uuid.uuid4()): {
+                "test_1": {"name": "test_1", "status": "success",
+                           "duration": "0.5", "tags": ["smoke"],
+                           "timestamp": "2001-01-01T00:00:02"},
+                "test_2": {"name": "test_2", "status": "fail",
+                           "duration": "1.5", "tags": [],
+                           "timestamp": "2001-01-01T00:00:01",
+                           "traceback": "Some traceback"}},
+            str(uuid.uuid4()): {}
+        }
+
+        env_table = db_utils.get_table(engine, "envs")
+        verifier_table = db_utils.get_table(engine, "verifiers")
+        verification_table = db_utils.get_table(engine, "verifications")
+
+        with engine.connect() as conn:
+            conn.execute(
+                env_table.insert(),
+                [{
+                    "uuid": self._dca5d1ac95fb_env_uuid,
+                    "name": self._dca5d1ac95fb_env_uuid,
+                    "description": "",
+                    "status": "READY",
+                    "extras": json.dumps({}),
+                    "spec": json.dumps({}),
+                    "config": json.dumps({})
+                }]
+            )
+            conn.execute(
+                verifier_table.insert(),
+                [{
+                    "uuid": self._dca5d1ac95fb_verifier_uuid,
+                    "name": str(uuid.uuid4()),
+                    "type": str(uuid.uuid4()),
+                    "created_at": dt.datetime.utcnow(),
+                    "updated_at": dt.datetime.utcnow(),
+                    "status": consts.VerifierStatus.INIT
+                }]
+            )
+            conn.execute(
+                verification_table.insert(),
+                [{
+                    "uuid": v_uuid,
+                    "env_uuid": self._dca5d1ac95fb_env_uuid,
+                    "verifier_uuid": self._dca5d1ac95fb_verifier_uuid,
+                    "status": consts.VerificationStatus.FINISHED,
+                    "tests": json.dumps(tests),
+                    "created_at": dt.datetime.utcnow(),
+                    "updated_at": dt.datetime.utcnow()
+                } for v_uuid, tests in
+                    self._dca5d1ac95fb_verifications.items()]
+            )
+
+    def _check_dca5d1ac95fb(self, engine, data):
+        env_table = db_utils.get_table(engine, "envs")
+        verifier_table = db_utils.get_table(engine, "verifiers")
+        verification_table = db_utils.get_table(engine, "verifications")
+        results_table = db_utils.get_table(engine, "verification_results")
+
+        with engine.connect() as conn:
+            for v_uuid, tests in self._dca5d1ac95fb_verifications.items():
+                verification = conn.execute(verification_table.select().where(
+                    verification_table.c.uuid == v_uuid)).first()
+                self.assertNotIn("tests", verification)
+
+                results = conn.execute(results_table.select().where(
+                    results_table.c.verification_uuid == v_uuid).order_by(
+                    results_table.c.id)).fetchall()
+                # results are stored in order tests were run
+                self.assertEqual(
+                    [(name, test["status"], float(test["duration"]), test)
+                     for name, test in sorted(
+                         tests.items(),
+                         key=lambda t: (t[1]["timestamp"], t[0]))],
+                    [(r.name, r.status, r.duration, json.loads(r.data))
+                     for r in results])
+
+                conn.execute(results_table.delete().where(
+                    results_table.c.verification_uuid == v_uuid))
+                conn.execute(verification_table.delete().where(
+                    verification_table.c.uuid == v_uuid))
+
+            conn.execute(verifier_table.delete().where(
+                verifier_table.c.uuid == self._dca5d1ac95fb_verifier_uuid))
+            conn.execute(env_table.delete().where(
+                env_table.c.uuid == self._dca5d1ac95fb_env_uuid))
+
+    def _check_ecade935ac58(self, engine, data):
+        self.assertColumnCount(
+            engine, "trend_points",
+            ["id", "task_uuid", "workload_uuid", "config_hash", "name",
+             "data", "created_at", "updated_at"])
+        self.assertIndexMembers(engine, "trend_points",
+                                "trend_point_task_uuid", ["task_uuid"])
+        self.assertIndexMembers(engine, "trend_points",
+                                "trend_point_config_hash", ["config_hash"])
+
+    def _check_0b54f7a1deb3(self, engine, data):
+        self.assertColumnExists(engine, "workloads", "parameters")
@@ -0,0 +1,93 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import io
+import json
+
+import ddt
+
+from rally.common.io import json_stream
+from tests.unit import test
+
+
+DOCUMENT = {"info": {"version": 1.25, "name": "фу"},
+            "items": [{"id": 1234567, "tags": ["a", "b"]},
+                      {"id": -2, "tags": []},
+                      None, True, "str"],
+            "empty": {}, "nothing": []}
+
+
+@ddt.ddt
+class ReaderTestCase(test.TestCase):
+
+    def _read(self, reader):
+        """Read a value entering all containers."""
+        char = reader.peek()
+        if char == "{":
+            return dict((key, self._read(reader))
+                        for key in reader.iter_object())
+        if char == "[":
+            return [self._read(reader) for _ in reader.iter_array()]
+        return reader.read_value()
+
+    @ddt.data(1, 2, 7, 65536)
+    def test_read(self, buffer_size):
+        for indent in (None, 4):
+            reader = json_stream.Reader(
+                io.StringIO(json.dumps(DOCUMENT, indent=indent)),
+                buffer_size=buffer_size)
+            self.assertEqual(DOCUMENT, self._read(reader))
+            reader.check_end()
+
+    @ddt.data(1, 3, 65536)
+    def test_read_value(self, buffer_size):
+        reader = json_stream.Reader(
+            io.StringIO("  [12345, {\"a\": [1.5e3, \"x\"]}]  "),
+            buffer_size=buffer_size)
+        values = [reader.read_value() for _ in reader.iter_array()]
+        self.assertEqual([12345, {"a": [1500.0, "x"]}], values)
+        reader.check_end()
+        self.assertEqual("", reader.peek())
+
+    def test_partial_consumption(self):
+        reader = json_stream.Reader(io.StringIO(json.dumps(DOCUMENT)),
+                                    buffer_size=4)
+        keys = reader.iter_object()
+        for key in keys:
+            if key == "items":
+                break
+            reader.read_value()
+        items = reader.iter_array()
+        next(items)
+        self.assertEqual({"id": 1234567, "tags": ["a", "b"]},
+                         reader.read_value())
+        next(items)
+        self.assertEqual({"id": -2, "tags": []}, reader.read_value())
+        for _ in items:
+            reader.read_value()
+        # the rest of the object
+        self.assertEqual({"empty": {}, "nothing": []},
+                         dict((k, reader.read_value()) for k in keys))
+
+    @ddt.data("[1, 2", "[1 2]", "{\"a\" 1}", "{1: 2}", "[1, }", "[tru]",
+              "{\"a\": \"b}")
+    def test_malformed(self, document):
+        reader = json_stream.Reader(io.StringIO(document), buffer_size=2)
+        self.assertRaises(ValueError, self._read, reader)
+
+    def test_check_end(self):
+        reader = json_stream.Reader(io.StringIO("[] []"))
+        self.assertEqual([], self._read(reader))
+        e = self.assertRaises(ValueError, reader.check_end)
+        self.assertEqual("Extra data: char 3", str(e))
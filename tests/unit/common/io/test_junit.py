@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import io
 from unittest import mock
 
 from rally.common.io import junit
@@ -59,3 +60,45 @@ class JUnitTestCase(test.TestCase):
 </testsuites>
 """
         self.assertEqual(expected, str(j))
+
+    def test_writer(self):
+        def fill(test_suite):
+            test_suite.add_test_case(classname="Foo", name="Bar<&>",
+                                     time="3.14")
+            t = test_suite.add_test_case(classname="Foo", name="Baz",
+                                         time="13.37", id="id-1")
+            t.mark_as_failed("fail <message>")
+            t = test_suite.add_test_case(classname="Foo", name="Qux")
+            t.mark_as_xfail("reason", "Traceback:\nfoo")
+            t = test_suite.add_test_case(classname="Foo", name="Quux")
+            t.mark_as_skipped(None)
+
+        j = junit.JUnitXML()
+        fill(j.add_test_suite("uuid1", time="58.51", timestamp="3"))
+        j.add_test_suite("uuid2", time="0", timestamp="4")
+        fill(j.add_test_suite("uuid3", time="1", timestamp="5"))
+
+        stream = io.StringIO()
+        with junit.JUnitXMLWriter(stream) as writer:
+            fill(writer.add_test_suite("uuid1", time="58.51", timestamp="3",
+                                       tests="4", skipped="1",
+                                       failures="1"))
+            writer.add_test_suite("uuid2", time="0", timestamp="4",
+                                  tests="0", skipped="0", failures="0")
+            fill(writer.add_test_suite("uuid3", time="1", timestamp="5",
+                                       tests="4", skipped="1",
+                                       failures="1"))
+
+        self.assertEqual(j.to_string(), stream.getvalue())
+
+    def test_writer_without_test_suites(self):
+        stream = io.StringIO()
+        writer = junit.JUnitXMLWriter(stream)
+        # test cases are written to the stream while they are added
+        self.assertEqual(
+            "<testsuites>\n"
+            "  <!--Report is generated by Rally VERSION at TIME-->",
+            stream.getvalue())
+        writer.close()
+        writer.close()
+        self.assertEqual(str(junit.JUnitXML()), stream.getvalue())
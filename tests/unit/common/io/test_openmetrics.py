@@ -0,0 +1,86 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+
+import ddt
+
+from rally.common.io import openmetrics
+from tests.unit import test
+
+
+@ddt.ddt
+class OpenMetricsTestCase(test.TestCase):
+
+    @ddt.data(("foo", "foo"),
+              ("a \"b\" c", "a \\\"b\\\" c"),
+              ("C:\\path\nnext", "C:\\\\path\\nnext"),
+              (42, "42"))
+    @ddt.unpack
+    def test_escape(self, value, expected):
+        self.assertEqual(expected, openmetrics.escape(value))
+
+    @ddt.data((True, "1"), (False, "0"), (42, "42"), (0.5, "0.5"),
+              (2.0, "2.0"), (float("inf"), "+Inf"), (float("-inf"), "-Inf"),
+              (float("nan"), "NaN"))
+    @ddt.unpack
+    def test_format_value(self, value, expected):
+        self.assertEqual(expected, openmetrics.format_value(value))
+
+    def test_metric_family(self):
+        self.assertRaises(ValueError, openmetrics.MetricFamily,
+                          "foo", "summary", "Foo.")
+        self.assertRaises(ValueError, openmetrics.MetricFamily,
+                          "foo", "gauge", "Foo.", unit="seconds")
+
+        gauge = openmetrics.MetricFamily("foo_seconds", "gauge", "Foo.",
+                                         unit="seconds")
+        gauge.add(collections.OrderedDict([("a", "x"), ("b", "y\"")]), 1.5)
+        gauge.add({}, 2)
+        counter = openmetrics.MetricFamily("bar", "counter", "Bar\nbaz.")
+        counter.add({"a": "x"}, 3)
+        empty = openmetrics.MetricFamily("baz", "gauge", "Baz.")
+
+        self.assertEqual(
+            "# TYPE foo_seconds gauge\n"
+            "# UNIT foo_seconds seconds\n"
+            "# HELP foo_seconds Foo.\n"
+            "foo_seconds{a=\"x\",b=\"y\\\"\"} 1.5\n"
+            "foo_seconds 2\n"
+            "# TYPE bar counter\n"
+            "# HELP bar Bar\\nbaz.\n"
+            "bar_total{a=\"x\"} 3\n"
+            "# EOF\n",
+            openmetrics.to_string([gauge, counter, empty]))
+
+    def test_histogram(self):
+        histogram = openmetrics.Histogram(buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value)
+        self.assertEqual([2, 1, 1], histogram.counts)
+        self.assertEqual(4, histogram.count)
+        self.assertEqual(3.65, histogram.sum)
+
+        family = openmetrics.MetricFamily("foo", "histogram", "Foo.")
+        family.add_histogram({"a": "x"}, histogram)
+        self.assertEqual(
+            "# TYPE foo histogram\n"
+            "# HELP foo Foo.\n"
+            "foo_bucket{a=\"x\",le=\"0.1\"} 2\n"
+            "foo_bucket{a=\"x\",le=\"1.0\"} 3\n"
+            "foo_bucket{a=\"x\",le=\"+Inf\"} 4\n"
+            "foo_count{a=\"x\"} 4\n"
+            "foo_sum{a=\"x\"} 3.65\n"
+            "# EOF\n",
+            openmetrics.to_string([family]))
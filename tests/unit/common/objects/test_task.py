@@ -16,6 +16,7 @@
 """Tests for db.task layer."""
 
 import collections
+import copy
 import datetime as dt
 from unittest import mock
 
@@ -65,7 +66,7 @@ class TaskTestCase(test.TestCase):
         mock_task_get.return_value = self.task
         task = objects.Task.get(self.task["uuid"])
         mock_task_get.assert_called_once_with(self.task["uuid"],
-                                              detailed=False)
+                                              detailed=False, load_data=True)
         self.assertEqual(task["uuid"], self.task["uuid"])
 
     @mock.patch("rally.common.objects.task.db.task_get_status")
@@ -106,6 +107,19 @@ class TaskTestCase(test.TestCase):
         mock_task_delete.assert_called_once_with(
             self.task["uuid"], status=consts.TaskStatus.FINISHED)
 
+    @mock.patch("rally.common.objects.task.db.trend_points_set")
+    def test_set_trend_points(self, mock_trend_points_set):
+        objects.Task.set_trend_points(self.task["uuid"], ["point"])
+        mock_trend_points_set.assert_called_once_with(
+            self.task["uuid"], ["point"])
+
+    @mock.patch("rally.common.objects.task.db.trend_points_get")
+    def test_get_trend_points(self, mock_trend_points_get):
+        self.assertEqual(
+            mock_trend_points_get.return_value,
+            objects.Task.get_trend_points([self.task["uuid"]]))
+        mock_trend_points_get.assert_called_once_with([self.task["uuid"]])
+
     @mock.patch("rally.common.objects.task.db.task_list",
                 return_value=[{"uuid": "a",
                                "created_at": "b",
@@ -196,9 +210,24 @@ class TaskTestCase(test.TestCase):
             "created_at": dt.datetime.now(),
             "updated_at": dt.datetime.now()}]}
         task_detailed = objects.Task.get("task_id", detailed=True)
-        mock_task_get.assert_called_once_with("task_id", detailed=True)
+        mock_task_get.assert_called_once_with("task_id", detailed=True,
+                                              load_data=True)
         self.assertEqual(mock_task_get.return_value, task_detailed.task)
 
+    @mock.patch("rally.common.db.api.task_get")
+    def test_get_lazy_data(self, mock_task_get):
+        mock_task_get.return_value = {
+            "subtasks": [{"workloads": [{"uuid": "w1"}, {"uuid": "w2"}]}]}
+
+        task = objects.Task.get("task_id", detailed=True, lazy_data=True)
+
+        mock_task_get.assert_called_once_with("task_id", detailed=True,
+                                              load_data=False)
+        workloads = task["subtasks"][0]["workloads"]
+        self.assertIsInstance(workloads[0]["data"], objects.WorkloadRawData)
+        self.assertEqual("w1", workloads[0]["data"].workload_uuid)
+        self.assertEqual("w2", workloads[1]["data"].workload_uuid)
+
     @mock.patch("rally.common.objects.task.db.task_update")
     def test_set_failed(self, mock_task_update):
         mock_task_update.return_value = self.task
@@ -212,12 +241,21 @@ class TaskTestCase(test.TestCase):
                                    "trace": "foo_trace"}},
         )
 
+    @mock.patch("rally.common.objects.task.db.task_update")
+    def test_set_validation_duration(self, mock_task_update):
+        mock_task_update.return_value = self.task
+        task = objects.Task(task=self.task)
+        task.set_validation_duration(1.5)
+        mock_task_update.assert_called_once_with(
+            self.task["uuid"], {"validation_duration": 1.5})
+
     @mock.patch("rally.common.objects.task.Subtask")
     def test_add_subtask(self, mock_subtask):
         task = objects.Task(task=self.task)
         subtask = task.add_subtask(title="foo")
         mock_subtask.assert_called_once_with(
-            self.task["uuid"], title="foo", contexts=None, description=None)
+            self.task["uuid"], title="foo", contexts=None, description=None,
+            run_in_parallel=False)
         self.assertIs(subtask, mock_subtask.return_value)
 
     @ddt.data(
@@ -388,6 +426,31 @@ class TaskTestCase(test.TestCase):
                 [mock.call(*args) for args in validate_output_calls],
                 any_order=True)
 
+    @mock.patch("rally.common.objects.task.charts.validate_output")
+    def test_check_result(self, mock_validate_output):
+        def action(name, children=(), finished_at=2.0):
+            return {"name": name, "started_at": 1.0,
+                    "finished_at": finished_at, "children": list(children)}
+
+        result = {"duration": 1.0, "timestamp": 1.0, "idle_duration": 1.0,
+                  "error": [], "output": {"additive": [], "complete": []},
+                  "atomic_actions": [
+                      action("a", [action("b", [action("c")])]),
+                      action("d")]}
+        expected = copy.deepcopy(result)
+        self.assertIsNone(objects.task.check_result(result))
+        # the result is not modified and output is not checked if empty
+        self.assertEqual(expected, result)
+        self.assertFalse(mock_validate_output.called)
+
+        # deeply nested children are checked
+        result["atomic_actions"][0]["children"][0]["children"].append(
+            action("e", finished_at=None))
+        self.assertEqual(
+            "Atomic action %s has wrong type '%s', should be 'float'"
+            % (action("e", finished_at=None), type(None)),
+            objects.task.check_result(result))
+
 
 class SubtaskTestCase(test.TestCase):
 
@@ -404,7 +467,8 @@ class SubtaskTestCase(test.TestCase):
         mock_subtask_create.return_value = self.subtask
         subtask = objects.Subtask("bar", title="foo")
         mock_subtask_create.assert_called_once_with(
-            "bar", title="foo", contexts=None, description=None)
+            "bar", title="foo", contexts=None, description=None,
+            run_in_parallel=False)
         self.assertEqual(subtask["uuid"], self.subtask["uuid"])
 
     @mock.patch("rally.common.objects.task.db.subtask_update")
@@ -442,10 +506,54 @@ class SubtaskTestCase(test.TestCase):
             description=description, position=position,
             runner_type=runner_type, runner=runner,
             contexts=contexts, sla=sla, args=args,
-            hooks=[{"config": h} for h in hooks])
+            hooks=[{"config": h} for h in hooks], parameters=None)
         self.assertIs(workload, mock_workload.return_value)
 
 
+class WorkloadRawDataTestCase(test.TestCase):
+
+    @mock.patch("rally.common.objects.task.db.workload_data_get_chunk")
+    @mock.patch("rally.common.objects.task.db.workload_data_list_chunks")
+    def test_iter(self, mock_workload_data_list_chunks,
+                  mock_workload_data_get_chunk):
+        mock_workload_data_list_chunks.return_value = [0, 1]
+        mock_workload_data_get_chunk.side_effect = [
+            [{"timestamp": 1}, {"timestamp": 2}], [{"timestamp": 3}],
+            [{"timestamp": 1}, {"timestamp": 2}], [{"timestamp": 3}]]
+        data = objects.WorkloadRawData("uuid")
+
+        self.assertEqual([{"timestamp": 1}, {"timestamp": 2},
+                          {"timestamp": 3}], list(data))
+        self.assertEqual([mock.call("uuid", 0), mock.call("uuid", 1)],
+                         mock_workload_data_get_chunk.call_args_list)
+
+        # every iteration loads data again
+        self.assertEqual(3, len(list(data)))
+        self.assertEqual([mock.call("uuid"), mock.call("uuid")],
+                         mock_workload_data_list_chunks.call_args_list)
+        self.assertEqual(4, mock_workload_data_get_chunk.call_count)
+
+    @mock.patch("rally.common.objects.task.db.workload_data_get_chunk")
+    @mock.patch("rally.common.objects.task.db.workload_data_list_chunks")
+    def test_iter_overlapped_chunks(self, mock_workload_data_list_chunks,
+                                    mock_workload_data_get_chunk):
+        # a long iteration which started first finished last, so it is
+        #   stored in the last chunk
+        chunks = {0: [{"timestamp": 2, "duration": 1},
+                      {"timestamp": 3, "duration": 1}],
+                  1: [{"timestamp": 4, "duration": 1},
+                      {"timestamp": 5, "duration": 1}],
+                  2: [{"timestamp": 1, "duration": 10},
+                      {"timestamp": 6, "duration": 1}]}
+        mock_workload_data_list_chunks.return_value = [0, 1, 2]
+        mock_workload_data_get_chunk.side_effect = (
+            lambda uuid, chunk_order: chunks[chunk_order])
+
+        self.assertEqual(
+            [1, 2, 3, 4, 5, 6],
+            [i["timestamp"] for i in objects.WorkloadRawData("uuid")])
+
+
 class WorkloadTestCase(test.TestCase):
 
     def setUp(self):
@@ -456,6 +564,74 @@ class WorkloadTestCase(test.TestCase):
             "uuid": "00ef46a2-c5b8-4aea-a5ca-0f54a10cbca3",
         }
 
+    @mock.patch("rally.common.objects.task.db.workload_list_for_compaction")
+    def test_list_for_compaction(self, mock_workload_list_for_compaction):
+        self.assertEqual(
+            mock_workload_list_for_compaction.return_value,
+            objects.Workload.list_for_compaction(tags=["foo"], marker=3))
+        mock_workload_list_for_compaction.assert_called_once_with(
+            created_before=None, tags=["foo"], marker=3, limit=100)
+
+    @mock.patch("rally.common.objects.task.db.workload_compact")
+    @mock.patch("rally.common.objects.task.db.workload_data_get_chunk")
+    @mock.patch("rally.common.objects.task.db.workload_data_list_chunks")
+    @mock.patch("rally.common.objects.task.db.workload_get")
+    def test_compact(self, mock_workload_get,
+                     mock_workload_data_list_chunks,
+                     mock_workload_data_get_chunk, mock_workload_compact):
+        mock_workload_get.return_value = {
+            "total_iteration_count": 10, "load_duration": 10,
+            "start_time": 0, "statistics": {"durations": {"foo": "bar"}}}
+        data = [
+            {"timestamp": i, "duration": i / 10.0, "idle_duration": 0,
+             "error": ["E", "msg", "trace"] if i % 3 == 0 else []}
+            for i in range(10)]
+        mock_workload_data_list_chunks.return_value = [0, 1]
+        mock_workload_data_get_chunk.side_effect = (
+            lambda uuid, chunk_order: data[chunk_order::2])
+        mock_workload_compact.return_value = True
+
+        self.assertTrue(objects.Workload.compact("uuid", iterations_limit=4,
+                                                 chunk_format="columnar"))
+
+        mock_workload_compact.assert_called_once_with(
+            "uuid", raw_data=mock.ANY, statistics=mock.ANY,
+            chunk_format="columnar")
+        # raw data is read chunk by chunk: the first iteration for the load
+        #   profile, then the sketch and the sample passes
+        self.assertEqual(6, mock_workload_data_get_chunk.call_count)
+        kwargs = mock_workload_compact.call_args[1]
+        self.assertEqual([0, 2, 5, 7],
+                         [itr["timestamp"] for itr in kwargs["raw_data"]])
+        self.assertEqual(["E", "msg", ""], kwargs["raw_data"][0]["error"])
+        # original data should not be modified
+        self.assertEqual(["E", "msg", "trace"], data[0]["error"])
+        compacted = kwargs["statistics"].pop("compacted")
+        self.assertEqual({"durations": {"foo": "bar"}}, kwargs["statistics"])
+        self.assertEqual(10, compacted["iterations_count"])
+        self.assertEqual(4, compacted["stored_iterations_count"])
+        self.assertEqual({"E": 4}, compacted["errors"])
+        self.assertEqual(101, len(compacted["duration_quantiles"]))
+        self.assertEqual(0.0, compacted["duration_quantiles"][0])
+        self.assertEqual(0.9, compacted["duration_quantiles"][-1])
+        self.assertEqual("parallel iterations",
+                         compacted["load_profile"][0][0])
+
+    @mock.patch("rally.common.objects.task.db.workload_compact",
+                return_value=False)
+    @mock.patch("rally.common.objects.task.db.workload_data_list_chunks",
+                return_value=[])
+    @mock.patch("rally.common.objects.task.db.workload_get")
+    def test_compact_already_compacted(self, mock_workload_get,
+                                       mock_workload_data_list_chunks,
+                                       mock_workload_compact):
+        mock_workload_get.return_value = {
+            "total_iteration_count": 0, "load_duration": 0, "start_time": 0,
+            "statistics": {"compacted": {}}}
+        self.assertFalse(objects.Workload.compact("uuid"))
+        mock_workload_compact.assert_called_once_with(
+            "uuid", raw_data=[], statistics=mock.ANY, chunk_format="json")
+
     @mock.patch("rally.common.objects.task.db.workload_create")
     def test_init(self, mock_workload_create):
         mock_workload_create.return_value = self.workload
@@ -476,7 +652,8 @@ class WorkloadTestCase(test.TestCase):
         mock_workload_create.assert_called_once_with(
             task_uuid="uuid1", subtask_uuid="uuid2", name=name, hooks=hooks,
             description=description, position=position, runner=runner,
-            runner_type="constant", contexts=contexts, sla=sla, args=args)
+            runner_type="constant", contexts=contexts, sla=sla, args=args,
+            parameters=None)
         self.assertEqual(workload["uuid"], self.workload["uuid"])
 
     @mock.patch("rally.common.objects.task.db.workload_data_create")
@@ -493,7 +670,7 @@ class WorkloadTestCase(test.TestCase):
         workload.add_workload_data(0, {"data": "foo"})
         mock_workload_data_create.assert_called_once_with(
             self.workload["task_uuid"], self.workload["uuid"],
-            0, {"data": "foo"})
+            0, {"data": "foo"}, chunk_format="json")
 
     @mock.patch("rally.common.objects.task.db.workload_set_results")
     @mock.patch("rally.common.objects.task.db.workload_create")
@@ -84,6 +84,87 @@ class VerificationTestCase(test.TestCase):
         mock_verification_list.assert_called_once_with(None, None, None, None)
         self.assertEqual(self.db_obj["uuid"], vs[0].uuid)
 
+    @mock.patch("rally.common.objects.verification.db."
+                "verification_results_get")
+    def test_tests(self, mock_verification_results_get):
+        mock_verification_results_get.return_value = [
+            {"verification_uuid": "uuid-1", "name": "test_1",
+             "result": {"name": "test_1", "status": "success"}},
+            {"verification_uuid": "uuid-1", "name": "test_2",
+             "result": {"name": "test_2", "status": "fail"}}]
+        v = objects.Verification(self.db_obj)
+        self.assertNotIn("tests", v.to_dict())
+
+        expected = {"test_1": {"name": "test_1", "status": "success"},
+                    "test_2": {"name": "test_2", "status": "fail"}}
+        self.assertEqual(expected, v.tests)
+        self.assertEqual(expected, v["tests"])
+        self.assertEqual(expected, v.to_dict()["tests"])
+        # tests are loaded only once
+        mock_verification_results_get.assert_called_once_with(
+            ["uuid-1"], status=None, detailed=True)
+
+    @mock.patch("rally.common.objects.verification.db."
+                "verification_results_get")
+    def test_get_tests(self, mock_verification_results_get):
+        mock_verification_results_get.return_value = [
+            {"verification_uuid": "uuid-1", "name": "test_2",
+             "result": {"name": "test_2", "status": "fail",
+                        "duration": 1.0}}]
+        v = objects.Verification(self.db_obj)
+        self.assertEqual(
+            {"test_2": {"name": "test_2", "status": "fail", "duration": 1.0}},
+            v.get_tests(status="fail", detailed=False))
+        mock_verification_results_get.assert_called_once_with(
+            ["uuid-1"], status="fail", detailed=False)
+
+    @mock.patch("rally.common.objects.verification.db."
+                "verification_results_get")
+    def test_iter_tests(self, mock_verification_results_get):
+        results = [{"id": i, "verification_uuid": "uuid-1",
+                    "name": "test_%s" % i, "result": {"name": "test_%s" % i}}
+                   for i in range(5)]
+        mock_verification_results_get.side_effect = [
+            results[:2], results[2:4], results[4:]]
+        v = objects.Verification(self.db_obj)
+        v.RESULTS_BATCH_SIZE = 2
+
+        self.assertEqual([r["result"] for r in results], list(v.iter_tests()))
+        self.assertEqual(
+            [mock.call(["uuid-1"], marker=None, limit=2),
+             mock.call(["uuid-1"], marker=1, limit=2),
+             mock.call(["uuid-1"], marker=3, limit=2)],
+            mock_verification_results_get.call_args_list)
+        self.assertNotIn("tests", v.to_dict())
+
+    @mock.patch("rally.common.objects.verification.db."
+                "verification_results_get")
+    def test_iter_tests_loaded(self, mock_verification_results_get):
+        v = objects.Verification(self.db_obj)
+        v._db_entry["tests"] = {
+            "test_2": {"name": "test_2", "timestamp": "2001-01-01T00:00:01"},
+            "test_3": {"name": "test_3", "timestamp": "2001-01-01T00:00:00"},
+            "test_1": {"name": "test_1"}}
+
+        self.assertEqual(["test_1", "test_3", "test_2"],
+                         [t["name"] for t in v.iter_tests()])
+        self.assertFalse(mock_verification_results_get.called)
+
+    @mock.patch("rally.common.objects.verification.db."
+                "verification_results_get")
+    def test_get_test_results(self, mock_verification_results_get):
+        mock_verification_results_get.return_value = [
+            {"verification_uuid": "uuid-1", "name": "test_1",
+             "result": {"status": "success"}},
+            {"verification_uuid": "uuid-2", "name": "test_1",
+             "result": {"status": "fail"}}]
+        self.assertEqual(
+            {"uuid-1": {"test_1": {"status": "success"}},
+             "uuid-2": {"test_1": {"status": "fail"}}},
+            objects.Verification.get_test_results(["test_1"]))
+        mock_verification_results_get.assert_called_once_with(
+            None, names=["test_1"])
+
     @mock.patch("rally.common.objects.verification.db.verification_delete")
     def test_delete(self, mock_verification_delete):
         objects.Verification(self.db_obj).delete()
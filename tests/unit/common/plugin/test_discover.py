@@ -16,6 +16,8 @@
 from unittest import mock
 import uuid
 
+import fixtures
+
 from rally.common.plugin import discover
 from tests.unit import test
 
@@ -146,22 +148,22 @@ class LoadExtraModulesTestCase(test.TestCase):
 
     @mock.patch("%s.importlib" % DISCOVER)
     @mock.patch("%s.pkgutil.walk_packages" % DISCOVER)
-    @mock.patch("%s.pkg_resources" % DISCOVER)
-    def test_import_modules_by_entry_point(self, mock_pkg_resources,
+    @mock.patch("%s.importlib_metadata" % DISCOVER)
+    def test_import_modules_by_entry_point(self, mock_importlib_metadata,
                                            mock_walk_packages, mock_importlib):
+        self.useFixture(fixtures.MonkeyPatch(
+            "%s._found_packages" % DISCOVER, None))
 
-        class Package(object):
-            def __init__(self, name, version, entry_map):
-                self.get_entry_map_called = False
-                self.project_name = name
+        class Distribution(object):
+            def __init__(self, name, version, entry_points):
+                self.metadata = {"Name": name}
                 self.version = version
-                self.entry_map = entry_map
-
-            def get_entry_map(self, group):
-                if self.get_entry_map_called is not False:
-                    raise Exception("`get_entry_map` should be called once.")
-                self.get_entry_map_called = group
-                return self.entry_map.get(group, {})
+                self.entry_points = [
+                    mock.Mock(group=group, value=value)
+                    for group, name, value in entry_points]
+                for ep, (group, name, value) in zip(self.entry_points,
+                                                    entry_points):
+                    ep.name = name
 
         class LoadedPackage(object):
             def __init__(self, name, path=None, file=None):
@@ -171,73 +173,53 @@ class LoadExtraModulesTestCase(test.TestCase):
                 if file is not None:
                     self.__file__ = file
 
-        class FakeEntryPoint(object):
-            def __init__(self, package_name=None, package_path=None,
-                         package_file=None, module_name=None, attrs=None):
-                self.load = mock.Mock(return_value=LoadedPackage(
-                    package_name, package_path, package_file))
-                self.module_name = module_name or str(uuid.uuid4())
-                self.attrs = attrs or tuple()
-
-        mock_pkg_resources.working_set = [
-            Package("foo", "0.1", entry_map={}),
-            Package("plugin1", "0.2",
-                    entry_map={"rally_plugins": {
-                        "path": FakeEntryPoint("plugin1", package_path="/foo"),
-                        "foo": FakeEntryPoint("plugin1", package_path="/foo"),
-                        "options": FakeEntryPoint(module_name="foo.bar",
-                                                  attrs=("list_opts",))
-                    }}),
-            Package("plugin2", "0.2.1",
-                    entry_map={"rally_plugins": {
-                        "path": FakeEntryPoint("plugin2",
-                                               package_path=None,
-                                               package_file="/bar")
-                    }}),
-            Package("plugin3", "0.3",
-                    entry_map={"rally_plugins": {
-                        "path": FakeEntryPoint("plugin3",
-                                               package_path="/xxx",
-                                               package_file="/yyy")
-                    }}),
-            Package("error", "6.6.6",
-                    entry_map={"rally_plugins": {
-                        "path": FakeEntryPoint("error")
-                    }})
+        mock_importlib_metadata.distributions.return_value = [
+            Distribution("foo", "0.1", entry_points=[
+                ("console_scripts", "foo", "foo.cli:main")]),
+            Distribution("plugin1", "0.2", entry_points=[
+                ("rally_plugins", "path", "plugin1"),
+                ("rally_plugins", "foo", "plugin1.foo"),
+                ("rally_plugins", "options", "foo.bar:list_opts")]),
+            Distribution("plugin_2", "0.2.1", entry_points=[
+                ("rally_plugins", "path", "plugin2"),
+                ("rally_plugins", "options", "plugin2.opts")]),
+            Distribution("plugin3", "0.3", entry_points=[
+                ("rally_plugins", "path", "plugin3")]),
+            # shadowed by the first distribution with the same name
+            Distribution("Plugin3", "0.2", entry_points=[
+                ("rally_plugins", "path", "plugin3_old")]),
+            Distribution("error", "6.6.6", entry_points=[
+                ("rally_plugins", "path", "error")])
         ]
-
-        def mock_get_entry_map(name, group=None):
-            self.assertIsNone(group)
-            for p in mock_pkg_resources.working_set:
-                if p.project_name == name:
-                    return p.entry_map
-
-        mock_pkg_resources.get_entry_map.side_effect = mock_get_entry_map
+        modules = {"plugin1": LoadedPackage("plugin1", path="/foo"),
+                   "plugin2": LoadedPackage("plugin2", file="/bar"),
+                   "plugin3": LoadedPackage("plugin3", path="/xxx",
+                                            file="/yyy"),
+                   "error": LoadedPackage("error")}
+        mock_importlib.import_module.side_effect = (
+            lambda name: modules.get(name, mock.Mock()))
 
         # use random uuid to not have conflicts in sys.modules
         packages = [[(mock.Mock(), str(uuid.uuid4()), None)] for i in range(3)]
         mock_walk_packages.side_effect = packages
 
-        data = dict((p["name"], p)
-                    for p in discover.import_modules_by_entry_point())
-        for package in mock_pkg_resources.working_set:
-            self.assertEqual("rally_plugins", package.get_entry_map_called)
-            entry_map = package.entry_map.get("rally_plugins", {})
-            for ep_name, ep in entry_map.items():
-                if ep_name == "path":
-                    ep.load.assert_called_once_with()
-                    self.assertIn(package.project_name, data)
-                    self.assertEqual(package.version,
-                                     data[package.project_name]["version"])
-                else:
-                    self.assertFalse(ep.load.called)
-                    if ep_name == "options":
-                        self.assertIn(package.project_name, data)
-                        self.assertEqual(
-                            "%s:%s" % (ep.module_name, ep.attrs[0]),
-                            data[package.project_name]["options"])
+        self.assertEqual(
+            [{"name": "plugin1", "version": "0.2", "plugins_path": "plugin1",
+              "options": "foo.bar:list_opts"},
+             {"name": "plugin-2", "version": "0.2.1",
+              "plugins_path": "plugin2", "options": "plugin2.opts:list_opts"},
+             {"name": "plugin3", "version": "0.3", "plugins_path": "plugin3"},
+             {"name": "error", "version": "6.6.6", "plugins_path": "error"}],
+            discover.import_modules_by_entry_point())
 
         self.assertEqual([mock.call("/foo", prefix="plugin1."),
                           mock.call(["/bar"], prefix="plugin2."),
                           mock.call("/xxx", prefix="plugin3.")],
                          mock_walk_packages.call_args_list)
+        mock_importlib.import_module.assert_has_calls(
+            [mock.call("plugin1"), mock.call("plugin2"),
+             mock.call("plugin3"), mock.call("error")], any_order=True)
+
+        # installed distributions are scanned once
+        discover.find_packages_by_entry_point()
+        mock_importlib_metadata.distributions.assert_called_once_with()
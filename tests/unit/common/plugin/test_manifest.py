@@ -0,0 +1,270 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import sys
+from unittest import mock
+
+import fixtures
+
+from rally.common.plugin import discover
+from rally.common.plugin import manifest
+from rally.common.plugin import plugin
+from rally import exceptions
+from rally import plugins
+from rally.task import service
+from tests.unit import test
+
+
+PLUGIN_MODULE = """
+from rally.common.plugin import plugin
+
+
+@plugin.configure(name="test_manifest_plugin", platform="foo")
+class ManifestPlugin(plugin.Plugin):
+    pass
+"""
+
+SERVICE_MODULE = """
+from rally.task import service
+
+
+@service.service("manifest_test", service_type="test", version="1")
+class ManifestTestService(service.Service):
+    pass
+"""
+
+
+class ManifestTestCase(test.TestCase):
+
+    def setUp(self):
+        super(ManifestTestCase, self).setUp()
+        self.tempdir = self.useFixture(fixtures.TempDir()).path
+
+    def _make_package(self):
+        package = os.path.join(self.tempdir, "manifest_test_pkg")
+        os.makedirs(package)
+        open(os.path.join(package, "__init__.py"), "w").close()
+        with open(os.path.join(package, "foo.py"), "w") as f:
+            f.write(PLUGIN_MODULE)
+        with open(os.path.join(package, "impl.py"), "w") as f:
+            f.write(SERVICE_MODULE)
+        self.useFixture(fixtures.MonkeyPatch(
+            "sys.path", [self.tempdir] + sys.path))
+        self.addCleanup(sys.modules.pop, "manifest_test_pkg.impl", None)
+        self.addCleanup(sys.modules.pop, "manifest_test_pkg.foo", None)
+        self.addCleanup(sys.modules.pop, "manifest_test_pkg", None)
+        return package
+
+    def test_build(self):
+        package = self._make_package()
+        from manifest_test_pkg import foo
+        self.addCleanup(foo.ManifestPlugin.unregister)
+
+        result = manifest.build([package], packages=[{"name": "pkg"}])
+
+        self.assertEqual([{"name": "test_manifest_plugin",
+                           "base": "rally.common.plugin.plugin.Plugin",
+                           "platform": "foo",
+                           "module": "manifest_test_pkg.foo"}],
+                         result["plugins"])
+        self.assertEqual([{"name": "pkg"}], result["packages"])
+        self.assertEqual(["manifest_test_pkg", "manifest_test_pkg.foo"],
+                         result["modules"])
+        self.assertEqual(
+            sorted([package, os.path.join(package, "__init__.py"),
+                    os.path.join(package, "foo.py"),
+                    os.path.join(package, "impl.py")]),
+            sorted(result["mtimes"]))
+        self.assertTrue(manifest.is_valid(result))
+
+        # a plugin is changed
+        mtime = os.stat(os.path.join(package, "foo.py")).st_mtime
+        os.utime(os.path.join(package, "foo.py"), (mtime + 10, mtime + 10))
+        self.assertFalse(manifest.is_valid(result))
+
+    def test_subclasses_from_modules_without_plugins(self):
+        package = self._make_package()
+        from manifest_test_pkg import foo
+        from manifest_test_pkg import impl
+        self.addCleanup(foo.ManifestPlugin.unregister)
+        result = manifest.build([package], packages=[])
+        self.assertEqual(["manifest_test_pkg", "manifest_test_pkg.foo",
+                          "manifest_test_pkg.impl"], result["modules"])
+        self.addCleanup(plugin.set_lazy_loader, None)
+        plugin.set_lazy_loader(manifest.LazyLoader(result))
+
+        with mock.patch("rally.common.plugin.manifest.importlib."
+                        "import_module") as mock_import_module:
+            plugin.Plugin.get("test_manifest_plugin")
+            mock_import_module.assert_called_once_with(
+                "manifest_test_pkg.foo")
+
+            # the implementation of a service is found by walking
+            #   subclasses, so all recorded modules are imported first
+            mock_import_module.reset_mock()
+            self.assertIn(impl.ManifestTestService, list(
+                discover.itersubclasses(service.Service)))
+        self.assertEqual([mock.call("manifest_test_pkg"),
+                          mock.call("manifest_test_pkg.impl")],
+                         mock_import_module.call_args_list)
+        self.assertIsNone(plugin._lazy_loader)
+
+    @mock.patch("rally.common.plugin.manifest.version.version_string")
+    def test_is_valid(self, mock_version_string):
+        mock_version_string.return_value = "1.0"
+        result = manifest.build([self.tempdir], packages=[])
+        self.assertEqual([], result["plugins"])
+        self.assertTrue(manifest.is_valid(result))
+
+        # a package is installed
+        self.assertFalse(manifest.is_valid(
+            dict(result, sys_path=dict(result["sys_path"], foo=1.0))))
+        # rally is upgraded
+        mock_version_string.return_value = "2.0"
+        self.assertFalse(manifest.is_valid(result))
+
+    def test_save_and_load(self):
+        path = os.path.join(self.tempdir, "cache", "manifest.json")
+        self.assertIsNone(manifest.load(path))
+
+        root = os.path.join(self.tempdir, "plugins")
+        os.makedirs(root)
+        result = manifest.build([root], packages=[])
+        manifest.save(path, result)
+        self.assertEqual(result, manifest.load(path))
+        self.assertEqual(["manifest.json"],
+                         os.listdir(os.path.dirname(path)))
+
+        with open(path, "w") as f:
+            f.write("{\"broken")
+        self.assertIsNone(manifest.load(path))
+
+        with open(path, "w") as f:
+            f.write("{}")
+        self.assertIsNone(manifest.load(path))
+
+    @mock.patch("rally.common.plugin.manifest.importlib.import_module")
+    def test_lazy_loader(self, mock_import_module):
+        self.addCleanup(plugin.set_lazy_loader, None)
+
+        @plugin.base()
+        class Base(plugin.Plugin):
+            pass
+
+        base = "%s.Base" % Base.__module__
+        loader = manifest.LazyLoader({"modules": ["m4"], "plugins": [
+            {"name": "a", "base": base, "module": "m1"},
+            {"name": "b", "base": base, "module": "m2"},
+            {"name": "b", "base": "x.Other", "module": "m3"},
+            {"name": "c", "base": "x.Other", "module": "m3"}]})
+        plugin.set_lazy_loader(loader)
+
+        mock_import_module.side_effect = [None, ImportError("Oops")]
+        loader(Base, "b")
+        loader(Base, "b")
+        loader(Base, "unknown")
+        self.assertEqual([mock.call("m2"), mock.call("m3")],
+                         mock_import_module.call_args_list)
+
+        mock_import_module.reset_mock()
+        mock_import_module.side_effect = None
+        loader(Base, None)
+        self.assertEqual([mock.call("m1")],
+                         mock_import_module.call_args_list)
+        self.assertIs(loader, plugin._lazy_loader)
+
+        mock_import_module.reset_mock()
+        loader(plugin.Plugin, None)
+        # all modules are imported, including ones without plugins
+        self.assertEqual([mock.call("m4")],
+                         mock_import_module.call_args_list)
+        self.assertIsNone(plugin._lazy_loader)
+
+    def test_lazy_loader_is_called_on_lookups(self):
+        self.addCleanup(plugin.set_lazy_loader, None)
+        loader = mock.Mock()
+        plugin.set_lazy_loader(loader)
+
+        self.assertRaises(exceptions.PluginNotFound, plugin.Plugin.get,
+                          "test_unknown_plugin@foo")
+        plugin.Plugin.get_all()
+        self.assertEqual([mock.call(plugin.Plugin, "test_unknown_plugin"),
+                          mock.call(plugin.Plugin, None)],
+                         loader.call_args_list)
+
+
+class LoadPluginsTestCase(test.TestCase):
+
+    def setUp(self):
+        super(LoadPluginsTestCase, self).setUp()
+        self.useFixture(fixtures.MonkeyPatch(
+            "rally.plugins.PLUGINS_LOADED", False))
+        self.addCleanup(plugin.set_lazy_loader, None)
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 "manifest.json")
+        self.useFixture(fixtures.MonkeyPatch(
+            "rally.plugins.cfg.CONF", mock.Mock(plugins_manifest=self.path)))
+
+    @mock.patch("rally.plugins.discover.load_plugins")
+    @mock.patch("rally.plugins._import_plugins")
+    def test_load(self, mock__import_plugins, mock_load_plugins):
+        mock__import_plugins.return_value = []
+
+        plugins.load(use_manifest=True)
+
+        self.assertTrue(mock__import_plugins.called)
+        self.assertTrue(os.path.exists(self.path))
+        self.assertIsNone(plugin._lazy_loader)
+        self.assertEqual(2, mock_load_plugins.call_count)
+
+        # the manifest is used
+        mock__import_plugins.reset_mock()
+        self.useFixture(fixtures.MonkeyPatch(
+            "rally.plugins.PLUGINS_LOADED", False))
+
+        plugins.load(use_manifest=True)
+
+        self.assertFalse(mock__import_plugins.called)
+        self.assertIsInstance(plugin._lazy_loader, manifest.LazyLoader)
+        self.assertEqual(4, mock_load_plugins.call_count)
+
+    @mock.patch("rally.plugins.discover.load_plugins")
+    @mock.patch("rally.plugins._import_plugins")
+    def test_load_without_manifest(self, mock__import_plugins,
+                                   mock_load_plugins):
+        plugins.load()
+
+        self.assertTrue(mock__import_plugins.called)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertIsNone(plugin._lazy_loader)
+
+    @mock.patch("rally.plugins.discover.load_plugins")
+    @mock.patch("rally.plugins._import_plugins")
+    def test_load_packages_from_manifest(self, mock__import_plugins,
+                                         mock_load_plugins):
+        packages = [{"name": "foo", "version": "1.0"}]
+        mock__import_plugins.return_value = packages
+        plugins.load(use_manifest=True)
+        mock__import_plugins.assert_called_once_with(mock.ANY, None)
+
+        mock__import_plugins.reset_mock()
+        self.useFixture(fixtures.MonkeyPatch(
+            "rally.plugins.PLUGINS_LOADED", False))
+
+        plugins.load()
+
+        # all plugins are imported, but installed packages are not scanned
+        mock__import_plugins.assert_called_once_with(mock.ANY, packages)
+        self.assertIsNone(plugin._lazy_loader)
@@ -13,6 +13,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import gc
+from unittest import mock
+
 from rally.common.plugin import plugin
 from rally import exceptions
 from tests.unit import test
@@ -254,6 +257,35 @@ class PluginTestCase(test.TestCase):
 
         A.unregister()
 
+    @mock.patch("rally.common.plugin.discover.itersubclasses")
+    def test_get_does_not_walk_subclasses(self, mock_itersubclasses):
+        self.assertEqual(SomePlugin, BasePlugin.get("test_some_plugin"))
+        self.assertEqual(MyPluginInFoo,
+                         BasePlugin.get("test_my_plugin@foo"))
+        self.assertEqual([], SomePlugin.get_all(name="test_some_plugin"))
+        self.assertRaises(exceptions.PluginNotFound,
+                          SomePlugin.get, "test_some_plugin")
+        self.assertFalse(mock_itersubclasses.called)
+
+    def test_get_collected_plugin(self):
+        def make_plugin():
+            @plugin.configure(name="test_collected_plugin")
+            class CollectedPlugin(BasePlugin):
+                pass
+
+            return CollectedPlugin
+
+        make_plugin()
+        self.assertEqual("test_collected_plugin",
+                         BasePlugin.get("test_collected_plugin").get_name())
+        gc.collect()
+        self.assertNotIn("test_collected_plugin", plugin._REGISTRY)
+        self.assertRaises(exceptions.PluginNotFound,
+                          BasePlugin.get, "test_collected_plugin")
+        # the name can be used again
+        make_plugin().unregister()
+        self.assertNotIn("test_collected_plugin", plugin._REGISTRY)
+
     def test_get_name(self):
         self.assertEqual("test_some_plugin", SomePlugin.get_name())
 
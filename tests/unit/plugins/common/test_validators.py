@@ -45,6 +45,28 @@ class JsonSchemaValidatorTestCase(test.TestCase):
 
         DummyPlugin.unregister()
 
+    @mock.patch("rally.plugins.common.validators.jsonschema.validators."
+                "validator_for")
+    def test_validate_compiles_schema_once(self, mock_validator_for):
+        validator_cls = mock_validator_for.return_value
+        validator_cls.return_value.iter_errors.return_value = []
+
+        class Plugin(object):
+            CONFIG_SCHEMA = {"type": "string"}
+
+        validator = validators.JsonSchemaValidator()
+        validator.validate(None, None, Plugin, "foo")
+        validator.validate(None, None, Plugin, "bar")
+        validator_cls.check_schema.assert_called_once_with(
+            Plugin.CONFIG_SCHEMA)
+        self.assertEqual([mock.call("foo"), mock.call("bar")],
+                         validator_cls.return_value.iter_errors.call_args_list)
+
+        # the schema is changed
+        Plugin.CONFIG_SCHEMA = {"type": "integer"}
+        validator.validate(None, None, Plugin, 10)
+        self.assertEqual(2, validator_cls.check_schema.call_count)
+
 
 @ddt.ddt
 class ArgsValidatorTestCase(test.TestCase):
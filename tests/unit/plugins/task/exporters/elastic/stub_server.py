@@ -0,0 +1,134 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""A tiny in-process imitation of ElasticSearch cluster.
+
+It supports only requests which are made by ElasticSearchClient and is used
+for testing and benchmarking of the exporter without a real cluster.
+"""
+
+from http import server
+import json
+import socketserver
+import threading
+import time
+
+
+class _Handler(server.BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _respond(self, status, data=None):
+        body = b"" if data is None else json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_GET(self):
+        stub = self.server.stub
+        if self.path == "/_cat/indices?v":
+            body = " ".join(sorted(stub.indices)).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._respond(200, {"version": {"number": stub.version}})
+
+    def do_HEAD(self):
+        # none of documents exists
+        self._respond(404)
+
+    def do_PUT(self):
+        self._read_body()
+        self.server.stub.indices.add(self.path.strip("/"))
+        self._respond(200, {"acknowledged": True})
+
+    def do_POST(self):
+        stub = self.server.stub
+        lines = self._read_body().decode("utf-8").splitlines()
+        with stub.lock:
+            stub.requests += 1
+            fail = stub.failures > 0
+            if fail:
+                stub.failures -= 1
+        if fail:
+            self._respond(503, {"error": "the cluster is overloaded"})
+            return
+        if stub.latency:
+            time.sleep(stub.latency)
+        items = []
+        with stub.lock:
+            for action, doc in zip(lines[::2], lines[1::2]):
+                stub.documents.append((action, doc))
+                items.append({"index": {"status": 201}})
+        self._respond(200, {"took": 1, "errors": False, "items": items})
+
+
+class _Server(socketserver.ThreadingMixIn, server.HTTPServer):
+    daemon_threads = True
+
+
+class StubElasticSearch(object):
+    """ElasticSearch imitation listening on a random local port.
+
+    Received documents are stored as pairs of raw lines (the action and the
+    document itself) in `documents` attribute.
+
+    :param latency: a delay in seconds of processing each bulk request
+    :param failures: a number of first bulk requests to reject with 503
+    :param version: a version of ElasticSearch to report
+    """
+
+    def __init__(self, latency=0, failures=0, version="6.8.0"):
+        self.latency = latency
+        self.failures = failures
+        self.version = version
+        self.indices = set()
+        self.documents = []
+        self.requests = 0
+        self.lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:%s" % self._server.server_address[1]
+
+    def start(self):
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.stub = self
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.stop()
@@ -12,11 +12,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from concurrent import futures
 import copy
+import json
 from unittest import mock
 
 from rally import exceptions
 from rally.plugins.task.exporters.elastic import client
+from tests.unit.plugins.task.exporters.elastic import stub_server
 from tests.unit import test
 
 
@@ -139,26 +142,150 @@ class ElasticSearchClientTestCase(test.TestCase):
         self.assertIsNone(es.check_document("foo", "bar"))
         mock__check_response.assert_called_once_with(resp, mock.ANY)
 
-    @mock.patch("%s.requests.post" % PATH)
-    def test_push_documents(self, mock_requests_post):
-        mock_requests_post.return_value.status_code = 200
+    @mock.patch("%s.adapters.HTTPAdapter" % PATH)
+    @mock.patch("%s.requests.Session" % PATH)
+    def test__get_session(self, mock_session, mock_http_adapter):
+        sessions = [mock.Mock(), mock.Mock()]
+        mock_session.side_effect = sessions
         es = client.ElasticSearchClient(None)
+
+        session = es._get_session()
+
+        self.assertEqual(sessions[0], session)
+        self.assertEqual(session, es._get_session())
+        mock_session.assert_called_once_with()
+        mock_http_adapter.assert_called_once_with(
+            pool_connections=1, pool_maxsize=1)
+        self.assertEqual(
+            [mock.call("http://", mock_http_adapter.return_value),
+             mock.call("https://", mock_http_adapter.return_value)],
+            session.mount.call_args_list)
+
+        # each thread has its own session
+        with futures.ThreadPoolExecutor(max_workers=1) as executor:
+            self.assertEqual(sessions[1],
+                             executor.submit(es._get_session).result())
+
+        es._close_sessions()
+        sessions[0].close.assert_called_once_with()
+        sessions[1].close.assert_called_once_with()
+
+    @mock.patch("%s.requests.Session" % PATH)
+    def test_push_documents_closes_sessions(self, mock_session):
+        es = client.ElasticSearchClient(None)
+        es.WORKERS = 2
+        mock_post = mock_session.return_value.post
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.json.return_value = {"items": [{}]}
+
+        es.push_documents(["doc1", "doc2"])
+
+        mock_session.return_value.close.assert_called_once_with()
+
+        # sessions are closed in case of failure as well
+        mock_session.reset_mock()
+        mock_post.return_value.status_code = 400
+        self.assertRaises(exceptions.RallyException,
+                          es.push_documents, ["doc1", "doc2"])
+        mock_session.return_value.close.assert_called_once_with()
+
+    def test_push_documents(self):
+        es = client.ElasticSearchClient(None)
+        es._get_session = mock.Mock()
+        mock_post = es._get_session.return_value.post
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.json.side_effect = [
+            {"items": [{}]}, {"items": [{}]}]
         # decrease the size of chunks to not generate 10_001 number of docs
         es.CHUNK_LENGTH = 2
+        es.WORKERS = 1
 
-        documents = ["doc1", "doc2", "doc3"]
+        documents = iter(["doc1", "doc2", "doc3", "doc4"])
 
-        es.push_documents(documents)
+        stats = es.push_documents(documents)
 
         headers = {"Content-Type": "application/x-ndjson"}
 
         self.assertEqual(
             [mock.call("http://localhost:9200/_bulk",
-                       data="doc1\ndoc2\n", headers=headers),
+                       data=b"doc1\ndoc2\n", headers=headers,
+                       timeout=es.TIMEOUT),
              mock.call("http://localhost:9200/_bulk",
-                       data="doc3\n", headers=headers)],
-            mock_requests_post.call_args_list
+                       data=b"doc3\ndoc4\n", headers=headers,
+                       timeout=es.TIMEOUT)],
+            mock_post.call_args_list
         )
+        self.assertEqual(2, stats["documents"])
+        self.assertEqual(20, stats["bytes"])
+        self.assertIn("duration", stats)
+
+    @mock.patch("%s.time.sleep" % PATH)
+    def test_push_documents_retries(self, mock_sleep):
+        es = client.ElasticSearchClient(None)
+        es._get_session = mock.Mock()
+        mock_post = es._get_session.return_value.post
+        ok = mock.Mock(status_code=200)
+        ok.json.return_value = {"items": [{}]}
+        es.RETRIES = 4
+        mock_post.side_effect = [mock.Mock(status_code=503),
+                                 client.requests.ConnectionError("foo"),
+                                 client.requests.ReadTimeout("bar"),
+                                 ok]
+
+        stats = es.push_documents(["doc1", "doc2"])
+
+        self.assertEqual(1, stats["documents"])
+        self.assertEqual(4, mock_post.call_count)
+        self.assertEqual([mock.call(1), mock.call(2), mock.call(4)],
+                         mock_sleep.call_args_list)
+
+    @mock.patch("%s.time.sleep" % PATH)
+    def test_push_documents_fails(self, mock_sleep):
+        es = client.ElasticSearchClient(None)
+        es._get_session = mock.Mock()
+        mock_post = es._get_session.return_value.post
+
+        # case #1: the error is not temporary
+        mock_post.return_value = mock.Mock(status_code=400, text="bad")
+        mock_post.return_value.json.side_effect = ValueError()
+
+        e = self.assertRaises(exceptions.RallyException,
+                              es.push_documents, ["doc1", "doc2"])
+        self.assertEqual("[HTTP 400] Failed to push documents to "
+                         "ElasticSearch cluster: bad", e.format_message())
+        mock_post.assert_called_once_with(mock.ANY, data=mock.ANY,
+                                          headers=mock.ANY,
+                                          timeout=es.TIMEOUT)
+        self.assertFalse(mock_sleep.called)
+
+        # case #2: the cluster is not reachable
+        mock_post.reset_mock()
+        mock_post.side_effect = client.requests.ConnectionError("foo")
+
+        e = self.assertRaises(exceptions.RallyException,
+                              es.push_documents, ["doc1", "doc2"])
+        self.assertEqual("Failed to push documents to ElasticSearch "
+                         "cluster: foo", e.format_message())
+        self.assertEqual(es.RETRIES, mock_post.call_count)
+
+    def test_push_documents_to_stub_server(self):
+        with stub_server.StubElasticSearch(failures=1) as stub:
+            es = client.ElasticSearchClient(stub.url)
+            es.CHUNK_LENGTH = 4
+            es.RETRY_DELAY = 0
+            documents = []
+            for i in range(25):
+                documents.append(json.dumps({"index": {"_id": str(i)}}))
+                documents.append(json.dumps({"number": i}))
+
+            stats = es.push_documents(iter(documents))
+
+        self.assertEqual(25, stats["documents"])
+        # 13 chunks and one retry
+        self.assertEqual(14, stub.requests)
+        self.assertEqual(list(range(25)),
+                         sorted(json.loads(doc)["number"]
+                                for _a, doc in stub.documents))
 
     @mock.patch("%s.ElasticSearchClient._check_response" % PATH)
     @mock.patch("%s.requests.get" % PATH)
@@ -14,9 +14,11 @@
 
 import copy
 import json
+import os
 from unittest import mock
 
 import ddt
+import fixtures
 
 from rally import exceptions
 from rally.plugins.task.exporters.elastic import exporter as elastic
@@ -157,8 +159,7 @@ class ElasticSearchExporterTestCase(test.TestCase):
         self.assertFalse(exporter._remote)
         self.assertIsNone(getattr(exporter, "_client", None))
 
-    @ddt.data(None, "/home/bar", "https://example.com")
-    def test__add_index(self, destination):
+    def test__make_index(self):
 
         index = "foo"
         doc_type = "bar"
@@ -168,22 +169,21 @@ class ElasticSearchExporterTestCase(test.TestCase):
         }
         doc_id = "2fa4f5ff-7d23-4bb0-9b1f-8ee235f7f1c8"
 
-        exporter = elastic.ElasticSearchExporter([], destination)
+        lines = elastic.ElasticSearchExporter._make_index(index=index,
+                                                          body=body,
+                                                          doc_id=doc_id,
+                                                          doc_type=doc_type)
 
-        exporter._add_index(index=index,
-                            body=body,
-                            doc_id=doc_id,
-                            doc_type=doc_type)
-
-        self.assertEqual(2, len(exporter._report))
+        self.assertEqual(2, len(lines))
         self.assertEqual({"index": {"_index": index,
                                     "_type": doc_type,
                                     "_id": doc_id}},
-                         json.loads(exporter._report[0]))
+                         json.loads(lines[0]))
+        self.assertEqual(body, json.loads(lines[1]))
 
     @ddt.data(True, False)
-    @mock.patch("%s.ElasticSearchExporter._add_index" % PATH)
-    def test__process_atomic_actions(self, known_fail, mock__add_index):
+    @mock.patch("%s.ElasticSearchExporter._make_index" % PATH)
+    def test__process_atomic_actions(self, known_fail, mock__make_index):
         es_exporter = elastic.ElasticSearchExporter({}, None)
 
         itr_data = {"id": "foo_bar_uuid",
@@ -213,9 +213,11 @@ class ElasticSearchExporterTestCase(test.TestCase):
             atomic_actions[-1]["failed"] = True
             atomic_actions[-1]["children"][-1]["failed"] = True
 
-        es_exporter._process_atomic_actions(
+        mock__make_index.side_effect = lambda *a, **kw: ("action", "doc")
+
+        lines = list(es_exporter._process_atomic_actions(
             atomic_actions=atomic_actions, itr=itr_data,
-            workload_id="wid", workload=workload)
+            workload_id="wid", workload=workload))
 
         expected_calls = [
             mock.call(
@@ -293,12 +295,14 @@ class ElasticSearchExporterTestCase(test.TestCase):
                     "workload_uuid": "wid"},
                 doc_id="foo_bar_uuid_action_no-name-action_0"))
 
-        self.assertEqual(expected_calls, mock__add_index.call_args_list)
+        self.assertEqual(expected_calls, mock__make_index.call_args_list)
+        self.assertEqual(["action", "doc"] * len(expected_calls), lines)
 
     def test_generate_fails_on_doc_exists(self):
         destination = "http://example.com"
         client = self.es_cls.return_value
         client.check_document.side_effect = (False, True)
+        client.push_documents.side_effect = lambda docs: list(docs)
 
         tasks = get_tasks_results()
         second_task = copy.deepcopy(tasks[-1])
@@ -310,6 +314,8 @@ class ElasticSearchExporterTestCase(test.TestCase):
         e = self.assertRaises(exceptions.RallyException, exporter.generate)
         self.assertIn("Failed to push the task %s" % tasks[0]["uuid"],
                       e.format_message())
+        # nothing should be pushed if any of tasks exists
+        self.assertFalse(client.push_documents.called)
 
     def test__ensure_indices(self):
         es = mock.MagicMock()
@@ -353,8 +359,17 @@ class ElasticSearchExporterTestCase(test.TestCase):
             destination = "http://example.com"
             client = self.es_cls.return_value
             client.check_document.return_value = False
+            pushed = []
+
+            def push_documents(documents):
+                pushed.extend(documents)
+                return {"documents": len(pushed) // 2, "bytes": 1,
+                        "duration": 0.5}
+
+            client.push_documents.side_effect = push_documents
         else:
-            destination = "/home/bar.txt"
+            destination = os.path.join(
+                self.useFixture(fixtures.TempDir()).path, "bar.txt")
 
         tasks = get_tasks_results()
         second_task = copy.deepcopy(tasks[-1])
@@ -371,19 +386,23 @@ class ElasticSearchExporterTestCase(test.TestCase):
                  mock.call("rally_task_data_v1", second_task["uuid"])],
                 client.check_document.call_args_list
             )
-            client.push_documents.assert_called_once_with(exporter._report)
+            client.push_documents.assert_called_once_with(mock.ANY)
             client.list_indices.assert_called_once_with()
             self.assertEqual(3, client.create_index.call_count)
+            self.assertEqual(
+                "Successfully exported results to ElasticSearch at url "
+                "'%s' (6 documents in 0.50 seconds)" % destination,
+                result["print"])
+            lines = pushed
         else:
-            self.assertEqual({"files", "open"}, set(result.keys()))
-            self.assertEqual("file://%s" % destination, result["open"])
-            self.assertEqual({destination}, set(result["files"].keys()))
-
-            data = result["files"][destination].split("\n")
+            # the file is written by the exporter
+            self.assertEqual({"open": "file://%s" % destination}, result)
+            with open(destination) as f:
+                lines = f.read().split("\n")
             # the should be always empty line in the end
-            self.assertEqual("", data[-1])
+            self.assertEqual("", lines.pop())
 
-        data = [json.loads(l) for l in exporter._report]
+        data = [json.loads(l) for l in lines]
         self.assertIsInstance(data, list)
         expected = [
             {
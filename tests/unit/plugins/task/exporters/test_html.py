@@ -24,8 +24,9 @@ PATH = "rally.plugins.task.exporters.html"
 
 class HTMLExporterTestCase(test.TestCase):
 
+    @mock.patch("%s.report_cache.ReportCache" % PATH)
     @mock.patch("%s.plot.plot" % PATH, return_value="html")
-    def test_generate(self, mock_plot):
+    def test_generate(self, mock_plot, mock_report_cache):
         tasks_results = dummy_data.get_tasks_results()
         tasks_results.extend(dummy_data.get_tasks_results())
         reporter = html.HTMLExporter(tasks_results, None)
@@ -36,13 +37,26 @@ class HTMLExporterTestCase(test.TestCase):
         reporter._generate_results.assert_called_once_with()
         mock_plot.assert_called_once_with(
             reporter._generate_results.return_value,
-            include_libs=False)
+            include_libs=False, lazy=False,
+            cache=mock_report_cache.return_value)
 
         reporter = html.HTMLExporter(tasks_results, output_destination="path")
         self.assertEqual({"files": {"path": "html"},
                           "open": "file://" + os.path.abspath("path")},
                          reporter.generate())
 
+    @mock.patch("%s.report_cache.ReportCache" % PATH)
+    @mock.patch("%s.plot.plot" % PATH, return_value="html")
+    def test_generate_lazy(self, mock_plot, mock_report_cache):
+        tasks_results = dummy_data.get_tasks_results()
+        reporter = html.HTMLLazyExporter(tasks_results, None)
+        reporter.use_cache = False
+
+        self.assertEqual({"print": "html"}, reporter.generate())
+        mock_plot.assert_called_once_with(tasks_results, include_libs=False,
+                                          lazy=True, cache=None)
+        self.assertFalse(mock_report_cache.called)
+
     def test__generate_results(self):
         tasks_results = [{
             "uuid": "task_id",
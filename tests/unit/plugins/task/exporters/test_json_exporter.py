@@ -13,10 +13,14 @@
 #    under the License.
 
 import collections
-import datetime as dt
+import json
+import os
 from unittest import mock
 
+import fixtures
+
 from rally.common import version as rally_version
+from rally import exceptions
 from rally.plugins.task.exporters import json_exporter
 from tests.unit.plugins.task.exporters import dummy_data
 from tests.unit import test
@@ -67,7 +71,6 @@ class JSONExporterTestCase(test.TestCase):
                                 ("load_duration", 2.03029203414917),
                                 ("full_duration", 29.969523191452026),
                                 ("statistics", {}),
-                                ("data", w_data),
                                 ("failed_iteration_count", 0),
                                 ("total_iteration_count", 10),
                                 ("created_at", "2017-06-04T05:14:44"),
@@ -77,39 +80,110 @@ class JSONExporterTestCase(test.TestCase):
                                 ("position", 0),
                                 ("pass_sla", True),
                                 ("sla_results", {"sla": []}),
-                                ("sla", {})
+                                ("sla", {}),
+                                ("data", w_data)
                             ])
                         ])
                     ])
                 ])
             ])], reporter._generate_tasks())
 
-    @mock.patch("%s.json.dumps" % PATH, return_value="json")
     @mock.patch("%s.dt" % PATH)
-    def test_generate(self, mock_dt, mock_json_dumps):
-        mock_dt.datetime.utcnow.return_value = dt.datetime.utcnow()
+    def test_generate(self, mock_dt):
+        mock_dt.datetime.strftime.return_value = "2017-01-01T00:00:00"
         tasks_results = dummy_data.get_tasks_results()
 
         # print
         reporter = json_exporter.JSONExporter(tasks_results, None)
-        reporter._generate_tasks = mock.MagicMock()
-        self.assertEqual({"print": "json"}, reporter.generate())
         results = {
             "info": {"rally_version": rally_version.version_string(),
-                     "generated_at": mock_dt.datetime.strftime.return_value,
-                     "format_version": "1.2"},
-            "tasks": reporter._generate_tasks.return_value
+                     "generated_at": "2017-01-01T00:00:00",
+                     "format_version": "1.3"},
+            "tasks": reporter._generate_tasks()
         }
+        self.assertEqual(
+            {"print": json.dumps(results, sort_keys=False, indent=4)},
+            reporter.generate())
         mock_dt.datetime.strftime.assert_called_once_with(
             mock_dt.datetime.utcnow.return_value,
             json_exporter.TIMEFORMAT)
-        reporter._generate_tasks.assert_called_once_with()
-        mock_json_dumps.assert_called_once_with(results,
-                                                sort_keys=False,
-                                                indent=4)
 
-        # export to file
+    def test__encode(self):
+        items = [{"bar": "a\nb", "data": [{"x": [1.5]}, {}]},
+                 {"data": []},
+                 {"data": [[], "y"]}]
+        obj = collections.OrderedDict([
+            ("info", {"foo": [1, 2]}),
+            ("items", [dict(items[0]), dict(items[1]),
+                       {"data": iter(items[2]["data"])}])])
+
+        self.assertEqual(
+            json.dumps({"info": {"foo": [1, 2]}, "items": items}, indent=4),
+            "".join(json_exporter._encode(obj, 0, ("items", "data"))))
+        self.assertEqual(
+            json.dumps({"items": []}, indent=4),
+            "".join(json_exporter._encode({"items": []}, 0, ("items",))))
+
+    def test_generate_to_file(self):
+        tasks_results = dummy_data.get_tasks_results()
+        w_data = tasks_results[0]["subtasks"][0]["workloads"][0]["data"]
+        # iterations can be loaded lazily
+        tasks_results[0]["subtasks"][0]["workloads"][0]["data"] = (
+            itr for itr in w_data)
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            "report.json")
+
+        reporter = json_exporter.JSONExporter(tasks_results,
+                                              output_destination=path)
+
+        self.assertEqual({"open": "file://%s" % path}, reporter.generate())
+        with open(path) as f:
+            results = json.load(f)
+        self.assertEqual("1.3", results["info"]["format_version"])
+        workload = results["tasks"][0]["subtasks"][0]["workloads"][0]
+        self.assertEqual(w_data, workload["data"])
+        self.assertEqual("data", list(workload)[-1])
+
+    def test_generate_to_file_failed(self):
+        tasks_results = dummy_data.get_tasks_results()
+
+        def data():
+            yield {"timestamp": 1}
+            raise exceptions.RallyException("Failed to load a chunk")
+
+        tasks_results[0]["subtasks"][0]["workloads"][0]["data"] = data()
+        tmp_dir = self.useFixture(fixtures.TempDir()).path
+        path = os.path.join(tmp_dir, "report.json")
+        with open(path, "w") as f:
+            f.write("previous report")
+
         reporter = json_exporter.JSONExporter(tasks_results,
-                                              output_destination="path")
-        self.assertEqual({"files": {"path": "json"},
-                          "open": "file://path"}, reporter.generate())
+                                              output_destination=path)
+
+        self.assertRaises(exceptions.RallyException, reporter.generate)
+        # the previous report is kept and no temporary files are left
+        with open(path) as f:
+            self.assertEqual("previous report", f.read())
+        self.assertEqual(["report.json"], os.listdir(tmp_dir))
+
+    def test_generate_lazy_empty_data(self):
+        tasks_results = dummy_data.get_tasks_results()
+        tasks_results[0]["subtasks"][0]["workloads"][0]["data"] = iter([])
+
+        reporter = json_exporter.JSONExporter(tasks_results, None)
+
+        results = json.loads(reporter.generate()["print"])
+        self.assertEqual(
+            [], results["tasks"][0]["subtasks"][0]["workloads"][0]["data"])
+
+    def test__generate_tasks_with_parameters(self):
+        tasks_results = dummy_data.get_tasks_results()
+        workload = tasks_results[0]["subtasks"][0]["workloads"][0]
+        workload["parameters"] = {"runner.concurrency": 2}
+
+        reporter = json_exporter.JSONExporter(tasks_results, None)
+
+        workload = reporter._generate_tasks()[0]["subtasks"][0][
+            "workloads"][0]
+        self.assertEqual({"runner.concurrency": 2}, workload["parameters"])
+        self.assertEqual(["parameters", "data"], list(workload)[-2:])
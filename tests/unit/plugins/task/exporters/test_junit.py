@@ -16,6 +16,8 @@ import datetime as dt
 import os
 from unittest import mock
 
+import fixtures
+
 from rally.plugins.task.exporters import junit
 from tests.unit import test
 
@@ -83,8 +85,10 @@ class JUnitXMLExporterTestCase(test.TestCase):
                                           output_destination=None)
         self.assertEqual({"print": expected_report}, reporter.generate())
 
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            "report.xml")
         reporter = junit.JUnitXMLExporter(get_tasks_results(),
-                                          output_destination="path")
-        self.assertEqual({"files": {"path": expected_report},
-                          "open": "file://" + os.path.abspath("path")},
-                         reporter.generate())
+                                          output_destination=path)
+        self.assertEqual({"open": "file://" + path}, reporter.generate())
+        with open(path) as f:
+            self.assertEqual(expected_report, f.read())
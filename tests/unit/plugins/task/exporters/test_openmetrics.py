@@ -0,0 +1,120 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+
+from rally.plugins.task.exporters import openmetrics
+from tests.unit import test
+
+
+def _stats(name, min, median, p90, p95, max, avg, success):
+    return {"name": name, "display_name": name,
+            "data": {"min": min, "median": median, "90%ile": p90,
+                     "95%ile": p95, "max": max, "avg": avg,
+                     "success": success, "iteration_count": 4}}
+
+
+def get_tasks_results():
+    workload_1 = {
+        "uuid": "w1", "name": "Foo.bar",
+        "statistics": {"durations": {
+            "total": _stats("total", 1.0, 2.0, 3.0, 3.5, 4.0, 2.5, "75.0%"),
+            "atomics": [_stats("foo", 0.5, 1.0, 1.5, 1.75, 2.0, 1.25,
+                               "100.0%")]}},
+        "total_iteration_count": 4, "failed_iteration_count": 1,
+        "load_duration": 2.0, "start_time": 1500000000.5,
+        "pass_sla": False, "data": []}
+    workload_2 = {
+        "uuid": "w2", "name": "Foo.baz",
+        "statistics": {"durations": {
+            "total": _stats("total", "n/a", "n/a", "n/a", "n/a", "n/a",
+                            "n/a", "n/a"),
+            "atomics": []}},
+        "total_iteration_count": 0, "failed_iteration_count": 0,
+        "load_duration": 0, "start_time": None,
+        "pass_sla": True, "data": []}
+    return [{"uuid": "t1",
+             "subtasks": [{"uuid": "s1", "workloads": [workload_1]},
+                          {"uuid": "s2", "workloads": [workload_2]}]}]
+
+
+W1 = "task_uuid=\"t1\",workload_uuid=\"w1\",scenario=\"Foo.bar\""
+W2 = "task_uuid=\"t1\",workload_uuid=\"w2\",scenario=\"Foo.baz\""
+
+EXPECTED = """# TYPE rally_workload_duration_seconds gauge
+# UNIT rally_workload_duration_seconds seconds
+# HELP rally_workload_duration_seconds Statistics of durations of \
+iterations (action=total) and atomic actions.
+rally_workload_duration_seconds{%(w1)s,action="total",stat="min"} 1.0
+rally_workload_duration_seconds{%(w1)s,action="total",stat="median"} 2.0
+rally_workload_duration_seconds{%(w1)s,action="total",stat="p90"} 3.0
+rally_workload_duration_seconds{%(w1)s,action="total",stat="p95"} 3.5
+rally_workload_duration_seconds{%(w1)s,action="total",stat="max"} 4.0
+rally_workload_duration_seconds{%(w1)s,action="total",stat="avg"} 2.5
+rally_workload_duration_seconds{%(w1)s,action="foo",stat="min"} 0.5
+rally_workload_duration_seconds{%(w1)s,action="foo",stat="median"} 1.0
+rally_workload_duration_seconds{%(w1)s,action="foo",stat="p90"} 1.5
+rally_workload_duration_seconds{%(w1)s,action="foo",stat="p95"} 1.75
+rally_workload_duration_seconds{%(w1)s,action="foo",stat="max"} 2.0
+rally_workload_duration_seconds{%(w1)s,action="foo",stat="avg"} 1.25
+# TYPE rally_workload_action_success_ratio gauge
+# HELP rally_workload_action_success_ratio Ratio of successful runs of \
+iterations (action=total) and atomic actions.
+rally_workload_action_success_ratio{%(w1)s,action="total"} 0.75
+rally_workload_action_success_ratio{%(w1)s,action="foo"} 1.0
+# TYPE rally_workload_iterations gauge
+# HELP rally_workload_iterations Number of iterations.
+rally_workload_iterations{%(w1)s} 4
+rally_workload_iterations{%(w2)s} 0
+# TYPE rally_workload_failed_iterations gauge
+# HELP rally_workload_failed_iterations Number of failed iterations.
+rally_workload_failed_iterations{%(w1)s} 1
+rally_workload_failed_iterations{%(w2)s} 0
+# TYPE rally_workload_failure_ratio gauge
+# HELP rally_workload_failure_ratio Ratio of failed iterations.
+rally_workload_failure_ratio{%(w1)s} 0.25
+# TYPE rally_workload_throughput gauge
+# HELP rally_workload_throughput Number of iterations per second of the load.
+rally_workload_throughput{%(w1)s} 2.0
+# TYPE rally_workload_load_duration_seconds gauge
+# UNIT rally_workload_load_duration_seconds seconds
+# HELP rally_workload_load_duration_seconds Duration of the load.
+rally_workload_load_duration_seconds{%(w1)s} 2.0
+rally_workload_load_duration_seconds{%(w2)s} 0
+# TYPE rally_workload_start_timestamp_seconds gauge
+# UNIT rally_workload_start_timestamp_seconds seconds
+# HELP rally_workload_start_timestamp_seconds Time when the load was started.
+rally_workload_start_timestamp_seconds{%(w1)s} 1500000000.5
+# TYPE rally_workload_sla_passed gauge
+# HELP rally_workload_sla_passed Whether all SLA checks of the workload \
+passed.
+rally_workload_sla_passed{%(w1)s} 0
+rally_workload_sla_passed{%(w2)s} 1
+# EOF
+""" % {"w1": W1, "w2": W2}
+
+
+class OpenMetricsExporterTestCase(test.TestCase):
+
+    def test_generate(self):
+        reporter = openmetrics.OpenMetricsExporter(get_tasks_results(), None)
+        self.assertEqual({"print": EXPECTED}, reporter.generate())
+
+    def test_generate_to_file(self):
+        reporter = openmetrics.OpenMetricsExporter(get_tasks_results(),
+                                                   "metrics.prom")
+        self.assertEqual(
+            {"files": {"metrics.prom": EXPECTED},
+             "open": "file://" + os.path.abspath("metrics.prom")},
+            reporter.generate())
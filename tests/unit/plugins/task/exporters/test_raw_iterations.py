@@ -0,0 +1,148 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import csv
+import gzip
+import io
+import json
+import os
+
+import fixtures
+
+from rally.plugins.task.exporters import raw_iterations
+from tests.unit import test
+
+
+def _action(name, started_at, finished_at, children=None, failed=False):
+    action = {"name": name, "started_at": started_at,
+              "finished_at": finished_at, "children": children or []}
+    if failed:
+        action["failed"] = True
+    return action
+
+
+def get_tasks_results(statistics=True):
+    workload_1 = {
+        "uuid": "w1", "name": "Foo.bar",
+        "statistics": {"durations": {"atomics": [{"name": "foo"},
+                                                 {"name": "bar"}]}},
+        "data": iter([
+            {"timestamp": 1.0, "duration": 3.0, "idle_duration": 0.5,
+             "error": [],
+             "atomic_actions": [
+                 _action("foo", 1.0, 2.0, children=[_action("x", 1, 2)]),
+                 _action("bar", 2.0, 2.5), _action("bar", 2.5, 4.0)]},
+            {"timestamp": 5.0, "duration": 1.0, "idle_duration": 0,
+             "error": ["KeyError", "msg", "traceback"],
+             "atomic_actions": [_action("foo", 5.0, 6.0, failed=True)]}])}
+    workload_2 = {
+        "uuid": "w2", "name": "Foo.baz",
+        "statistics": {"durations": {"atomics": [{"name": "baz"}]}},
+        "data": [{"timestamp": 7.0, "duration": 0.25, "idle_duration": 0,
+                  "error": [],
+                  "atomic_actions": [_action("baz", 7.0, 7.25)]}]}
+    if not statistics:
+        workload_1["statistics"] = {}
+        workload_1["data"] = list(workload_1["data"])
+        del workload_2["statistics"]
+    return [{"uuid": "t1",
+             "subtasks": [{"uuid": "s1", "workloads": [workload_1]},
+                          {"uuid": "s2", "workloads": [workload_2]}]}]
+
+
+ROWS = [
+    {"task_uuid": "t1", "subtask_uuid": "s1", "workload_uuid": "w1",
+     "workload_name": "Foo.bar", "iteration": 1, "timestamp": 1.0,
+     "duration": 3.0, "idle_duration": 0.5, "error": None,
+     "atomic.foo": 1.0, "atomic.bar": 2.0},
+    {"task_uuid": "t1", "subtask_uuid": "s1", "workload_uuid": "w1",
+     "workload_name": "Foo.bar", "iteration": 2, "timestamp": 5.0,
+     "duration": 1.0, "idle_duration": 0, "error": "KeyError",
+     "atomic.foo": 1.0},
+    {"task_uuid": "t1", "subtask_uuid": "s2", "workload_uuid": "w2",
+     "workload_name": "Foo.baz", "iteration": 1, "timestamp": 7.0,
+     "duration": 0.25, "idle_duration": 0, "error": None,
+     "atomic.baz": 0.25}]
+
+
+class NDJSONExporterTestCase(test.TestCase):
+
+    def test_generate(self):
+        exporter = raw_iterations.NDJSONExporter(get_tasks_results(), None)
+        report = exporter.generate()
+        self.assertEqual(
+            ROWS, [json.loads(line)
+                   for line in report["print"].split("\n")])
+
+    def test_generate_to_file(self):
+        tempdir = self.useFixture(fixtures.TempDir()).path
+        for name, opener in (("report.json", open),
+                             ("report.json.gz", gzip.open)):
+            path = os.path.join(tempdir, name)
+            exporter = raw_iterations.NDJSONExporter(get_tasks_results(),
+                                                     path)
+            self.assertEqual(
+                {"print": "Successfully exported 3 iterations to '%s'"
+                          % path},
+                exporter.generate())
+            with opener(path, "rt") as f:
+                self.assertEqual(ROWS, [json.loads(line) for line in f])
+
+    def test_generate_empty(self):
+        tasks_results = get_tasks_results()
+        tasks_results[0]["subtasks"][0]["workloads"][0]["data"] = []
+        tasks_results[0]["subtasks"][1]["workloads"][0]["data"] = []
+        exporter = raw_iterations.NDJSONExporter(tasks_results, None)
+        self.assertEqual({"print": ""}, exporter.generate())
+
+
+class CSVExporterTestCase(test.TestCase):
+
+    HEADER = raw_iterations.FIELDS + ["atomic.foo", "atomic.bar",
+                                      "atomic.baz"]
+
+    def _read(self, f):
+        reader = csv.reader(f)
+        header = next(reader)
+        return header, [dict((k, v) for k, v in zip(header, row) if v)
+                        for row in reader]
+
+    def _expected_rows(self):
+        return [dict((k, str(v)) for k, v in row.items() if v is not None)
+                for row in ROWS]
+
+    def test_generate(self):
+        exporter = raw_iterations.CSVExporter(get_tasks_results(), None)
+        header, rows = self._read(io.StringIO(exporter.generate()["print"]))
+        self.assertEqual(self.HEADER, header)
+        self.assertEqual(self._expected_rows(), rows)
+
+    def test_generate_without_statistics(self):
+        exporter = raw_iterations.CSVExporter(
+            get_tasks_results(statistics=False), None)
+        header, rows = self._read(io.StringIO(exporter.generate()["print"]))
+        self.assertEqual(self.HEADER, header)
+        self.assertEqual(self._expected_rows(), rows)
+
+    def test_generate_to_file(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            "report.csv.gz")
+        exporter = raw_iterations.CSVExporter(get_tasks_results(), path)
+        self.assertEqual(
+            {"print": "Successfully exported 3 iterations to '%s'" % path},
+            exporter.generate())
+        with gzip.open(path, "rt", newline="") as f:
+            header, rows = self._read(f)
+        self.assertEqual(self.HEADER, header)
+        self.assertEqual(self._expected_rows(), rows)
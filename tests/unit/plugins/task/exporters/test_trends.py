@@ -81,15 +81,30 @@ class TrendsExporterTestCase(test.TestCase):
 
     @mock.patch("%s.plot.trends" % PATH, return_value="html")
     def test_generate(self, mock_plot_trends):
-        reporter = trends.TrendsExporter("task_results", None)
+        tasks_results = get_tasks_results()
+        reporter = trends.TrendsExporter(tasks_results, None)
 
         self.assertEqual({"print": "html"}, reporter.generate())
 
-        mock_plot_trends.assert_called_once_with(
-            "task_results", False)
+        mock_plot_trends.assert_called_once_with(tasks_results, False)
 
-        reporter = trends.TrendsExporter("task_results",
+        reporter = trends.TrendsExporter(tasks_results,
                                          output_destination="path")
         self.assertEqual({"files": {"path": "html"},
                           "open": "file://" + os.path.abspath("path")},
                          reporter.generate())
+
+    @mock.patch("%s.plot.trends" % PATH, return_value="html")
+    def test_generate_from_index(self, mock_plot_trends):
+        detailed_task = get_tasks_results()[0]
+        api = mock.Mock()
+        api.task.get_trend_points.return_value = {"uuid-1": ["point"]}
+        reporter = trends.TrendsExporter(
+            [{"uuid": "uuid-1"}, detailed_task], None, api=api)
+
+        self.assertEqual({"print": "html"}, reporter.generate())
+
+        api.task.get_trend_points.assert_called_once_with(["uuid-1"])
+        mock_plot_trends.assert_called_once_with(
+            [{"uuid": "uuid-1", "trend_points": ["point"]}, detailed_task],
+            False)
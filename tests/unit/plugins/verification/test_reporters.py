@@ -14,10 +14,12 @@
 
 import collections
 import datetime as dt
+import functools
 import os
 from unittest import mock
 
 import ddt
+import fixtures
 
 from rally.common import utils
 from rally.plugins.verification import reporters
@@ -398,11 +400,23 @@ class JUnitXMLReporterTestCase(test.TestCase):
                                "junit_report.xml")) as f:
             expected_report = f.read()
 
-        junit_reporter = reporters.JUnitXMLReporter(get_verifications(), None)
+        def get_db_verifications():
+            # results are loaded from the database in order tests were run
+            verifications = get_verifications()
+            for v in verifications:
+                v.iter_tests = functools.partial(
+                    sorted, v.tests.values(),
+                    key=lambda t: (t.get("timestamp", ""), t["name"]))
+            return verifications
+
+        junit_reporter = reporters.JUnitXMLReporter(get_db_verifications(),
+                                                    None)
         self.assertEqual({"print": expected_report}, junit_reporter.generate())
 
-        dest = "path"
-        junit_reporter = reporters.JUnitXMLReporter(get_verifications(), dest)
-        self.assertEqual({"open": dest,
-                          "files": {dest: expected_report}},
-                         junit_reporter.generate())
+        dest = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            "reports", "junit.xml")
+        junit_reporter = reporters.JUnitXMLReporter(get_db_verifications(),
+                                                    dest)
+        self.assertEqual({"open": dest}, junit_reporter.generate())
+        with open(dest) as f:
+            self.assertEqual(expected_report, f.read())
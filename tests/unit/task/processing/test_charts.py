@@ -777,6 +777,22 @@ class MainStatsTableTestCase(test.TestCase):
                     "styles": expected_styles}
         self.assertEqual(expected, table.render())
 
+    def test_load_results(self):
+        data = [generate_iteration(1.6, True, ("foo", 1.2)),
+                generate_iteration(5.2, False, ("foo", 1.2)),
+                generate_iteration(12.3, False, ("foo", 4.2))]
+        tables = []
+        for i in range(2):
+            tables.append(charts.MainStatsTable({"total_iteration_count": 3}))
+            for el in data:
+                tables[-1].add_iteration(el)
+        durations = tables[0].to_dict()
+
+        loaded = charts.MainStatsTable({"total_iteration_count": 3})
+        loaded.load_results(durations)
+        self.assertEqual(durations, loaded.to_dict())
+        self.assertEqual(tables[1].render(), loaded.render())
+
     def test_to_dict(self):
         table = charts.MainStatsTable({"total_iteration_count": 4})
         data = [generate_iteration(1.6, True, ("foo", 1.2)),
@@ -13,7 +13,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import base64
 import collections
+import copy
+import gzip
 import json
 from unittest import mock
 
@@ -67,6 +70,7 @@ class PlotTestCase(test.TestCase):
         self.assertEqual(
             {"cls": "Foo", "met": "bar", "pos": "1",
              "name": "bar [2]", "description": "Description!!",
+             "parameters": None,
              "runner": "constant", "config": json.dumps("!!!CONF!!!",
                                                         indent=2),
              "created_at": "xxx_time",
@@ -85,6 +89,45 @@ class PlotTestCase(test.TestCase):
              "sla": {}, "sla_success": True, "table": "main_stats"},
             result)
 
+    @mock.patch(PLOT + "charts")
+    def test__process_workload_compacted(self, mock_charts):
+        iterations = [
+            {"timestamp": i + 2, "error": ["E", "msg", ""] if i else [],
+             "duration": i + 5, "idle_duration": i,
+             "output": {"additive": [], "complete": []},
+             "atomic_actions": {"foo_action": i + 10}} for i in range(3)]
+        workload = {
+            "data": iterations,
+            "sla_results": {"sla": {}}, "pass_sla": True,
+            "position": 0,
+            "name": "Foo.bar", "description": "Description!!",
+            "runner_type": "constant",
+            "runner": {},
+            "statistics": {"durations": "durations",
+                           "compacted": {"load_profile": "load_profile"}},
+            "full_duration": 40, "load_duration": 32,
+            "total_iteration_count": 100,
+            "failed_iteration_count": 10,
+            "max_duration": 14, "min_duration": 5,
+            "start_time": 2,
+            "created_at": "xxx_time",
+            "hooks": []}
+
+        result = plot._process_workload(workload, "!!!CONF!!!", 0)
+
+        sample = dict(workload, total_iteration_count=3)
+        mock_charts.MainStackedAreaChart.assert_called_once_with(sample)
+        mock_charts.MainStatsTable.assert_called_once_with(workload)
+        main_stats = mock_charts.MainStatsTable.return_value
+        main_stats.load_results.assert_called_once_with("durations")
+        self.assertFalse(main_stats.add_iteration.called)
+        load_profile = mock_charts.LoadProfileChart.return_value
+        self.assertFalse(load_profile.add_iteration.called)
+        self.assertEqual("load_profile", result["load_profile"])
+        self.assertEqual([("success", 90), ("errors", 10)],
+                         result["iterations"]["pie"])
+        self.assertEqual(2, len(result["errors"]))
+
     @ddt.data(
         {"hooks": [], "expected": []},
         {"hooks": [
@@ -215,6 +258,57 @@ class PlotTestCase(test.TestCase):
             {"cls": "Foo.bar_3_cls", "met": "dummy", "name": "0", "pos": "0"}],
             p_workloads)
 
+    @mock.patch(PLOT + "_process_workload")
+    def test__process_workloads_with_cache(self, mock__process_workload):
+        workloads = [{"uuid": "uuid-%s" % i, "name": "Foo.bar",
+                      "updated_at": "2017-06-04T05:14:44", "position": 0,
+                      "description": "", "runner_type": "constant",
+                      "runner": {}, "contexts": {}, "sla": {}, "args": {},
+                      "hooks": [], "data": iter([{"id": i}])}
+                     for i in range(3)]
+        cache = mock.Mock()
+        cache.get.side_effect = [{"cls": "Foo", "met": "bar", "pos": "0"},
+                                 None]
+        mock__process_workload.side_effect = lambda w, cfg, pos: {
+            "cls": "Foo", "met": "bar", "pos": str(pos), "data": w["data"]}
+
+        p_workloads = plot._process_workloads(
+            workloads, cache=cache, cacheable={"uuid-0", "uuid-1"})
+
+        self.assertEqual(
+            [{"cls": "Foo", "met": "bar", "pos": "0"},
+             {"cls": "Foo", "met": "bar", "pos": "1", "data": [{"id": 1}]},
+             {"cls": "Foo", "met": "bar", "pos": "2", "data": [{"id": 2}]}],
+            p_workloads)
+        self.assertEqual([mock.call(workloads[0], 0),
+                          mock.call(workloads[1], 1)],
+                         cache.make_key.call_args_list)
+        # the last workload is not cacheable
+        cache.set.assert_called_once_with(cache.make_key.return_value,
+                                          p_workloads[1])
+
+    @mock.patch(PLOT + "_process_workloads")
+    @mock.patch(PLOT + "ui_utils.get_template")
+    def test_plot_with_cache(self, mock_get_template,
+                             mock__process_workloads):
+        mock__process_workloads.return_value = []
+        tasks = [{"uuid": "task-%s" % status, "title": "", "status": status,
+                  "description": "",
+                  "subtasks": [{"title": "", "description": "",
+                                "workloads": [{"uuid": "w-%s" % status,
+                                               "name": "Foo.bar",
+                                               "args": {}, "description": "",
+                                               "contexts": {}, "runner": {},
+                                               "runner_type": "constant",
+                                               "hooks": [], "sla": {}}]}]}
+                 for status in ("finished", "running", "aborted")]
+        cache = mock.Mock()
+
+        plot.plot(tasks, cache=cache)
+
+        mock__process_workloads.assert_called_once_with(
+            mock.ANY, cache=cache, cacheable={"w-finished", "w-aborted"})
+
     def test__make_source(self):
         tasks = [{"title": "task title",
                   "uuid": "task1",
@@ -334,35 +428,76 @@ class PlotTestCase(test.TestCase):
 
     @ddt.data({},
               {"include_libs": True},
-              {"include_libs": False})
+              {"include_libs": False},
+              {"lazy": True})
     @ddt.unpack
+    @mock.patch(PLOT + "_make_lazy")
     @mock.patch(PLOT + "_make_source")
     @mock.patch(PLOT + "_process_workloads")
     @mock.patch(PLOT + "ui_utils.get_template")
     @mock.patch("rally.common.version.version_string", return_value="42.0")
     def test_plot(self, mock_version_string, mock_get_template,
-                  mock__process_workloads, mock__make_source, **ddt_kwargs):
+                  mock__process_workloads, mock__make_source, mock__make_lazy,
+                  **ddt_kwargs):
         task_dict = {"title": "", "description": "",
                      "subtasks": [{"title": "", "description": "",
                                    "workloads": ["foo", "bar"]}]}
         mock__make_source.return_value = "source"
         mock__process_workloads.return_value = "scenarios"
+        mock__make_lazy.return_value = ("summaries", [("id", "blob")])
         mock_get_template.return_value.render.return_value = "tasks_html"
 
         html = plot.plot([task_dict], **ddt_kwargs)
 
         self.assertEqual("tasks_html", html)
         mock_get_template.assert_called_once_with("task/report.html")
-        mock__process_workloads.assert_called_once_with(["foo", "bar"])
-        if "include_libs" in ddt_kwargs:
+        mock__process_workloads.assert_called_once_with(
+            ["foo", "bar"], cache=None, cacheable=set())
+        if ddt_kwargs.get("lazy"):
+            mock__make_lazy.assert_called_once_with("scenarios")
             mock_get_template.return_value.render.assert_called_once_with(
-                version="42.0", data="\"scenarios\"",
-                source="\"source\"",
-                include_libs=ddt_kwargs["include_libs"])
+                version="42.0", data="\"summaries\"",
+                source="\"source\"", blobs=[("id", "blob")],
+                include_libs=False)
         else:
+            self.assertFalse(mock__make_lazy.called)
             mock_get_template.return_value.render.assert_called_once_with(
                 version="42.0", data="\"scenarios\"",
-                source="\"source\"", include_libs=False)
+                source="\"source\"", blobs=[],
+                include_libs=ddt_kwargs.get("include_libs", False))
+
+    def test__make_lazy(self):
+        workloads = [
+            {"cls": "Foo", "met": "bar", "pos": "0", "name": "bar",
+             "runner": "constant", "description": "", "load_duration": 1,
+             "full_duration": 2, "created_at": "2017-06-04T05:14:44",
+             "iterations_count": 10, "sla_success": True,
+             "errors": [{"type": "KeyError"}], "hooks": [],
+             "table": {"rows": []}},
+            {"cls": "Foo", "met": "bar", "pos": "1", "name": "bar [2]",
+             "runner": "serial", "description": "d", "load_duration": 3,
+             "full_duration": 4, "created_at": "2017-06-04T05:15:44",
+             "iterations_count": 0, "sla_success": False,
+             "errors": [], "hooks": ["hook"], "table": {"rows": [1]}}]
+
+        summaries, blobs = plot._make_lazy(copy.deepcopy(workloads))
+
+        self.assertEqual(["workload-data-0", "workload-data-1"],
+                         [b[0] for b in blobs])
+        for summary, (blob_id, blob), workload in zip(summaries, blobs,
+                                                      workloads):
+            details = json.loads(
+                gzip.decompress(base64.b64decode(blob)).decode("utf-8"))
+            self.assertEqual(
+                {"errors": workload["errors"], "hooks": workload["hooks"],
+                 "table": workload["table"]}, details)
+            self.assertEqual(blob_id, summary.pop("lazy"))
+            self.assertEqual(len(workload["errors"]),
+                             summary.pop("errors_count"))
+            self.assertEqual(len(workload["hooks"]),
+                             summary.pop("hooks_count"))
+            summary.update(details)
+            self.assertEqual(workload, summary)
 
     @mock.patch(PLOT + "objects.Task")
     @mock.patch(PLOT + "Trends")
@@ -372,6 +507,7 @@ class PlotTestCase(test.TestCase):
                     mock_task):
         task_dict = {"uuid": "task--uu--iiii-dd",
                      "subtasks": [{"workloads": ["foo", "bar"]}]}
+        indexed_task = {"uuid": "indexed-task", "trend_points": ["p1"]}
 
         trends = mock.Mock()
         trends.get_data.return_value = ["foo", "bar"]
@@ -380,13 +516,14 @@ class PlotTestCase(test.TestCase):
         template.render.return_value = "trends html"
         mock_get_template.return_value = template
 
-        result = plot.trends([task_dict])
+        result = plot.trends([task_dict, indexed_task])
 
         self.assertEqual("trends html", result)
         self.assertEqual(
             [mock.call("task--uu--iiii-dd", "foo"),
              mock.call("task--uu--iiii-dd", "bar")],
             trends.add_result.mock_calls)
+        trends.add_point.assert_called_once_with("indexed-task", "p1")
         mock_get_template.assert_called_once_with("task/trends.html")
         template.render.assert_called_once_with(version="42.0",
                                                 data="[\"foo\", \"bar\"]",
@@ -493,6 +630,26 @@ class TrendsTestCase(test.TestCase):
                 trends_result[idx]["actions"][a_idx]["durations"].sort()
         return trends_result
 
+    def test_make_point_and_add_point(self):
+        workloads = [self._make_result(0), self._make_result(1),
+                     self._make_result(2, sla_success=False, with_na=True),
+                     self._make_result(0, sla_success=False)]
+        for w in workloads:
+            w.update({"description": "descr", "sla": {}, "position": 0})
+
+        expected = plot.Trends()
+        for i, w in enumerate(workloads):
+            expected.add_result("task_uuid_%s" % i, w)
+
+        trends = plot.Trends()
+        for i, w in enumerate(workloads):
+            # points are stored in the database as JSON
+            point = json.loads(json.dumps(trends.make_point(w)))
+            trends.add_point("task_uuid_%s" % i, point)
+
+        self.assertEqual(json.loads(json.dumps(expected.get_data())),
+                         json.loads(json.dumps(trends.get_data())))
+
     @mock.patch(PLOT + "json.dumps")
     @mock.patch(PLOT + "objects.Workload.to_task")
     def test_add_result_and_get_data(self, mock_workload_to_task, mock_dumps):
@@ -545,6 +702,7 @@ class TrendsTestCase(test.TestCase):
              "met": "name_0",
              "name": "Scenario.name_0",
              "sla_failures": 0,
+             "parameters": None,
              "stat": {"avg": 1.425, "max": 1.8, "min": 0.8},
              "success": [("success", [(123456789, 100.0)])]},
             {"actions": [{"durations": [("90%ile", [(123457789, 0.9)]),
@@ -575,6 +733,7 @@ class TrendsTestCase(test.TestCase):
              "met": "name_1",
              "name": "Scenario.name_1",
              "sla_failures": 0,
+             "parameters": None,
              "stat": {"avg": 1.425, "max": 1.8, "min": 0.8},
              "success": [("success", [(123457789, 100.0)])]}]
         self.assertEqual(expected, actual)
@@ -624,6 +783,7 @@ class TrendsTestCase(test.TestCase):
              "met": "name_42",
              "name": "Scenario.name_42",
              "sla_failures": 1,
+             "parameters": None,
              "stat": {"avg": 1.425, "max": 1.8, "min": 0.8},
              "success": [("success", [(123498789, 100.0)])]}]
         self.assertEqual(expected, actual)
@@ -673,6 +833,7 @@ class TrendsTestCase(test.TestCase):
              "met": "name_42",
              "name": "Scenario.name_42",
              "sla_failures": 1,
+             "parameters": None,
              "stat": {"avg": None, "max": None, "min": None},
              "success": [("success", [(123498789, 0)])]}]
 
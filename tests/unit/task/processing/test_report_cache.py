@@ -0,0 +1,103 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+from unittest import mock
+
+import fixtures
+
+from rally.task.processing import report_cache
+from tests.unit import test
+
+
+class ReportCacheTestCase(test.TestCase):
+
+    def setUp(self):
+        super(ReportCacheTestCase, self).setUp()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 "cache")
+
+    @mock.patch("rally.task.processing.report_cache.CONF")
+    def test___init__(self, mock_conf):
+        mock_conf.report_cache_dir = "~/foo"
+        mock_conf.report_cache_size = 2
+        cache = report_cache.ReportCache()
+        self.assertEqual(os.path.expanduser("~/foo"), cache.path)
+        self.assertEqual(2 * 1024 * 1024, cache.max_size)
+
+    @mock.patch("rally.task.processing.report_cache.version.version_string")
+    def test_make_key(self, mock_version_string):
+        mock_version_string.return_value = "1.0"
+        workload = {"uuid": "uuid", "updated_at": "2017-06-04T05:14:44"}
+        key = report_cache.ReportCache.make_key(workload, 1)
+
+        self.assertEqual(key, report_cache.ReportCache.make_key(workload, 1))
+        self.assertNotEqual(key,
+                            report_cache.ReportCache.make_key(workload, 2))
+        self.assertNotEqual(key, report_cache.ReportCache.make_key(
+            dict(workload, updated_at="2017-06-04T05:14:45"), 1))
+        mock_version_string.return_value = "1.1"
+        self.assertNotEqual(key,
+                            report_cache.ReportCache.make_key(workload, 1))
+
+        self.assertIsNone(report_cache.ReportCache.make_key({"uuid": "u"}))
+
+    def test_get_and_set(self):
+        cache = report_cache.ReportCache(self.path, max_size=1024 * 1024)
+        self.assertIsNone(cache.get("key"))
+
+        cache.set("key", {"foo": [1, 2.5, "bar"]})
+        self.assertEqual({"foo": [1, 2.5, "bar"]}, cache.get("key"))
+        # no temporary files are left
+        self.assertEqual(["key.json.gz"], os.listdir(self.path))
+
+    def test_get_corrupted(self):
+        cache = report_cache.ReportCache(self.path, max_size=1024 * 1024)
+        os.makedirs(self.path)
+        with open(os.path.join(self.path, "key.json.gz"), "wb") as f:
+            f.write(b"garbage")
+        self.assertIsNone(cache.get("key"))
+
+    def test_disabled(self):
+        cache = report_cache.ReportCache(self.path, max_size=0)
+        cache.set("key", {"foo": "bar"})
+        self.assertIsNone(cache.get("key"))
+        self.assertFalse(os.path.exists(self.path))
+
+    @mock.patch("rally.task.processing.report_cache.LOG")
+    def test_set_failed(self, mock_log):
+        # the directory cannot be created, since there is a file
+        with open(self.path, "w") as f:
+            f.write("")
+        cache = report_cache.ReportCache(self.path, max_size=1024 * 1024)
+        cache.set("key", {"foo": "bar"})
+        self.assertTrue(mock_log.warning.called)
+
+    def test_evict(self):
+        cache = report_cache.ReportCache(self.path, max_size=1024 * 1024)
+        data = [str(i) * 100 for i in range(20)]
+        for i, key in enumerate(("a", "b", "c")):
+            cache.set(key, data)
+            # make usage times distinct
+            os.utime(os.path.join(self.path, key + ".json.gz"), (i, i))
+        entry_size = os.path.getsize(os.path.join(self.path, "a.json.gz"))
+        # the usage of an entry makes it the most recent one
+        self.assertEqual(data, cache.get("a"))
+
+        cache.max_size = entry_size * 3
+        cache.set("d", data)
+
+        self.assertEqual(["a.json.gz", "c.json.gz", "d.json.gz"],
+                         sorted(os.listdir(self.path)))
+        self.assertEqual(entry_size * 3, cache._size)
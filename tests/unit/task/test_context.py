@@ -13,10 +13,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import threading
 from unittest import mock
 
 import ddt
 
+from rally.common import cfg
 from rally import exceptions
 from rally.task import context
 from tests.unit import fakes
@@ -262,6 +264,83 @@ class ContextManagerTestCase(test.TestCase):
             }], manager.contexts_results())
         mock_format_exc.assert_called_once_with(special_exc)
 
+    def _make_contexts(self, *orders):
+        contexts = []
+        for i, order in enumerate(orders):
+            ctx = mock.MagicMock()
+            ctx.get_order.return_value = order
+            ctx.get_fullname.return_value = "ctx%s" % i
+            contexts.append(ctx)
+        return contexts
+
+    @mock.patch("rally.task.context.ContextManager._get_sorted_context_lst")
+    def test_setup_concurrently(self, mock__get_sorted_context_lst):
+        self.useFixture(cfg.fixture.Config()).config(context_workers=4)
+        contexts = self._make_contexts(1, 2, 2, 2, 3)
+        mock__get_sorted_context_lst.return_value = contexts
+        # contexts with the same order wait for each other, so they would
+        #   hang if they were set up one by one
+        barrier = threading.Barrier(3, timeout=5)
+        for ctx in contexts[1:4]:
+            ctx.setup.side_effect = barrier.wait
+        ctx_object = {"config": {}, "task": {"uuid": "uuid"}}
+
+        manager = context.ContextManager(ctx_object)
+        manager.setup()
+
+        for ctx in contexts:
+            ctx.setup.assert_called_once_with()
+        self.assertEqual(["ctx%s" % i for i in range(5)],
+                         [r["plugin_name"]
+                          for r in manager.contexts_results()])
+        self.assertEqual(contexts, manager._visited)
+
+    @mock.patch("rally.task.context.task_utils.format_exc")
+    @mock.patch("rally.task.context.ContextManager._get_sorted_context_lst")
+    def test_setup_concurrently_fails(self, mock__get_sorted_context_lst,
+                                      mock_format_exc):
+        self.useFixture(cfg.fixture.Config()).config(context_workers=4)
+        contexts = self._make_contexts(1, 1, 1, 2)
+        mock__get_sorted_context_lst.return_value = contexts
+        special_exc = KeyError("Oops")
+        contexts[1].setup.side_effect = special_exc
+        ctx_object = {"config": {}, "task": {"uuid": "uuid"}}
+
+        manager = context.ContextManager(ctx_object)
+        with mock.patch.object(manager, "cleanup") as mock_cleanup:
+            e = self.assertRaises(KeyError, manager.__enter__)
+        self.assertEqual(special_exc, e)
+
+        # contexts with the same order are finished anyway
+        for ctx in contexts[:3]:
+            ctx.setup.assert_called_once_with()
+        self.assertFalse(contexts[3].setup.called)
+        mock_cleanup.assert_called_once_with()
+        self.assertEqual(contexts[:3], manager._visited)
+        self.assertEqual(
+            [None, mock_format_exc.return_value, None],
+            [r["setup"]["error"] for r in manager.contexts_results()])
+        mock_format_exc.assert_called_once_with(special_exc)
+
+    def test_cleanup_concurrently(self):
+        self.useFixture(cfg.fixture.Config()).config(context_workers=4)
+        contexts = self._make_contexts(1, 2, 2, 3)
+        calls = []
+        barrier = threading.Barrier(2, timeout=5)
+        contexts[0].cleanup.side_effect = lambda: calls.append("ctx0")
+        contexts[1].cleanup.side_effect = barrier.wait
+        contexts[2].cleanup.side_effect = barrier.wait
+        contexts[3].cleanup.side_effect = lambda: calls.append("ctx3")
+        ctx_object = {"config": {}, "task": {"uuid": "uuid"}}
+
+        manager = context.ContextManager(ctx_object)
+        manager._visited = contexts
+        manager.cleanup()
+
+        for ctx in contexts:
+            ctx.cleanup.assert_called_once_with()
+        self.assertEqual(["ctx3", "ctx0"], calls)
+
     def test_get_sorted_context_lst(self):
 
         @context.configure("foo", order=1)
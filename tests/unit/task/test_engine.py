@@ -72,6 +72,7 @@ class TaskEngineTestCase(test.TestCase):
         mock_validate.syntax.assert_called_once_with(config)
         mock_validate.platforms.assert_called_once_with(config)
         mock_validate.semantic.assert_called_once_with(config)
+        eng.task.set_validation_duration.assert_called_once_with(mock.ANY)
 
     def test_validate__wrong_syntax(self):
         task = mock.MagicMock()
@@ -219,6 +220,35 @@ class TaskEngineTestCase(test.TestCase):
                          "configuration\nSubtask configuration:\n<JSON>\n\n"
                          "Reason(s):\n context_error", e.format_message())
 
+    @mock.patch("rally.task.engine.TaskEngine._validate_workload")
+    def test__validate_config_syntax_with_matrix(
+            self, mock_task_engine__validate_workload):
+        workload = dict(self._make_workload(name="sca", args={}),
+                        matrix={"zip": {"args.a": [1, 2]}})
+        config = mock.MagicMock(subtasks=[{"workloads": [workload]}])
+        eng = engine.TaskEngine(mock.MagicMock(), mock.MagicMock(),
+                                mock.Mock())
+
+        eng._validate_config_syntax(config)
+
+        self.assertEqual(
+            [{"a": 1}, {"a": 2}],
+            [c[0][0]["args"]
+             for c in mock_task_engine__validate_workload.call_args_list])
+
+        # each value of a product is validated once
+        mock_task_engine__validate_workload.reset_mock()
+        workload["matrix"] = {"product": {"args.a": [1, 2, 3],
+                                          "args.b": [4, 5]}}
+
+        eng._validate_config_syntax(config)
+
+        self.assertEqual(
+            [{"a": 1, "b": 4}, {"a": 2, "b": 4}, {"a": 3, "b": 4},
+             {"a": 1, "b": 5}],
+            [c[0][0]["args"]
+             for c in mock_task_engine__validate_workload.call_args_list])
+
     @mock.patch("rally.task.engine.json.dumps")
     @mock.patch("rally.task.engine.scenario.Scenario.get")
     @mock.patch("rally.task.sla.SLA.validate")
@@ -347,6 +377,84 @@ class TaskEngineTestCase(test.TestCase):
                           eng._validate_config_semantic,
                           mock_task_instance)
 
+    @mock.patch("rally.task.engine.scenario.Scenario.get")
+    @mock.patch("rally.task.engine.scenario.Scenario.validate")
+    @mock.patch("rally.task.engine.context.Context.validate")
+    def test__validate_workload_memoizes_results(
+            self, mock_context_validate, mock_scenario_validate,
+            mock_scenario_get):
+        mock_context_validate.return_value = []
+        mock_scenario_validate.return_value = []
+        scenario_cls = mock_scenario_get.return_value
+        scenario_cls.get_default_context.return_value = {"foo": {"x": 1}}
+        eng = engine.TaskEngine(mock.MagicMock(), mock.MagicMock(),
+                                mock.Mock())
+
+        for position in range(3):
+            eng._validate_workload(
+                self._make_workload("sca", position=position,
+                                    contexts={"a": {"y": [1, 2]}}),
+                vtype="syntax")
+        eng._validate_workload(
+            self._make_workload("sca", contexts={"a": {"y": [1, True]}}),
+            vtype="syntax")
+        eng._validate_workload(self._make_workload("sca"),
+                               vtype="semantic")
+
+        self.assertEqual(3, mock_scenario_validate.call_count)
+        self.assertEqual(
+            [mock.call(name="a", context=None, config=None,
+                       plugin_cfg={"y": [1, 2]}, vtype="syntax"),
+             mock.call(name="foo", context=None, config=None,
+                       plugin_cfg={"x": 1}, allow_hidden=True,
+                       vtype="syntax"),
+             mock.call(name="a", context=None, config=None,
+                       plugin_cfg={"y": [1, True]}, vtype="syntax"),
+             mock.call(name="foo", context=None, config=None,
+                       plugin_cfg={"x": 1}, allow_hidden=True,
+                       vtype="semantic")],
+            mock_context_validate.call_args_list)
+        self.assertEqual({"validations": 19, "cached": 10},
+                         eng._validation_stats)
+
+    @mock.patch("rally.task.engine.context.ContextManager.cleanup")
+    @mock.patch("rally.task.engine.context.ContextManager.setup")
+    @mock.patch("rally.task.engine.TaskEngine._validate_workload")
+    @mock.patch("rally.task.engine.CONF")
+    def test__validate_config_semantic_concurrently(
+            self, mock_conf, mock__validate_workload,
+            mock_context_manager_setup, mock_context_manager_cleanup):
+        mock_conf.validation_workers = 3
+        env = mock.MagicMock(uuid="env_uuid")
+        env.check_health.return_value = {}
+        workloads = [self._make_workload("sca", position=i)
+                     for i in range(5)]
+        config = mock.Mock(subtasks=[{"workloads": workloads[:2]},
+                                     {"workloads": workloads[2:]}])
+        barrier = threading.Barrier(3, timeout=5)
+
+        def validate_workload(workload, vcontext, vtype):
+            if workload["position"] < 3:
+                # three workloads are validated at once
+                barrier.wait()
+            if workload["position"] in (2, 4):
+                raise exceptions.InvalidTaskConfig(
+                    name="sca", pos=workload["position"], config="",
+                    reason="foo")
+
+        mock__validate_workload.side_effect = validate_workload
+        eng = engine.TaskEngine(config, mock.MagicMock(), env)
+
+        e = self.assertRaises(exceptions.InvalidTaskConfig,
+                              eng._validate_config_semantic, config)
+        # the first invalid workload is reported, validation of workloads
+        #   which are not started yet is cancelled
+        self.assertIn("sca[2]", e.format_message())
+        self.assertEqual(
+            [0, 1, 2],
+            sorted(c[0][0]["position"]
+                   for c in mock__validate_workload.call_args_list)[:3])
+
     @mock.patch("rally.task.engine.TaskEngine._validate_workload")
     def test__validate_config_platforms(self, mock__validate_workload):
 
@@ -359,8 +467,8 @@ class TaskEngineTestCase(test.TestCase):
             }
         })
 
-        workload1 = "workload1"
-        workload2 = "workload2"
+        workload1 = self._make_workload("workload1")
+        workload2 = self._make_workload("workload2")
         subtasks = [{"workloads": [workload1]},
                     {"workloads": [workload2]}]
         config = mock.Mock(subtasks=subtasks)
@@ -395,6 +503,48 @@ class TaskEngineTestCase(test.TestCase):
             mock.call(consts.TaskStatus.FINISHED)
         ])
 
+    @mock.patch("rally.common.objects.Task.get_status")
+    @mock.patch("rally.task.engine.TaskEngine._run_subtask")
+    @mock.patch("rally.task.engine.live_metrics")
+    @mock.patch("rally.task.engine.CONF")
+    def test_run_with_live_metrics(self, mock_conf, mock_live_metrics,
+                                   mock_task_engine__run_subtask,
+                                   mock_task_get_status):
+        mock_conf.live_metrics_endpoint = "127.0.0.1:9464"
+        config = mock.MagicMock()
+        config.subtasks = ["subtask"]
+        eng = engine.TaskEngine(config, mock.MagicMock(), mock.Mock())
+        eng.run()
+
+        metrics = mock_live_metrics.LiveMetrics.return_value
+        self.assertEqual(metrics, eng.metrics)
+        mock_live_metrics.MetricsServer.assert_called_once_with(
+            "127.0.0.1:9464", metrics)
+        server = mock_live_metrics.MetricsServer.return_value
+        server.start.assert_called_once_with()
+        server.stop.assert_called_once_with()
+        mock_task_engine__run_subtask.assert_called_once_with("subtask")
+
+    @mock.patch("rally.task.engine.LOG")
+    @mock.patch("rally.task.engine.live_metrics")
+    @mock.patch("rally.task.engine.CONF")
+    def test__start_metrics_server(self, mock_conf, mock_live_metrics,
+                                   mock_log):
+        eng = engine.TaskEngine(mock.MagicMock(), mock.MagicMock(),
+                                mock.Mock())
+
+        mock_conf.live_metrics_endpoint = None
+        self.assertIsNone(eng._start_metrics_server())
+        self.assertFalse(mock_live_metrics.MetricsServer.called)
+
+        # a failure of the endpoint does not break the task
+        mock_conf.live_metrics_endpoint = "127.0.0.1:9464"
+        server = mock_live_metrics.MetricsServer.return_value
+        server.start.side_effect = OSError("Address already in use")
+        self.assertIsNone(eng._start_metrics_server())
+        self.assertIsNone(eng.metrics)
+        self.assertTrue(mock_log.warning.called)
+
     @mock.patch("rally.task.engine.objects.task.Task.get_status")
     @mock.patch("rally.task.engine.LOG")
     @mock.patch("rally.task.engine.ResultConsumer")
@@ -539,6 +689,75 @@ class TaskEngineTestCase(test.TestCase):
         subtask_obj.update_status.assert_called_once_with(
             consts.SubtaskStatus.CRASHED)
 
+    @mock.patch("rally.task.engine.TaskEngine._run_workload")
+    def test__run_subtask_with_matrix(self, mock_task_engine__run_workload):
+        workloads = []
+        mock_task_engine__run_workload.side_effect = (
+            lambda s, w: workloads.append(w))
+        task = mock.MagicMock()
+        matrix = {"product": {"runner.times": [1, 2], "args.a": [3, 4]}}
+        eng = engine.TaskEngine(mock.MagicMock(), task, mock.Mock())
+
+        eng._run_subtask({
+            "title": "foo", "description": "", "contexts": {},
+            "workloads": [
+                self._make_workload("a.task", args={}, position=0),
+                dict(self._make_workload("b.task", args={}, position=1),
+                     matrix=matrix),
+                self._make_workload("c.task", position=2)]})
+
+        self.assertEqual(
+            [("a.task", 0, None, {}),
+             ("b.task", 1, {"runner.times": 1, "args.a": 3}, {"a": 3}),
+             ("b.task", 2, {"runner.times": 1, "args.a": 4}, {"a": 4}),
+             ("b.task", 3, {"runner.times": 2, "args.a": 3}, {"a": 3}),
+             ("b.task", 4, {"runner.times": 2, "args.a": 4}, {"a": 4}),
+             ("c.task", 5, None, None)],
+            [(w["name"], w["position"], w.get("parameters"), w["args"])
+             for w in workloads])
+        task.add_subtask.return_value.update_status.assert_called_once_with(
+            consts.SubtaskStatus.FINISHED)
+
+    @mock.patch("rally.task.engine.TaskEngine._run_workload")
+    def test__run_subtask_in_parallel(self, mock_task_engine__run_workload):
+        task = mock.MagicMock()
+        subtask_obj = task.add_subtask.return_value
+        eng = engine.TaskEngine(mock.MagicMock(), task, mock.Mock())
+
+        eng._run_subtask({
+            "title": "foo", "description": "", "contexts": {},
+            "run_in_parallel": True,
+            "workloads": [
+                self._make_workload("a.task", position=0),
+                dict(self._make_workload("b.task", args={}, position=1),
+                     matrix={"zip": {"args.a": [1, 2]}})]})
+
+        task.add_subtask.assert_called_once_with(
+            title="foo", description="", contexts={}, run_in_parallel=True)
+        calls = mock_task_engine__run_workload.call_args_list
+        self.assertEqual(
+            [("a.task", 0), ("b.task", 1), ("b.task", 2)],
+            sorted((c[0][1]["name"], c[0][1]["position"]) for c in calls))
+        groups = [c[1]["group"] for c in calls]
+        self.assertIsInstance(groups[0], engine.WorkloadGroup)
+        self.assertEqual(1, len(set(groups)))
+        subtask_obj.update_status.assert_called_once_with(
+            consts.SubtaskStatus.FINISHED)
+
+        # a failure of any workload crashes the subtask once all of them
+        #   are finished
+        task.reset_mock()
+        mock_task_engine__run_workload.reset_mock()
+        mock_task_engine__run_workload.side_effect = [MyException(), None]
+        self.assertRaises(MyException, eng._run_subtask, {
+            "title": "foo", "description": "", "contexts": {},
+            "run_in_parallel": True,
+            "workloads": [self._make_workload("a.task", position=0),
+                          self._make_workload("b.task", position=1)]})
+        self.assertEqual(2, mock_task_engine__run_workload.call_count)
+        subtask_obj.update_status.assert_called_once_with(
+            consts.SubtaskStatus.CRASHED)
+
     def test__prepare_context(self):
 
         @context.configure("test1", 1, platform="testing")
@@ -579,6 +798,62 @@ class TaskEngineTestCase(test.TestCase):
         self.assertEqual(expected_result, result)
 
 
+class WorkloadGroupTestCase(test.TestCase):
+
+    def _run_in_threads(self, *targets):
+        threads = [threading.Thread(target=t) for t in targets]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(5)
+            self.assertFalse(t.is_alive())
+
+    def test_start(self):
+        group = engine.WorkloadGroup(3)
+        ready = []
+        started = []
+
+        def workload():
+            ready.append(True)
+            group.start()
+            # nobody is started until all workloads are ready
+            started.append(len(ready))
+            group.leave()
+
+        self._run_in_threads(workload, workload, workload)
+        self.assertEqual([3, 3, 3], started)
+        self.assertFalse(group._barrier.broken)
+
+    def test_start_after_failure(self):
+        group = engine.WorkloadGroup(2)
+        errors = []
+
+        def failed_workload():
+            group.leave()
+
+        def workload():
+            try:
+                group.start()
+            except exceptions.RallyException as e:
+                errors.append(e)
+            group.leave()
+
+        self._run_in_threads(workload, failed_workload)
+        self.assertEqual(1, len(errors))
+        self.assertIn("another workload of the subtask", str(errors[0]))
+
+    def test_abort_on_sla(self):
+        group = engine.WorkloadGroup(2)
+        consumers = [mock.Mock(), mock.Mock()]
+        for consumer in consumers:
+            group.add_consumer(consumer)
+
+        group.abort_on_sla()
+
+        for consumer in consumers:
+            consumer.abort_on_sla.assert_called_once_with()
+
+
 class ResultConsumerTestCase(test.TestCase):
 
     @mock.patch("rally.common.objects.Task.get_status")
@@ -688,6 +963,33 @@ class ResultConsumerTestCase(test.TestCase):
         task.update_status.assert_called_once_with(
             consts.TaskStatus.SOFT_ABORTING)
 
+    @mock.patch("rally.task.engine.threading.Thread")
+    @mock.patch("rally.task.engine.threading.Event")
+    @mock.patch("rally.task.sla.SLAChecker")
+    def test_consume_results_sla_failure_abort_group(
+            self, mock_sla_checker, mock_event, mock_thread):
+        mock_sla_checker.return_value.add_iteration.return_value = False
+        task = mock.MagicMock()
+        runner = mock.MagicMock()
+        runner.result_queue = collections.deque(
+            [[{"duration": 1, "timestamp": 1}]])
+        group = mock.Mock()
+
+        consumer = engine.ResultConsumer(
+            {"fake": 2, "hooks": []}, task=task,
+            subtask=mock.Mock(spec=objects.Subtask),
+            workload=mock.Mock(spec=objects.Workload), runner=runner,
+            abort_on_sla_failure=True, ctx_manager=mock.MagicMock(),
+            group=group)
+        consumer._consume_results()
+
+        group.add_consumer.assert_called_once_with(consumer)
+        group.abort_on_sla.assert_called_once_with()
+        # the runner is aborted by the group
+        self.assertFalse(runner.abort.called)
+        task.update_status.assert_called_once_with(
+            consts.TaskStatus.SOFT_ABORTING)
+
     @mock.patch("rally.task.hook.HookExecutor")
     @mock.patch("rally.common.objects.Task.get_status")
     @mock.patch("rally.task.engine.threading.Thread")
@@ -783,6 +1085,48 @@ class ResultConsumerTestCase(test.TestCase):
         mock_sla_instance.set_unexpected_failure.assert_has_calls(
             [mock.call(exc)])
 
+    @mock.patch("rally.common.objects.Task.get_status")
+    @mock.patch("rally.task.engine.ResultConsumer.wait_and_abort")
+    @mock.patch("rally.task.sla.SLAChecker")
+    def test_consume_results_with_metrics(
+            self, mock_sla_checker, mock_result_consumer_wait_and_abort,
+            mock_task_get_status):
+        mock_sla_checker.return_value.add_iteration.side_effect = [
+            True, False, True]
+        mock_task_get_status.return_value = consts.TaskStatus.RUNNING
+        workload_cfg = {"name": "Foo.bar", "hooks": []}
+        task = mock.MagicMock()
+        task.__getitem__.return_value = "task-uuid"
+        workload = mock.MagicMock(spec=objects.Workload)
+        workload.__getitem__.return_value = "workload-uuid"
+        runner = mock.MagicMock()
+        results = [[{"duration": 1, "timestamp": 3}],
+                   [{"duration": 2, "timestamp": 2},
+                    {"duration": 3, "timestamp": 4}]]
+        runner.result_queue = collections.deque(results)
+        runner.event_queue = collections.deque()
+        metrics = mock.Mock()
+
+        consumer = engine.ResultConsumer(
+            workload_cfg, task=task, subtask=mock.Mock(spec=objects.Subtask),
+            workload=workload, runner=runner, abort_on_sla_failure=False,
+            ctx_manager=mock.MagicMock(), metrics=metrics)
+        # consume results in the current thread
+        consumer.thread = mock.Mock()
+        consumer.aborting_checker = mock.Mock()
+        consumer.is_done = mock.Mock()
+        consumer.is_done.isSet.return_value = True
+        with consumer:
+            consumer._consume_results()
+
+        metrics.start_workload.assert_called_once_with(
+            "task-uuid", "workload-uuid", "Foo.bar")
+        self.assertEqual(
+            [mock.call("workload-uuid", results[0], sla_passed=True),
+             mock.call("workload-uuid", results[1], sla_passed=True)],
+            metrics.add_iterations.call_args_list)
+        metrics.finish_workload.assert_called_once_with("workload-uuid")
+
     @mock.patch("rally.task.engine.CONF")
     @mock.patch("rally.common.objects.Task.get_status")
     @mock.patch("rally.task.engine.ResultConsumer.wait_and_abort")
@@ -834,12 +1178,16 @@ class ResultConsumerTestCase(test.TestCase):
 
         workload.add_workload_data.assert_has_calls([
             mock.call(0, {"raw": [{"duration": 2, "timestamp": 2},
-                                  {"duration": 1, "timestamp": 3}]}),
+                                  {"duration": 1, "timestamp": 3}]},
+                      chunk_format="json"),
             mock.call(1, {"raw": [{"duration": 4, "timestamp": 2},
-                                  {"duration": 3, "timestamp": 3}]}),
+                                  {"duration": 3, "timestamp": 3}]},
+                      chunk_format="json"),
             mock.call(2, {"raw": [{"duration": 6, "timestamp": 2},
-                                  {"duration": 5, "timestamp": 3}]}),
-            mock.call(3, {"raw": [{"duration": 7, "timestamp": 1}]})])
+                                  {"duration": 5, "timestamp": 3}]},
+                      chunk_format="json"),
+            mock.call(3, {"raw": [{"duration": 7, "timestamp": 1}]},
+                      chunk_format="json")])
 
     @mock.patch("rally.task.engine.LOG")
     @mock.patch("rally.task.hook.HookExecutor")
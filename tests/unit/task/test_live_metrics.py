@@ -0,0 +1,115 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import urllib.error
+import urllib.request
+
+from rally.common.io import openmetrics
+from rally.task import live_metrics
+from tests.unit import test
+
+
+def _iteration(duration, error=None, actions=()):
+    return {"duration": duration, "error": error or [],
+            "atomic_actions": [{"name": name, "started_at": 1,
+                                "finished_at": finished_at, "children": []}
+                               for name, finished_at in actions]}
+
+
+def scrape(url):
+    """Fetch metrics and parse samples like a scraper does."""
+    with urllib.request.urlopen(url, timeout=10) as response:
+        content_type = response.headers["Content-Type"]
+        text = response.read().decode("utf-8")
+    samples = {}
+    for line in text.splitlines():
+        if not line.startswith("#"):
+            key, value = line.rsplit(" ", 1)
+            samples[key] = float(value)
+    return content_type, text, samples
+
+
+class LiveMetricsTestCase(test.TestCase):
+
+    def test_metrics(self):
+        metrics = live_metrics.LiveMetrics()
+        self.assertEqual("# EOF\n", metrics.to_string())
+
+        metrics.start_workload("t", "w", "Foo.bar")
+        metrics.add_iterations("w", [
+            _iteration(0.3, actions=[("foo", 1.2), ("bar", None)]),
+            _iteration(7, error=["KeyError", "msg", "tb"],
+                       actions=[("foo", 2)])])
+        metrics.add_iterations("w", [_iteration(0.01)], sla_passed=False)
+        metrics.finish_workload("w")
+
+        lines = metrics.to_string().splitlines()
+        labels = "task_uuid=\"t\",workload_uuid=\"w\",scenario=\"Foo.bar\""
+        for sample in (
+                "rally_workload_running{%s} 0",
+                "rally_iterations_total{%s} 3",
+                "rally_failed_iterations_total{%s} 1",
+                "rally_workload_sla_passed{%s} 0",
+                "rally_iteration_duration_seconds_bucket{%s,le=\"0.01\"} 1",
+                "rally_iteration_duration_seconds_bucket{%s,le=\"0.5\"} 2",
+                "rally_iteration_duration_seconds_bucket{%s,le=\"+Inf\"} 3",
+                "rally_iteration_duration_seconds_count{%s} 3",
+                "rally_iteration_duration_seconds_sum{%s} 7.31",
+                "rally_atomic_action_duration_seconds_bucket"
+                "{%s,action=\"foo\",le=\"0.25\"} 1",
+                "rally_atomic_action_duration_seconds_count"
+                "{%s,action=\"foo\"} 2"):
+            self.assertIn(sample % labels, lines)
+        # unfinished atomic actions are not accounted
+        self.assertNotIn("action=\"bar\"", "\n".join(lines))
+        self.assertEqual("# EOF", lines[-1])
+
+
+class MetricsServerTestCase(test.TestCase):
+
+    def test___init__invalid_endpoint(self):
+        for endpoint in ("localhost", ":80", "localhost:http"):
+            self.assertRaises(ValueError, live_metrics.MetricsServer,
+                              endpoint, live_metrics.LiveMetrics())
+
+    def test_scrape(self):
+        metrics = live_metrics.LiveMetrics()
+        server = live_metrics.MetricsServer("127.0.0.1:0", metrics)
+        server.start()
+        self.addCleanup(server.stop)
+        url = "http://%s:%s" % server.address
+
+        metrics.start_workload("t", "w", "Foo.bar")
+        content_type, _text, samples = scrape(url + "/metrics")
+        self.assertEqual(openmetrics.CONTENT_TYPE, content_type)
+        labels = "task_uuid=\"t\",workload_uuid=\"w\",scenario=\"Foo.bar\""
+        self.assertEqual(0, samples["rally_iterations_total{%s}" % labels])
+        self.assertEqual(1, samples["rally_workload_running{%s}" % labels])
+
+        # values are changed between scrapes
+        metrics.add_iterations("w", [_iteration(1), _iteration(2)])
+        _content_type, text, samples = scrape(url + "/metrics")
+        self.assertEqual(2, samples["rally_iterations_total{%s}" % labels])
+        self.assertEqual(
+            3, samples["rally_iteration_duration_seconds_sum{%s}" % labels])
+        self.assertTrue(text.endswith("# EOF\n"))
+
+        e = self.assertRaises(urllib.error.HTTPError,
+                              urllib.request.urlopen, url + "/foo")
+        self.assertEqual(404, e.code)
+        e.close()
+
+        server.stop()
+        self.assertRaises(urllib.error.URLError, urllib.request.urlopen,
+                          url + "/metrics", timeout=1)
@@ -234,3 +234,17 @@ class ScenarioRunnerTestCase(test.TestCase):
         self.assertTrue(mock_log.warning.called)
         self.assertEqual([], runner_.result_batch)
         self.assertEqual(collections.deque([]), runner_.result_queue)
+
+    def test__send_result_with_validation_sample_rate(self):
+        task = fakes.FakeTask(uuid="foo_uuid")
+        task.result_has_valid_schema = mock.MagicMock(return_value=True)
+        runner_ = self._get_runner(task=task, batch_size=10)
+        runner_.validation_sample_rate = 3
+        results = [{"timestamp": i} for i in range(7)]
+        for result in results:
+            runner_._send_result(result)
+        self.assertEqual(
+            [mock.call(results[0]), mock.call(results[3]),
+             mock.call(results[6])],
+            task.result_has_valid_schema.call_args_list)
+        self.assertEqual(results, runner_.result_batch)
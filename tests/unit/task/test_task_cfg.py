@@ -321,3 +321,116 @@ class TaskConfigTestCase(test.TestCase):
             "is found.",
             e.kwargs["message"]
         )
+
+    def _make_matrix_task(self, matrix, args=None):
+        return {"version": 2, "title": "", "subtasks": [{
+            "title": "foo",
+            "scenario": {"Dummy.dummy": args or {"sleep": 0}},
+            "runner": {"constant": {"times": 10, "concurrency": 1}},
+            "matrix": matrix}]}
+
+    def test_matrix_product(self):
+        task = task_cfg.TaskConfig(self._make_matrix_task(
+            {"product": {"runner.concurrency": [1, 2],
+                         "args.sleep": [0.1, 0.5, 1],
+                         "contexts.users.tenants": [3]}}))
+        workload = task.subtasks[0]["workloads"][0]
+        # the matrix is not expanded by the config
+        self.assertEqual(1, len(task.subtasks[0]["workloads"]))
+        self.assertIn("matrix", task.to_dict()["subtasks"][0]["workloads"][0])
+
+        workloads = list(task_cfg.expand_workload(workload))
+
+        self.assertEqual(
+            [{"runner.concurrency": c, "args.sleep": s,
+              "contexts.users.tenants": 3}
+             for c in (1, 2) for s in (0.1, 0.5, 1)],
+            [w["parameters"] for w in workloads])
+        self.assertEqual(
+            [({"concurrency": c, "times": 10}, {"sleep": s},
+              {"users": {"tenants": 3}})
+             for c in (1, 2) for s in (0.1, 0.5, 1)],
+            [(w["runner"], w["args"], w["contexts"]) for w in workloads])
+        self.assertNotIn("matrix", workloads[0])
+        # the original workload is not changed
+        self.assertEqual(1, workload["runner"]["concurrency"])
+        self.assertEqual({}, workload["contexts"])
+
+    def test_matrix_product_each_value_once(self):
+        task = task_cfg.TaskConfig(self._make_matrix_task(
+            {"product": {"runner.concurrency": [1, 2],
+                         "args.sleep": [0.1, 0.5, 1],
+                         "contexts.users.tenants": [3]}}))
+
+        workloads = list(task_cfg.expand_workload(
+            task.subtasks[0]["workloads"][0], each_value_once=True))
+
+        self.assertEqual(
+            [(1, 0.1), (2, 0.1), (1, 0.5), (1, 1)],
+            [(w["runner"]["concurrency"], w["args"]["sleep"])
+             for w in workloads])
+        self.assertEqual([{"users": {"tenants": 3}}] * 4,
+                         [w["contexts"] for w in workloads])
+
+    def test_matrix_zip(self):
+        task = task_cfg.TaskConfig(self._make_matrix_task(
+            {"zip": {"runner.concurrency": [1, 2, 4],
+                     "runner.times": [10, 20, 40]}}))
+        workloads = list(task_cfg.expand_workload(
+            task.subtasks[0]["workloads"][0]))
+        self.assertEqual(
+            [{"concurrency": 1, "times": 10}, {"concurrency": 2, "times": 20},
+             {"concurrency": 4, "times": 40}],
+            [w["runner"] for w in workloads])
+        # zipped values are never combined, so nothing can be skipped
+        self.assertEqual(workloads, list(task_cfg.expand_workload(
+            task.subtasks[0]["workloads"][0], each_value_once=True)))
+
+    def test_expand_workload_without_matrix(self):
+        workload = {"name": "foo"}
+        self.assertEqual([workload],
+                         list(task_cfg.expand_workload(workload)))
+
+    def test_matrix_invalid(self):
+        for matrix in ({"product": {"name": [1]}},
+                       {"product": {"runner.times": []}},
+                       {"product": {"runner.times": [1]}, "zip": {}},
+                       {"foo": {"runner.times": [1]}}):
+            self.assertRaises(exceptions.InvalidTaskException,
+                              task_cfg.TaskConfig,
+                              self._make_matrix_task(matrix))
+
+        e = self.assertRaises(
+            exceptions.InvalidTaskException, task_cfg.TaskConfig,
+            self._make_matrix_task({"zip": {"runner.times": [1, 2],
+                                            "args.sleep": [1]}}))
+        self.assertEqual(
+            "Subtask #1. Lists of values of zipped parameters of a matrix "
+            "should have the same length.", e.kwargs["message"])
+
+        e = self.assertRaises(
+            exceptions.InvalidTaskException, task_cfg.TaskConfig,
+            self._make_matrix_task({"product": {"args.foo.bar": [1]}},
+                                   args={"foo": [1, 2]}))
+        self.assertEqual(
+            "Parameter 'args.foo.bar' of the matrix of workload "
+            "Dummy.dummy[0] does not point to a property of an object.",
+            e.kwargs["message"])
+
+    def test_matrix_in_parallel_subtask(self):
+        config = {"version": 2, "title": "", "subtasks": [{
+            "title": "foo",
+            "run_in_parallel": True,
+            "workloads": [
+                {"scenario": {"Dummy.dummy": {"sleep": 0}}},
+                {"scenario": {"Dummy.dummy": {"sleep": 0}},
+                 "matrix": {"product": {"args.sleep": [1, 2]}}}]}]}
+
+        e = self.assertRaises(exceptions.InvalidTaskException,
+                              task_cfg.TaskConfig, config)
+        self.assertEqual(
+            "Subtask #1. Workloads of a subtask which are run in parallel "
+            "cannot have a matrix.", e.kwargs["message"])
+
+        config["subtasks"][0]["run_in_parallel"] = False
+        task_cfg.TaskConfig(config)
@@ -0,0 +1,82 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import os
+from unittest import mock
+
+import fixtures
+
+from rally.common import cfg
+from rally.task import template
+from tests.unit import test
+
+
+class TemplateTestCase(test.TestCase):
+
+    def setUp(self):
+        super(TemplateTestCase, self).setUp()
+        self.tempdir = self.useFixture(fixtures.TempDir()).path
+        self.cache_dir = os.path.join(self.tempdir, "cache")
+        self.useFixture(fixtures.MonkeyPatch(
+            "rally.task.template._cache", collections.OrderedDict()))
+        self.conf = self.useFixture(cfg.fixture.Config())
+        self.conf.config(template_cache_dir=self.cache_dir)
+
+    def test_get(self):
+        with open(os.path.join(self.tempdir, "inc.yaml"), "w") as f:
+            f.write("{{ b }}")
+        source = "{{ a }}-{% include 'inc.yaml' %}-{{ f(1) }}"
+
+        compiled = template.get(source, self.tempdir, {"f": str})
+
+        # variables of included templates are not found by jinja2
+        self.assertEqual({"a"}, compiled.undeclared - {"f"})
+        self.assertEqual("1-2-1", compiled.render(a=1, b=2))
+        self.assertIs(compiled, template.get(source, self.tempdir,
+                                             {"f": str}))
+        # the main template and the included one
+        self.assertEqual(2, len(os.listdir(self.cache_dir)))
+
+        # other directory of included templates
+        self.assertIsNot(compiled, template.get(source, self.cache_dir,
+                                                {"f": str}))
+
+    def test_get_evicts_templates(self):
+        self.useFixture(fixtures.MonkeyPatch(
+            "rally.task.template.CACHE_SIZE", 2))
+        first = template.get("{{ a }}", self.tempdir, {})
+        template.get("{{ b }}", self.tempdir, {})
+        template.get("{{ a }}", self.tempdir, {})
+        template.get("{{ c }}", self.tempdir, {})
+
+        self.assertEqual(2, len(template._cache))
+        self.assertIs(first, template.get("{{ a }}", self.tempdir, {}))
+
+    def test_get_uses_bytecode_cache(self):
+        self.assertEqual("1", template.get("{{ a }}", self.tempdir,
+                                           {}).render(a=1))
+        # as if it is a new process
+        template._cache.clear()
+
+        with mock.patch("jinja2.Environment.compile") as mock_compile:
+            self.assertEqual("2", template.get("{{ a }}", self.tempdir,
+                                               {}).render(a=2))
+        self.assertFalse(mock_compile.called)
+
+    def test_get_without_bytecode_cache(self):
+        self.conf.config(template_cache_dir="")
+        self.assertEqual("1", template.get("{{ a }}", self.tempdir,
+                                           {}).render(a=1))
+        self.assertFalse(os.path.exists(self.cache_dir))
@@ -16,10 +16,13 @@
 """Test for api."""
 
 import copy
+import datetime as dt
+import json
 import os
 from unittest import mock
 
 import ddt
+import fixtures
 
 from rally import api
 from rally.common import cfg
@@ -27,6 +30,7 @@ from rally.common import objects
 from rally import consts
 from rally import exceptions
 from tests.unit import fakes
+from tests.unit.plugins.task.exporters import dummy_data
 from tests.unit import test
 
 
@@ -50,6 +54,15 @@ FAKE_DEPLOYMENT_CONFIG = {
 }
 
 
+class CheckTaskResultTestCase(test.TestCase):
+
+    @mock.patch("rally.common.objects.task.check_result")
+    def test_check_task_result(self, mock_check_result):
+        self.assertEqual(mock_check_result.return_value,
+                         api.check_task_result({"duration": 1}))
+        mock_check_result.assert_called_once_with({"duration": 1})
+
+
 class APIGroupTestCase(test.TestCase):
     def setUp(self):
         super(APIGroupTestCase, self).setUp()
@@ -460,6 +473,103 @@ class TaskAPITestCase(test.TestCase):
             self.task_uuid,
             status=expected_status)
 
+    @ddt.data((consts.TaskStatus.FINISHED, True),
+              (consts.TaskStatus.CRASHED, True),
+              (consts.TaskStatus.RUNNING, False))
+    @ddt.unpack
+    @mock.patch("rally.api.plot.Trends")
+    @mock.patch("rally.api.objects.Task")
+    def test__index_trends(self, status, stored, mock_task, mock_trends):
+        mock_task.get.return_value.to_dict.return_value = {
+            "status": status,
+            "subtasks": [{"workloads": [{"uuid": "w1"}, {"uuid": "w2"}]},
+                         {"workloads": [{"uuid": "w3"}]}]}
+        mock_trends.return_value.make_point.side_effect = (
+            lambda w: "point-%s" % w["uuid"])
+
+        self.assertEqual(["point-w1", "point-w2", "point-w3"],
+                         self.task_inst._index_trends("uuid"))
+
+        mock_task.get.assert_called_once_with("uuid", detailed=True,
+                                              lazy_data=True)
+        if stored:
+            mock_task.set_trend_points.assert_called_once_with(
+                "uuid", [{"workload_uuid": w, "point": "point-%s" % w}
+                         for w in ("w1", "w2", "w3")])
+        else:
+            self.assertFalse(mock_task.set_trend_points.called)
+
+    @mock.patch("rally.api._Task._index_trends")
+    @mock.patch("rally.api.objects.Task.get_trend_points")
+    def test_get_trend_points(self, mock_task_get_trend_points,
+                              mock___task__index_trends):
+        mock_task_get_trend_points.return_value = {"uuid-2": ["p2"],
+                                                   "uuid-1": ["p1"]}
+        mock___task__index_trends.return_value = ["p3"]
+
+        points = self.task_inst.get_trend_points(
+            ["uuid-1", "uuid-2", "uuid-3"])
+
+        self.assertEqual(
+            [("uuid-1", ["p1"]), ("uuid-2", ["p2"]), ("uuid-3", ["p3"])],
+            list(points.items()))
+        mock_task_get_trend_points.assert_called_once_with(
+            ["uuid-1", "uuid-2", "uuid-3"])
+        mock___task__index_trends.assert_called_once_with("uuid-3")
+
+    @mock.patch("rally.api.objects.Workload.compact")
+    @mock.patch("rally.api.objects.Workload.list_for_compaction")
+    def test_compact(self, mock_workload_list_for_compaction,
+                     mock_workload_compact):
+        mock_workload_list_for_compaction.side_effect = [
+            [{"id": 1, "uuid": "w1"}, {"id": 2, "uuid": "w2"}],
+            [{"id": 5, "uuid": "w5"}],
+            []]
+        mock_workload_compact.side_effect = [True, False, True]
+
+        self.assertEqual(2, self.task_inst.compact(tags=["foo"],
+                                                   iterations_limit=10,
+                                                   batch_size=2))
+
+        self.assertEqual(
+            [mock.call(created_before=None, tags=["foo"], marker=None,
+                       limit=2),
+             mock.call(created_before=None, tags=["foo"], marker=2,
+                       limit=2),
+             mock.call(created_before=None, tags=["foo"], marker=5,
+                       limit=2)],
+            mock_workload_list_for_compaction.call_args_list)
+        self.assertEqual(
+            [mock.call(w, iterations_limit=10,
+                       chunk_format=cfg.CONF.raw_result_chunk_format)
+             for w in ("w1", "w2", "w5")],
+            mock_workload_compact.call_args_list)
+
+    @mock.patch("rally.api.objects.Workload.list_for_compaction",
+                return_value=[])
+    def test_compact_older_than(self, mock_workload_list_for_compaction):
+        self.assertEqual(0, self.task_inst.compact(older_than=7))
+        created_before = mock_workload_list_for_compaction.call_args[1][
+            "created_before"]
+        self.assertTrue(
+            dt.timedelta(days=7) <= dt.datetime.utcnow() - created_before)
+
+    def test_export_to_file_by_streaming_exporter(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            "report.json")
+        tasks_results = dummy_data.get_tasks_results()
+
+        # the report is written by the exporter itself, so it is not
+        #   returned as a content of "files"
+        self.assertEqual({"open": "file://%s" % path},
+                         self.task_inst.export(tasks=tasks_results,
+                                               output_type="json",
+                                               output_dest=path))
+        with open(path) as f:
+            report = json.load(f)
+        self.assertEqual([t["uuid"] for t in tasks_results],
+                         [t["uuid"] for t in report["tasks"]])
+
     @mock.patch("rally.api.texporter.TaskExporter")
     @mock.patch("rally.api.objects.Task.get")
     def test_export(self, mock_task_get, mock_task_exporter):
@@ -489,9 +599,12 @@ class TaskAPITestCase(test.TestCase):
         mock_task_exporter.make.assert_called_once_with(
             reporter,
             [t.to_dict.return_value for t in tasks] + [{"uuid": "uuid-3"}],
-            output_dest, api=self.task_inst.api)
-        self.assertEqual([mock.call(u, detailed=True) for u in tasks_id],
-                         mock_task_get.call_args_list)
+            output_dest, api=self.task_inst.api, use_cache=True)
+        self.assertEqual(
+            [mock.call(u, detailed=reporter.DETAILED,
+                       lazy_data=reporter.STREAMING)
+             for u in tasks_id],
+            mock_task_get.call_args_list)
 
     @mock.patch("rally.api.objects.Task")
     def test_get_detailed(self, mock_task):
@@ -500,7 +613,8 @@ class TaskAPITestCase(test.TestCase):
         self.assertEqual(
             task.to_dict.return_value,
             self.task_inst.get(task_id="task_uuid", detailed=True))
-        mock_task.get.assert_called_once_with("task_uuid", detailed=True)
+        mock_task.get.assert_called_once_with("task_uuid", detailed=True,
+                                              lazy_data=False)
         self.assertFalse(task.extend_results.called)
         task.to_dict.assert_called_once_with()
 
@@ -566,19 +680,66 @@ class TaskAPITestCase(test.TestCase):
             runner_type=workload["runner_type"],
             contexts=workload["contexts"],
             sla=workload["sla"],
-            hooks=workload["hooks"], args=workload["args"]
+            hooks=workload["hooks"], args=workload["args"],
+            parameters=None
         )
         sub_task.update_status.assert_called_once_with(
             consts.SubtaskStatus.FINISHED)
         work_load = sub_task.add_workload.return_value
         work_load.add_workload_data.assert_called_once_with(
-            0, {"raw": workload["data"]})
+            0, {"raw": workload["data"]}, chunk_format="json")
         work_load.set_results.assert_called_once_with(
             full_duration=workload["full_duration"],
             load_duration=workload["load_duration"],
             sla_results=workload["sla_results"]["sla"],
             contexts_results=workload["contexts_results"],
             hooks_results=workload["hooks"], start_time=workload["start_time"])
+        self.assertFalse(mock_task.return_value.delete.called)
+
+    @mock.patch("rally.api.objects.Task")
+    @mock.patch("rally.api.objects.Deployment.get")
+    def test_import_results_without_validation(self, mock_deployment_get,
+                                               mock_task):
+        mock_deployment_get.return_value = fakes.FakeDeployment(
+            uuid="deployment_uuid", admin="fake_admin", users=["fake_user"],
+            status=consts.DeployStatus.DEPLOY_FINISHED)
+        workload = {"name": "test_scenario", "description": "",
+                    "full_duration": 3, "load_duration": 1,
+                    "start_time": 23.77, "position": 0, "runner": {},
+                    "runner_type": "", "contexts": {},
+                    "contexts_results": [], "hooks": [], "pass_sla": True,
+                    "sla": {}, "sla_results": {"sla": []}, "args": {},
+                    "statistics": {}, "total_iteration_count": 1,
+                    "failed_iteration_count": 0, "data": [{"timestamp": 1}]}
+
+        self.task_inst.import_results(
+            deployment="deployment_uuid",
+            task_results={"subtasks": [{"title": "subtask-title",
+                                        "workloads": [workload]}]},
+            validate=False)
+
+        self.assertFalse(mock_task.return_value.result_has_valid_schema.called)
+        work_load = (mock_task.return_value.add_subtask.return_value
+                     .add_workload.return_value)
+        work_load.add_workload_data.assert_called_once_with(
+            0, {"raw": workload["data"]}, chunk_format="json")
+
+    @mock.patch("rally.api._Task._index_trends")
+    @mock.patch("rally.api.objects.Task")
+    @mock.patch("rally.api.objects.Deployment.get")
+    def test_import_results_failed_to_index_trends(
+            self, mock_deployment_get, mock_task, mock___task__index_trends):
+        mock_deployment_get.return_value = fakes.FakeDeployment(
+            uuid="deployment_uuid", admin="fake_admin", users=["fake_user"],
+            status=consts.DeployStatus.DEPLOY_FINISHED)
+        mock___task__index_trends.side_effect = RuntimeError("Oops")
+
+        # the task is imported, trends of it are indexed on the fly later
+        self.assertEqual(
+            mock_task.return_value.to_dict.return_value,
+            self.task_inst.import_results(deployment="deployment_uuid",
+                                          task_results={"subtasks": []}))
+        self.assertFalse(mock_task.return_value.delete.called)
 
     @mock.patch("rally.api.objects.Task")
     @mock.patch("rally.api.objects.Deployment.get")
@@ -614,6 +775,7 @@ class TaskAPITestCase(test.TestCase):
         task_results = {"subtasks": [{"title": "scen-subtasks",
                                       "workloads": [workload]}]}
         mock_conf.raw_result_chunk_size = 2
+        mock_conf.raw_result_chunk_format = "columnar"
 
         self.assertEqual(
             mock_task.return_value.to_dict(),
@@ -640,14 +802,17 @@ class TaskAPITestCase(test.TestCase):
             contexts=workload["contexts"],
             sla=workload["sla"],
             hooks=workload["hooks"],
-            args=workload["args"]
+            args=workload["args"],
+            parameters=None
         )
         sub_task.update_status.assert_called_once_with(
             consts.SubtaskStatus.FINISHED)
         work_load = sub_task.add_workload.return_value
         self.assertEqual(
-            [mock.call(0, {"raw": [{"timestamp": 1}, {"timestamp": 2}]}),
-             mock.call(1, {"raw": [{"timestamp": 3}]})],
+            [mock.call(0, {"raw": [{"timestamp": 1}, {"timestamp": 2}]},
+                       chunk_format="columnar"),
+             mock.call(1, {"raw": [{"timestamp": 3}]},
+                       chunk_format="columnar")],
             work_load.add_workload_data.call_args_list)
         work_load.set_results.assert_called_once_with(
             full_duration=workload["full_duration"],
@@ -681,14 +846,23 @@ class TaskAPITestCase(test.TestCase):
         mock_task.return_value.result_has_valid_schema = mock.MagicMock(
             return_value=False)
 
+        workload = {"name": "test_scenario", "description": "",
+                    "position": 0, "runner": {}, "runner_type": "",
+                    "contexts": {}, "hooks": [], "sla": {}, "args": {},
+                    "data": iter([{"a": 1}])}
         task_results = {"subtasks": [{"title": "subtask-title",
-                                      "workloads": [{"data": [{"a": 1}]}]
-                                      }]}
+                                      "workloads": [workload]}]}
 
         self.assertRaises(exceptions.RallyException,
                           self.task_inst.import_results,
                           deployment="deployment_uuid",
                           task_results=task_results)
+        sub_task = mock_task.return_value.add_subtask.return_value
+        work_load = sub_task.add_workload.return_value
+        self.assertFalse(work_load.add_workload_data.called)
+        # the half-imported task is removed
+        mock_task.return_value.delete.assert_called_once_with()
+        self.assertFalse(mock_task.return_value.to_dict.called)
 
 
 class BaseDeploymentTestCase(test.TestCase):
@@ -1009,6 +1183,38 @@ class APITestCase(test.TestCase):
         mock_conf.assert_called_once_with(
             [], default_config_files=None, project="rally", version="0.0.0")
 
+    @mock.patch("rally.common.db.schema.is_revision_verified")
+    @mock.patch("rally.common.db.schema.set_revision_verified")
+    @mock.patch("rally.common.version.database_revision",
+                return_value={"revision": "foobar", "current_head": "foobar"})
+    def test_check_db_revision(self, mock_database_revision,
+                               mock_set_revision_verified,
+                               mock_is_revision_verified):
+        api_inst = api.API(skip_db_check=True)
+
+        mock_is_revision_verified.return_value = True
+        api_inst.check_db_revision()
+        self.assertFalse(mock_database_revision.called)
+        self.assertFalse(mock_set_revision_verified.called)
+
+        mock_is_revision_verified.return_value = False
+        api_inst.check_db_revision()
+        mock_database_revision.assert_called_once_with()
+        mock_set_revision_verified.assert_called_once_with()
+
+        mock_set_revision_verified.reset_mock()
+        mock_database_revision.return_value = {"revision": "spam",
+                                               "current_head": "foobar"}
+        self.assertRaises(exceptions.RallyException,
+                          api_inst.check_db_revision)
+        self.assertFalse(mock_set_revision_verified.called)
+
+    @mock.patch("rally.common.version.database_revision")
+    def test_read_only(self, mock_database_revision):
+        api_inst = api.API.read_only(config_args=[])
+        self.assertIsInstance(api_inst, api.API)
+        self.assertFalse(mock_database_revision.called)
+
     def test_version(self):
         api_inst = api.API(skip_db_check=True)
         self.assertEqual(1, api_inst.version)
@@ -1671,11 +1877,38 @@ class VerificationAPITestCase(test.TestCase):
     @mock.patch("rally.api.objects.Verification.get")
     def test_get(self, mock_verification_get):
         verification_uuid = "uuiiiidd"
-        self.assertEqual(mock_verification_get.return_value.to_dict(),
+        verification = mock_verification_get.return_value
+        verification.to_dict.side_effect = lambda: {"uuid": verification_uuid}
+        self.assertEqual({"uuid": verification_uuid,
+                          "tests": verification.tests},
                          self.verification_inst.get(
                              verification_uuid=verification_uuid))
         mock_verification_get.assert_called_once_with(verification_uuid)
 
+        self.assertEqual({"uuid": verification_uuid},
+                         self.verification_inst.get(
+                             verification_uuid=verification_uuid,
+                             load_tests=False))
+
+    @mock.patch("rally.api.objects.Verification.get")
+    def test_get_tests(self, mock_verification_get):
+        verification = mock_verification_get.return_value
+        self.assertEqual(verification.get_tests.return_value,
+                         self.verification_inst.get_tests(
+                             verification_uuid="uuid", status="fail",
+                             detailed=False))
+        mock_verification_get.assert_called_once_with("uuid")
+        verification.get_tests.assert_called_once_with(status="fail",
+                                                       detailed=False)
+
+    @mock.patch("rally.api.objects.Verification.get_test_results")
+    def test_get_test_results(self, mock_verification_get_test_results):
+        self.assertEqual(mock_verification_get_test_results.return_value,
+                         self.verification_inst.get_test_results(
+                             ["test_1"], verification_uuids=["uuid"]))
+        mock_verification_get_test_results.assert_called_once_with(
+            ["test_1"], verification_uuids=["uuid"])
+
     @mock.patch("rally.api.objects.Verification.get")
     def test_delete(self, mock_verification_get):
         verification_uuid = "uuiiiidd"
@@ -1725,6 +1958,29 @@ class VerificationAPITestCase(test.TestCase):
         self.assertEqual([mock.call(u) for u in verifications],
                          mock_verification_get.call_args_list)
 
+    @mock.patch("rally.api.objects.Verification.get")
+    def test_report_to_file_by_streaming_reporter(self,
+                                                  mock_verification_get):
+        mock_verification_get.return_value = objects.Verification({
+            "uuid": "uuid-1", "env_uuid": "env-uuid",
+            "created_at": dt.datetime(2001, 1, 1), "tests_duration": 4,
+            "tests_count": 2, "skipped": 0, "failures": 0,
+            "unexpected_success": 0,
+            "tests": {"some.test.TestCase.test_1": {
+                "name": "some.test.TestCase.test_1", "status": "success",
+                "duration": "2"}}})
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            "junit.xml")
+
+        # the report is written by the reporter itself, so it is not
+        #   returned as a content of "files"
+        self.assertEqual({"open": path},
+                         self.verification_inst.report(
+                             uuids=["uuid-1"], output_type="junit-xml",
+                             output_dest=path))
+        with open(path) as f:
+            self.assertIn("name=\"test_1\"", f.read())
+
     @mock.patch("rally.api.objects.Verification.create")
     @mock.patch("rally.api._Verifier._get")
     def test_import_results(self, mock___verifier__get,
@@ -1939,8 +2195,9 @@ class VerificationAPITestCase(test.TestCase):
         tests = {"test_1": {"status": "success"},
                  "test_2": {"status": "fail"}}
         mock___verification__get.return_value = mock.Mock(
-            uuid="uuid", verifier_uuid="v_uuid", deployment_uuid="d_uuid",
-            tests=tests)
+            uuid="uuid", verifier_uuid="v_uuid", deployment_uuid="d_uuid")
+        verification = mock___verification__get.return_value
+        verification.get_tests.return_value = tests
         self.verification_inst.api.deployment.get.return_value = {
             "name": "d_name",
             "uuid": "d_uuid"}
@@ -1956,6 +2213,7 @@ class VerificationAPITestCase(test.TestCase):
         mock_start.assert_called_once_with(
             verifier_id="v_uuid", deployment_id="d_uuid",
             load_list=list(tests.keys()), tags=None, concurrency=1)
+        verification.get_tests.assert_called_once_with(detailed=False)
 
     @mock.patch("rally.api._Verification.start")
     @mock.patch("rally.api.objects.Verification.create")
@@ -1968,8 +2226,10 @@ class VerificationAPITestCase(test.TestCase):
                  "test_2": {"status": "fail"},
                  "test_3": {"status": "fail"}}
         mock_verification_get.return_value = mock.Mock(
-            uuid="uuid", verifier_uuid="v_uuid", deployment_uuid="d_uuid",
-            tests=tests)
+            uuid="uuid", verifier_uuid="v_uuid", deployment_uuid="d_uuid")
+        verification = mock_verification_get.return_value
+        verification.get_tests.return_value = dict(
+            (t, r) for t, r in tests.items() if r["status"] == "fail")
         self.verification_inst.return_value = mock.Mock()
         self.verification_inst.api.deployment.get.return_value = {
             "name": "deployment_name",
@@ -1980,16 +2240,15 @@ class VerificationAPITestCase(test.TestCase):
         mock_start.assert_called_once_with(
             verifier_id="v_uuid", deployment_id="deployment_uuid",
             load_list=expected_tests, tags=None)
+        verification.get_tests.assert_called_once_with(status="fail",
+                                                       detailed=False)
 
     @mock.patch("rally.api._Verification._get")
     def test_rerun_failed_tests_raise_exc(
             self, mock___verification__get):
-        tests = {"test_1": {"status": "success"},
-                 "test_2": {"status": "success"},
-                 "test_3": {"status": "skip"}}
         mock___verification__get.return_value = mock.Mock(
-            uuid="uuid", verifier_uuid="v_uuid", deployment_uuid="d_uuid",
-            tests=tests)
+            uuid="uuid", verifier_uuid="v_uuid", deployment_uuid="d_uuid")
+        mock___verification__get.return_value.get_tests.return_value = {}
 
         e = self.assertRaises(exceptions.RallyException,
                               self.verification_inst.rerun,